@@ -0,0 +1,206 @@
+"""
+Coalesced user activity counters.
+
+``UserActivityMiddleware`` used to insert one ``AnalyticsMetric`` row per page
+view and per API call. Activity is now counted in process, keyed by
+(metric, user, role, path template, method, minute), and written as one
+rolled-up ``AnalyticsMetric`` row per key (``value`` is the count) every
+``FLUSH_INTERVAL`` seconds. The request that crosses the interval only hands
+the rows to the monitoring ``TelemetryBuffer``, whose writer thread does the
+``bulk_create``; remaining counts are handed over at exit, before the buffer's
+own final flush.
+
+``SessionTouchThrottle`` limits the per-session "last seen" cache writes of
+``UserSessionMiddleware`` to one per ``SESSION_TOUCH_INTERVAL``.
+
+Configured through ``settings.USER_ACTIVITY``:
+
+* ``ENABLED``: count activity at all
+* ``FLUSH_INTERVAL``: seconds between rolled-up writes
+* ``MAX_KEYS``: distinct counters held before new keys are dropped
+* ``SESSION_TOUCH_INTERVAL``: seconds between session cache writes
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.utils import normalize_endpoint
+# Imported here, not lazily, so its atexit flush is registered before (and runs after) ours
+from system_monitoring.telemetry import get_buffer
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_METRIC_TYPE = 'user_activity'
+
+DEFAULT_ACTIVITY_SETTINGS = {
+    'ENABLED': True,
+    'FLUSH_INTERVAL': 60.0,
+    'MAX_KEYS': 50000,
+    'SESSION_TOUCH_INTERVAL': 60.0,
+}
+
+
+def get_activity_settings():
+    """Return user activity settings merged over the defaults."""
+    return {**DEFAULT_ACTIVITY_SETTINGS, **getattr(settings, 'USER_ACTIVITY', {})}
+
+
+class ActivityCounters:
+    """Thread-safe per-process activity counters handed to the telemetry writer as rolled-up rows."""
+
+    def __init__(self, flush_interval=60.0, max_keys=50000):
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+        self.dropped = 0
+        self.flushed = 0
+        self._counts = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def __len__(self):
+        return len(self._counts)
+
+    def increment(self, metric_name, user, path, method, **extra):
+        """Count one event for ``user`` in the current minute."""
+        self._check_fork()
+        minute = timezone.now().replace(second=0, microsecond=0)
+        key = (
+            metric_name,
+            user.id,
+            getattr(user, 'role', None),
+            normalize_endpoint(path),
+            method,
+            minute,
+            tuple(sorted(extra.items())),
+        )
+        with self._lock:
+            if key in self._counts:
+                self._counts[key] += 1
+            elif len(self._counts) >= self.max_keys:
+                self.dropped += 1
+            else:
+                self._counts[key] = 1
+            flush_due = time.monotonic() - self._last_flush >= self.flush_interval
+        if flush_due:
+            self.flush()
+
+    def flush(self):
+        """Queue one ``AnalyticsMetric`` row per counter on the telemetry buffer; returns the rows queued."""
+        from analytics.models import AnalyticsMetric
+
+        with self._lock:
+            counts, self._counts = self._counts, {}
+            self._last_flush = time.monotonic()
+        if not counts:
+            return 0
+
+        rows = []
+        for (metric_name, user_id, role, template, method, minute, extra), count in counts.items():
+            rows.append(AnalyticsMetric(
+                metric_name=metric_name,
+                metric_type=ACTIVITY_METRIC_TYPE,
+                value=count,
+                description=json.dumps({
+                    'path': template,
+                    'method': method,
+                    'user_id': user_id,
+                    'user_role': role,
+                    'minute': minute.isoformat(),
+                    **dict(extra),
+                }),
+            ))
+        if not get_buffer().add(*rows):
+            logger.warning(f"Telemetry buffer full, dropped {len(rows)} user activity rows")
+            self.dropped += len(rows)
+            return 0
+        self.flushed += len(rows)
+        return len(rows)
+
+    def _check_fork(self):
+        # Forked workers must not flush counts that belong to the parent
+        pid = os.getpid()
+        if pid != self._pid:
+            with self._lock:
+                self._pid = pid
+                self._counts = {}
+
+
+class SessionTouchThrottle:
+    """Remembers when each session was last written to allow one write per interval."""
+
+    def __init__(self, interval=60.0, max_keys=50000):
+        self.interval = interval
+        self.max_keys = max_keys
+        self._touched = {}
+        self._lock = threading.Lock()
+
+    def due(self, key):
+        """Return True (and record the touch) if ``key`` wasn't touched within the interval."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._touched.get(key)
+            if last is not None and now - last < self.interval:
+                return False
+            if last is None and len(self._touched) >= self.max_keys:
+                # Forget sessions whose interval has passed; they'd be due anyway
+                self._touched = {k: t for k, t in self._touched.items() if now - t < self.interval}
+            self._touched[key] = now
+            return True
+
+
+_counters = None
+_throttle = None
+_singleton_lock = threading.Lock()
+
+
+def get_activity_counters():
+    """Return the process-wide ``ActivityCounters``, creating it on first use."""
+    global _counters
+    if _counters is None:
+        with _singleton_lock:
+            if _counters is None:
+                config = get_activity_settings()
+                _counters = ActivityCounters(
+                    flush_interval=config['FLUSH_INTERVAL'],
+                    max_keys=config['MAX_KEYS'],
+                )
+    return _counters
+
+
+def get_session_throttle():
+    """Return the process-wide ``SessionTouchThrottle``."""
+    global _throttle
+    if _throttle is None:
+        with _singleton_lock:
+            if _throttle is None:
+                config = get_activity_settings()
+                _throttle = SessionTouchThrottle(
+                    interval=config['SESSION_TOUCH_INTERVAL'],
+                    max_keys=config['MAX_KEYS'],
+                )
+    return _throttle
+
+
+def reset_activity():
+    """Drop the process-wide counters and throttle so they are rebuilt from settings."""
+    global _counters, _throttle
+    with _singleton_lock:
+        _counters = None
+        _throttle = None
+
+
+@atexit.register
+def _flush_at_exit():
+    if _counters is not None:
+        try:
+            _counters.flush()
+        except Exception:
+            pass
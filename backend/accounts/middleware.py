@@ -9,6 +9,8 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.cache import cache
 
+from .activity import get_activity_counters, get_activity_settings, get_session_throttle
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
@@ -21,18 +23,18 @@ class UserSessionMiddleware(MiddlewareMixin):
     def process_request(self, request):
         """Track user session activity."""
         if hasattr(request, 'user') and request.user.is_authenticated:
-            # Update user session
+            # Update user session, at most once per SESSION_TOUCH_INTERVAL
             session_key = request.session.session_key
             if session_key:
                 cache_key = f'user_session_{request.user.id}_{session_key}'
-                session_data = cache.get(cache_key, {})
-                session_data.update({
+                if not get_session_throttle().due(cache_key):
+                    return
+                cache.set(cache_key, {
                     'last_activity': timezone.now().isoformat(),
                     'ip_address': self.get_client_ip(request),
                     'user_agent': request.META.get('HTTP_USER_AGENT', 'Unknown'),
                     'path': request.path,
-                })
-                cache.set(cache_key, session_data, 3600)  # 1 hour
+                }, 3600)  # 1 hour
     
     def get_client_ip(self, request):
         """Get client IP address."""
@@ -94,6 +96,8 @@ class UserActivityMiddleware(MiddlewareMixin):
     def process_request(self, request):
         """Track user activity for analytics."""
         if hasattr(request, 'user') and request.user.is_authenticated:
+            if not get_activity_settings()['ENABLED']:
+                return
             # Track page views
             if request.method == 'GET':
                 self.track_page_view(request)
@@ -103,39 +107,16 @@ class UserActivityMiddleware(MiddlewareMixin):
                 self.track_api_call(request)
     
     def track_page_view(self, request):
-        """Track page view for analytics."""
+        """Count a page view; rolled-up rows are written by accounts.activity."""
         try:
-            from analytics.models import AnalyticsMetric
-            
-            AnalyticsMetric.objects.create(
-                metric_name='page_view',
-                value=1,
-                recorded_at=timezone.now(),
-                description={
-                    'path': request.path,
-                    'user_id': request.user.id,
-                    'user_role': request.user.role,
-                }
-            )
+            get_activity_counters().increment('page_view', request.user, request.path, request.method)
         except Exception as e:
             logger.warning(f"Could not track page view: {e}")
     
     def track_api_call(self, request):
-        """Track API call for analytics."""
+        """Count an API call; rolled-up rows are written by accounts.activity."""
         try:
-            from analytics.models import AnalyticsMetric
-            
-            AnalyticsMetric.objects.create(
-                metric_name='api_call',
-                value=1,
-                recorded_at=timezone.now(),
-                description={
-                    'path': request.path,
-                    'method': request.method,
-                    'user_id': request.user.id,
-                    'user_role': request.user.role,
-                }
-            )
+            get_activity_counters().increment('api_call', request.user, request.path, request.method)
         except Exception as e:
             logger.warning(f"Could not track API call: {e}")
 
@@ -149,16 +130,10 @@ class UserNotificationMiddleware(MiddlewareMixin):
         """Add notification data to response."""
         if hasattr(request, 'user') and request.user.is_authenticated:
             try:
-                from notifications.models import Notification
-                
-                # Get unread notifications
-                unread_notifications = Notification.objects.filter(
-                    user=request.user,
-                    is_read=False
-                ).count()
+                from notifications.inbox import unread_count
                 
-                # Add notification count to response headers
-                response['X-Unread-Notifications'] = str(unread_notifications)
+                # Served from the cached inbox counters
+                response['X-Unread-Notifications'] = str(unread_count(request.user))
                 
             except Exception as e:
                 logger.warning(f"Could not get notifications: {e}")
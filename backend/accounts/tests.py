@@ -2,7 +2,7 @@
 Tests for accounts app.
 """
 
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.utils import timezone
@@ -400,3 +400,92 @@ class UserPermissionsTest(TestCase):
         self.assertTrue(self.admin.has_perm('accounts.add_user'))
         self.assertTrue(self.admin.has_perm('accounts.change_user'))
         self.assertTrue(self.admin.has_perm('accounts.delete_user'))
+
+
+@override_settings(MONITORING_TELEMETRY={'ENABLED': False, 'ASYNC_WRITER': False, 'FLUSH_INTERVAL': 3600})
+class UserActivityCountersTest(TestCase):
+    """Activity is counted in memory and written as rolled-up rows."""
+
+    def setUp(self):
+        from accounts.activity import reset_activity
+
+        reset_activity()
+        self.addCleanup(reset_activity)
+        self.user = User.objects.create_user(
+            username='activity_user',
+            email='activity@example.com',
+            password='testpass123',
+            role='Student',
+        )
+
+    def make_request(self, path, method='get'):
+        from django.test import RequestFactory
+
+        request = getattr(RequestFactory(), method)(path)
+        request.user = self.user
+        return request
+
+    def test_requests_are_coalesced_into_one_row_per_key(self):
+        from analytics.models import AnalyticsMetric
+        from accounts.activity import get_activity_counters
+        from accounts.middleware import UserActivityMiddleware
+        from system_monitoring.telemetry import get_buffer
+
+        middleware = UserActivityMiddleware(lambda request: None)
+        for project_id in (1, 2, 3):
+            middleware.process_request(self.make_request(f'/api/projects/{project_id}/'))
+        middleware.process_request(self.make_request('/api/projects/', method='post'))
+
+        activity = AnalyticsMetric.objects.filter(metric_type='user_activity')
+        self.assertEqual(activity.count(), 0)
+        self.assertEqual(get_activity_counters().flush(), 3)
+        self.assertEqual(activity.count(), 0)   # queued for the telemetry writer, not written inline
+        self.assertEqual(get_buffer().flush(), 3)
+
+        rows = {
+            (row.metric_name, json.loads(row.description)['path'], json.loads(row.description)['method']): row
+            for row in activity
+        }
+        self.assertEqual(rows[('page_view', '/api/projects/{id}/', 'GET')].value, 3)
+        self.assertEqual(rows[('api_call', '/api/projects/{id}/', 'GET')].value, 3)
+        self.assertEqual(rows[('api_call', '/api/projects/', 'POST')].value, 1)
+        description = json.loads(rows[('api_call', '/api/projects/', 'POST')].description)
+        self.assertEqual(description['user_id'], self.user.id)
+        self.assertEqual(description['user_role'], 'Student')
+        self.assertEqual(rows[('api_call', '/api/projects/', 'POST')].metric_type, 'user_activity')
+
+    def test_counters_flush_once_the_interval_elapses(self):
+        from analytics.models import AnalyticsMetric
+        from accounts.activity import ActivityCounters
+        from system_monitoring.telemetry import get_buffer
+
+        counters = ActivityCounters(flush_interval=0)
+        counters.increment('api_call', self.user, '/api/students/', 'GET')
+        self.assertEqual(len(counters), 0)
+        self.assertEqual(len(get_buffer()), 1)
+        get_buffer().flush()
+        self.assertEqual(AnalyticsMetric.objects.get(metric_type='user_activity').value, 1)
+
+    def test_counters_drop_new_keys_when_full(self):
+        from accounts.activity import ActivityCounters
+
+        counters = ActivityCounters(max_keys=1)
+        counters.increment('api_call', self.user, '/api/students/', 'GET')
+        counters.increment('api_call', self.user, '/api/students/', 'GET')
+        counters.increment('api_call', self.user, '/api/advisors/', 'GET')
+        self.assertEqual(len(counters), 1)
+        self.assertEqual(counters.dropped, 1)
+
+    def test_session_writes_are_throttled(self):
+        from unittest import mock
+        from accounts.middleware import UserSessionMiddleware
+
+        request = self.make_request('/api/projects/')
+        request.session = mock.Mock(session_key='abc123')
+        middleware = UserSessionMiddleware(lambda request: None)
+        with mock.patch('accounts.middleware.cache') as cache:
+            middleware.process_request(request)
+            middleware.process_request(request)
+            middleware.process_request(request)
+        self.assertEqual(cache.set.call_count, 1)
+        self.assertEqual(cache.set.call_args[0][0], f'user_session_{self.user.id}_abc123')
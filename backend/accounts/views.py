@@ -3,7 +3,7 @@ from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import RefreshToken, Token
 from django.contrib.auth import login, logout
 from django.utils import timezone
 from django.conf import settings
@@ -11,6 +11,9 @@ from django.db.models import Q, Count
 from django_filters.rest_framework import DjangoFilterBackend
 import uuid
 
+from core.jwt_auth import revoke_token
+from core.principal import invalidate_principal
+
 from .models import User, UserSession, PasswordResetToken
 from .serializers import (
     UserSerializer, UserCreateSerializer, UserUpdateSerializer,
@@ -129,6 +132,10 @@ class LogoutView(APIView):
         except Exception:
             pass
         
+        # Reject the access token used for this request from now on
+        if isinstance(request.auth, Token):
+            revoke_token(request.auth)
+        
         # Deactivate user sessions
         UserSession.objects.filter(
             user=request.user,
@@ -329,6 +336,9 @@ class UserViewSet(viewsets.ModelViewSet):
             
             # Update users
             updated_count = User.objects.filter(id__in=user_ids).update(**updates)
+            # update() sends no post_save, so drop the cached principals here
+            for user_id in user_ids:
+                invalidate_principal(user_id)
             
             return Response({
                 'message': f'Successfully updated {updated_count} users.',
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import (
-    Advisor, AdvisorSpecialization, AdvisorWorkload, AdvisorPerformance,
+    Advisor, AdvisorSpecialization, AdvisorWorkload, AdvisorWorkloadCounter, AdvisorPerformance,
     AdvisorAvailability, AdvisorNote
 )
 
@@ -53,6 +53,19 @@ class AdvisorWorkloadAdmin(admin.ModelAdmin):
     ordering = ['-academic_year', '-semester']
 
 
+@admin.register(AdvisorWorkloadCounter)
+class AdvisorWorkloadCounterAdmin(admin.ModelAdmin):
+    """Admin interface for AdvisorWorkloadCounter model (maintained by advisors.workload)."""
+    
+    list_display = ['advisor', 'academic_year', 'supervised_projects', 'main_committee_seats',
+                    'second_committee_seats', 'third_committee_seats', 'pending_reviews', 'updated_at']
+    list_filter = ['academic_year']
+    search_fields = ['advisor__advisor_id']
+    ordering = ['-academic_year', 'advisor']
+    readonly_fields = ['supervised_projects', 'main_committee_seats', 'second_committee_seats',
+                       'third_committee_seats', 'pending_reviews', 'updated_at']
+
+
 @admin.register(AdvisorPerformance)
 class AdvisorPerformanceAdmin(admin.ModelAdmin):
     """Admin interface for AdvisorPerformance model."""
@@ -0,0 +1,15 @@
+"""
+Advisors app configuration.
+"""
+
+from django.apps import AppConfig
+
+
+class AdvisorsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'advisors'
+    
+    def ready(self):
+        """Connect the workload counter signals when app is ready."""
+        from .workload import connect_signals
+        connect_signals()
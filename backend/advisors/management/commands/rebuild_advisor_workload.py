@@ -0,0 +1,17 @@
+"""
+Management command to rebuild the advisor workload counters
+Usage: python manage.py rebuild_advisor_workload
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from advisors.workload import rebuild_workload_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute advisor workload counters from projects, committee seats and milestones'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild_workload_counters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} advisor workload counters"))
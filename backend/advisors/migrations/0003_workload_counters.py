@@ -0,0 +1,81 @@
+# Generated by Django 5.0.7 on 2026-10-17 03:05
+
+import django.db.models.deletion
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+
+ROLE_COUNTERS = {
+    'main': 'main_committee_seats',
+    'second': 'second_committee_seats',
+    'third': 'third_committee_seats',
+}
+
+
+def academic_year_of(project_id):
+    parts = (project_id or '').split('-')
+    if len(parts) >= 2 and parts[0].isdigit() and parts[1].isdigit():
+        return f"{parts[0]}-{parts[1]}"
+    return ''
+
+
+def backfill_workload_counters(apps, schema_editor):
+    """Count supervised projects, committee seats and submitted milestones per advisor and year."""
+    Project = apps.get_model('projects', 'Project')
+    ProjectCommitteeMember = apps.get_model('committees', 'ProjectCommitteeMember')
+    Milestone = apps.get_model('milestones', 'Milestone')
+    AdvisorWorkloadCounter = apps.get_model('advisors', 'AdvisorWorkloadCounter')
+    alias = schema_editor.connection.alias
+
+    counts = defaultdict(Counter)
+    supervisors = {}
+    projects = Project.objects.using(alias).filter(advisor__isnull=False).values_list('advisor_id', 'project_id')
+    for advisor_id, project_id in projects.iterator():
+        supervisors[project_id] = advisor_id
+        counts[(advisor_id, academic_year_of(project_id))]['supervised_projects'] += 1
+    seats = ProjectCommitteeMember.objects.using(alias).values_list('advisor_id', 'role', 'project_group__project_id')
+    for advisor_id, role, project_id in seats.iterator():
+        counts[(advisor_id, academic_year_of(project_id))][ROLE_COUNTERS[role]] += 1
+    submitted = Milestone.objects.using(alias).filter(status='Submitted').values_list('project_group__project_id', flat=True)
+    for project_id in submitted.iterator():
+        if project_id in supervisors:
+            counts[(supervisors[project_id], academic_year_of(project_id))]['pending_reviews'] += 1
+
+    AdvisorWorkloadCounter.objects.using(alias).bulk_create([
+        AdvisorWorkloadCounter(advisor_id=advisor_id, academic_year=year, **fields)
+        for (advisor_id, year), fields in counts.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisors', '0002_advisor_employee_id_advisor_max_students_and_more'),
+        ('committees', '0002_project_committee_members'),
+        ('milestones', '0004_milestone_status_due_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdvisorWorkloadCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('academic_year', models.CharField(blank=True, max_length=10)),
+                ('supervised_projects', models.IntegerField(default=0)),
+                ('main_committee_seats', models.IntegerField(default=0)),
+                ('second_committee_seats', models.IntegerField(default=0)),
+                ('third_committee_seats', models.IntegerField(default=0)),
+                ('pending_reviews', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('advisor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workload_counters', to='advisors.advisor')),
+            ],
+            options={
+                'verbose_name': 'Advisor Workload Counter',
+                'verbose_name_plural': 'Advisor Workload Counters',
+                'db_table': 'advisor_workload_counters',
+                'indexes': [models.Index(fields=['academic_year'], name='advisor_wor_academi_f28f3b_idx')],
+                'unique_together': {('advisor', 'academic_year')},
+            },
+        ),
+        migrations.RunPython(backfill_workload_counters, migrations.RunPython.noop),
+    ]
@@ -52,15 +52,84 @@ class Advisor(models.Model):
     
     @property
     def current_load(self):
-        """Calculate current workload."""
-        # TODO: Implement logic to calculate current project load
-        return 0
+        """Number of projects this advisor supervises in the current academic year."""
+        return self.get_workload()['supervised_projects']
     
     @property
     def is_overloaded(self):
-        """Check if advisor is overloaded."""
+        """Check if advisor is over quota in the current academic year."""
         return self.current_load > self.quota
 
+    def get_workload(self, academic_year=None, all_years=False):
+        """
+        Workload counters for ``academic_year`` (default: the user's current
+        academic year), or summed over all years with ``all_years``.
+        Quotas apply per academic year (see ``advisors.workload``).
+        """
+        from .workload import counter_totals
+        if all_years:
+            return counter_totals(self)
+        if academic_year is None:
+            academic_year = self.user.current_academic_year
+        return counter_totals(self, academic_year)
+
+    def get_workload_summary(self, academic_year=None, all_years=False):
+        """Workload counters against the advisor's quotas."""
+        from .workload import workload_summary
+        return workload_summary(self, self.get_workload(academic_year, all_years))
+
+    def can_supervise_more_projects(self, academic_year=None):
+        """Check if advisor can supervise more projects in ``academic_year`` (default: current)."""
+        return self.get_workload(academic_year)['supervised_projects'] < self.quota
+
+    def get_committee_count(self, committee_type, academic_year=None):
+        """Number of committee seats of ``committee_type`` this advisor holds in ``academic_year``."""
+        from .workload import ROLE_COUNTERS
+        if committee_type not in ROLE_COUNTERS:
+            return 0
+        return self.get_workload(academic_year)[ROLE_COUNTERS[committee_type]]
+
+    def can_join_committee(self, committee_type, academic_year=None):
+        """Check if advisor can join committee of specific type"""
+        quota_map = {
+            'main': self.main_committee_quota,
+            'second': self.second_committee_quota,
+            'third': self.third_committee_quota
+        }
+        if committee_type not in quota_map:
+            return False
+        return self.get_committee_count(committee_type, academic_year) < quota_map[committee_type]
+
+
+class AdvisorWorkloadCounter(models.Model):
+    """
+    Live workload counters of an advisor for one academic year.
+
+    Maintained incrementally by ``advisors.workload`` as projects, committee
+    seats and milestone reviews change; ``AdvisorWorkload`` holds snapshots.
+    """
+    
+    advisor = models.ForeignKey(Advisor, on_delete=models.CASCADE, related_name='workload_counters')
+    academic_year = models.CharField(max_length=10, blank=True)  # '' for project IDs without a year prefix
+    supervised_projects = models.IntegerField(default=0)
+    main_committee_seats = models.IntegerField(default=0)
+    second_committee_seats = models.IntegerField(default=0)
+    third_committee_seats = models.IntegerField(default=0)
+    pending_reviews = models.IntegerField(default=0)  # Submitted milestones of supervised projects
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'advisor_workload_counters'
+        verbose_name = 'Advisor Workload Counter'
+        verbose_name_plural = 'Advisor Workload Counters'
+        unique_together = ['advisor', 'academic_year']
+        indexes = [
+            models.Index(fields=['academic_year']),
+        ]
+    
+    def __str__(self):
+        return f"{self.advisor_id} - {self.academic_year}"
+
 
 class AdvisorSpecialization(models.Model):
     """Specializations for advisors."""
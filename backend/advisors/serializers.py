@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from core.fieldsets import SparseFieldsetMixin
 from .models import (
     Advisor, AdvisorSpecialization, AdvisorWorkload, AdvisorPerformance,
     AdvisorAvailability, AdvisorNote
@@ -8,8 +10,8 @@ from .models import (
 User = get_user_model()
 
 
-class AdvisorSerializer(serializers.ModelSerializer):
-    """Serializer for Advisor model."""
+class AdvisorSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer for Advisor model (supports ``?fields=``/``?omit=``)."""
     
     user = serializers.SerializerMethodField()
     specializations = serializers.SerializerMethodField()
@@ -30,6 +32,17 @@ class AdvisorSerializer(serializers.ModelSerializer):
             'current_workload', 'performance_summary', 'recent_notes'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+    select_related_fields = {'user': ['user'], 'current_workload': ['user']}
+    prefetch_related_fields = {
+        'specializations': ['specializations'],
+        'specializedMajorIds': ['specializations'],
+        'current_workload': ['workload_counters'],
+        'recent_notes': [Prefetch(
+            'notes', queryset=AdvisorNote.objects.filter(is_private=False).select_related('created_by'),
+            to_attr='public_notes',
+        )],
+    }
     
     def get_user(self, obj):
         """Get user information."""
@@ -59,33 +72,41 @@ class AdvisorSerializer(serializers.ModelSerializer):
     
     def get_specializedMajorIds(self, obj):
         """Get specialized major IDs for frontend compatibility."""
-        from majors.models import Major
-        specializations = obj.specializations.all()
+        majors = self._get_majors()
         major_ids = []
-        for spec in specializations:
-            try:
-                # Try to find major by name
-                major = Major.objects.filter(name__icontains=spec.major).first()
-                if major:
-                    major_ids.append(major.id)
-            except:
-                pass
+        for spec in obj.specializations.all():
+            # Match by name, like Major.objects.filter(name__icontains=spec.major).first()
+            needle = (spec.major or '').lower()
+            major_id = next((pk for pk, name in majors if needle in name.lower()), None)
+            if major_id is not None:
+                major_ids.append(major_id)
         # If no specializations, return all major IDs (allow advisor to supervise all majors)
         if not major_ids:
-            major_ids = list(Major.objects.values_list('id', flat=True))
+            major_ids = [pk for pk, _ in majors]
         return major_ids
+
+    def _get_majors(self):
+        """``(id, name)`` of every major, loaded once per serialization."""
+        majors = self.context.get('_majors')
+        if majors is None:
+            from majors.models import Major
+            majors = list(Major.objects.order_by('id').values_list('id', 'name'))
+            self.context['_majors'] = majors
+        return majors
     
     def get_current_workload(self, obj):
-        """Get current workload information."""
-        # TODO: Implement actual workload calculation
+        """Get current workload information from the prefetched workload counters."""
+        workload = obj.get_workload_summary()
         return {
-            'supervising_projects': 0,
-            'main_committee_projects': 0,
-            'second_committee_projects': 0,
-            'third_committee_projects': 0,
-            'total_projects': 0,
-            'is_overloaded': False,
-            'utilization_rate': 0.0
+            'supervising_projects': workload['supervised_projects'],
+            'main_committee_projects': workload['main_committee_seats'],
+            'second_committee_projects': workload['second_committee_seats'],
+            'third_committee_projects': workload['third_committee_seats'],
+            'pending_reviews': workload['pending_reviews'],
+            'total_projects': workload['supervised_projects'] + workload['committee_seats'],
+            'is_overloaded': workload['is_overloaded'],
+            'over_quota': workload['over_quota'],
+            'utilization_rate': workload['utilization_rate']
         }
     
     def get_performance_summary(self, obj):
@@ -100,7 +121,10 @@ class AdvisorSerializer(serializers.ModelSerializer):
     
     def get_recent_notes(self, obj):
         """Get recent notes."""
-        notes = obj.notes.filter(is_private=False).all()[:5]  # Last 5 public notes
+        notes = getattr(obj, 'public_notes', None)
+        if notes is None:
+            notes = obj.notes.filter(is_private=False).select_related('created_by')
+        notes = notes[:5]  # Last 5 public notes
         return [
             {
                 'id': note.id,
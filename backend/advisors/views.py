@@ -1,9 +1,11 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db.models import Avg, F, Q
 from django.utils import timezone
 
+from projects.statistics import is_academic_year
+
 from .models import (
     Advisor, AdvisorSpecialization, AdvisorWorkload, AdvisorPerformance,
     AdvisorAvailability, AdvisorNote
@@ -14,6 +16,7 @@ from .serializers import (
     AdvisorAvailabilitySerializer, AdvisorNoteSerializer, AdvisorBulkUpdateSerializer,
     AdvisorSearchSerializer, AdvisorWorkloadSummarySerializer
 )
+from .workload import ALL_YEARS, COUNTER_FIELDS, workload_queryset, workload_summary
 
 
 class AdvisorListView(generics.ListCreateAPIView):
@@ -73,7 +76,8 @@ class AdvisorListView(generics.ListCreateAPIView):
         elif user.role == 'Admin':
             pass  # No filtering
         
-        return queryset
+        # Load only the related rows the requested ?fields= need
+        return AdvisorSerializer.optimize_queryset(queryset, self.request)
 
 
 class AdvisorDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -243,8 +247,12 @@ def advisor_statistics(request):
             department_distribution[dept] = advisors.filter(department=dept).count()
     
     # Workload statistics
-    overloaded_advisors = advisors.filter(is_active=True).count()  # TODO: Implement actual overload calculation
-    average_quota = advisors.aggregate(avg_quota=models.Avg('quota'))['avg_quota'] or 0
+    overloaded_advisors = workload_queryset(
+        advisors.filter(is_active=True), request.user.current_academic_year
+    ).filter(
+        supervised_projects_total__gt=F('quota')
+    ).count()
+    average_quota = advisors.aggregate(avg_quota=Avg('quota'))['avg_quota'] or 0
     
     return Response({
         'total_advisors': total_advisors,
@@ -334,34 +342,49 @@ def advisor_search(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def advisor_workload_summary(request):
-    """Get workload summary for all advisors."""
-    advisors = Advisor.objects.filter(is_active=True)
+    """
+    Get workload summary for all advisors in ``academic_year`` (default: the
+    user's current academic year), or summed over all years with ``academic_year=all``.
+    """
+    academic_year = request.query_params.get('academic_year') or request.user.current_academic_year
+    if academic_year == ALL_YEARS:
+        academic_year = None
+    elif not is_academic_year(academic_year):
+        return Response(
+            {'academic_year': ['Expected an academic year such as 2024-2025, or "all".']},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Workload counters are summed inside the advisor query; specializations come in one prefetch
+    advisors = workload_queryset(
+        Advisor.objects.filter(is_active=True).select_related('user').prefetch_related('specializations'),
+        academic_year,
+    )
     
     workload_summaries = []
     for advisor in advisors:
-        # TODO: Implement actual workload calculation
-        current_load = 0  # Placeholder
-        quota = advisor.quota
-        utilization_rate = (current_load / quota * 100) if quota > 0 else 0
-        
-        specializations = list(advisor.specializations.values_list('major', flat=True))
-        
+        workload = workload_summary(
+            advisor, {field: getattr(advisor, f'{field}_total') for field in COUNTER_FIELDS}
+        )
         workload_summaries.append({
             'advisor_id': advisor.advisor_id,
             'advisor_name': advisor.user.get_full_name(),
-            'current_load': current_load,
-            'quota': quota,
-            'utilization_rate': round(utilization_rate, 2),
-            'is_overloaded': current_load > quota,
-            'specializations': specializations,
+            'current_load': workload['supervised_projects'],
+            'quota': advisor.quota,
+            'utilization_rate': workload['utilization_rate'],
+            'is_overloaded': workload['is_overloaded'],
+            'workload': workload,
+            'specializations': [s.major for s in advisor.specializations.all()],
             'performance_score': 0.0,  # Placeholder
             'availability_status': 'Available'  # Placeholder
         })
     
     return Response({
+        'academic_year': academic_year or ALL_YEARS,
         'workload_summaries': workload_summaries,
         'total_advisors': len(workload_summaries),
         'overloaded_count': sum(1 for w in workload_summaries if w['is_overloaded']),
+        'over_quota_count': sum(1 for w in workload_summaries if w['workload']['over_quota']),
         'average_utilization': sum(w['utilization_rate'] for w in workload_summaries) / len(workload_summaries) if workload_summaries else 0
     })
 
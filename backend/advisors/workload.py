@@ -0,0 +1,272 @@
+"""
+Advisor workload counters.
+
+``AdvisorWorkloadCounter`` holds, per advisor and academic year, the number
+of supervised projects, main/second/third committee seats and pending reviews
+(submitted milestones of supervised projects). The counters are adjusted
+incrementally where assignments change instead of being recounted on read:
+
+* ``Project.advisor`` and project deletion, through signals
+* committee seats, by ``committees.membership.sync_committee_members``
+* milestone status changes and deletion, through signals
+* bulk transfers, by ``projects.bulk_operations``
+
+so an advisor's workload and quota checks read one small indexed set of rows
+and the department summary (``workload_queryset``) is a single query. Quotas
+are per academic year: checks default to the user's current academic year (or
+the year of the project being assigned) and sum all years only when asked.
+``rebuild_workload_counters`` recomputes everything from the source rows
+(``python manage.py rebuild_advisor_workload``).
+"""
+
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db.models import F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+COUNTER_FIELDS = (
+    'supervised_projects', 'main_committee_seats', 'second_committee_seats',
+    'third_committee_seats', 'pending_reviews',
+)
+ROLE_COUNTERS = {
+    'main': 'main_committee_seats',
+    'second': 'second_committee_seats',
+    'third': 'third_committee_seats',
+}
+QUOTA_FIELDS = {
+    'supervised_projects': 'quota',
+    'main_committee_seats': 'main_committee_quota',
+    'second_committee_seats': 'second_committee_quota',
+    'third_committee_seats': 'third_committee_quota',
+}
+PENDING_REVIEW_STATUS = 'Submitted'
+ALL_YEARS = 'all'  # Query value asking for counters summed over every academic year
+
+
+def academic_year_of(project_id):
+    from projects.read_model import academic_year_from_project_id
+    return academic_year_from_project_id(project_id)
+
+
+class WorkloadDelta:
+    """Counter changes keyed by (advisor pk, academic year), written in one pass."""
+
+    def __init__(self):
+        self.changes = defaultdict(Counter)
+
+    def add(self, advisor_id, project_id, field, n=1):
+        if advisor_id and n:
+            self.changes[(advisor_id, academic_year_of(project_id))][field] += n
+
+    def move(self, old_advisor_id, new_advisor_id, project_id, field, n=1):
+        if old_advisor_id != new_advisor_id:
+            self.add(old_advisor_id, project_id, field, -n)
+            self.add(new_advisor_id, project_id, field, n)
+
+    def apply(self):
+        """Create missing counter rows, then one UPDATE per distinct change."""
+        from .models import AdvisorWorkloadCounter
+
+        changes = {
+            key: tuple(sorted((field, n) for field, n in fields.items() if n))
+            for key, fields in self.changes.items()
+        }
+        changes = {key: delta for key, delta in changes.items() if delta}
+        self.changes.clear()
+        if not changes:
+            return
+        AdvisorWorkloadCounter.objects.bulk_create(
+            [AdvisorWorkloadCounter(advisor_id=advisor_id, academic_year=year) for advisor_id, year in changes],
+            ignore_conflicts=True,
+        )
+        rows_by_delta = defaultdict(list)
+        for (advisor_id, year), delta in changes.items():
+            rows_by_delta[delta].append(Q(advisor_id=advisor_id, academic_year=year))
+        now = timezone.now()
+        for delta, rows in rows_by_delta.items():
+            AdvisorWorkloadCounter.objects.filter(reduce(or_, rows)).update(
+                updated_at=now, **{field: F(field) + n for field, n in delta}
+            )
+
+
+def counter_totals(advisor, academic_year=None):
+    """Counters of ``advisor`` summed over academic years (or for one), using prefetched rows if present."""
+    totals = dict.fromkeys(COUNTER_FIELDS, 0)
+    for row in advisor.workload_counters.all():
+        if academic_year is None or row.academic_year == academic_year:
+            for field in COUNTER_FIELDS:
+                totals[field] += getattr(row, field)
+    return totals
+
+
+def workload_summary(advisor, totals):
+    """``totals`` against the quotas of ``advisor``."""
+    over_quota = [
+        field for field, quota_field in QUOTA_FIELDS.items()
+        if totals[field] > getattr(advisor, quota_field)
+    ]
+    quota = advisor.quota
+    return {
+        **totals,
+        'committee_seats': sum(totals[field] for field in ROLE_COUNTERS.values()),
+        'quota': quota,
+        'main_committee_quota': advisor.main_committee_quota,
+        'second_committee_quota': advisor.second_committee_quota,
+        'third_committee_quota': advisor.third_committee_quota,
+        'utilization_rate': round(totals['supervised_projects'] * 100 / quota, 2) if quota > 0 else 0,
+        'is_overloaded': 'supervised_projects' in over_quota,
+        'over_quota': over_quota,
+    }
+
+
+def workload_queryset(advisors, academic_year=None):
+    """
+    Annotate ``advisors`` with their counters (``<field>_total``) in the same query.
+
+    Correlated subqueries rather than a join, so further annotations and
+    filters on ``advisors`` are not multiplied by counter rows.
+    """
+    from .models import AdvisorWorkloadCounter
+
+    counters = AdvisorWorkloadCounter.objects.filter(advisor=OuterRef('pk'))
+    if academic_year is not None:
+        counters = counters.filter(academic_year=academic_year)
+    counters = counters.order_by().values('advisor')
+    return advisors.annotate(**{
+        f'{field}_total': Coalesce(
+            Subquery(counters.annotate(total=Sum(field)).values('total')[:1], output_field=IntegerField()),
+            Value(0),
+        )
+        for field in COUNTER_FIELDS
+    })
+
+
+def rebuild_workload_counters():
+    """Recompute every counter from projects, committee seats and milestones; returns rows written."""
+    from committees.models import ProjectCommitteeMember
+    from milestones.models import Milestone
+    from projects.models import Project
+    from .models import AdvisorWorkloadCounter
+
+    counts = defaultdict(Counter)
+    supervisors = {}
+    for advisor_id, project_id in Project.objects.filter(advisor__isnull=False).values_list('advisor_id', 'project_id'):
+        supervisors[project_id] = advisor_id
+        counts[(advisor_id, academic_year_of(project_id))]['supervised_projects'] += 1
+    seats = ProjectCommitteeMember.objects.values_list('advisor_id', 'role', 'project_group__project_id')
+    for advisor_id, role, project_id in seats:
+        counts[(advisor_id, academic_year_of(project_id))][ROLE_COUNTERS[role]] += 1
+    submitted = Milestone.objects.filter(status=PENDING_REVIEW_STATUS).values_list('project_group__project_id', flat=True)
+    for project_id in submitted:
+        if project_id in supervisors:
+            counts[(supervisors[project_id], academic_year_of(project_id))]['pending_reviews'] += 1
+
+    AdvisorWorkloadCounter.objects.all().delete()
+    AdvisorWorkloadCounter.objects.bulk_create([
+        AdvisorWorkloadCounter(advisor_id=advisor_id, academic_year=year, **fields)
+        for (advisor_id, year), fields in counts.items()
+    ], batch_size=500)
+    return len(counts)
+
+
+# Signal handlers
+
+def _supervision(project_group_id):
+    """``(advisor pk, project_id)`` of the project supervising a group, or ``None``."""
+    from projects.models import Project, ProjectGroup
+
+    return (
+        Project.objects.filter(
+            project_id__in=ProjectGroup.objects.filter(pk=project_group_id).values('project_id')
+        ).values_list('advisor_id', 'project_id').first()
+    )
+
+
+def _pending_reviews(project_id):
+    from milestones.models import Milestone
+
+    return Milestone.objects.filter(project_group__project_id=project_id, status=PENDING_REVIEW_STATUS).count()
+
+
+def _remember_project(sender, instance, **kwargs):
+    instance._workload_previous = (
+        sender.objects.filter(pk=instance.pk).values_list('advisor_id', 'project_id').first()
+        if instance.pk else None
+    )
+
+
+def _project_saved(sender, instance, **kwargs):
+    old_advisor_id, old_project_id = getattr(instance, '_workload_previous', None) or (None, None)
+    if (old_advisor_id, old_project_id) == (instance.advisor_id, instance.project_id):
+        return
+    delta = WorkloadDelta()
+    pending = _pending_reviews(instance.project_id) if (old_advisor_id or instance.advisor_id) else 0
+    for field, n in (('supervised_projects', 1), ('pending_reviews', pending)):
+        delta.add(old_advisor_id, old_project_id, field, -n)
+        delta.add(instance.advisor_id, instance.project_id, field, n)
+    delta.apply()
+
+
+def _project_deleted(sender, instance, **kwargs):
+    if instance.advisor_id:
+        delta = WorkloadDelta()
+        delta.add(instance.advisor_id, instance.project_id, 'supervised_projects', -1)
+        delta.add(instance.advisor_id, instance.project_id, 'pending_reviews', -_pending_reviews(instance.project_id))
+        delta.apply()
+
+
+def _remember_milestone(sender, instance, **kwargs):
+    instance._workload_was_pending = (
+        sender.objects.filter(pk=instance.pk, status=PENDING_REVIEW_STATUS).exists() if instance.pk else False
+    )
+
+
+def _adjust_pending_reviews(milestone, n):
+    supervision = _supervision(milestone.project_group_id)
+    if supervision:
+        delta = WorkloadDelta()
+        delta.add(*supervision, 'pending_reviews', n)
+        delta.apply()
+
+
+def _milestone_saved(sender, instance, **kwargs):
+    was_pending = getattr(instance, '_workload_was_pending', False)
+    is_pending = instance.status == PENDING_REVIEW_STATUS
+    if was_pending != is_pending:
+        _adjust_pending_reviews(instance, 1 if is_pending else -1)
+
+
+def _milestone_deleted(sender, instance, **kwargs):
+    # Also runs for milestones removed with their project group, before the group row goes
+    if instance.status == PENDING_REVIEW_STATUS:
+        _adjust_pending_reviews(instance, -1)
+
+
+def _group_deleting(sender, instance, **kwargs):
+    """Committee seat rows are removed by cascade, without signals."""
+    delta = WorkloadDelta()
+    for advisor_id, role in instance.committee_members.values_list('advisor_id', 'role'):
+        delta.add(advisor_id, instance.project_id, ROLE_COUNTERS[role], -1)
+    delta.apply()
+
+
+def connect_signals():
+    """Keep the counters in step with projects, milestones and project groups."""
+    from django.apps import apps
+    from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+    project = apps.get_model('projects.Project')
+    milestone = apps.get_model('milestones.Milestone')
+    pre_save.connect(_remember_project, sender=project, dispatch_uid='advisor_workload_project_pre_save')
+    post_save.connect(_project_saved, sender=project, dispatch_uid='advisor_workload_project_save')
+    post_delete.connect(_project_deleted, sender=project, dispatch_uid='advisor_workload_project_delete')
+    pre_save.connect(_remember_milestone, sender=milestone, dispatch_uid='advisor_workload_milestone_pre_save')
+    post_save.connect(_milestone_saved, sender=milestone, dispatch_uid='advisor_workload_milestone_save')
+    post_delete.connect(_milestone_deleted, sender=milestone, dispatch_uid='advisor_workload_milestone_delete')
+    pre_delete.connect(
+        _group_deleting, sender=apps.get_model('projects.ProjectGroup'),
+        dispatch_uid='advisor_workload_project_group_delete',
+    )
@@ -6,7 +6,7 @@ from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import RefreshToken, Token
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.password_validation import validate_password
@@ -27,6 +27,7 @@ from .serializers import (
     TokenRefreshSerializer,
     LogoutSerializer
 )
+from core.jwt_auth import revoke_token
 from core.utils import get_client_ip
 
 
@@ -232,6 +233,10 @@ class LogoutView(APIView):
         serializer = LogoutSerializer(data=request.data)
         
         if serializer.is_valid():
+            # Reject the access token used for this request from now on
+            if isinstance(request.auth, Token):
+                revoke_token(request.auth)
+            
             try:
                 refresh_token = serializer.validated_data['refresh']
                 token = RefreshToken(refresh_token)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Committee, CommitteeAssignment, CommitteeEvaluation, CommitteeMeeting,
-    CommitteeMember, CommitteeNote
+    CommitteeMember, CommitteeNote, ProjectCommitteeMember
 )
 
 
@@ -37,6 +37,17 @@ class CommitteeAssignmentAdmin(admin.ModelAdmin):
     ordering = ['-assigned_date']
 
 
+@admin.register(ProjectCommitteeMember)
+class ProjectCommitteeMemberAdmin(admin.ModelAdmin):
+    """Admin interface for ProjectCommitteeMember model."""
+    
+    list_display = ['project_group', 'advisor', 'role', 'assigned_at']
+    list_filter = ['role']
+    search_fields = ['project_group__project_id', 'advisor__advisor_id']
+    raw_id_fields = ['project_group', 'advisor']
+    ordering = ['project_group', 'role']
+
+
 @admin.register(CommitteeEvaluation)
 class CommitteeEvaluationAdmin(admin.ModelAdmin):
     """Admin interface for CommitteeEvaluation model."""
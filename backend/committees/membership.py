@@ -0,0 +1,122 @@
+"""
+Committee membership of projects.
+
+``ProjectGroup.main/second/third_committee_id`` hold ``Advisor.advisor_id``
+strings and stay the field clients read and write. ``ProjectCommitteeMember``
+mirrors every filled slot as an indexed ``(project_group, advisor, role)`` row
+so that "who sits on this committee", "which committees does this advisor sit
+on" and per-role counts are each one indexed query instead of an OR across the
+three columns plus an ``Advisor`` lookup per slot.
+
+Rows are kept in step with the slots by ``sync_committee_members``, which the
+``ProjectGroup`` post_save handler, ``update_committee`` and bulk committee
+assignment call after writing slots. It is the only writer of these rows and
+also adjusts the advisors' seat counters (``advisors.workload``).
+"""
+
+from collections import defaultdict
+
+from django.db.models import Count
+
+COMMITTEE_ROLES = ('main', 'second', 'third')
+COMMITTEE_FIELDS = {
+    'main': 'main_committee_id',
+    'second': 'second_committee_id',
+    'third': 'third_committee_id',
+}
+
+
+def sync_committee_members(groups):
+    """
+    Make the member rows of ``groups`` match their committee slots.
+
+    Set-based: one query for the existing rows, one to resolve advisor ids
+    that are new, then at most one delete and one insert, plus the advisor
+    workload counter updates for the seats that changed. Slots naming an
+    unknown advisor get no row.
+    """
+    from advisors.models import Advisor
+    from advisors.workload import ROLE_COUNTERS, WorkloadDelta
+    from .models import ProjectCommitteeMember
+
+    groups = [group for group in groups if group.pk]
+    if not groups:
+        return
+    wanted = {
+        (group.pk, role): getattr(group, field)
+        for group in groups for role, field in COMMITTEE_FIELDS.items()
+        if getattr(group, field)
+    }
+
+    project_ids = {group.pk: group.project_id for group in groups}
+    seats = WorkloadDelta()
+
+    stale = []
+    current = {}
+    rows = ProjectCommitteeMember.objects.filter(
+        project_group_id__in=project_ids
+    ).values_list('pk', 'project_group_id', 'role', 'advisor_id', 'advisor__advisor_id')
+    for pk, group_pk, role, advisor_pk, advisor_id in rows:
+        if wanted.get((group_pk, role)) == advisor_id:
+            current[(group_pk, role)] = advisor_id
+        else:
+            stale.append(pk)
+            seats.add(advisor_pk, project_ids[group_pk], ROLE_COUNTERS[role], -1)
+
+    missing = {key: advisor_id for key, advisor_id in wanted.items() if key not in current}
+    if stale:
+        ProjectCommitteeMember.objects.filter(pk__in=stale).delete()
+    if missing:
+        advisor_pks = dict(
+            Advisor.objects.filter(advisor_id__in=set(missing.values())).values_list('advisor_id', 'pk')
+        )
+        created = ProjectCommitteeMember.objects.bulk_create([
+            ProjectCommitteeMember(project_group_id=group_pk, role=role, advisor_id=advisor_pks[advisor_id])
+            for (group_pk, role), advisor_id in missing.items()
+            if advisor_id in advisor_pks
+        ])
+        for member in created:
+            seats.add(member.advisor_id, project_ids[member.project_group_id], ROLE_COUNTERS[member.role], 1)
+    seats.apply()
+
+
+def committee_members_for(groups):
+    """``{ProjectGroup.pk: {role: Advisor}}`` for ``groups``, in one query."""
+    from .models import ProjectCommitteeMember
+
+    members = defaultdict(dict)
+    rows = ProjectCommitteeMember.objects.filter(
+        project_group__in=groups
+    ).select_related('advisor__user')
+    for row in rows:
+        members[row.project_group_id][row.role] = row.advisor
+    return dict(members)
+
+
+def committee_groups(advisor, roles=COMMITTEE_ROLES):
+    """Project groups on whose committee ``advisor`` sits in one of ``roles``."""
+    from projects.models import ProjectGroup
+
+    return ProjectGroup.objects.filter(
+        committee_members__advisor=advisor, committee_members__role__in=roles
+    ).distinct()
+
+
+def committee_count(advisor, role):
+    """Number of ``role`` committee seats ``advisor`` holds."""
+    from .models import ProjectCommitteeMember
+
+    return ProjectCommitteeMember.objects.filter(advisor=advisor, role=role).count()
+
+
+def committee_counts(advisors=None):
+    """``{Advisor.pk: {role: seats}}`` for ``advisors`` (all when ``None``), in one query."""
+    from .models import ProjectCommitteeMember
+
+    rows = ProjectCommitteeMember.objects.all()
+    if advisors is not None:
+        rows = rows.filter(advisor__in=advisors)
+    counts = defaultdict(lambda: dict.fromkeys(COMMITTEE_ROLES, 0))
+    for row in rows.values('advisor_id', 'role').annotate(seats=Count('id')).order_by():
+        counts[row['advisor_id']][row['role']] = row['seats']
+    return dict(counts)
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.7 on 2026-10-17 02:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+COMMITTEE_FIELDS = {
+    'main': 'main_committee_id',
+    'second': 'second_committee_id',
+    'third': 'third_committee_id',
+}
+
+
+def backfill_committee_members(apps, schema_editor):
+    """Create a member row for every filled committee slot whose advisor_id resolves."""
+    Advisor = apps.get_model('advisors', 'Advisor')
+    ProjectGroup = apps.get_model('projects', 'ProjectGroup')
+    ProjectCommitteeMember = apps.get_model('committees', 'ProjectCommitteeMember')
+    alias = schema_editor.connection.alias
+
+    advisor_pks = dict(Advisor.objects.using(alias).values_list('advisor_id', 'pk'))
+    rows = []
+    groups = ProjectGroup.objects.using(alias).values_list('pk', *COMMITTEE_FIELDS.values())
+    for group_pk, *advisor_ids in groups.iterator():
+        for role, advisor_id in zip(COMMITTEE_FIELDS, advisor_ids):
+            if advisor_id in advisor_pks:
+                rows.append(ProjectCommitteeMember(project_group_id=group_pk, advisor_id=advisor_pks[advisor_id], role=role))
+    ProjectCommitteeMember.objects.using(alias).bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisors', '0002_advisor_employee_id_advisor_max_students_and_more'),
+        ('committees', '0001_initial'),
+        ('projects', '0006_project_group_link_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectCommitteeMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('main', 'Main Committee'), ('second', 'Second Committee'), ('third', 'Third Committee')], max_length=20)),
+                ('assigned_at', models.DateTimeField(auto_now_add=True)),
+                ('advisor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='committee_seats', to='advisors.advisor')),
+                ('project_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='committee_members', to='projects.projectgroup')),
+            ],
+            options={
+                'verbose_name': 'Project Committee Member',
+                'verbose_name_plural': 'Project Committee Members',
+                'db_table': 'project_committee_members',
+                'indexes': [models.Index(fields=['advisor', 'role'], name='project_com_advisor_d94d2e_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='projectcommitteemember',
+            constraint=models.UniqueConstraint(fields=('project_group', 'role'), name='unique_project_committee_role'),
+        ),
+        migrations.RunPython(backfill_committee_members, migrations.RunPython.noop),
+    ]
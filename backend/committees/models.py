@@ -75,6 +75,34 @@ class CommitteeAssignment(models.Model):
         return f"{self.project_group.project_id} - {self.committee.name} ({self.assignment_type})"
 
 
+class ProjectCommitteeMember(models.Model):
+    """
+    An advisor's seat on a project's committee.
+
+    Mirrors ``ProjectGroup.main/second/third_committee_id`` as indexed rows so
+    committee lookups from either side are single queries (see ``membership``).
+    """
+    
+    project_group = models.ForeignKey('projects.ProjectGroup', on_delete=models.CASCADE, related_name='committee_members')
+    advisor = models.ForeignKey('advisors.Advisor', on_delete=models.CASCADE, related_name='committee_seats')
+    role = models.CharField(max_length=20, choices=Committee.COMMITTEE_TYPES)
+    assigned_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'project_committee_members'
+        verbose_name = 'Project Committee Member'
+        verbose_name_plural = 'Project Committee Members'
+        constraints = [
+            models.UniqueConstraint(fields=['project_group', 'role'], name='unique_project_committee_role'),
+        ]
+        indexes = [
+            models.Index(fields=['advisor', 'role']),
+        ]
+    
+    def __str__(self):
+        return f"{self.project_group_id} - {self.advisor_id} ({self.role})"
+
+
 class CommitteeEvaluation(models.Model):
     """Evaluation results from committee members."""
     
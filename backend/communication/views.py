@@ -1,6 +1,7 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from core.permissions import RolePermission, RoleRequiredMixin, require_roles, IsAdminOrDepartmentAdmin
+from core.pagination import PageOrCursorPagination
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db.models import Q, Count, Max
@@ -82,6 +83,7 @@ class MessageListView(RoleRequiredMixin, generics.ListCreateAPIView):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated, RolePermission]
     allowed_roles = ('Admin', 'DepartmentAdmin', 'Advisor', 'Student')
+    pagination_class = PageOrCursorPagination
     
     def get_queryset(self):
         channel_id = self.kwargs.get('channel_id')
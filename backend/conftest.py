@@ -4,6 +4,7 @@ Pytest configuration and fixtures
 import pytest
 import factory
 from django.test import TestCase
+from django.test.utils import override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -12,10 +13,42 @@ from students.models import Student
 from advisors.models import Advisor
 from projects.models import ProjectGroup, Project, ProjectStudent
 from notifications.models import Notification
+from core.rate_limit import reset_rate_limiter
+from core.testing import settings_overrides
+from system_monitoring.telemetry import reset_buffer, shutdown_buffer
 
 User = get_user_model()
 
 
+@pytest.fixture(scope='session', autouse=True)
+def suite_settings():
+    """Apply the settings every test run starts from (see core.testing)"""
+    with override_settings(**settings_overrides()):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiter():
+    """Every test starts with empty rate limit counters"""
+    reset_rate_limiter()
+    yield
+    reset_rate_limiter()
+
+
+@pytest.fixture(scope='session', autouse=True)
+def telemetry_writer(suite_settings, django_db_setup):
+    """Stop the telemetry writer and write what it holds while the test database still exists"""
+    yield
+    shutdown_buffer()
+
+
+@pytest.fixture(autouse=True)
+def fresh_telemetry_buffer():
+    """Telemetry queued by one test is never written into another's"""
+    yield
+    reset_buffer()
+
+
 @pytest.fixture
 def api_client():
     """API client fixture"""
@@ -10,3 +10,13 @@ class CoreConfig(AppConfig):
     name = 'core'
     verbose_name = 'Core Security & Utilities'
 
+
+    def ready(self):
+        from .principal import connect_signals
+        from .threat_matcher import SECURITY_SETTINGS, get_threat_matcher
+
+        connect_signals()
+
+        # Compile the security middleware patterns once at startup
+        for setting in SECURITY_SETTINGS:
+            get_threat_matcher(setting)
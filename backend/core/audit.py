@@ -0,0 +1,177 @@
+"""
+Non-blocking structured audit log.
+
+``AuditLogMiddleware`` builds one compact record per request and hands it to
+``AuditLog.log``, which only puts it on a bounded queue. A ``QueueListener``
+thread drains the queue into a size-rotated JSON Lines file, so the request
+thread never does file I/O. When the queue is full records are dropped (and
+counted) instead of blocking.
+
+Configured through ``settings.AUDIT_LOG``:
+
+* ``ENABLED``: write the audit log at all
+* ``FILENAME``, ``MAX_BYTES``, ``BACKUP_COUNT``: rotating JSONL file
+* ``QUEUE_SIZE``: records buffered before new ones are dropped
+* ``SAMPLE_RATE``: default fraction of requests logged
+* ``PATH_SAMPLE_RATES``: ``{path_prefix: rate}``; the longest matching prefix wins
+* ``ALWAYS_LOG_STATUS``: responses with this status or above are always logged
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+
+from django.conf import settings
+
+DEFAULT_AUDIT_SETTINGS = {
+    'ENABLED': True,
+    'FILENAME': os.path.join('logs', 'audit.jsonl'),
+    'MAX_BYTES': 50 * 1024 * 1024,
+    'BACKUP_COUNT': 10,
+    'QUEUE_SIZE': 10000,
+    'SAMPLE_RATE': 1.0,
+    'PATH_SAMPLE_RATES': {},
+    'ALWAYS_LOG_STATUS': 400,
+}
+
+
+def get_audit_settings():
+    """Return audit settings merged over the defaults."""
+    return {**DEFAULT_AUDIT_SETTINGS, **getattr(settings, 'AUDIT_LOG', {})}
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Formats the record's ``audit`` dict as one compact JSON line."""
+
+    def format(self, record):
+        return json.dumps(getattr(record, 'audit', {}), separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks and passes records through unformatted."""
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The writer formats the audit dict itself; skip QueueHandler's message merging
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class AuditLog:
+    """Sampling and the queue -> listener -> rotating file pipeline."""
+
+    def __init__(self, config):
+        self.config = config
+        self.enabled = config['ENABLED']
+        # Longest prefix first so the most specific rate wins
+        self.path_rates = sorted(config['PATH_SAMPLE_RATES'].items(), key=lambda item: len(item[0]), reverse=True)
+        self.queue = queue.Queue(maxsize=config['QUEUE_SIZE'])
+        self.handler = DroppingQueueHandler(self.queue)
+        self._listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def dropped(self):
+        return self.handler.dropped
+
+    def sample_rate(self, path):
+        for prefix, rate in self.path_rates:
+            if path.startswith(prefix):
+                return rate
+        return self.config['SAMPLE_RATE']
+
+    def should_log(self, path, status_code):
+        if not self.enabled:
+            return False
+        if status_code >= self.config['ALWAYS_LOG_STATUS']:
+            return True
+        rate = self.sample_rate(path)
+        return rate >= 1 or random.random() < rate
+
+    def log(self, record):
+        """Queue one audit record (a JSON-serializable dict)."""
+        self._ensure_listener()
+        log_record = logging.LogRecord('core.audit', logging.INFO, __file__, 0, '', None, None)
+        log_record.audit = record
+        self.handler.handle(log_record)
+
+    def _ensure_listener(self):
+        # Started lazily, and again in forked workers, which don't inherit the thread
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            filename = self.config['FILENAME']
+            if not os.path.isabs(filename):
+                filename = os.path.join(settings.BASE_DIR, filename)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                filename,
+                maxBytes=self.config['MAX_BYTES'],
+                backupCount=self.config['BACKUP_COUNT'],
+                encoding='utf-8',
+                delay=True,
+            )
+            file_handler.setFormatter(JSONLinesFormatter())
+            if self._pid is not None:
+                # Forked: the inherited queue may hold the parent's records
+                self.queue = queue.Queue(maxsize=self.config['QUEUE_SIZE'])
+                self.handler.queue = self.queue
+            self._listener = logging.handlers.QueueListener(self.queue, file_handler)
+            self._listener.start()
+            self._pid = pid
+
+    def stop(self):
+        """Flush queued records and stop the writer thread."""
+        with self._lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+                for handler in self._listener.handlers:
+                    handler.close()
+            self._listener = None
+            self._pid = None
+
+
+_audit_log = None
+_audit_log_lock = threading.Lock()
+
+
+def get_audit_log():
+    """Return the process-wide ``AuditLog``, creating it on first use."""
+    global _audit_log
+    if _audit_log is None:
+        with _audit_log_lock:
+            if _audit_log is None:
+                _audit_log = AuditLog(get_audit_settings())
+    return _audit_log
+
+
+def reset_audit_log():
+    """Stop the process-wide audit log so it is rebuilt from current settings."""
+    global _audit_log
+    with _audit_log_lock:
+        if _audit_log is not None:
+            _audit_log.stop()
+        _audit_log = None
+
+
+@atexit.register
+def _stop_at_exit():
+    if _audit_log is not None:
+        _audit_log.stop()
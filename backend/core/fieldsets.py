@@ -0,0 +1,85 @@
+"""
+Sparse fieldsets for read serializers.
+
+Clients pass ``?fields=id,project_id,status`` to receive only those fields, or
+``?omit=recent_activity,student_names`` to drop some. Serializers that mix in
+``SparseFieldsetMixin`` remove the other fields before serializing, so their
+``SerializerMethodField`` getters never run, and declare per field which
+``select_related``/``prefetch_related`` lookups it needs so views can load
+only what the selected fields use (``optimize_queryset``).
+
+The selection can also be passed directly: ``Serializer(obj, fields=[...])``.
+Unknown names are ignored; query parameters only apply to safe (read) requests.
+"""
+
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def parse_field_list(value):
+    """``'a, b,,c'`` -> ``{'a', 'b', 'c'}``; ``None`` when the parameter is absent."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return {name.strip() for name in value if name and name.strip()}
+
+
+def requested_fieldset(request):
+    """``(fields, omit)`` from the query string of a read request."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, None
+    params = getattr(request, 'query_params', request.GET)
+    return parse_field_list(params.get(FIELDS_PARAM)), parse_field_list(params.get(OMIT_PARAM))
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin keeping only the requested fields.
+
+    ``select_related_fields`` and ``prefetch_related_fields`` map a field name
+    to the lookups it needs; fields without an entry need nothing extra.
+    """
+
+    select_related_fields = {}
+    prefetch_related_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        omit = kwargs.pop('omit', None)
+        super().__init__(*args, **kwargs)
+        # Nested serializers get no context in __init__, so only top-level ones follow the query string
+        if fields is None and omit is None:
+            fields, omit = requested_fieldset(self.context.get('request'))
+        self._sparse_fields = parse_field_list(fields)
+        self._sparse_omit = parse_field_list(omit) or set()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        keep = self._sparse_fields
+        for name in list(fields):
+            if (keep is not None and name not in keep) or name in self._sparse_omit:
+                del fields[name]
+        return fields
+
+    @classmethod
+    def optimize_queryset(cls, queryset, request=None, fields=None, omit=None):
+        """Apply the ``select_related``/``prefetch_related`` lookups the selected fields need."""
+        if fields is None and omit is None:
+            fields, omit = requested_fieldset(request)
+        selected = cls(fields=fields, omit=omit, context={'request': request}).fields
+        select_related = {
+            lookup for name in selected for lookup in cls.select_related_fields.get(name, ())
+        }
+        prefetches = []
+        for name in selected:
+            for lookup in cls.prefetch_related_fields.get(name, ()):
+                if lookup not in prefetches:
+                    prefetches.append(lookup)
+        if select_related:
+            queryset = queryset.select_related(*sorted(select_related))
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
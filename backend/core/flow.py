@@ -0,0 +1,131 @@
+"""
+Minimum-cost maximum flow for sparse graphs with non-negative integer costs.
+
+Primal-dual: each phase computes shortest distances with Dijkstra on reduced
+costs, updates the node potentials and then pushes a blocking flow through
+every shortest path at once (Dinic on the zero-reduced-cost edges). The number
+of phases is bounded by the number of distinct path costs, so small integer
+cost scales (like assignment fit scores) solve in a few dozen phases even for
+graphs with tens of thousands of edges. Pure Python, no dependencies.
+"""
+
+from collections import deque
+from heapq import heappop, heappush
+
+INF = float('inf')
+
+
+class MinCostFlow:
+    """Residual graph with paired forward/backward edges (``edge ^ 1`` is the reverse)."""
+
+    def __init__(self, node_count):
+        self.node_count = node_count
+        self.adjacency = [[] for _ in range(node_count)]
+        self.head = []
+        self.capacity = []
+        self.cost = []
+
+    def add_edge(self, source, target, capacity, cost):
+        """Add an edge and return its index, for ``flow_on`` after solving."""
+        edge = len(self.head)
+        self.adjacency[source].append(edge)
+        self.head.append(target)
+        self.capacity.append(capacity)
+        self.cost.append(cost)
+        self.adjacency[target].append(edge + 1)
+        self.head.append(source)
+        self.capacity.append(0)
+        self.cost.append(-cost)
+        return edge
+
+    def flow_on(self, edge):
+        return self.capacity[edge ^ 1]
+
+    def solve(self, source, sink):
+        """Push as much flow as possible at minimum cost; returns ``(flow, cost)``."""
+        potential = [0] * self.node_count
+        total_flow = total_cost = 0
+        while True:
+            dist = self._shortest_distances(source, potential)
+            if dist[sink] == INF:
+                return total_flow, total_cost
+            # Capping at the sink distance keeps every reduced cost non-negative
+            cap = dist[sink]
+            for node in range(self.node_count):
+                potential[node] += min(dist[node], cap)
+            pushed = self._push_blocking_flows(source, sink, potential)
+            total_flow += pushed
+            total_cost += pushed * (potential[sink] - potential[source])
+
+    def _shortest_distances(self, source, potential):
+        adjacency, head, capacity, cost = self.adjacency, self.head, self.capacity, self.cost
+        dist = [INF] * self.node_count
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, node = heappop(heap)
+            if d > dist[node]:
+                continue
+            base = d + potential[node]
+            for edge in adjacency[node]:
+                if capacity[edge]:
+                    target = head[edge]
+                    nd = base + cost[edge] - potential[target]
+                    if nd < dist[target]:
+                        dist[target] = nd
+                        heappush(heap, (nd, target))
+        return dist
+
+    def _push_blocking_flows(self, source, sink, potential):
+        """Max flow restricted to zero-reduced-cost edges (Dinic with iterative DFS)."""
+        adjacency, head, capacity, cost = self.adjacency, self.head, self.capacity, self.cost
+        pushed = 0
+        while True:
+            level = [-1] * self.node_count
+            level[source] = 0
+            queue = deque([source])
+            while queue:
+                node = queue.popleft()
+                base = potential[node]
+                for edge in adjacency[node]:
+                    target = head[edge]
+                    if level[target] < 0 and capacity[edge] and base + cost[edge] == potential[target]:
+                        level[target] = level[node] + 1
+                        queue.append(target)
+            if level[sink] < 0:
+                return pushed
+
+            current = [0] * self.node_count
+            path = []
+            node = source
+            while True:
+                if node == sink:
+                    amount = min(capacity[edge] for edge in path)
+                    for edge in path:
+                        capacity[edge] -= amount
+                        capacity[edge ^ 1] += amount
+                    pushed += amount
+                    path.clear()
+                    node = source
+                    continue
+                edges = adjacency[node]
+                index = current[node]
+                next_level, base = level[node] + 1, potential[node]
+                while index < len(edges):
+                    edge = edges[index]
+                    target = head[edge]
+                    if level[target] == next_level and capacity[edge] and base + cost[edge] == potential[target]:
+                        break
+                    index += 1
+                current[node] = index
+                if index < len(edges):
+                    path.append(edges[index])
+                    node = head[edges[index]]
+                    continue
+                # Dead end: drop the node from this level graph and retreat
+                level[node] = -1
+                if not path:
+                    break
+                edge = path.pop()
+                node = head[edge ^ 1]
+                current[node] += 1
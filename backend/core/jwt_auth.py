@@ -0,0 +1,53 @@
+"""
+JWT authentication backed by the principal cache.
+"""
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .principal import get_principal_cache
+
+
+def token_user_id(validated_token):
+    """The user id claim of a validated token."""
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken(_("Token contained no recognizable user identification"))
+
+
+def user_from_entry(entry, validated_token):
+    """Apply ``JWTAuthentication.get_user``'s checks to a cached principal entry."""
+    if entry is None:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+    if not entry.principal.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+    if entry.is_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+        raise InvalidToken(_("Token has been revoked"))
+
+    if api_settings.CHECK_REVOKE_TOKEN:
+        if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(entry.user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+    return entry.make_user()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that resolves users through ``PrincipalCache``."""
+
+    def get_user(self, validated_token):
+        return user_from_entry(get_principal_cache().get(token_user_id(validated_token)), validated_token)
+
+
+def revoke_token(validated_token):
+    """Reject ``validated_token`` (e.g. on logout) until it expires."""
+    jti = validated_token.get(api_settings.JTI_CLAIM)
+    if jti is None:
+        return
+    get_principal_cache().revoke(token_user_id(validated_token), jti, validated_token.get('exp', 0))
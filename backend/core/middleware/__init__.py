@@ -6,7 +6,6 @@ import time
 import logging
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
-from django.core.cache import cache
 from django.conf import settings
 from django.utils import timezone
 from django.contrib.auth.models import AnonymousUser
@@ -23,7 +22,10 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.validators import SecurityValidator, SQLInjectionValidator, XSSValidator
-from core.utils import get_client_ip
+from core.utils import get_client_ip, response_size
+from core.rate_limit import Rate, get_rate_limiter
+from core.threat_matcher import get_threat_matcher
+from core.audit import get_audit_log
 
 logger = logging.getLogger('core.security')
 
@@ -60,44 +62,26 @@ class SecurityMiddleware(MiddlewareMixin):
     
     def _is_ip_blocked(self, ip):
         """
-        Check if IP is in blocked list
+        Check if IP is in blocked list (addresses or CIDR networks)
         """
-        blocked_ips = getattr(settings, 'API_SECURITY', {}).get('BLOCKED_IPS', [])
-        return ip in blocked_ips
+        return get_threat_matcher().is_blocked_ip(ip)
     
     def _has_suspicious_patterns(self, request):
         """
         Check for suspicious patterns in request
         """
-        suspicious_patterns = getattr(settings, 'API_SECURITY', {}).get('SUSPICIOUS_PATTERNS', [])
+        matcher = get_threat_matcher()
         
-        # Check URL
-        if self._check_patterns(request.path, suspicious_patterns):
+        # Check URL and query parameters
+        if matcher.find_pattern(request.path, *request.GET.values()):
             return True
         
-        # Check query parameters
-        for value in request.GET.values():
-            if self._check_patterns(str(value), suspicious_patterns):
-                return True
-        
         # Check POST data
-        if request.method == 'POST':
-            for value in request.POST.values():
-                if self._check_patterns(str(value), suspicious_patterns):
-                    return True
+        if request.method == 'POST' and matcher.find_pattern(*request.POST.values()):
+            return True
         
         return False
     
-    def _check_patterns(self, text, patterns):
-        """
-        Check if text matches any suspicious patterns
-        """
-        import re
-        for pattern in patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        return False
-    
     def _add_security_headers(self, request):
         """
         Add security headers to response
@@ -141,109 +125,76 @@ class RateLimitMiddleware(MiddlewareMixin):
         user_id = getattr(request.user, 'id', None) if hasattr(request, 'user') and not isinstance(request.user, AnonymousUser) else None
         
         # Check rate limits
-        if self._is_rate_limited(client_ip, user_id, request):
-            return JsonResponse({
+        result = self._check_rate_limit(client_ip, user_id, request)
+        if not result.allowed:
+            response = JsonResponse({
                 'error': 'Rate limit exceeded. Please try again later.'
             }, status=429)
+            response['Retry-After'] = str(result.retry_after)
+            return response
         
         return None
     
-    def _is_rate_limited(self, ip, user_id, request):
+    def _check_rate_limit(self, ip, user_id, request):
         """
-        Check if request exceeds rate limits
+        Count the request against the per-minute and per-hour limits
         """
-        # Get rate limit settings
-        max_requests_per_minute = getattr(settings, 'API_SECURITY', {}).get('MAX_REQUESTS_PER_MINUTE', 60)
-        max_requests_per_hour = getattr(settings, 'API_SECURITY', {}).get('MAX_REQUESTS_PER_HOUR', 1000)
-        
-        # Check per-minute limit
-        minute_key = f"rate_limit_minute_{ip}_{user_id or 'anon'}"
-        minute_count = cache.get(minute_key, 0)
-        
-        if minute_count >= max_requests_per_minute:
-            return True
-        
-        # Check per-hour limit
-        hour_key = f"rate_limit_hour_{ip}_{user_id or 'anon'}"
-        hour_count = cache.get(hour_key, 0)
-        
-        if hour_count >= max_requests_per_hour:
-            return True
-        
-        # Increment counters
-        cache.set(minute_key, minute_count + 1, 60)  # 1 minute
-        cache.set(hour_key, hour_count + 1, 3600)  # 1 hour
-        
-        return False
+        api_security = getattr(settings, 'API_SECURITY', {})
+        rates = [
+            Rate(api_security.get('MAX_REQUESTS_PER_MINUTE', 60), 60),
+            Rate(api_security.get('MAX_REQUESTS_PER_HOUR', 1000), 3600),
+        ]
+        return get_rate_limiter().hit(f"http:{ip}:{user_id or 'anon'}", rates)
 
 
 class AuditLogMiddleware(MiddlewareMixin):
     """
-    Audit logging middleware
+    Audit logging middleware: one structured record per request, written off
+    the request thread (see core.audit)
     """
     
     def process_request(self, request):
         """
-        Log incoming requests
+        Note when the request started
         """
-        if not getattr(settings, 'API_SECURITY', {}).get('ENABLE_REQUEST_LOGGING', True):
-            return None
-        
-        # Log request details
-        self._log_request(request)
-        
+        request._audit_started = time.monotonic()
         return None
     
     def process_response(self, request, response):
         """
-        Log response details
+        Queue the audit record for the request
         """
         if not getattr(settings, 'API_SECURITY', {}).get('ENABLE_REQUEST_LOGGING', True):
             return response
         
-        # Log response details
-        self._log_response(request, response)
+        audit_log = get_audit_log()
+        if audit_log.should_log(request.path, response.status_code):
+            audit_log.log(self._build_record(request, response))
         
         return response
     
-    def _log_request(self, request):
+    def _build_record(self, request, response):
         """
-        Log request details
+        Compact audit record; empty fields are left out
         """
-        client_ip = get_client_ip(request)
-        user_id = getattr(request.user, 'id', None) if hasattr(request, 'user') and not isinstance(request.user, AnonymousUser) else None
-        
-        log_data = {
-            'timestamp': timezone.now().isoformat(),
-            'ip': client_ip,
-            'user_id': user_id,
+        user = getattr(request, 'user', None)
+        record = {
+            'ts': timezone.now().isoformat(),
+            'ip': get_client_ip(request),
+            'user_id': user.id if user is not None and user.is_authenticated else None,
             'method': request.method,
             'path': request.path,
-            'query_params': dict(request.GET),
-            'user_agent': request.META.get('HTTP_USER_AGENT', ''),
-            'referer': request.META.get('HTTP_REFERER', ''),
+            'status': response.status_code,
+            'size': response_size(response),
         }
-        
-        logger.info(f"Request: {log_data}")
-    
-    def _log_response(self, request, response):
-        """
-        Log response details
-        """
-        client_ip = get_client_ip(request)
-        user_id = getattr(request.user, 'id', None) if hasattr(request, 'user') and not isinstance(request.user, AnonymousUser) else None
-        
-        log_data = {
-            'timestamp': timezone.now().isoformat(),
-            'ip': client_ip,
-            'user_id': user_id,
-            'method': request.method,
-            'path': request.path,
-            'status_code': response.status_code,
-            'response_size': len(response.content) if hasattr(response, 'content') else 0,
-        }
-        
-        logger.info(f"Response: {log_data}")
+        started = getattr(request, '_audit_started', None)
+        if started is not None:
+            record['ms'] = round((time.monotonic() - started) * 1000, 2)
+        for key, header in (('query', 'QUERY_STRING'), ('ua', 'HTTP_USER_AGENT'), ('referer', 'HTTP_REFERER')):
+            value = request.META.get(header)
+            if value:
+                record[key] = value
+        return record
 
 
 class IPWhitelistMiddleware(MiddlewareMixin):
@@ -7,6 +7,7 @@ import logging
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from django.core.cache import cache
+from ..threat_matcher import PROTECTED_PATHS, get_threat_matcher
 from ..utils import get_client_ip
 
 logger = logging.getLogger('core.security')
@@ -18,114 +19,7 @@ class EnvironmentProtectionMiddleware(MiddlewareMixin):
     """
     
     # Sensitive files and directories that should never be accessible
-    PROTECTED_PATHS = [
-        # Environment files
-        '.env',
-        '.env.local',
-        '.env.production',
-        '.env.development',
-        '.env.test',
-        '.env.staging',
-        'env',
-        'venv',
-        '.venv',
-        
-        # Version control
-        '.git',
-        '.gitignore',
-        '.gitattributes',
-        '.svn',
-        '.hg',
-        '.bzr',
-        
-        # Configuration files
-        'settings.py',
-        'settings_local.py',
-        'settings_production.py',
-        'local_settings.py',
-        'config.py',
-        'config.json',
-        'config.yaml',
-        'config.yml',
-        'secrets.json',
-        'secrets.yaml',
-        
-        # Database files
-        'db.sqlite3',
-        'database.db',
-        '*.sql',
-        '*.dump',
-        
-        # Backup files
-        '*.bak',
-        '*.backup',
-        '*.old',
-        '*.orig',
-        '*.save',
-        '*.swp',
-        '*.swo',
-        '*~',
-        
-        # Log files (direct access)
-        'logs/',
-        '*.log',
-        
-        # IDE and editor files
-        '.vscode',
-        '.idea',
-        '.vs',
-        '*.sublime-project',
-        '*.sublime-workspace',
-        
-        # Package manager files
-        'package-lock.json',
-        'yarn.lock',
-        'Pipfile.lock',
-        'poetry.lock',
-        'requirements.txt',
-        'Pipfile',
-        
-        # Docker files
-        'Dockerfile',
-        'docker-compose.yml',
-        'docker-compose.yaml',
-        '.dockerignore',
-        
-        # CI/CD files
-        '.gitlab-ci.yml',
-        '.travis.yml',
-        'Jenkinsfile',
-        '.circleci',
-        '.github',
-        
-        # Python bytecode
-        '__pycache__',
-        '*.pyc',
-        '*.pyo',
-        '*.pyd',
-        
-        # SSH and keys
-        '.ssh',
-        'id_rsa',
-        'id_dsa',
-        '*.pem',
-        '*.key',
-        '*.crt',
-        '*.cer',
-        
-        # AWS and cloud credentials
-        '.aws',
-        'credentials',
-        '.boto',
-        
-        # Other sensitive files
-        'wp-config.php',
-        'web.config',
-        '.htaccess',
-        '.htpasswd',
-        'phpinfo.php',
-        'info.php',
-    ]
+    PROTECTED_PATHS = PROTECTED_PATHS
     
     def process_request(self, request):
         """
@@ -160,14 +54,14 @@ class EnvironmentProtectionMiddleware(MiddlewareMixin):
             return HttpResponseNotFound("Frontend file not found. This should be handled by Vite dev server.")
         
         # Check if path contains any protected patterns (for non-API paths)
-        for protected in self.PROTECTED_PATHS:
-            if protected.lower() in path:
-                self._log_and_block(client_ip, path, protected)
-                return JsonResponse({
-                    'error': 'Access denied',
-                    'code': 'PROTECTED_RESOURCE',
-                    'message': 'This resource is protected and cannot be accessed'
-                }, status=403)
+        protected = get_threat_matcher().find_protected_path(path)
+        if protected is not None:
+            self._log_and_block(client_ip, path, protected)
+            return JsonResponse({
+                'error': 'Access denied',
+                'code': 'PROTECTED_RESOURCE',
+                'message': 'This resource is protected and cannot be accessed'
+            }, status=403)
         
         # Check for common path traversal attempts
         if self._is_path_traversal(path):
@@ -193,22 +87,7 @@ class EnvironmentProtectionMiddleware(MiddlewareMixin):
         """
         Check for path traversal attempts
         """
-        traversal_patterns = [
-            '../',
-            '..\\',
-            '%2e%2e/',
-            '%2e%2e\\',
-            '..%2f',
-            '..%5c',
-            '%252e%252e/',
-            '%252e%252e\\',
-        ]
-        
-        for pattern in traversal_patterns:
-            if pattern in path:
-                return True
-        
-        return False
+        return get_threat_matcher().is_path_traversal(path)
     
     def _is_parent_directory_access(self, path):
         """
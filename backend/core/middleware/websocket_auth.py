@@ -6,41 +6,27 @@ from channels.middleware import BaseMiddleware
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
-from rest_framework_simplejwt.tokens import UntypedToken
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-from jwt import decode as jwt_decode
-from django.conf import settings
+
+from core.jwt_auth import CachedJWTAuthentication, token_user_id, user_from_entry
+from core.principal import get_principal_cache
 
 User = get_user_model()
 
 
-@database_sync_to_async
-def get_user_from_token(token_string):
+async def get_user_from_token(token_string):
     """Get user from JWT token"""
     try:
-        # Validate token using UntypedToken (uses SIMPLE_JWT settings)
-        UntypedToken(token_string)
-        
-        # Decode token - use SIGNING_KEY from SIMPLE_JWT settings
-        from rest_framework_simplejwt.settings import api_settings
-        signing_key = api_settings.SIGNING_KEY or settings.SECRET_KEY
-        
-        decoded_data = jwt_decode(
-            token_string,
-            signing_key,
-            algorithms=[api_settings.ALGORITHM]
-        )
+        # Signature and claims are checked once, in memory
+        validated_token = CachedJWTAuthentication().get_validated_token(token_string)
+        user_id = token_user_id(validated_token)
         
-        # Get user
-        user_id = decoded_data.get(api_settings.USER_ID_CLAIM)
-        if user_id:
-            try:
-                return User.objects.get(id=user_id)
-            except User.DoesNotExist:
-                return AnonymousUser()
-        
-        return AnonymousUser()
-    except (InvalidToken, TokenError, Exception) as e:
+        # The principal cache checks revocations in the shared cache even on a
+        # process-memory hit, so the lookup always runs in a thread
+        entry = await database_sync_to_async(get_principal_cache().get)(user_id)
+        return user_from_entry(entry, validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed, Exception) as e:
         import logging
         logger = logging.getLogger(__name__)
         logger.debug(f"WebSocket token validation failed: {str(e)}")
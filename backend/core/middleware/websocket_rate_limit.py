@@ -1,11 +1,10 @@
 """
 Rate limiting middleware for WebSocket connections
 """
+from asgiref.sync import sync_to_async
 from channels.middleware import BaseMiddleware
-from django.core.cache import cache
-from django.contrib.auth.models import AnonymousUser
+from core.rate_limit import Rate, get_rate_limiter
 import logging
-import time
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +42,7 @@ class WebSocketRateLimitMiddleware(BaseMiddleware):
             return
         
         # Check concurrent connections limit
-        if not await self._check_concurrent_connections(client_ip):
+        if not await self._acquire_connection_slot(client_ip):
             logger.warning(f"WebSocket concurrent connection limit exceeded for IP: {client_ip}")
             await send({
                 "type": "websocket.close",
@@ -51,10 +50,11 @@ class WebSocketRateLimitMiddleware(BaseMiddleware):
             })
             return
         
-        # Track connection
-        await self._track_connection(client_ip)
-        
-        return await super().__call__(scope, receive, send)
+        try:
+            return await super().__call__(scope, receive, send)
+        finally:
+            # Free the slot when the connection ends
+            await self._release_connection_slot(client_ip)
     
     def _get_client_ip(self, scope):
         """Extract client IP from scope"""
@@ -81,32 +81,19 @@ class WebSocketRateLimitMiddleware(BaseMiddleware):
     
     async def _check_connection_limit(self, client_ip):
         """Check if IP has exceeded connection rate limit"""
-        cache_key = f"ws_conn_rate_limit:{client_ip}"
-        connection_count = cache.get(cache_key, 0)
-        
-        if connection_count >= self.MAX_RECONNECT_ATTEMPTS:
-            return False
-        
-        # Increment counter
-        cache.set(cache_key, connection_count + 1, self.RATE_LIMIT_WINDOW * 60)  # 1 hour
-        
-        return True
+        rate = Rate(self.MAX_RECONNECT_ATTEMPTS, self.RATE_LIMIT_WINDOW * 60)  # 1 hour
+        result = await sync_to_async(get_rate_limiter().hit)(f"ws_conn:{client_ip}", [rate])
+        return result.allowed
     
-    async def _check_concurrent_connections(self, client_ip):
-        """Check if IP has exceeded concurrent connection limit"""
-        cache_key = f"ws_concurrent_conn:{client_ip}"
-        current_connections = cache.get(cache_key, 0)
-        
-        if current_connections >= self.MAX_CONNECTIONS_PER_IP:
-            return False
-        
-        return True
+    async def _acquire_connection_slot(self, client_ip):
+        """Take a concurrent connection slot for the IP, if one is free"""
+        return await sync_to_async(get_rate_limiter().acquire)(
+            f"ws_concurrent:{client_ip}", self.MAX_CONNECTIONS_PER_IP, 3600  # 1 hour TTL
+        )
     
-    async def _track_connection(self, client_ip):
-        """Track active connection"""
-        cache_key = f"ws_concurrent_conn:{client_ip}"
-        current = cache.get(cache_key, 0)
-        cache.set(cache_key, current + 1, 3600)  # 1 hour TTL
+    async def _release_connection_slot(self, client_ip):
+        """Give back the connection slot"""
+        await sync_to_async(get_rate_limiter().release)(f"ws_concurrent:{client_ip}")
 
 
 def WebSocketRateLimitMiddlewareStack(inner):
@@ -2,8 +2,25 @@
 Custom pagination classes for the Final Project Management System
 """
 
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+import logging
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+logger = logging.getLogger(__name__)
+
+COUNT_MODES = ('exact', 'estimate', 'none')
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -67,3 +84,222 @@ class SmallResultsSetPagination(PageNumberPagination):
             'current_page': self.page.number,
             'results': data
         })
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for ``queryset`` or ``None``.
+
+    Only PostgreSQL exposes a cheap estimate (``EXPLAIN``); other databases
+    return ``None`` so callers can fall back to an exact count.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        logger.warning(f"Could not estimate row count: {e}")
+        return None
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on a composite ordering such as ``(created_at, id)``.
+
+    Each page is fetched with a ``WHERE (created_at, id) < (last values)``
+    condition instead of ``OFFSET``, so deep pages cost the same as the first.
+    The ordering fields must be non-null and the last one must be unique.
+
+    The total is controlled by ``?count=exact|estimate|none`` (default
+    ``count_mode``). Estimates use the PostgreSQL planner and fall back to an
+    exact count elsewhere or when the estimate is small.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering = ('-created_at', '-id')
+    count_mode = 'estimate'
+    exact_count_threshold = 1000
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, 'cursor_ordering', None) or self.ordering)
+        self.count, self.count_is_estimate = self.get_count(queryset, request)
+
+        cursor = self.decode_cursor(request)
+        position, reverse = cursor if cursor else (None, False)
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(position, reverse))
+
+        order = [self._invert(field) for field in self.ordering] if reverse else list(self.ordering)
+        rows = list(queryset.order_by(*order)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = position is not None, has_more
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'page_size': self.page_size,
+            'results': data,
+        }
+        if self.count is not None:
+            payload['count'] = self.count
+            payload['count_is_estimate'] = self.count_is_estimate
+        return Response(payload)
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_count(self, queryset, request):
+        """Return ``(count, is_estimate)``; ``count`` is ``None`` when skipped."""
+        mode = request.query_params.get(self.count_query_param, self.count_mode)
+        if mode not in COUNT_MODES:
+            mode = self.count_mode
+        if mode == 'none':
+            return None, False
+        if mode == 'estimate':
+            estimate = estimate_count(queryset)
+            if estimate is not None and estimate >= self.exact_count_threshold:
+                return estimate, True
+        return queryset.count(), False
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def decode_cursor(self, request):
+        """Return ``(position, reverse)`` from the request, or ``None`` for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+            position = data['p']
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError('cursor does not match ordering')
+            return position, bool(data.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse):
+        data = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def _link(self, row, reverse):
+        position = [self._serialize(getattr(row, self._field_name(field))) for field in self.ordering]
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(position, reverse))
+
+    def _keyset_filter(self, position, reverse):
+        """Rows strictly after ``position`` in (possibly reversed) ordering."""
+        condition = None
+        for index, field in enumerate(self.ordering):
+            name = self._field_name(field)
+            descending = field.startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            term = Q(**{f'{name}__{lookup}': position[index]})
+            for prev_index in range(index):
+                term &= Q(**{self._field_name(self.ordering[prev_index]): position[prev_index]})
+            condition = term if condition is None else condition | term
+        return condition
+
+    @staticmethod
+    def _field_name(field):
+        return field.lstrip('-')
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        if isinstance(value, (UUID, Decimal)):
+            return str(value)
+        return value
+
+    @classmethod
+    def is_requested(cls, request):
+        """Endpoints with legacy page numbers switch to keyset mode on ``?cursor=``."""
+        return cls.cursor_query_param in request.query_params
+
+
+class RequestLogCursorPagination(KeysetCursorPagination):
+    """Keyset pagination for monitoring logs keyed on ``timestamp``."""
+    page_size = 50
+    max_page_size = 200
+    ordering = ('-timestamp', '-id')
+
+
+class PageOrCursorPagination(BasePagination):
+    """
+    Page-number pagination that switches to keyset pages on ``?cursor=``.
+
+    Existing clients keep the page-number response (``count``, ``?page=``);
+    high-volume readers opt in with ``?cursor=`` (empty for the first page)
+    and follow the cursor links from there. ``page_number_class`` defaults to
+    ``DEFAULT_PAGINATION_CLASS``.
+    """
+    page_number_class = None
+    cursor_class = KeysetCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_class.is_requested(request):
+            self.paginator = self.cursor_class()
+        else:
+            self.paginator = (self.page_number_class or api_settings.DEFAULT_PAGINATION_CLASS)()
+        return self.paginator.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_paginated_response_schema(self, schema):
+        return (self.page_number_class or api_settings.DEFAULT_PAGINATION_CLASS)().get_paginated_response_schema(schema)
+
+
+class RequestLogPageOrCursorPagination(PageOrCursorPagination):
+    """Page numbers for request logs, keyset pages on ``timestamp`` with ``?cursor=``."""
+    cursor_class = RequestLogCursorPagination
@@ -0,0 +1,334 @@
+"""
+Authenticated-principal cache for JWT authentication.
+
+``CachedJWTAuthentication`` (HTTP) and the WebSocket ``JWTAuthMiddleware``
+resolve a token's user through ``PrincipalCache`` instead of loading the user
+from the database on every request. An entry holds the ``User`` instance, a
+``Principal`` summary (role, active flag, student/advisor profile ids and
+academic-year access) and the user's revoked token ids.
+
+Entries live in two tiers: process memory for ``LOCAL_TTL`` seconds, then the
+shared Django cache for ``SHARED_TTL`` seconds, then the database. Saving or
+deleting a user or their student/advisor profile invalidates the entry, and
+logging out revokes the access token's ``jti``. Every lookup, including one
+served from process memory, reads the user's stamp (replaced on invalidation)
+and revoked token ids from the shared cache in one round trip, so both apply
+to the next request in every process. Only when the shared cache has lost the
+stamp (eviction, or a dummy cache) do other processes keep an entry for up to
+``LOCAL_TTL``. The shared copy of the user carries no password hash; code that
+needs it loads it from the database.
+
+Configured through ``settings.PRINCIPAL_CACHE``:
+
+* ``ENABLED``: cache principals at all
+* ``LOCAL_TTL``: seconds an entry is trusted from process memory
+* ``SHARED_TTL``: seconds an entry is kept in the shared cache
+* ``MAX_ENTRIES``: entries held in process memory
+"""
+
+import copy
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRINCIPAL_SETTINGS = {
+    'ENABLED': True,
+    'LOCAL_TTL': 30,
+    'SHARED_TTL': 300,
+    'MAX_ENTRIES': 10000,
+}
+
+ADMIN_ROLES = ('Admin',)
+
+
+def get_principal_settings():
+    """Return principal cache settings merged over the defaults."""
+    return {**DEFAULT_PRINCIPAL_SETTINGS, **getattr(settings, 'PRINCIPAL_CACHE', {})}
+
+
+@dataclass(frozen=True)
+class Principal:
+    """What authorization checks need to know about an authenticated user."""
+    user_id: int
+    username: str
+    role: str
+    is_active: bool
+    is_superuser: bool
+    academic_year: str
+    student_id: Optional[int] = None
+    advisor_id: Optional[int] = None
+
+    @classmethod
+    def from_user(cls, user):
+        Student = apps.get_model('students', 'Student')
+        Advisor = apps.get_model('advisors', 'Advisor')
+        return cls(
+            user_id=user.pk,
+            username=user.username,
+            role=user.role,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            academic_year=user.current_academic_year,
+            student_id=Student.objects.filter(user_id=user.pk).values_list('pk', flat=True).first(),
+            advisor_id=Advisor.objects.filter(user_id=user.pk).values_list('pk', flat=True).first(),
+        )
+
+    def is_admin(self):
+        return self.role in ADMIN_ROLES or self.is_superuser
+
+    def can_access_academic_year(self, academic_year):
+        """Same rule as ``User.can_access_academic_year``."""
+        return self.is_admin() or academic_year == self.academic_year or not academic_year
+
+
+@dataclass
+class PrincipalEntry:
+    user: object
+    principal: Principal
+    revoked: dict = field(default_factory=dict)  # {jti: expiry timestamp}
+    expires: float = 0.0
+    stamp: Optional[str] = None
+
+    def is_revoked(self, jti):
+        return jti is not None and jti in self.revoked
+
+    def make_user(self):
+        """A copy of the cached user, so request code can't mutate the shared one."""
+        user = copy.copy(self.user)
+        user.principal = self.principal
+        return user
+
+
+def _user_key(user_id):
+    return f'principal_user_{user_id}'
+
+
+def _revoked_key(user_id):
+    return f'principal_revoked_{user_id}'
+
+
+def _stamp_key(user_id):
+    return f'principal_stamp_{user_id}'
+
+
+def _without_password(user):
+    """Copy of ``user`` for the shared cache; the password becomes a deferred field."""
+    user = copy.copy(user)
+    user.__dict__.pop('password', None)
+    return user
+
+
+class PrincipalCache:
+    """Two-tier (process memory, shared cache) cache of ``PrincipalEntry``."""
+
+    def __init__(self, local_ttl=30, shared_ttl=300, max_entries=10000):
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_local(self, user_id):
+        """Fresh in-process entry for ``user_id``, or None; never does I/O."""
+        entry = self._entries.get(str(user_id))
+        if entry is not None and entry.expires > time.monotonic():
+            return entry
+        return None
+
+    def get(self, user_id):
+        """Entry for ``user_id`` from memory, the shared cache or the database; None if no such user."""
+        user_id = str(user_id)
+        entry = self.get_local(user_id)
+        if entry is not None:
+            cached = self._shared_get([_stamp_key(user_id), _revoked_key(user_id)])
+            stamp = cached.get(_stamp_key(user_id))
+            if stamp is None or stamp == entry.stamp:
+                entry.revoked = {**self._live(entry.revoked), **self._live(cached.get(_revoked_key(user_id)) or {})}
+                return entry
+
+        cached = self._shared_get([_user_key(user_id), _stamp_key(user_id), _revoked_key(user_id)])
+        stored = cached.get(_user_key(user_id))
+        stamp = cached.get(_stamp_key(user_id))
+        revoked = self._live(cached.get(_revoked_key(user_id)) or {})
+        if stored is not None and stamp is not None and stored[-1] == stamp:
+            user, principal, _ = stored
+        else:
+            User = apps.get_model(settings.AUTH_USER_MODEL)
+            try:
+                user = User.objects.get(pk=user_id)
+            except (User.DoesNotExist, ValueError):
+                return None
+            principal = Principal.from_user(user)
+            stamp = stamp or uuid.uuid4().hex
+            self._shared_set_many({
+                _user_key(user_id): (_without_password(user), principal, stamp),
+                _stamp_key(user_id): stamp,
+            }, self.shared_ttl)
+
+        entry = PrincipalEntry(user, principal, revoked, time.monotonic() + self.local_ttl, stamp)
+        self._store(user_id, entry)
+        return entry
+
+    def invalidate(self, user_id):
+        """Forget ``user_id`` here and, through a new stamp, in every other process."""
+        user_id = str(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+        try:
+            cache.delete(_user_key(user_id))
+            # Kept at least as long as any process may hold an entry in memory
+            cache.set(_stamp_key(user_id), uuid.uuid4().hex, max(self.shared_ttl, self.local_ttl))
+        except Exception as e:
+            logger.warning(f"Could not invalidate cached principal {user_id}: {e}")
+
+    def revoke(self, user_id, jti, expires_at):
+        """Reject the token ``jti`` of ``user_id`` until it expires at ``expires_at`` (epoch seconds)."""
+        user_id = str(user_id)
+        revoked = self._live(self._shared_get([_revoked_key(user_id)]).get(_revoked_key(user_id)) or {})
+        revoked[jti] = expires_at
+        timeout = max(int(max(revoked.values()) - time.time()) + 1, 1)
+        self._shared_set(_revoked_key(user_id), revoked, timeout)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry.revoked = {**entry.revoked, jti: expires_at}
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+    def _store(self, user_id, entry):
+        with self._lock:
+            if user_id not in self._entries and len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                self._entries = {key: e for key, e in self._entries.items() if e.expires > now}
+                if len(self._entries) >= self.max_entries:
+                    # Still full: drop the oldest half (dicts keep insertion order)
+                    keys = list(self._entries)
+                    self._entries = {key: self._entries[key] for key in keys[len(keys) // 2:]}
+            self._entries[user_id] = entry
+
+    @staticmethod
+    def _live(revoked):
+        now = time.time()
+        return {jti: expires_at for jti, expires_at in revoked.items() if expires_at > now}
+
+    @staticmethod
+    def _shared_get(keys):
+        try:
+            return cache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"Could not read cached principals: {e}")
+            return {}
+
+    @staticmethod
+    def _shared_set(key, value, timeout):
+        try:
+            cache.set(key, value, timeout)
+        except Exception as e:
+            logger.warning(f"Could not cache principal: {e}")
+
+    @staticmethod
+    def _shared_set_many(values, timeout):
+        try:
+            cache.set_many(values, timeout)
+        except Exception as e:
+            logger.warning(f"Could not cache principal: {e}")
+
+
+class UncachedPrincipalCache(PrincipalCache):
+    """Used when the cache is disabled: every lookup reads the database."""
+
+    def get_local(self, user_id):
+        return None
+
+    def get(self, user_id):
+        User = apps.get_model(settings.AUTH_USER_MODEL)
+        try:
+            user = User.objects.get(pk=user_id)
+        except (User.DoesNotExist, ValueError):
+            return None
+        revoked = self._live(self._shared_get([_revoked_key(user_id)]).get(_revoked_key(user_id)) or {})
+        return PrincipalEntry(user, Principal.from_user(user), revoked)
+
+    def invalidate(self, user_id):
+        pass
+
+
+_principal_cache = None
+_principal_cache_lock = threading.Lock()
+
+
+def get_principal_cache():
+    """Return the process-wide ``PrincipalCache``, creating it on first use."""
+    global _principal_cache
+    if _principal_cache is None:
+        with _principal_cache_lock:
+            if _principal_cache is None:
+                config = get_principal_settings()
+                cache_class = PrincipalCache if config['ENABLED'] else UncachedPrincipalCache
+                _principal_cache = cache_class(
+                    local_ttl=config['LOCAL_TTL'],
+                    shared_ttl=config['SHARED_TTL'],
+                    max_entries=config['MAX_ENTRIES'],
+                )
+    return _principal_cache
+
+
+def reset_principal_cache():
+    """Drop the process-wide cache so it is rebuilt from current settings."""
+    global _principal_cache
+    with _principal_cache_lock:
+        _principal_cache = None
+
+
+def invalidate_principal(user_id):
+    """Forget the cached principal of ``user_id``."""
+    if user_id is not None:
+        get_principal_cache().invalidate(user_id)
+        # Again after commit, in case a concurrent request re-cached the old row meanwhile
+        transaction.on_commit(lambda: get_principal_cache().invalidate(user_id))
+
+
+@receiver(setting_changed)
+def _reset_on_setting_changed(setting, **kwargs):
+    if setting == 'PRINCIPAL_CACHE':
+        reset_principal_cache()
+    elif setting == 'CACHES':
+        # Entries in process memory may have come from the old shared cache
+        get_principal_cache().clear()
+
+
+def _invalidate_user(sender, instance, **kwargs):
+    invalidate_principal(instance.pk)
+
+
+def _invalidate_profile_user(sender, instance, **kwargs):
+    invalidate_principal(instance.user_id)
+
+
+def connect_signals():
+    """Invalidate principals when users or their student/advisor profiles change."""
+    from django.db.models.signals import post_delete, post_save
+
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    for signal in (post_save, post_delete):
+        signal.connect(_invalidate_user, sender=User, dispatch_uid=f'principal_user_{signal is post_save}')
+        for label in ('students.Student', 'advisors.Advisor'):
+            signal.connect(
+                _invalidate_profile_user,
+                sender=apps.get_model(label),
+                dispatch_uid=f'principal_{label}_{signal is post_save}',
+            )
@@ -0,0 +1,370 @@
+"""
+Shared rate limiter for the HTTP and WebSocket middleware.
+
+Limits are sliding windows approximated from two fixed-window counters: the
+count of the current window plus the previous window's count weighted by how
+much of it still overlaps the sliding window. Every check is atomic:
+
+* ``RedisRateLimiter`` evaluates all windows of a check in a single Lua script,
+  so a check is one round trip and concurrent workers never undercount.
+* ``CacheRateLimiter`` uses ``cache.add``/``cache.incr`` on other shared cache
+  backends (e.g. memcached): a hit is counted first and judged on the value
+  the increment returns, then taken back when it is rejected.
+* ``LocalRateLimiter`` keeps counters in process memory for the locmem and
+  dummy caches, which cannot share counters between workers.
+
+Set ``API_SECURITY['RATE_LIMIT_LOCAL_FALLBACK']`` to ``False`` to disable
+limiting instead of falling back to process memory.
+"""
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger('core.security')
+
+KEY_PREFIX = 'rl'
+
+
+@dataclass(frozen=True)
+class Rate:
+    """At most ``limit`` hits per ``window`` seconds."""
+    limit: int
+    window: int
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    remaining: int = 0
+    retry_after: int = 0
+
+
+ALLOW = RateLimitResult(allowed=True, remaining=-1)
+
+
+def window_keys(key, rate, now):
+    """Return the (current, previous) counter keys of ``rate`` at ``now``."""
+    window_id = int(now // rate.window)
+    # The braces are a Redis Cluster hash tag: all counters of a key share a slot
+    base = f"{KEY_PREFIX}:{{{key}}}:{rate.window}"
+    return f"{base}:{window_id}", f"{base}:{window_id - 1}"
+
+
+def evaluate(rates, counts, now):
+    """
+    Decide a check from ``[(current, previous), ...]`` counts, one per rate.
+
+    Mirrors ``RedisRateLimiter.SCRIPT``; ``current`` excludes the hit being
+    checked.
+    """
+    remaining = None
+    retry_after = 0
+    for rate, (current, previous) in zip(rates, counts):
+        elapsed = (now % rate.window) / rate.window
+        estimate = previous * (1 - elapsed) + current
+        if estimate + 1 > rate.limit:
+            retry_after = max(retry_after, math.ceil(rate.window - now % rate.window))
+        else:
+            left = math.floor(rate.limit - estimate - 1)
+            remaining = left if remaining is None else min(remaining, left)
+    if retry_after:
+        return RateLimitResult(allowed=False, retry_after=retry_after)
+    return RateLimitResult(allowed=True, remaining=remaining if remaining is not None else -1)
+
+
+class BaseRateLimiter:
+    """Interface shared by the rate limiter backends."""
+
+    def hit(self, key, rates):
+        """Count one hit against every rate for ``key`` unless any is exhausted."""
+        raise NotImplementedError
+
+    def acquire(self, key, limit, timeout):
+        """Take one of ``limit`` concurrent slots for ``key``; ``False`` when none are free."""
+        raise NotImplementedError
+
+    def release(self, key):
+        """Give back a slot taken with ``acquire``."""
+        raise NotImplementedError
+
+
+class NullRateLimiter(BaseRateLimiter):
+    """Allows everything; used when limiting cannot be enforced."""
+
+    def hit(self, key, rates):
+        return ALLOW
+
+    def acquire(self, key, limit, timeout):
+        return True
+
+    def release(self, key):
+        pass
+
+
+class RedisRateLimiter(BaseRateLimiter):
+    """Lua scripts over a Redis client: one round trip per operation."""
+
+    # KEYS: current/previous counter per rate; ARGV: now, then limit/window per rate
+    SCRIPT = """
+        local now = tonumber(ARGV[1])
+        local remaining = -1
+        local retry_after = 0
+        for i = 1, #KEYS / 2 do
+            local limit = tonumber(ARGV[i * 2])
+            local window = tonumber(ARGV[i * 2 + 1])
+            local current = tonumber(redis.call('GET', KEYS[i * 2 - 1]) or '0')
+            local previous = tonumber(redis.call('GET', KEYS[i * 2]) or '0')
+            local estimate = previous * (1 - (now % window) / window) + current
+            if estimate + 1 > limit then
+                retry_after = math.max(retry_after, math.ceil(window - now % window))
+            else
+                local left = math.floor(limit - estimate - 1)
+                if remaining < 0 or left < remaining then remaining = left end
+            end
+        end
+        if retry_after > 0 then
+            return {0, 0, retry_after}
+        end
+        for i = 1, #KEYS / 2 do
+            redis.call('INCR', KEYS[i * 2 - 1])
+            redis.call('EXPIRE', KEYS[i * 2 - 1], tonumber(ARGV[i * 2 + 1]) * 2)
+        end
+        return {1, remaining, 0}
+    """
+
+    ACQUIRE_SCRIPT = """
+        local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+        if current >= tonumber(ARGV[1]) then
+            return 0
+        end
+        redis.call('INCR', KEYS[1])
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+        return 1
+    """
+
+    RELEASE_SCRIPT = """
+        if redis.call('DECR', KEYS[1]) <= 0 then
+            redis.call('DEL', KEYS[1])
+        end
+        return 1
+    """
+
+    def __init__(self, client, make_key=None):
+        self.client = client
+        self.make_key = make_key or (lambda key: key)
+        self._hit = client.register_script(self.SCRIPT)
+        self._acquire = client.register_script(self.ACQUIRE_SCRIPT)
+        self._release = client.register_script(self.RELEASE_SCRIPT)
+
+    def hit(self, key, rates):
+        now = time.time()
+        keys, args = [], [now]
+        for rate in rates:
+            keys.extend(self.make_key(k) for k in window_keys(key, rate, now))
+            args.extend([rate.limit, rate.window])
+        try:
+            allowed, remaining, retry_after = self._hit(keys=keys, args=args)
+        except Exception as e:
+            # Fail open: an unavailable cache must not take the API down
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return ALLOW
+        return RateLimitResult(allowed=bool(allowed), remaining=int(remaining), retry_after=int(retry_after))
+
+    def acquire(self, key, limit, timeout):
+        try:
+            return bool(self._acquire(keys=[self.make_key(f"{KEY_PREFIX}:slots:{key}")], args=[limit, timeout]))
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing connection: {e}")
+            return True
+
+    def release(self, key):
+        try:
+            self._release(keys=[self.make_key(f"{KEY_PREFIX}:slots:{key}")])
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, slot not released: {e}")
+
+
+class CacheRateLimiter(BaseRateLimiter):
+    """
+    Atomic ``add``/``incr`` on a shared Django cache without scripting.
+
+    Hits are counted before they are judged, so concurrent workers each see a
+    distinct count; a rejected hit is decremented again.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def hit(self, key, rates):
+        now = time.time()
+        keys = [window_keys(key, rate, now) for rate in rates]
+        try:
+            # Count first: every concurrent hit sees its own position in the current
+            # window, so two workers can never both take the last remaining hit
+            currents = [self._incr(current, rate.window * 2) for rate, (current, _) in zip(rates, keys)]
+            previous = self.cache.get_many([previous for _, previous in keys])
+            counts = [(count - 1, previous.get(k, 0)) for count, (_, k) in zip(currents, keys)]
+            result = evaluate(rates, counts, now)
+            if not result.allowed:
+                for current, _ in keys:
+                    self._decr(current)
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return ALLOW
+        return result
+
+    def acquire(self, key, limit, timeout):
+        slot_key = f"{KEY_PREFIX}:slots:{key}"
+        try:
+            if self._incr(slot_key, timeout) > limit:
+                self.cache.decr(slot_key)
+                return False
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing connection: {e}")
+        return True
+
+    def release(self, key):
+        try:
+            self.cache.decr(f"{KEY_PREFIX}:slots:{key}")
+        except ValueError:
+            pass  # Expired meanwhile
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, slot not released: {e}")
+
+    def _decr(self, key):
+        try:
+            self.cache.decr(key)
+        except ValueError:
+            pass  # Expired meanwhile
+
+    def _incr(self, key, timeout):
+        if self.cache.add(key, 1, timeout):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add and incr
+            self.cache.add(key, 1, timeout)
+            return 1
+
+
+class LocalRateLimiter(BaseRateLimiter):
+    """In-process counters guarded by a lock; limits are per worker process."""
+
+    PURGE_EVERY = 1000
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._operations = 0
+
+    def hit(self, key, rates):
+        now = time.time()
+        keys = [window_keys(key, rate, now) for rate in rates]
+        with self._lock:
+            self._maybe_purge(now)
+            counts = [(self._get(current, now), self._get(previous, now)) for current, previous in keys]
+            result = evaluate(rates, counts, now)
+            if result.allowed:
+                for rate, (current, _) in zip(rates, keys):
+                    self._counters[current] = (self._get(current, now) + 1, now + rate.window * 2)
+        return result
+
+    def acquire(self, key, limit, timeout):
+        now = time.time()
+        slot_key = f"{KEY_PREFIX}:slots:{key}"
+        with self._lock:
+            current = self._get(slot_key, now)
+            if current >= limit:
+                return False
+            self._counters[slot_key] = (current + 1, now + timeout)
+        return True
+
+    def release(self, key):
+        now = time.time()
+        slot_key = f"{KEY_PREFIX}:slots:{key}"
+        with self._lock:
+            current = self._get(slot_key, now)
+            if current <= 1:
+                self._counters.pop(slot_key, None)
+            else:
+                self._counters[slot_key] = (current - 1, self._counters[slot_key][1])
+
+    def _get(self, key, now):
+        value, expires_at = self._counters.get(key, (0, None))
+        if expires_at is not None and expires_at <= now:
+            del self._counters[key]
+            return 0
+        return value
+
+    def _maybe_purge(self, now):
+        self._operations += 1
+        if self._operations % self.PURGE_EVERY:
+            return
+        expired = [key for key, (_, expires_at) in self._counters.items() if expires_at <= now]
+        for key in expired:
+            del self._counters[key]
+
+
+def _redis_client(cache):
+    """Return a raw Redis client for Django's or django-redis' cache backend."""
+    backend_client = getattr(cache, '_cache', None)
+    if hasattr(backend_client, 'get_client'):  # django.core.cache.backends.redis
+        return backend_client.get_client(write=True)
+    client = getattr(cache, 'client', None)
+    if hasattr(client, 'get_client'):  # django_redis
+        return client.get_client(write=True)
+    return None
+
+
+def build_rate_limiter(cache):
+    """Pick the rate limiter implementation for a Django cache backend."""
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        if getattr(settings, 'API_SECURITY', {}).get('RATE_LIMIT_LOCAL_FALLBACK', True):
+            return LocalRateLimiter()
+        return NullRateLimiter()
+    try:
+        client = _redis_client(cache)
+    except Exception as e:
+        logger.warning(f"Could not get a Redis client for rate limiting: {e}")
+        client = None
+    if client is not None:
+        return RedisRateLimiter(client, make_key=cache.make_key)
+    return CacheRateLimiter(cache)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide rate limiter for the default cache."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = build_rate_limiter(caches['default'])
+    return _limiter
+
+
+def reset_rate_limiter():
+    """Drop the process-wide limiter so it is rebuilt from current settings."""
+    global _limiter
+    with _limiter_lock:
+        _limiter = None
+
+
+@receiver(setting_changed)
+def _reset_on_setting_changed(setting, **kwargs):
+    if setting in ('API_SECURITY', 'CACHES'):
+        reset_rate_limiter()
@@ -0,0 +1,36 @@
+"""
+Settings overrides shared by every test run.
+
+``TestRunner`` applies them for ``manage.py test`` and the ``suite_settings``
+fixture in ``conftest.py`` applies them for pytest, so the base settings
+module never has to guess whether it is being loaded by a test run.
+"""
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def settings_overrides():
+    """Return the settings every test run starts from."""
+    return {
+        # Buffered background writers must not outlive the test database
+        'MONITORING_TELEMETRY': {**getattr(settings, 'MONITORING_TELEMETRY', {}), 'ENABLED': False},
+        # Test runs must not write into logs/
+        'AUDIT_LOG': {**getattr(settings, 'AUDIT_LOG', {}), 'ENABLED': False},
+        # Every test client shares one address
+        'API_SECURITY': {**getattr(settings, 'API_SECURITY', {}), 'RATE_LIMIT_LOCAL_FALLBACK': False},
+    }
+
+
+class TestRunner(DiscoverRunner):
+    """``DiscoverRunner`` that applies ``settings_overrides()``."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._overrides = override_settings(**settings_overrides())
+        self._overrides.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._overrides.disable()
+        super().teardown_test_environment(**kwargs)
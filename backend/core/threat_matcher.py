@@ -0,0 +1,243 @@
+"""
+Compiled threat matching shared by the security middleware chain.
+
+``SecurityMiddleware``, ``BlockSuspiciousRequestsMiddleware`` and
+``EnvironmentProtectionMiddleware`` all look requests up against the same
+``ThreatMatcher``. It is compiled once per settings dict and reused:
+
+* ``PatternSet``: every suspicious regex combined into one alternation, so
+  each input is scanned once instead of once per pattern.
+* ``TokenSet``: literal substrings (user agents, protected paths, traversal
+  sequences) as one escaped alternation.
+* ``IPSet``: blocked addresses in a set and CIDR networks bucketed by prefix
+  length, so a lookup costs one probe per distinct prefix length.
+
+The cache is cleared when the security settings change (``override_settings``).
+"""
+
+import ipaddress
+import logging
+import re
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+logger = logging.getLogger('core.security')
+
+SUSPICIOUS_USER_AGENTS = (
+    'sqlmap', 'nikto', 'nmap', 'masscan', 'zap', 'burp', 'w3af', 'havij',
+    'sqlninja', 'pangolin', 'acunetix', 'nessus', 'openvas', 'retina',
+    'qualys', 'rapid7', 'metasploit', 'cobalt', 'immunity', 'canvas', 'core',
+    'exploit', 'scanner', 'crawler', 'spider', 'bot', 'scraper', 'harvester',
+    'extractor', 'parser', 'analyzer', 'monitor', 'checker', 'tester',
+    'validator', 'verifier', 'auditor', 'inspector', 'probe', 'sniffer',
+    'listener', 'receiver', 'collector', 'gatherer', 'aggregator',
+    'accumulator', 'compiler', 'assembler', 'builder', 'generator', 'creator',
+    'maker', 'producer', 'manufacturer', 'fabricator', 'constructor',
+    'developer', 'programmer', 'coder', 'hacker', 'cracker', 'breaker',
+    'intruder', 'penetrator', 'infiltrator', 'invader', 'attacker',
+    'assailant', 'aggressor', 'offender', 'violator', 'trespasser',
+)
+
+PATH_TRAVERSAL_TOKENS = (
+    '../', '..\\', '%2e%2e/', '%2e%2e\\', '..%2f', '..%5c', '%252e%252e/', '%252e%252e\\',
+)
+
+# Sensitive files and directories that should never be accessible (matched as substrings)
+PROTECTED_PATHS = (
+    # Environment files
+    '.env', '.env.local', '.env.production', '.env.development', '.env.test',
+    '.env.staging', 'env', 'venv', '.venv',
+    # Version control
+    '.git', '.gitignore', '.gitattributes', '.svn', '.hg', '.bzr',
+    # Configuration files
+    'settings.py', 'settings_local.py', 'settings_production.py', 'local_settings.py',
+    'config.py', 'config.json', 'config.yaml', 'config.yml', 'secrets.json', 'secrets.yaml',
+    # Database files
+    'db.sqlite3', 'database.db', '*.sql', '*.dump',
+    # Backup files
+    '*.bak', '*.backup', '*.old', '*.orig', '*.save', '*.swp', '*.swo', '*~',
+    # Log files (direct access)
+    'logs/', '*.log',
+    # IDE and editor files
+    '.vscode', '.idea', '.vs', '*.sublime-project', '*.sublime-workspace',
+    # Package manager files
+    'package-lock.json', 'yarn.lock', 'Pipfile.lock', 'poetry.lock', 'requirements.txt', 'Pipfile',
+    # Docker files
+    'Dockerfile', 'docker-compose.yml', 'docker-compose.yaml', '.dockerignore',
+    # CI/CD files
+    '.gitlab-ci.yml', '.travis.yml', 'Jenkinsfile', '.circleci', '.github',
+    # Python bytecode
+    '__pycache__', '*.pyc', '*.pyo', '*.pyd',
+    # SSH and keys
+    '.ssh', 'id_rsa', 'id_dsa', '*.pem', '*.key', '*.crt', '*.cer',
+    # AWS and cloud credentials
+    '.aws', 'credentials', '.boto',
+    # Other sensitive files
+    'wp-config.php', 'web.config', '.htaccess', '.htpasswd', 'phpinfo.php', 'info.php',
+)
+
+NUMBERED_BACKREFERENCE_RE = re.compile(r'\\[1-9]')
+
+
+class PatternSet:
+    """Case-insensitive regexes searched in one pass; reports which one matched."""
+
+    def __init__(self, patterns):
+        self._compiled = []
+        for pattern in dict.fromkeys(patterns):
+            try:
+                self._compiled.append((pattern, re.compile(pattern, re.IGNORECASE)))
+            except re.error as e:
+                logger.error(f"Ignoring invalid suspicious pattern {pattern!r}: {e}")
+        self.patterns = [pattern for pattern, _ in self._compiled]
+
+        self._combined = None
+        # Numbered backreferences would point at the wrong group once combined
+        if self.patterns and not any(NUMBERED_BACKREFERENCE_RE.search(p) for p in self.patterns):
+            try:
+                self._combined = re.compile(
+                    '|'.join(f'(?P<p{index}>{pattern})' for index, pattern in enumerate(self.patterns)),
+                    re.IGNORECASE,
+                )
+            except re.error as e:
+                # e.g. inline global flags or clashing group names
+                logger.warning(f"Suspicious patterns cannot be combined, matching one by one: {e}")
+
+    def search(self, text):
+        """Return the first pattern found in ``text``, or ``None``."""
+        if not text:
+            return None
+        if self._combined is not None:
+            match = self._combined.search(text)
+            return self.patterns[int(match.lastgroup[1:])] if match else None
+        for pattern, regex in self._compiled:
+            if regex.search(text):
+                return pattern
+        return None
+
+
+class TokenSet:
+    """Case-insensitive literal substrings searched in one pass."""
+
+    def __init__(self, tokens):
+        self.tokens = list(dict.fromkeys(token.lower() for token in tokens))
+        # Longest first so the reported token is the most specific one
+        self._regex = re.compile(
+            '|'.join(re.escape(token) for token in sorted(self.tokens, key=len, reverse=True)),
+            re.IGNORECASE,
+        ) if self.tokens else None
+
+    def search(self, text):
+        """Return the token found in ``text`` (lower-cased), or ``None``."""
+        if not text or self._regex is None:
+            return None
+        match = self._regex.search(text)
+        return match.group(0).lower() if match else None
+
+
+class IPSet:
+    """Blocked addresses and CIDR networks with constant-time lookups."""
+
+    def __init__(self, entries):
+        self._addresses = set()
+        self._literals = set()
+        self._networks = {}  # (version, prefixlen) -> {network address int}
+        for entry in entries:
+            entry = str(entry).strip()
+            if not entry:
+                continue
+            try:
+                if '/' in entry:
+                    network = ipaddress.ip_network(entry, strict=False)
+                    self._networks.setdefault((network.version, network.prefixlen), set()).add(
+                        int(network.network_address)
+                    )
+                else:
+                    self._addresses.add(ipaddress.ip_address(entry))
+            except ValueError:
+                # Keep unparsable entries as exact strings, as the old list lookup did
+                self._literals.add(entry)
+
+    def __bool__(self):
+        return bool(self._addresses or self._literals or self._networks)
+
+    def __contains__(self, ip):
+        if not ip:
+            return False
+        if ip in self._literals:
+            return True
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        if address in self._addresses:
+            return True
+        value = int(address)
+        for (version, prefixlen), networks in self._networks.items():
+            if version == address.version:
+                shift = address.max_prefixlen - prefixlen
+                if (value >> shift) << shift in networks:
+                    return True
+        return False
+
+
+class ThreatMatcher:
+    """Everything the security middlewares match requests against."""
+
+    def __init__(self, security_settings):
+        self.patterns = PatternSet(security_settings.get('SUSPICIOUS_PATTERNS', []))
+        self.blocked_ips = IPSet(security_settings.get('BLOCKED_IPS', []))
+        self.user_agents = TokenSet(SUSPICIOUS_USER_AGENTS)
+        self.protected_paths = TokenSet(PROTECTED_PATHS)
+        self.path_traversal = TokenSet(PATH_TRAVERSAL_TOKENS)
+
+    def is_blocked_ip(self, ip):
+        return ip in self.blocked_ips
+
+    def find_pattern(self, *texts):
+        """Return the first suspicious pattern found in any of ``texts``."""
+        for text in texts:
+            pattern = self.patterns.search(text)
+            if pattern is not None:
+                return pattern
+        return None
+
+    def find_user_agent(self, user_agent):
+        return self.user_agents.search(user_agent)
+
+    def find_protected_path(self, path):
+        return self.protected_paths.search(path)
+
+    def is_path_traversal(self, path):
+        return self.path_traversal.search(path) is not None
+
+
+SECURITY_SETTINGS = ('API_SECURITY', 'ENHANCED_API_SECURITY')
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def get_threat_matcher(setting='API_SECURITY'):
+    """Return the compiled matcher for ``settings.<setting>``."""
+    matcher = _matchers.get(setting)
+    if matcher is None:
+        with _matchers_lock:
+            matcher = _matchers.get(setting)
+            if matcher is None:
+                matcher = _matchers[setting] = ThreatMatcher(getattr(settings, setting, {}) or {})
+    return matcher
+
+
+def reset_threat_matchers():
+    with _matchers_lock:
+        _matchers.clear()
+
+
+@receiver(setting_changed)
+def _reset_on_setting_changed(setting, **kwargs):
+    if setting in SECURITY_SETTINGS:
+        reset_threat_matchers()
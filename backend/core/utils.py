@@ -1,6 +1,7 @@
 """
 Utility functions for the core app
 """
+import re
 
 # Local imports from utils module
 try:
@@ -25,5 +26,30 @@ except ImportError:
 else:
     get_client_ip = _get_client_ip_from_utils
 
-__all__ = ['get_client_ip', 'generate_project_id']
+# Object ids in request paths: integers and UUIDs
+_ID_SEGMENT_RE = re.compile(
+    r'/(?:\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})(?=/|$)',
+    re.IGNORECASE,
+)
 
+
+def normalize_endpoint(path, max_length=None):
+    """Replace numeric and UUID path segments with ``{id}`` so paths group per route."""
+    endpoint = _ID_SEGMENT_RE.sub('/{id}', path or '')
+    return endpoint[:max_length] if max_length else endpoint
+
+
+__all__ = ['get_client_ip', 'generate_project_id', 'normalize_endpoint', 'response_size']
+
+
+def response_size(response):
+    """Size from ``Content-Length``; streaming and file bodies are never read."""
+    if response.has_header('Content-Length'):
+        try:
+            return int(response['Content-Length'])
+        except ValueError:
+            return None
+    if getattr(response, 'streaming', False):
+        return None
+    # Only in-memory bodies are measured
+    return len(response.content)
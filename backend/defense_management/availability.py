@@ -0,0 +1,330 @@
+"""
+Room and panel availability.
+
+Bookings come from two places: the defense fields of ``ProjectGroup``
+(``defense_date``/``defense_time``/``defense_room``, one hour long) and the
+active ``DefenseSchedule`` rows. ``load_bookings`` reads both for a date range
+in one query (a ``UNION ALL`` with one row per booking and person source), and
+``IntervalIndex`` keeps them per room and per person and day, sorted by start,
+so free/busy questions over many rooms, days and people are answered in
+memory.
+
+``Availability`` bundles the two for a date range; ``slot_grid`` turns it into
+the grid the scheduling UI shows: for every day and slot of any length, the
+free rooms and the busy people.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time as clock_time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+DEFAULT_DURATION = 60           # minutes held by bookings that only store a start time
+INACTIVE_STATUSES = ('cancelled', 'postponed')
+DAY_START = 8 * 60
+DAY_END = 18 * 60
+MAX_RANGE_DAYS = 62
+
+ROOM = 'room'
+PERSON = 'person'
+
+
+def minutes_of(value):
+    return value.hour * 60 + value.minute
+
+
+def as_time(minutes):
+    return clock_time(minutes // 60, minutes % 60)
+
+
+def clock(minutes):
+    """``'HH:MM'``, with bookings running past midnight ending at ``'24:00'``."""
+    return '24:00' if minutes >= 24 * 60 else f'{as_time(minutes):%H:%M}'
+
+
+def even_slots(day_start, day_end, minutes, step=None):
+    """``[(start, end), ...]`` of ``minutes`` each from ``day_start`` to ``day_end``, starting every ``step``."""
+    step = step or minutes
+    return [(start, start + minutes) for start in range(day_start, day_end - minutes + 1, step)]
+
+
+@dataclass(frozen=True)
+class Booking:
+    """A booked defense holding a room and people over ``[start, end)`` minutes of ``day``."""
+    day: date
+    start: int
+    end: int
+    room: str = None
+    people: frozenset = frozenset()
+    project_id: str = ''
+
+    def overlaps(self, start, end):
+        return self.start < end and start < self.end
+
+
+def local_midnight(day):
+    """The start of ``day`` as a ``DefenseSchedule.defense_date`` value, for range filters."""
+    start = datetime.combine(day, clock_time.min)
+    return timezone.make_aware(start) if settings.USE_TZ else start
+
+
+def _local_date(value):
+    return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+
+
+def booking_rows(first_day, last_day, exclude=()):
+    """
+    The ``UNION ALL`` queryset behind ``load_bookings``.
+
+    Every row is ``(source, project_id, day, start, minutes, room, *people)``
+    with up to four Advisor pks; the committee members of ``ProjectGroup``
+    bookings come as rows of their own, which ``load_bookings`` folds into
+    their booking.
+    """
+    from django.db.models import CharField, DateField, F, IntegerField, Value
+    from django.db.models.functions import Coalesce, TruncDate
+
+    from committees.models import ProjectCommitteeMember
+    from projects.models import ProjectGroup
+    from .models import DefenseSchedule
+
+    no_person = Value(None, output_field=IntegerField())
+    columns = [
+        'booking_source', 'booking_project', 'booking_day', 'booking_start', 'booking_minutes', 'booking_room',
+        'booking_person', 'booking_main', 'booking_second', 'booking_third',
+    ]
+
+    def group_rows(queryset, prefix, person):
+        return queryset.annotate(
+            booking_source=Value('group', output_field=CharField()),
+            booking_project=F(f'{prefix}project_id'),
+            booking_day=F(f'{prefix}defense_date'),
+            booking_start=F(f'{prefix}defense_time'),
+            booking_minutes=Value(DEFAULT_DURATION, output_field=IntegerField()),
+            booking_room=F(f'{prefix}defense_room'),
+            booking_person=F(person),
+            booking_main=no_person, booking_second=no_person, booking_third=no_person,
+        ).order_by().values_list(*columns)
+
+    groups = ProjectGroup.objects.filter(
+        defense_date__range=(first_day, last_day), defense_time__isnull=False
+    ).exclude(project_id__in=exclude)
+    members = ProjectCommitteeMember.objects.filter(
+        project_group__defense_date__range=(first_day, last_day), project_group__defense_time__isnull=False
+    ).exclude(project_group__project_id__in=exclude)
+    schedules = DefenseSchedule.objects.filter(
+        defense_date__gte=local_midnight(first_day), defense_date__lt=local_midnight(last_day + timedelta(days=1)),
+    ).exclude(status__in=INACTIVE_STATUSES).exclude(project__project_id__in=exclude).annotate(
+        booking_source=Value('schedule', output_field=CharField()),
+        booking_project=F('project__project_id'),
+        booking_day=TruncDate('defense_date', output_field=DateField()),
+        booking_start=F('defense_time'),
+        booking_minutes=Coalesce('defense_duration', Value(DEFAULT_DURATION)),
+        booking_room=F('defense_room'),
+        booking_person=F('project__legacy_project__advisor'),
+        booking_main=F('main_committee__advisor_profile'),
+        booking_second=F('second_committee__advisor_profile'),
+        booking_third=F('third_committee__advisor_profile'),
+    ).order_by().values_list(*columns)
+    return group_rows(groups, '', 'legacy_project__advisor').union(
+        group_rows(members, 'project_group__', 'advisor_id'), schedules, all=True
+    )
+
+
+def load_bookings(first_day, last_day, exclude=()):
+    """
+    Defenses booked from ``first_day`` to ``last_day``, except those of the projects in ``exclude``.
+
+    Both ``ProjectGroup`` defense fields and active ``DefenseSchedule`` rows
+    count; committee users of the latter are mapped to their advisors. One
+    query, however long the range.
+    """
+    bookings = {}
+    for source, project_id, day, start, minutes, room, *people in booking_rows(first_day, last_day, exclude):
+        if isinstance(day, datetime):
+            day = _local_date(day)
+        key = (source, project_id, day, start, minutes, room)
+        bookings.setdefault(key, set()).update(pk for pk in people if pk)
+    return [
+        Booking(day, minutes_of(start), minutes_of(start) + (minutes or DEFAULT_DURATION), room or None,
+                frozenset(people), project_id)
+        for (_, project_id, day, start, minutes, room), people in bookings.items()
+    ]
+
+
+class IntervalIndex:
+    """
+    Bookings by ``(ROOM, name)`` and ``(PERSON, Advisor pk)`` per day.
+
+    Each resource and day keeps its bookings sorted by start together with
+    the running maximum of their ends, so an overlap query is a bisection
+    plus a walk back over the bookings that still reach into the interval.
+    """
+
+    def __init__(self, bookings=()):
+        self._bookings = defaultdict(list)
+        self._sorted = {}
+        for booking in bookings:
+            self.add(booking)
+
+    def add(self, booking):
+        keys = [(PERSON, person) for person in booking.people]
+        if booking.room:
+            keys.append((ROOM, booking.room))
+        for kind, name in keys:
+            self._bookings[(kind, name, booking.day)].append(booking)
+            self._sorted.pop((kind, name, booking.day), None)
+
+    def _lookup(self, kind, name, day):
+        entry = self._sorted.get((kind, name, day))
+        if entry is None:
+            bookings = sorted(self._bookings.get((kind, name, day), ()), key=lambda b: (b.start, b.end))
+            reach, ends = 0, []
+            for booking in bookings:
+                reach = max(reach, booking.end)
+                ends.append(reach)
+            entry = self._sorted[(kind, name, day)] = ([b.start for b in bookings], ends, bookings)
+        return entry
+
+    def overlapping(self, kind, name, day, start, end):
+        """The bookings of one room or person overlapping ``[start, end)`` minutes of ``day``, by start."""
+        starts, reach, bookings = self._lookup(kind, name, day)
+        i = bisect_left(starts, end)
+        found = []
+        while i and reach[i - 1] > start:
+            i -= 1
+            if bookings[i].end > start:
+                found.append(bookings[i])
+        found.reverse()
+        return found
+
+    def is_free(self, kind, name, day, start, end):
+        return not self.overlapping(kind, name, day, start, end)
+
+    def busy(self, kind, name, day):
+        """Merged ``[(start, end), ...]`` busy intervals of one room or person on ``day``."""
+        merged = []
+        for booking in self._lookup(kind, name, day)[2]:
+            if merged and booking.start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], booking.end)
+            else:
+                merged.append([booking.start, booking.end])
+        return [tuple(interval) for interval in merged]
+
+    def free(self, kind, name, day, day_start=DAY_START, day_end=DAY_END):
+        """``[(start, end), ...]`` between ``day_start`` and ``day_end`` where one room or person is free."""
+        free, cursor = [], day_start
+        for start, end in self.busy(kind, name, day):
+            if start > cursor:
+                free.append((cursor, min(start, day_end)))
+            cursor = max(cursor, end)
+            if cursor >= day_end:
+                break
+        if cursor < day_end:
+            free.append((cursor, day_end))
+        return [(start, end) for start, end in free if start < end]
+
+
+class Availability:
+    """Free/busy of rooms and people from ``first_day`` to ``last_day``, loaded with one query."""
+
+    def __init__(self, first_day, last_day=None, exclude=()):
+        self.first_day = first_day
+        self.last_day = last_day or first_day
+        self.bookings = load_bookings(self.first_day, self.last_day, exclude)
+        self.index = IntervalIndex(self.bookings)
+
+    def days(self):
+        return [self.first_day + timedelta(days=i) for i in range((self.last_day - self.first_day).days + 1)]
+
+    def conflicts(self, day, start, end, room=None, people=()):
+        """``[(booking, reason), ...]`` for a defense in ``room`` with ``people`` over ``[start, end)`` of ``day``."""
+        found = []
+        if room:
+            found += [(booking, ROOM) for booking in self.index.overlapping(ROOM, room, day, start, end)]
+        seen = set()
+        for person in people:
+            for booking in self.index.overlapping(PERSON, person, day, start, end):
+                if booking not in seen:
+                    seen.add(booking)
+                    found.append((booking, PERSON))
+        return found
+
+    def report(self, slots, rooms=(), advisors=None):
+        """
+        Free/busy of ``rooms`` and ``advisors`` (``{Advisor pk: advisor_id}``) per day and slot, ready for JSON.
+
+        Besides the slot rows, every day lists each room's and advisor's
+        bookings and free intervals between the first slot start and the
+        last slot end.
+        """
+        advisors = advisors or {}
+        opens, closes = min(start for start, _ in slots), max(end for _, end in slots)
+        days = []
+        for day, rows in slot_grid(self, slots, rooms, list(advisors)):
+            days.append({
+                'date': day.isoformat(),
+                'slots': [
+                    {
+                        'start': clock(row['start']),
+                        'end': clock(row['end']),
+                        'free_rooms': row['free_rooms'],
+                        'busy_advisors': [advisors[pk] for pk in row['busy_people']],
+                        'available': row['available'],
+                    }
+                    for row in rows
+                ],
+                'rooms': {room: self._free_busy(ROOM, room, day, opens, closes) for room in rooms},
+                'advisors': {
+                    advisor_id: self._free_busy(PERSON, pk, day, opens, closes) for pk, advisor_id in advisors.items()
+                },
+            })
+        return {
+            'start_date': self.first_day.isoformat(),
+            'end_date': self.last_day.isoformat(),
+            'time_slots': [f'{clock(start)}-{clock(end)}' for start, end in slots],
+            'rooms': list(rooms),
+            'advisors': list(advisors.values()),
+            'days': days,
+        }
+
+    def _free_busy(self, kind, name, day, opens, closes):
+        return {
+            'busy': [
+                {'start': clock(b.start), 'end': clock(b.end), 'project_id': b.project_id}
+                for b in self.index.overlapping(kind, name, day, 0, 24 * 60)
+            ],
+            'free': [
+                {'start': clock(start), 'end': clock(end)} for start, end in self.index.free(kind, name, day, opens, closes)
+            ],
+        }
+
+
+def slot_grid(availability, slots, rooms=(), people=(), days=None):
+    """
+    ``[(day, [row, ...]), ...]`` with one row per slot of ``slots``.
+
+    A row has the slot's ``start``/``end``, the ``free_rooms`` among
+    ``rooms``, the ``busy_people`` among ``people`` and whether it is
+    ``available`` for a panel of all of ``people``: nobody is busy and, when
+    ``rooms`` are given, one of them is free.
+    """
+    index = availability.index
+    grid = []
+    for day in days or availability.days():
+        rows = []
+        for start, end in slots:
+            free_rooms = [room for room in rooms if index.is_free(ROOM, room, day, start, end)]
+            busy_people = [person for person in people if not index.is_free(PERSON, person, day, start, end)]
+            rows.append({
+                'start': start,
+                'end': end,
+                'free_rooms': free_rooms,
+                'busy_people': busy_people,
+                'available': (bool(free_rooms) or not rooms) and not busy_people,
+            })
+        grid.append((day, rows))
+    return grid
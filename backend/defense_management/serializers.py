@@ -1,3 +1,5 @@
+from datetime import time
+
 from rest_framework import serializers
 from .models import (
     DefenseSchedule, DefenseSession, DefenseEvaluation, DefenseResult,
@@ -5,6 +7,9 @@ from .models import (
 )
 from accounts.models import User
 from projects.models import ProjectGroup
+from projects.statistics import is_academic_year
+from .availability import MAX_RANGE_DAYS, even_slots, minutes_of
+from .timetabling import parse_time_slots
 
 
 class DefenseScheduleSerializer(serializers.ModelSerializer):
@@ -264,3 +269,79 @@ class DefenseRoomAvailabilitySerializer(serializers.Serializer):
     available_slots = serializers.ListField()
     booked_slots = serializers.ListField()
     conflicts = serializers.ListField()
+
+
+class DefenseTimetableSerializer(serializers.Serializer):
+    """Serializer for automatic defense timetabling requests (see timetabling)."""
+    
+    academic_year = serializers.CharField()
+    apply = serializers.BooleanField(default=False)
+    start_date = serializers.DateField(required=False, help_text="First defense day; defaults to defenseSettings.startDefenseDate")
+    days = serializers.IntegerField(required=False, min_value=1, max_value=60, help_text="Weekdays available for defenses")
+    time_slots = serializers.CharField(required=False, help_text="Comma-separated HH:MM-HH:MM; defaults to defenseSettings.timeSlots")
+    rooms = serializers.ListField(child=serializers.CharField(max_length=100), required=False, allow_empty=False)
+
+    def validate_academic_year(self, value):
+        if not is_academic_year(value):
+            raise serializers.ValidationError("Expected an academic year such as 2024-2025.")
+        return value
+
+    def validate_time_slots(self, value):
+        try:
+            parse_time_slots(value)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
+        return value
+
+
+class DefenseRescheduleSerializer(DefenseTimetableSerializer):
+    """Serializer for moving one defense within the timetable."""
+    
+    project_id = serializers.CharField()
+    defense_date = serializers.DateField()
+    defense_time = serializers.TimeField()
+    defense_room = serializers.CharField(max_length=100)
+
+
+class DefenseAvailabilitySerializer(serializers.Serializer):
+    """Query parameters of the room and advisor availability grid (see availability)."""
+    
+    start_date = serializers.DateField()
+    end_date = serializers.DateField(required=False, help_text="Last day, inclusive; defaults to start_date")
+    rooms = serializers.CharField(required=False, help_text="Comma-separated room names; defaults to the available DefenseRooms")
+    advisors = serializers.CharField(required=False, help_text="Comma-separated advisor IDs")
+    slot_minutes = serializers.IntegerField(default=60, min_value=5, max_value=480)
+    step_minutes = serializers.IntegerField(required=False, min_value=5, max_value=480, help_text="Defaults to slot_minutes")
+    day_start = serializers.TimeField(default=time(8, 0))
+    day_end = serializers.TimeField(default=time(18, 0))
+    time_slots = serializers.CharField(required=False, help_text="Comma-separated HH:MM-HH:MM; replaces the even slots")
+
+    def validate_rooms(self, value):
+        return [room.strip() for room in value.split(',') if room.strip()]
+
+    def validate_advisors(self, value):
+        return [advisor_id.strip() for advisor_id in value.split(',') if advisor_id.strip()]
+
+    def validate_time_slots(self, value):
+        try:
+            slots = parse_time_slots(value)
+        except ValueError as error:
+            raise serializers.ValidationError(str(error))
+        if not slots:
+            raise serializers.ValidationError("At least one time slot is required.")
+        return slots
+
+    def validate(self, data):
+        end_date = data.setdefault('end_date', data['start_date'])
+        if end_date < data['start_date']:
+            raise serializers.ValidationError({'end_date': "end_date is before start_date."})
+        if (end_date - data['start_date']).days >= MAX_RANGE_DAYS:
+            raise serializers.ValidationError({'end_date': f"At most {MAX_RANGE_DAYS} days at a time."})
+        if 'time_slots' not in data:
+            data['time_slots'] = even_slots(
+                minutes_of(data['day_start']), minutes_of(data['day_end']),
+                data['slot_minutes'], data.get('step_minutes'),
+            )
+            if not data['time_slots']:
+                raise serializers.ValidationError({'day_end': "No slot fits between day_start and day_end."})
+        return data
@@ -0,0 +1,606 @@
+"""
+Defense timetabling.
+
+``DefenseTimetabler`` places every approved defense of an academic year that
+has no slot yet into a room and time slot of the defense days, such that
+
+* a room holds one defense per slot
+* nobody (supervisor or committee member) sits in two defenses at once,
+  counting defenses already booked on ``ProjectGroup`` or ``DefenseSchedule``
+* advisors marked unavailable for a day (``AdvisorAvailability``) are not
+  scheduled on it, and an advisor stationed in a room
+  (``defenseSettings.stationaryAdvisors``) only sits in that room
+
+and, among such timetables, prefers fewer defense days, then fewer room
+changes for the people of each day, then earlier days. Days, slots and rooms
+come from the year's ``defenseSettings`` (``startDefenseDate``, ``timeSlots``,
+``rooms``), with ``DefenseRoom`` as the fallback for rooms.
+
+``Timetable`` is the solver: a most-constrained-first greedy placement, which
+moves one placed defense aside when the next one does not fit, followed by
+local search (emptying whole days, moving single defenses, swapping pairs)
+while it improves. ``Timetable.move`` is the incremental re-solve: one defense
+is pinned to a new slot and only the defenses it displaces are placed again.
+
+``preview()``/``apply()`` and ``reschedule()`` write through
+``BulkProjectOperation.schedule_defense``.
+"""
+
+import json
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, time as clock_time, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .availability import (
+    DEFAULT_DURATION, ROOM, Availability, Booking, as_time, load_bookings, minutes_of,
+)
+
+DEFAULT_TIME_SLOTS = '09:00-10:00,10:15-11:15,13:00-14:00,14:15-15:15'
+MAX_DAYS = 10
+
+DAY_WEIGHT = 10_000             # opening one more defense day
+ROOM_CHANGE_WEIGHT = 10         # one person using one more room on a day
+# ... plus the day index of every defense, so defenses drift to earlier days
+IMPROVE_SECONDS = 5
+
+
+def parse_time_slots(text):
+    """``'09:00-10:00,10:15-11:15'`` -> ``[(540, 600), (615, 675)]``, in minutes since midnight."""
+    slots = set()
+    for part in (text or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            start, end = (minutes_of(clock_time.fromisoformat(value.strip())) for value in part.split('-'))
+        except ValueError:
+            raise ValueError(f'Invalid time slot "{part}", expected HH:MM-HH:MM.')
+        if end <= start:
+            raise ValueError(f'Time slot "{part}" ends before it starts.')
+        slots.add((start, end))
+    return sorted(slots)
+
+
+def defense_days(start, count):
+    """The first ``count`` weekdays from ``start``."""
+    days = []
+    day = start
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+@dataclass
+class Defense:
+    project_id: str
+    people: tuple = ()          # Advisor pks of the supervisor and committee members
+    room: str = None            # the only allowed room, when a member is stationed in one
+
+
+class Timetable:
+    """
+    Defenses placed on a grid of ``(day index, slot index, room)`` positions.
+
+    ``bookings`` are fixed and block the rooms and people of every slot they
+    overlap; ``unavailable`` maps a person to the days they cannot attend.
+    """
+
+    def __init__(self, days, slots, rooms, bookings=(), unavailable=None):
+        self.days = list(days)
+        self.slots = list(slots)
+        self.rooms = list(rooms)
+        self.unavailable = unavailable or {}
+        self.blocked_rooms = set()
+        self.blocked_people = set()
+        self._day_index = {day: d for d, day in enumerate(self.days)}
+        self._positions = [
+            (d, s, room) for d in range(len(self.days)) for s in range(len(self.slots)) for room in self.rooms
+        ]
+        for booking in bookings:
+            self.block(booking)
+
+        self.defenses = {}
+        self.placed = {}                            # project_id -> position
+        self.pinned = set()
+        self.room_at = {}                           # position -> project_id
+        self.person_at = {}                         # (person, day, slot) -> project_id
+        self.day_load = Counter()
+        self.person_rooms = defaultdict(Counter)    # (person, day) -> rooms used
+        self.cost = 0
+
+    def block(self, booking):
+        d = self._day_index.get(booking.day)
+        if d is None:
+            return
+        for s, (start, end) in enumerate(self.slots):
+            if booking.overlaps(start, end):
+                if booking.room in self.rooms:
+                    self.blocked_rooms.add((d, s, booking.room))
+                self.blocked_people.update((person, d, s) for person in booking.people)
+
+    def position(self, day, start, room):
+        """The grid position of a booking, or ``None`` if it is not on the grid."""
+        starts = [slot_start for slot_start, _ in self.slots]
+        if day not in self._day_index or room not in self.rooms or minutes_of(start) not in starts:
+            return None
+        return self._day_index[day], starts.index(minutes_of(start)), room
+
+    def place(self, defense, position, pinned=False):
+        self.defenses[defense.project_id] = defense
+        self._add(defense, position)
+        if pinned:
+            self.pinned.add(defense.project_id)
+
+    def fits(self, defense, position):
+        d, s, room = position
+        if position in self.room_at or position in self.blocked_rooms:
+            return False
+        if defense.room is not None and room != defense.room:
+            return False
+        day = self.days[d]
+        return not any(
+            (person, d, s) in self.person_at or (person, d, s) in self.blocked_people
+            or day in self.unavailable.get(person, ())
+            for person in defense.people
+        )
+
+    def summary(self):
+        return {
+            'days_used': sum(1 for n in self.day_load.values() if n),
+            'room_changes': sum(len(rooms) - 1 for rooms in self.person_rooms.values()),
+        }
+
+    # Solving
+
+    def schedule(self, defenses):
+        """Place ``defenses`` and improve the timetable; returns the ids that could not be placed."""
+        for defense in defenses:
+            self.defenses[defense.project_id] = defense
+        load = Counter(person for defense in self.defenses.values() for person in defense.people)
+        options = {
+            defense.project_id: sum(1 for position in self._positions if self.fits(defense, position))
+            for defense in defenses
+        }
+        order = sorted(defenses, key=lambda defense: (
+            options[defense.project_id], -max((load[p] for p in defense.people), default=0), defense.project_id,
+        ))
+        unplaced = [defense.project_id for defense in order if not self._place(defense)]
+        self.improve()
+        return sorted(unplaced)
+
+    def move(self, project_id, position):
+        """
+        Pin ``project_id`` to ``position`` and place the defenses it displaces again.
+
+        Everything else stays where it is. Returns the displaced ids that no
+        longer fit anywhere; raises ``ValueError`` when a fixed booking, an
+        absence or a stationed advisor rules the position out.
+        """
+        defense = self.defenses[project_id]
+        old = self._remove(project_id) if project_id in self.placed else None
+        blockers = self._blockers(defense, position)
+        if blockers is None or blockers & self.pinned:
+            if old is not None:
+                self._add(defense, old)
+            raise ValueError(f'{project_id} cannot take this slot: a booking, an absence or a room rule is in the way.')
+        for other in blockers:
+            self._remove(other)
+        self.place(defense, position, pinned=True)
+        return sorted(other for other in blockers if not self._place(self.defenses[other]))
+
+    def improve(self, seconds=IMPROVE_SECONDS):
+        """Local search over the unpinned defenses until no move helps or time runs out."""
+        deadline = time.monotonic() + seconds
+        improved = True
+        while improved and time.monotonic() < deadline:
+            improved = self._empty_days() | self._relocate() | self._swap(deadline)
+
+    def _place(self, defense):
+        position = self.best_position(defense)
+        if position is not None:
+            self._add(defense, position)
+            return True
+        return self._eject(defense)
+
+    def best_position(self, defense, exclude_day=None):
+        best = None
+        for position in self._positions:
+            if best is not None and best[0] <= position[0]:
+                break       # later positions cost at least their day index
+            if position[0] != exclude_day and self.fits(defense, position):
+                cost = self._added_cost(defense, position)
+                if best is None or cost < best[0]:
+                    best = (cost, position)
+        return best[1] if best else None
+
+    def _eject(self, defense):
+        """Place ``defense`` where exactly one movable defense is in the way, moving that one elsewhere."""
+        for position in self._positions:
+            blockers = self._blockers(defense, position)
+            if not blockers or len(blockers) > 1 or blockers & self.pinned:
+                continue
+            other = self.defenses[blockers.pop()]
+            old = self._remove(other.project_id)
+            self._add(defense, position)
+            new = self.best_position(other)
+            if new is not None:
+                self._add(other, new)
+                return True
+            self._remove(defense.project_id)
+            self._add(other, old)
+        return False
+
+    def _blockers(self, defense, position):
+        """Placed defenses in the way of ``position``, or ``None`` when something fixed is."""
+        d, s, room = position
+        if position in self.blocked_rooms or (defense.room is not None and room != defense.room):
+            return None
+        day = self.days[d]
+        blockers = {self.room_at[position]} if position in self.room_at else set()
+        for person in defense.people:
+            key = (person, d, s)
+            if key in self.blocked_people or day in self.unavailable.get(person, ()):
+                return None
+            if key in self.person_at:
+                blockers.add(self.person_at[key])
+        return blockers
+
+    def _empty_days(self):
+        """Move every defense off a lightly used day if the other days can take them."""
+        improved = False
+        for d in sorted((d for d, n in self.day_load.items() if n), key=lambda d: (self.day_load[d], -d)):
+            moving = sorted(pid for pid, position in self.placed.items() if position[0] == d)
+            if not moving or self.pinned.intersection(moving):
+                continue
+            before = self.cost
+            old = {pid: self._remove(pid) for pid in moving}
+            new = {}
+            for pid in sorted(moving, key=lambda pid: -len(self.defenses[pid].people)):
+                position = self.best_position(self.defenses[pid], exclude_day=d)
+                if position is None:
+                    break
+                self._add(self.defenses[pid], position)
+                new[pid] = position
+            if len(new) == len(moving) and self.cost < before:
+                improved = True
+                continue
+            for pid in new:
+                self._remove(pid)
+            for pid, position in old.items():
+                self._add(self.defenses[pid], position)
+        return improved
+
+    def _relocate(self):
+        improved = False
+        for project_id in sorted(self.placed):
+            if project_id in self.pinned:
+                continue
+            defense = self.defenses[project_id]
+            before = self.cost
+            old = self._remove(project_id)
+            new = self.best_position(defense)
+            self._add(defense, new)
+            if self.cost < before:
+                improved = True
+            elif new != old:
+                self._remove(project_id)
+                self._add(defense, old)
+        return improved
+
+    def _swap(self, deadline):
+        improved = False
+        movable = sorted(pid for pid in self.placed if pid not in self.pinned)
+        for i, first in enumerate(movable):
+            if time.monotonic() > deadline:
+                break
+            a = self.defenses[first]
+            for second in movable[i + 1:]:
+                pa, pb = self.placed[first], self.placed[second]
+                if (pa[0], pa[2]) == (pb[0], pb[2]):
+                    continue    # same day and room: swapping slots changes nothing
+                b = self.defenses[second]
+                # Feasible only if each is in the other's way and nothing else is
+                if self._blockers(a, pb) != {second} or self._blockers(b, pa) != {first}:
+                    continue
+                before = self.cost
+                self._remove(first)
+                self._remove(second)
+                self._add(a, pb)
+                self._add(b, pa)
+                if self.cost < before:
+                    improved = True
+                    continue
+                self._remove(first)
+                self._remove(second)
+                self._add(a, pa)
+                self._add(b, pb)
+        return improved
+
+    # State
+
+    def _added_cost(self, defense, position):
+        d, _, room = position
+        cost = d + (0 if self.day_load[d] else DAY_WEIGHT)
+        for person in defense.people:
+            rooms = self.person_rooms.get((person, d))
+            if rooms and room not in rooms:
+                cost += ROOM_CHANGE_WEIGHT
+        return cost
+
+    def _add(self, defense, position):
+        self.cost += self._added_cost(defense, position)
+        d, s, room = position
+        self.placed[defense.project_id] = position
+        self.room_at[position] = defense.project_id
+        self.day_load[d] += 1
+        for person in defense.people:
+            self.person_at[(person, d, s)] = defense.project_id
+            self.person_rooms[(person, d)][room] += 1
+
+    def _remove(self, project_id):
+        defense = self.defenses[project_id]
+        position = self.placed.pop(project_id)
+        d, s, room = position
+        del self.room_at[position]
+        self.day_load[d] -= 1
+        for person in defense.people:
+            del self.person_at[(person, d, s)]
+            rooms = self.person_rooms[(person, d)]
+            rooms[room] -= 1
+            if not rooms[room]:
+                del rooms[room]
+            if not rooms:
+                del self.person_rooms[(person, d)]
+        self.cost -= self._added_cost(defense, position)
+        return position
+
+
+# Loading
+
+def load_defense_settings(academic_year):
+    """The year's ``defenseSettings`` (stored as ``defense_settings_<year>``), or ``{}``."""
+    from settings.models import SystemSettings
+
+    names = [f'defense_settings_{academic_year}', f'defense_settings_{academic_year.split("-")[0]}']
+    values = dict(
+        SystemSettings.objects.filter(setting_name__in=names, is_active=True).values_list('setting_name', 'setting_value')
+    )
+    for name in names:
+        try:
+            value = json.loads(values[name])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if isinstance(value, dict):
+            return value
+    return {}
+
+
+def defense_people(groups):
+    """``{project_id: {Advisor pk}}`` of the supervisor and committee members of ``groups`` (a queryset)."""
+    from committees.models import ProjectCommitteeMember
+
+    people = {}
+    for project_id, advisor_pk in groups.values_list('project_id', 'legacy_project__advisor'):
+        people[project_id] = {advisor_pk} if advisor_pk else set()
+    members = ProjectCommitteeMember.objects.filter(
+        project_group__in=groups
+    ).values_list('project_group__project_id', 'advisor_id')
+    for project_id, advisor_pk in members:
+        people.setdefault(project_id, set()).add(advisor_pk)
+    return people
+
+
+def booking_conflicts(project_id, day, start, room, people, duration=DEFAULT_DURATION):
+    """Messages for the bookings a defense of ``project_id`` at ``day``/``start`` in ``room`` collides with."""
+    begin = minutes_of(start)
+    conflicts = []
+    for booking, kind in Availability(day, exclude=[project_id]).conflicts(day, begin, begin + duration, room, people):
+        if kind == ROOM:
+            conflicts.append(f'{room} is booked for {booking.project_id} at {as_time(booking.start):%H:%M}.')
+        else:
+            conflicts.append(f'A supervisor or committee member sits in {booking.project_id} at {as_time(booking.start):%H:%M}.')
+    return conflicts
+
+
+class DefenseTimetabler:
+    """Defense timetable of the approved projects of ``academic_year``."""
+
+    def __init__(self, academic_year, start_date=None, days=MAX_DAYS, time_slots=None, rooms=None):
+        from advisors.models import Advisor
+        from .models import DefenseRoom
+
+        self.academic_year = academic_year
+        defense_settings = load_defense_settings(academic_year)
+        if start_date is None and defense_settings.get('startDefenseDate'):
+            try:
+                start_date = date.fromisoformat(defense_settings['startDefenseDate'])
+            except ValueError:
+                pass
+        self.days = defense_days(start_date or timezone.localdate(), days)
+        self.slots = parse_time_slots(time_slots or defense_settings.get('timeSlots') or DEFAULT_TIME_SLOTS)
+
+        setting_rooms = {}      # room id -> name; rooms are stored as names or {'id', 'name', ...}
+        for item in defense_settings.get('rooms') or []:
+            room = item if isinstance(item, dict) else {'name': item}
+            if room.get('name'):
+                setting_rooms[str(room.get('id', room['name']))] = room['name']
+        self.rooms = list(rooms or setting_rooms.values()) or list(
+            DefenseRoom.objects.filter(is_available=True).order_by('name').values_list('name', flat=True)
+        )
+        if not self.slots or not self.rooms:
+            raise ValueError('The defense timetable needs at least one time slot and one room.')
+
+        stationed = {
+            advisor_id: setting_rooms.get(room_id, room_id)
+            for room_id, advisor_id in (defense_settings.get('stationaryAdvisors') or {}).items() if advisor_id
+        }
+        self.stations = {
+            pk: stationed[advisor_id]
+            for pk, advisor_id in Advisor.objects.filter(advisor_id__in=stationed).values_list('pk', 'advisor_id')
+        } if stationed else {}
+
+    def groups(self):
+        from projects.models import ProjectGroup, ProjectStatus
+
+        return ProjectGroup.objects.filter(
+            project_id__startswith=f'{self.academic_year}-', status=ProjectStatus.APPROVED
+        )
+
+    def build(self, pin_existing=True, moving=None):
+        """
+        ``(timetable, pending, split)`` for the year's approved defenses.
+
+        Those booked on the grid are placed (and pinned when ``pin_existing``),
+        bookings of other projects or off the grid are fixed, ``pending`` are
+        the defenses without a slot (plus ``moving``) and ``split`` the ids of
+        defenses whose members are stationed in different rooms.
+        """
+        from advisors.models import AdvisorAvailability
+
+        groups = self.groups()
+        rows = list(groups.values_list('project_id', 'defense_date', 'defense_time', 'defense_room'))
+        people = defense_people(groups)
+        unavailable = defaultdict(set)
+        absences = AdvisorAvailability.objects.filter(
+            is_available=False, date__range=(self.days[0], self.days[-1]),
+            advisor__in={pk for members in people.values() for pk in members},
+        ).values_list('advisor_id', 'date')
+        for advisor_pk, day in absences:
+            unavailable[advisor_pk].add(day)
+        timetable = Timetable(
+            self.days, self.slots, self.rooms, load_bookings(self.days[0], self.days[-1], exclude=list(people)), unavailable,
+        )
+
+        pending, split = [], set()
+        for project_id, day, start, room in rows:
+            members = tuple(sorted(people.get(project_id, ())))
+            rooms = {self.stations[pk] for pk in members if pk in self.stations}
+            if len(rooms) > 1:
+                split.add(project_id)
+            defense = Defense(project_id, members, rooms.pop() if len(rooms) == 1 else None)
+            if day is None or start is None or project_id == moving:
+                pending.append(defense)
+                continue
+            position = timetable.position(day, start, room)
+            if position is not None and timetable.fits(defense, position):
+                timetable.place(defense, position, pinned=pin_existing)
+            else:
+                timetable.block(Booking(day, minutes_of(start), minutes_of(start) + DEFAULT_DURATION,
+                                        room or None, frozenset(members), project_id))
+        return timetable, pending, split
+
+    def preview(self):
+        started = time.monotonic()
+        timetable, pending, split = self.build()
+        existing = set(timetable.placed)
+        unplaced = timetable.schedule([defense for defense in pending if defense.project_id not in split])
+        scheduled = sorted(set(timetable.placed) - existing)
+        unscheduled = [
+            {'project_id': project_id, 'reason': 'Committee members are stationed in different rooms.'}
+            for project_id in sorted(split)
+        ] + [
+            {'project_id': project_id, 'reason': 'No room and slot is free for all of its advisors.'}
+            for project_id in unplaced
+        ]
+        return {
+            **self._grid(),
+            'schedule': self._entries(timetable, scheduled),
+            'existing': len(existing),
+            'unscheduled': unscheduled,
+            **timetable.summary(),
+            'elapsed_ms': round((time.monotonic() - started) * 1000),
+        }
+
+    def apply(self, user):
+        """Compute the timetable and book it in one transaction."""
+        with transaction.atomic():
+            report = self.preview()
+            report['applied'] = self._write(user, {
+                entry['project_id']: entry for entry in report['schedule']
+            })
+        return report
+
+    def reschedule(self, project_id, day, start, room, user=None):
+        """
+        Move one defense to ``day``/``start``/``room`` and re-place only the defenses it displaces.
+
+        Writes the changes when ``user`` is given; raises ``ValueError`` for a
+        position off the grid or ruled out by fixed bookings.
+        """
+        started = time.monotonic()
+        timetable, pending, _ = self.build(pin_existing=False, moving=project_id)
+        defense = next((defense for defense in pending if defense.project_id == project_id), None)
+        if defense is None:
+            raise ValueError(f'{project_id} is not an approved project of {self.academic_year}.')
+        position = timetable.position(day, start, room)
+        if position is None:
+            raise ValueError('The new slot is not one of the defense days, time slots and rooms.')
+
+        before = dict(timetable.placed)
+        timetable.defenses[project_id] = defense
+        unplaced = timetable.move(project_id, position)
+        changed = sorted(
+            pid for pid in {project_id, *timetable.placed} if before.get(pid) != timetable.placed.get(pid)
+        )
+        report = {
+            **self._grid(),
+            'project_id': project_id,
+            'changes': self._entries(timetable, [pid for pid in changed if pid in timetable.placed]),
+            'unscheduled': unplaced,
+            **timetable.summary(),
+            'elapsed_ms': round((time.monotonic() - started) * 1000),
+        }
+        if user is not None:
+            with transaction.atomic():
+                schedules = {entry['project_id']: entry for entry in report['changes']}
+                schedules.update({
+                    pid: {'defense_date': None, 'defense_time': None, 'defense_room': None} for pid in unplaced
+                })
+                report['applied'] = self._write(user, schedules)
+        return report
+
+    def _write(self, user, schedules):
+        from projects.bulk_operations import BulkProjectOperation, projects_for_groups
+
+        if not schedules:
+            return None
+        schedules = {
+            project_id: {
+                'defense_date': entry['defense_date'] and date.fromisoformat(entry['defense_date']),
+                'defense_time': entry['defense_time'] and clock_time.fromisoformat(entry['defense_time']),
+                'defense_room': entry['defense_room'],
+            }
+            for project_id, entry in schedules.items()
+        }
+        return BulkProjectOperation(user, projects_for_groups(schedules)).schedule_defense(schedules)
+
+    def _grid(self):
+        return {
+            'academic_year': self.academic_year,
+            'days': [day.isoformat() for day in self.days],
+            'time_slots': [f'{as_time(start):%H:%M}-{as_time(end):%H:%M}' for start, end in self.slots],
+            'rooms': self.rooms,
+        }
+
+    def _entries(self, timetable, project_ids):
+        from advisors.models import Advisor
+
+        people = {pk for pid in project_ids for pk in timetable.defenses[pid].people}
+        advisor_ids = dict(Advisor.objects.filter(pk__in=people).values_list('pk', 'advisor_id')) if people else {}
+        entries = []
+        for project_id in project_ids:
+            d, s, room = timetable.placed[project_id]
+            entries.append({
+                'project_id': project_id,
+                'defense_date': self.days[d].isoformat(),
+                'defense_time': f'{as_time(self.slots[s][0]):%H:%M}',
+                'defense_room': room,
+                'advisors': sorted(advisor_ids[pk] for pk in timetable.defenses[project_id].people),
+            })
+        return entries
@@ -7,6 +7,8 @@ urlpatterns = [
     path('schedules/<uuid:pk>/', views.DefenseScheduleDetailView.as_view(), name='defense-schedule-detail'),
     path('schedules/create/', views.schedule_defense, name='defense-schedule-create'),
     path('schedules/search/', views.search_defense_schedules, name='defense-schedule-search'),
+    path('timetable/', views.generate_timetable, name='defense-timetable'),
+    path('timetable/reschedule/', views.reschedule_defense, name='defense-timetable-reschedule'),
     
     # Defense sessions
     path('sessions/', views.DefenseSessionListView.as_view(), name='defense-session-list'),
@@ -29,6 +31,7 @@ urlpatterns = [
     path('rooms/', views.DefenseRoomListView.as_view(), name='defense-room-list'),
     path('rooms/<uuid:pk>/', views.DefenseRoomDetailView.as_view(), name='defense-room-detail'),
     path('rooms/<uuid:room_id>/availability/<str:date>/', views.defense_room_availability, name='defense-room-availability'),
+    path('availability/', views.defense_availability, name='defense-availability'),
     
     # Defense settings
     path('settings/', views.DefenseSettingsListView.as_view(), name='defense-settings-list'),
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db.models import Q, Count, Sum, Avg, Max, Min
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import timedelta
 from .models import (
     DefenseSchedule, DefenseSession, DefenseEvaluation, DefenseResult,
@@ -19,8 +20,12 @@ from .serializers import (
     DefenseLogSerializer, DefenseLogCreateSerializer,
     DefenseScheduleSearchSerializer, DefenseStatisticsSerializer,
     DefenseReminderSerializer, DefenseEvaluationSummarySerializer,
-    DefenseRoomAvailabilitySerializer
+    DefenseRoomAvailabilitySerializer, DefenseTimetableSerializer, DefenseRescheduleSerializer,
+    DefenseAvailabilitySerializer
 )
+from .availability import INACTIVE_STATUSES, ROOM, Availability, clock, even_slots, local_midnight
+from .timetabling import DEFAULT_DURATION, MAX_DAYS, DefenseTimetabler, booking_conflicts, defense_people
+from advisors.models import Advisor
 from projects.models import ProjectGroup
 from accounts.models import User
 from core.permissions import RolePermission, RoleRequiredMixin, require_roles
@@ -233,6 +238,16 @@ def schedule_defense(request):
     """Schedule a new defense."""
     serializer = DefenseScheduleCreateSerializer(data=request.data)
     if serializer.is_valid():
+        data = serializer.validated_data
+        committee = [data.get(role) for role in ('main_committee', 'second_committee', 'third_committee')]
+        people = set(Advisor.objects.filter(user__in=[user for user in committee if user]).values_list('pk', flat=True))
+        people |= defense_people(ProjectGroup.objects.filter(pk=data['project'].pk)).get(data['project'].project_id, set())
+        conflicts = booking_conflicts(
+            data['project'].project_id, timezone.localtime(data['defense_date']).date(), data['defense_time'],
+            data['defense_room'], people, data.get('defense_duration') or DEFAULT_DURATION,
+        )
+        if conflicts:
+            return Response({'conflicts': conflicts}, status=status.HTTP_400_BAD_REQUEST)
         defense_schedule = serializer.save(created_by=request.user)
         
         # Log the scheduling
@@ -249,6 +264,49 @@ def schedule_defense(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@require_roles('Admin', 'DepartmentAdmin')
+def generate_timetable(request):
+    """Preview or book an automatic defense timetable for an academic year."""
+    serializer = DefenseTimetableSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    try:
+        timetabler = DefenseTimetabler(
+            data['academic_year'], data.get('start_date'), data.get('days', MAX_DAYS),
+            data.get('time_slots'), data.get('rooms'),
+        )
+    except ValueError as error:
+        return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    report = timetabler.apply(request.user) if data['apply'] else timetabler.preview()
+    return Response(report)
+
+
+@api_view(['POST'])
+@require_roles('Admin', 'DepartmentAdmin')
+def reschedule_defense(request):
+    """Move one defense and re-place only the defenses it displaces."""
+    serializer = DefenseRescheduleSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    try:
+        timetabler = DefenseTimetabler(
+            data['academic_year'], data.get('start_date'), data.get('days', MAX_DAYS),
+            data.get('time_slots'), data.get('rooms'),
+        )
+        report = timetabler.reschedule(
+            data['project_id'], data['defense_date'], data['defense_time'], data['defense_room'],
+            user=request.user if data['apply'] else None,
+        )
+    except ValueError as error:
+        return Response({'error': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(report)
+
+
 @api_view(['POST'])
 @require_roles('Admin', 'DepartmentAdmin', 'Advisor')
 def start_defense_session(request, defense_schedule_id):
@@ -475,47 +533,34 @@ def defense_statistics(request):
 def defense_room_availability(request, room_id, date):
     """Get defense room availability for a specific date."""
     room = get_object_or_404(DefenseRoom, id=room_id)
-    
-    # Get scheduled defenses for the room on the given date
-    scheduled_defenses = DefenseSchedule.objects.filter(
-        defense_room=room.name,
-        defense_date__date=date
-    ).order_by('defense_time')
-    
-    # Generate available time slots (assuming 9 AM to 5 PM)
+    try:
+        day = parse_date(date)
+    except ValueError:
+        day = None
+    if day is None:
+        return Response({'error': 'Expected a date such as 2026-03-02.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Hourly slots from 9 AM to 5 PM, checked against the day's bookings in memory
+    index = Availability(day).index
     available_slots = []
     booked_slots = []
-    
-    for hour in range(9, 17):  # 9 AM to 5 PM
-        slot_start = f"{hour:02d}:00"
-        slot_end = f"{hour+1:02d}:00"
-        
-        # Check if this slot is booked
-        is_booked = scheduled_defenses.filter(
-            defense_time__hour=hour
-        ).exists()
-        
-        if is_booked:
-            booked_slots.append({
-                'start': slot_start,
-                'end': slot_end,
-                'defense': scheduled_defenses.filter(defense_time__hour=hour).first()
-            })
+    for start, end in even_slots(9 * 60, 17 * 60, 60):
+        booked = index.overlapping(ROOM, room.name, day, start, end)
+        if booked:
+            booked_slots.append({'start': clock(start), 'end': clock(end), 'defense': booked[0].project_id})
         else:
-            available_slots.append({
-                'start': slot_start,
-                'end': slot_end
-            })
-    
-    # Check for conflicts
-    conflicts = []
-    for defense in scheduled_defenses:
-        if defense.status in ['cancelled', 'postponed']:
-            conflicts.append({
-                'defense': DefenseScheduleSerializer(defense).data,
-                'reason': f"Status: {defense.status}"
-            })
-    
+            available_slots.append({'start': clock(start), 'end': clock(end)})
+
+    # Cancelled and postponed defenses that were booked in the room
+    inactive = DefenseSchedule.objects.filter(
+        defense_room=room.name, status__in=INACTIVE_STATUSES,
+        defense_date__gte=local_midnight(day), defense_date__lt=local_midnight(day + timedelta(days=1)),
+    ).order_by('defense_time')
+    conflicts = [
+        {'defense': DefenseScheduleSerializer(defense).data, 'reason': f"Status: {defense.status}"}
+        for defense in inactive
+    ]
+
     availability = {
         'room_id': room_id,
         'date': date,
@@ -523,10 +568,35 @@ def defense_room_availability(request, room_id, date):
         'booked_slots': booked_slots,
         'conflicts': conflicts
     }
-    
+
     return Response(availability)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, RolePermission])
+def defense_availability(request):
+    """Free/busy grid of rooms and advisors over a date range, for the scheduling UI."""
+    serializer = DefenseAvailabilitySerializer(data=request.query_params)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    rooms = data.get('rooms') or list(
+        DefenseRoom.objects.filter(is_available=True).order_by('name').values_list('name', flat=True)
+    )
+    advisors = {}
+    if data.get('advisors'):
+        advisors = dict(Advisor.objects.filter(advisor_id__in=data['advisors']).values_list('pk', 'advisor_id'))
+        unknown = sorted(set(data['advisors']) - set(advisors.values()))
+        if unknown:
+            return Response({'advisors': [f"Unknown advisor IDs: {', '.join(unknown)}"]}, status=status.HTTP_400_BAD_REQUEST)
+        order = {advisor_id: i for i, advisor_id in enumerate(data['advisors'])}
+        advisors = dict(sorted(advisors.items(), key=lambda item: order[item[1]]))
+
+    availability = Availability(data['start_date'], data['end_date'])
+    return Response(availability.report(data['time_slots'], rooms, advisors))
+
+
 @api_view(['POST'])
 @require_roles('Admin', 'DepartmentAdmin')
 def send_defense_reminder(request):
@@ -7,6 +7,7 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from django.core.serializers.json import DjangoJSONEncoder
+from notifications.inbox import get_inbox, notification_audience, user_audiences
 from notifications.models import Notification
 from projects.models import ProjectGroup
 from accounts.models import User
@@ -121,40 +122,17 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     
     @database_sync_to_async
     def get_user_notifications(self):
-        """Get user's recent notifications"""
-        from django.db.models import Q
-        
-        notifications = Notification.objects.filter(
-            Q(recipient_id=str(self.user.id)) |
-            Q(recipient_id=self.user.role) |
-            Q(recipient_type='all')
-        ).filter(
-            is_read=False
-        ).order_by('-created_at')[:10]
-        
-        return [
-            {
-                'id': str(notif.id),
-                'title': notif.title,
-                'message': notif.message,
-                'type': notif.notification_type,
-                'priority': notif.priority,
-                'timestamp': notif.created_at.isoformat(),
-                'read': notif.is_read,
-                'action_url': notif.action_url,
-                'action_text': notif.action_text
-            }
-            for notif in notifications
-        ]
+        """Get user's recent unread notifications from the cached inbox"""
+        return get_inbox(self.user)['notifications']
     
     @database_sync_to_async
     def mark_notification_as_read(self, notification_id):
         """Mark notification as read"""
         try:
             notification = Notification.objects.get(id=notification_id)
-            notification.read = True
-            notification.save()
-        except Notification.DoesNotExist:
+            if notification_audience(notification) in user_audiences(self.user):
+                notification.mark_as_read()
+        except (Notification.DoesNotExist, ValueError, TypeError):
             pass
 
 
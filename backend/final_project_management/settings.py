@@ -63,7 +63,7 @@ INSTALLED_APPS = [
     'accounts.apps.AccountsConfig',
     'projects.apps.ProjectsConfig',
     'students.apps.StudentsConfig',
-    'advisors',
+    'advisors.apps.AdvisorsConfig',
     'committees',
     'majors',
     'classrooms',
@@ -151,7 +151,7 @@ SIMPLE_JWT = {
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.jwt_auth.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -277,6 +277,12 @@ MIDDLEWARE = [
     'system_monitoring.middleware.ErrorLoggingMiddleware',
 ]
 
+# Opt-in per-middleware cost profiling (system_monitoring.middleware_profiler)
+MIDDLEWARE_PROFILING = config('MIDDLEWARE_PROFILING', default=False, cast=bool)
+if MIDDLEWARE_PROFILING:
+    from system_monitoring.middleware_profiler import instrument_middleware
+    MIDDLEWARE = instrument_middleware(MIDDLEWARE)
+
 # Security settings are handled by SecurityHeadersMiddleware in core/middleware/security.py
 
 ROOT_URLCONF = 'final_project_management.urls'
@@ -300,6 +306,9 @@ TEMPLATES = [
 WSGI_APPLICATION = 'final_project_management.wsgi.application'
 ASGI_APPLICATION = 'final_project_management.asgi.application'
 
+# Applies core.testing.settings_overrides() for manage.py test
+TEST_RUNNER = 'core.testing.TestRunner'
+
 # Database
 # Database Configuration
 import dj_database_url
@@ -432,6 +441,9 @@ API_SECURITY = {
     'ENABLE_XSS_PROTECTION': True,
     'MAX_REQUESTS_PER_MINUTE': 30,
     'MAX_REQUESTS_PER_HOUR': 500,
+    # Count in process memory when the cache is locmem/dummy (core.rate_limit);
+    # off for test runs (core.testing), where every client shares one address
+    'RATE_LIMIT_LOCAL_FALLBACK': True,
     'BLOCKED_IPS': [],
     'SUSPICIOUS_PATTERNS': [
         # XSS patterns
@@ -493,6 +505,57 @@ API_SECURITY = {
 # Enhanced Security Settings
 ENHANCED_API_SECURITY = API_SECURITY
 
+# Structured audit log written by core.middleware.AuditLogMiddleware (see core.audit)
+AUDIT_LOG = {
+    # Disabled for test runs by core.testing
+    'ENABLED': config('AUDIT_LOG_ENABLED', default=True, cast=bool),
+    'FILENAME': os.path.join(BASE_DIR, 'logs', 'audit.jsonl'),
+    'MAX_BYTES': 50 * 1024 * 1024,
+    'BACKUP_COUNT': 10,
+    'QUEUE_SIZE': 10000,
+    'SAMPLE_RATE': config('AUDIT_LOG_SAMPLE_RATE', default=1.0, cast=float),
+    'PATH_SAMPLE_RATES': {
+        '/api/monitoring/health/': 0.01,
+        '/static/': 0.0,
+        '/media/': 0.1,
+    },
+    'ALWAYS_LOG_STATUS': 400,
+}
+
+# Request telemetry written by system_monitoring.middleware.PerformanceMonitoringMiddleware
+MONITORING_TELEMETRY = {
+    # Disabled for test runs by core.testing
+    'ENABLED': config('TELEMETRY_ENABLED', default=True, cast=bool),
+    'SAMPLE_RATE': config('TELEMETRY_SAMPLE_RATE', default=1.0, cast=float),
+    'SLOW_REQUEST_MS': 1000,
+    'ASYNC_WRITER': config('TELEMETRY_ASYNC_WRITER', default=True, cast=bool),
+    'FLUSH_INTERVAL': 2.0,
+    'BATCH_SIZE': 500,
+    'MAX_BUFFER': 10000,
+}
+
+# Page view / API call counters of accounts.middleware.UserActivityMiddleware
+USER_ACTIVITY = {
+    'ENABLED': config('USER_ACTIVITY_ENABLED', default=True, cast=bool),
+    'FLUSH_INTERVAL': config('USER_ACTIVITY_FLUSH_INTERVAL', default=60.0, cast=float),
+    'MAX_KEYS': 50000,
+    'SESSION_TOUCH_INTERVAL': 60.0,
+}
+
+# Users resolved from JWTs by core.jwt_auth.CachedJWTAuthentication and the WebSocket auth middleware
+PRINCIPAL_CACHE = {
+    'ENABLED': config('PRINCIPAL_CACHE_ENABLED', default=True, cast=bool),
+    'LOCAL_TTL': config('PRINCIPAL_CACHE_LOCAL_TTL', default=30, cast=int),
+    'SHARED_TTL': 300,
+    'MAX_ENTRIES': 10000,
+}
+
+# ProjectViewSet.statistics results, cached per academic year by projects.statistics
+PROJECT_STATISTICS = {
+    'ENABLED': config('PROJECT_STATISTICS_CACHE_ENABLED', default=True, cast=bool),
+    'TIMEOUT': 300,
+}
+
 # Session Security
 SESSION_COOKIE_SECURE = not DEBUG
 SESSION_COOKIE_HTTPONLY = True
@@ -486,6 +486,7 @@ class NotificationUtils:
     ) -> int:
         """Send notification to multiple users."""
         try:
+            from notifications.inbox import invalidate_inbox
             from notifications.models import Notification
             
             notifications = []
@@ -499,7 +500,10 @@ class NotificationUtils:
                     is_read=False
                 ))
             
-            return len(Notification.objects.bulk_create(notifications))
+            created = Notification.objects.bulk_create(notifications)
+            # bulk_create() skips the signals that maintain the cached inboxes
+            invalidate_inbox(*{str(user.id) for user in users})
+            return len(created)
         except Exception as e:
             logger.error(f"Error sending bulk notification: {e}")
             return 0
@@ -508,13 +512,16 @@ class NotificationUtils:
     def mark_notifications_read(user: User, notification_ids: List[int] = None) -> int:
         """Mark notifications as read."""
         try:
+            from notifications.inbox import invalidate_inbox
             from notifications.models import Notification
             
             queryset = Notification.objects.filter(recipient_id=str(user.id), is_read=False)
             if notification_ids:
                 queryset = queryset.filter(id__in=notification_ids)
             
-            return queryset.update(is_read=True)
+            updated = queryset.update(is_read=True)
+            invalidate_inbox(str(user.id))
+            return updated
         except Exception as e:
             logger.error(f"Error marking notifications as read: {e}")
             return 0
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.7 on 2026-10-17 02:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('milestones', '0003_auto_20251020_2112'),
+        ('projects', '0006_project_group_link_and_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='milestone',
+            index=models.Index(fields=['status', 'due_date'], name='milestones_status_8c7ef6_idx'),
+        ),
+    ]
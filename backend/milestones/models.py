@@ -91,6 +91,9 @@ class Milestone(models.Model):
         verbose_name = 'Milestone'
         verbose_name_plural = 'Milestones'
         ordering = ['project_group', 'due_date']
+        indexes = [
+            models.Index(fields=['status', 'due_date']),
+        ]
     
     def __str__(self):
         return f"{self.project_group.project_id} - {self.name}"
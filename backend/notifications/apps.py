@@ -0,0 +1,14 @@
+"""
+Notifications app configuration.
+"""
+
+from django.apps import AppConfig
+
+
+class NotificationsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'notifications'
+    
+    def ready(self):
+        """Import signals when app is ready."""
+        import notifications.signals
@@ -0,0 +1,207 @@
+"""
+Cached unread-notification inboxes.
+
+A notification is addressed to one audience: a user id, a role, or ``all``
+(``recipient_type='all'``). For every audience the cache holds its unread
+count and its most recent unread notifications. A user's inbox is the merge
+of their three audiences, so ``X-Unread-Notifications`` headers and WebSocket
+inbox pushes are served from at most three cache reads.
+
+Entries are kept up to date incrementally from ``post_save``/``post_delete``
+(see ``notifications.signals``). Bulk writes that bypass signals
+(``bulk_create``, ``QuerySet.update``) must call ``invalidate_inbox`` for the
+audiences they touched; the next read rebuilds those entries with one count
+and one list query. Archived notifications don't count as unread.
+"""
+
+import logging
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+INBOX_SIZE = 10
+INBOX_TIMEOUT = 60 * 60
+
+ALL = 'all'
+
+
+def notification_audience(notification):
+    """The audience key a notification is delivered to."""
+    if notification.recipient_type == ALL:
+        return ALL
+    return str(notification.recipient_id)
+
+
+def user_audiences(user):
+    """Audiences whose notifications a user receives: their id, role and everyone."""
+    audiences = [str(user.id)]
+    role = getattr(user, 'role', None)
+    if role and role not in audiences:
+        audiences.append(role)
+    audiences.append(ALL)
+    return audiences
+
+
+def is_unread(notification):
+    return not notification.is_read and not notification.is_archived
+
+
+def serialize_notification(notification):
+    """Payload used by the inbox cache and WebSocket pushes."""
+    return {
+        'id': str(notification.id),
+        'title': notification.title,
+        'message': notification.message,
+        'type': notification.notification_type,
+        'priority': notification.priority,
+        'timestamp': notification.created_at.isoformat(),
+        'read': notification.is_read,
+        'action_url': notification.action_url,
+        'action_text': notification.action_text
+    }
+
+
+def _count_key(audience):
+    return f'notifications_unread_{audience}'
+
+
+def _recent_key(audience):
+    return f'notifications_recent_{audience}'
+
+
+def _audience_queryset(audience):
+    from .models import Notification
+
+    queryset = Notification.objects.filter(is_read=False, is_archived=False)
+    if audience == ALL:
+        return queryset.filter(recipient_type=ALL)
+    return queryset.filter(recipient_id=audience).exclude(recipient_type=ALL)
+
+
+def _load(audiences):
+    """Rebuild the cache entries of ``audiences`` from the database."""
+    entries = {}
+    to_cache = {}
+    for audience in audiences:
+        queryset = _audience_queryset(audience)
+        count = queryset.count()
+        recent = [serialize_notification(n) for n in queryset.order_by('-created_at', '-id')[:INBOX_SIZE]]
+        entries[audience] = (count, recent)
+        to_cache[_count_key(audience)] = count
+        to_cache[_recent_key(audience)] = recent
+    cache.set_many(to_cache, INBOX_TIMEOUT)
+    return entries
+
+
+def _entries(audiences):
+    """``{audience: (unread_count, recent)}``, from the cache where possible."""
+    keys = [key for audience in audiences for key in (_count_key(audience), _recent_key(audience))]
+    cached = cache.get_many(keys)
+    entries = {}
+    missing = []
+    for audience in audiences:
+        count = cached.get(_count_key(audience))
+        recent = cached.get(_recent_key(audience))
+        if count is None or recent is None:
+            missing.append(audience)
+        else:
+            entries[audience] = (max(count, 0), recent)
+    if missing:
+        entries.update(_load(missing))
+    return entries
+
+
+def unread_count(user):
+    """Number of unread notifications for ``user``."""
+    return sum(count for count, _ in _entries(user_audiences(user)).values())
+
+
+def get_inbox(user, limit=INBOX_SIZE):
+    """Unread count and the ``limit`` most recent unread notifications of ``user``."""
+    entries = _entries(user_audiences(user))
+    recent = [item for _, items in entries.values() for item in items]
+    recent.sort(key=lambda item: (item['timestamp'], int(item['id'])), reverse=True)
+    return {
+        'unread_count': sum(count for count, _ in entries.values()),
+        'notifications': recent[:limit],
+    }
+
+
+def invalidate_inbox(*audiences):
+    """Drop cached entries so they are rebuilt on next read."""
+    cache.delete_many([key for audience in audiences for key in (_count_key(audience), _recent_key(audience))])
+
+
+def _adjust_count(audience, delta):
+    key = _count_key(audience)
+    try:
+        value = cache.incr(key, delta) if delta > 0 else cache.decr(key, -delta)
+    except ValueError:
+        # Not cached; rebuilt from the database on next read
+        return
+    if value < 0:
+        cache.delete(key)
+
+
+def _update_recent(audience, notification, unread):
+    key = _recent_key(audience)
+    recent = cache.get(key)
+    if recent is None:
+        return
+    notification_id = str(notification.id)
+    kept = [item for item in recent if item['id'] != notification_id]
+    if unread:
+        kept.append(serialize_notification(notification))
+        kept.sort(key=lambda item: (item['timestamp'], int(item['id'])), reverse=True)
+        cache.set(key, kept[:INBOX_SIZE], INBOX_TIMEOUT)
+    elif len(kept) < len(recent):
+        count = cache.get(_count_key(audience))
+        if len(recent) == INBOX_SIZE and (count is None or count > len(kept)):
+            # An older unread notification should move up; only the database knows which
+            invalidate_inbox(audience)
+        else:
+            cache.set(key, kept, INBOX_TIMEOUT)
+
+
+def track_state(notification):
+    """Remember a loaded notification's audience and unread state."""
+    notification._inbox_state = (notification_audience(notification), is_unread(notification))
+
+
+def notification_saved(notification, created=False):
+    """Apply a created or updated notification to the cached inboxes."""
+    previous = None if created else getattr(notification, '_inbox_state', None)
+    audience, unread = notification_audience(notification), is_unread(notification)
+    try:
+        if previous is None and not created:
+            # Saved without having been loaded (e.g. constructed with a pk)
+            invalidate_inbox(audience)
+        else:
+            old_audience, was_unread = previous or (audience, False)
+            if old_audience != audience:
+                if was_unread:
+                    _adjust_count(old_audience, -1)
+                    _update_recent(old_audience, notification, False)
+                was_unread = False
+            if unread != was_unread:
+                _adjust_count(audience, 1 if unread else -1)
+            if unread or was_unread:
+                _update_recent(audience, notification, unread)
+    except Exception as e:
+        logger.warning(f"Could not update notification inbox cache: {e}")
+    track_state(notification)
+
+
+def notification_deleted(notification):
+    """Remove a deleted notification from the cached inboxes."""
+    audience, was_unread = getattr(
+        notification, '_inbox_state', (notification_audience(notification), is_unread(notification))
+    )
+    if not was_unread:
+        return
+    try:
+        _adjust_count(audience, -1)
+        _update_recent(audience, notification, False)
+    except Exception as e:
+        logger.warning(f"Could not update notification inbox cache: {e}")
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient_id', 'is_read', '-created_at'], name='notificatio_recipie_dde14f_idx'),
+        ),
+    ]
@@ -50,6 +50,9 @@ class Notification(models.Model):
         verbose_name = 'Notification'
         verbose_name_plural = 'Notifications'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['recipient_id', 'is_read', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.recipient_id}"
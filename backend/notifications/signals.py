@@ -0,0 +1,31 @@
+"""
+Signals keeping the cached notification inboxes up to date.
+"""
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .inbox import notification_deleted, notification_saved, track_state
+from .models import Notification
+
+TRACKED_FIELDS = {'recipient_id', 'recipient_type', 'is_read', 'is_archived'}
+
+
+@receiver(post_init, sender=Notification)
+def remember_inbox_state(sender, instance, **kwargs):
+    """Remember the loaded state so saves can adjust the cached counts."""
+    # Deferred fields would cost a query each, so those instances are left untracked
+    if instance.pk is not None and not TRACKED_FIELDS & instance.get_deferred_fields():
+        track_state(instance)
+
+
+@receiver(post_save, sender=Notification)
+def update_inbox_on_save(sender, instance, created, **kwargs):
+    """Apply created, read and archived notifications to the inbox cache."""
+    notification_saved(instance, created=created)
+
+
+@receiver(post_delete, sender=Notification)
+def update_inbox_on_delete(sender, instance, **kwargs):
+    """Drop deleted notifications from the inbox cache."""
+    notification_deleted(instance)
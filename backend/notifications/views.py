@@ -4,6 +4,9 @@ from rest_framework.response import Response
 from django.db.models import Q, Avg, Count
 from django.utils import timezone
 
+from core.pagination import PageOrCursorPagination
+
+from .inbox import invalidate_inbox
 from .models import (
     Notification, NotificationTemplate, NotificationSubscription,
     NotificationLog, NotificationAnnouncement, NotificationPreference
@@ -24,6 +27,7 @@ class NotificationListView(generics.ListCreateAPIView):
     
     queryset = Notification.objects.all()
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PageOrCursorPagination
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -367,6 +371,8 @@ def mark_notifications_read(request):
             is_read=True,
             read_at=timezone.now()
         )
+        # QuerySet.update() skips the signals that maintain the cached inboxes
+        invalidate_inbox(str(recipient_id), request.user.role, 'all')
         
         return Response({
             'message': f'Marked {updated_count} notifications as read.',
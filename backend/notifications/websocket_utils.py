@@ -5,6 +5,8 @@ from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 import json
 
+from .inbox import serialize_notification
+
 
 def send_notification_to_user(user_id, notification_data):
     """
@@ -84,17 +86,7 @@ def broadcast_notification(notification):
     Args:
         notification: Notification model instance
     """
-    notification_data = {
-        'id': str(notification.id),
-        'title': notification.title,
-        'message': notification.message,
-        'type': notification.notification_type,
-        'priority': notification.priority,
-        'timestamp': notification.created_at.isoformat(),
-        'read': notification.is_read,
-        'action_url': notification.action_url,
-        'action_text': notification.action_text
-    }
+    notification_data = serialize_notification(notification)
     
     if notification.recipient_type == 'all':
         send_notification_to_all(notification_data)
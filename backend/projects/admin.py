@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     ProjectGroup, StatusHistory, ProjectStudent, ProjectFile,
-    CommunicationLog, ProjectHealthCheck, TopicSimilarity
+    CommunicationLog, ProjectHealthCheck, TopicSimilarity, ProjectSummary
 )
 
 
@@ -91,3 +91,14 @@ class TopicSimilarityAdmin(admin.ModelAdmin):
     list_filter = ['analyzed_at']
     search_fields = ['project_group__project_id', 'similar_project_id', 'reason']
     ordering = ['-analyzed_at']
+
+
+@admin.register(ProjectSummary)
+class ProjectSummaryAdmin(admin.ModelAdmin):
+    """Admin interface for the ProjectSummary read model."""
+    
+    list_display = ['project_id', 'topic_eng', 'advisor_name', 'status', 'student_count', 'defense_date', 'refreshed_at']
+    list_filter = ['status', 'academic_year']
+    search_fields = ['project_id', 'topic_eng', 'topic_lao', 'advisor_name', 'student_names']
+    ordering = ['-created_at']
+    readonly_fields = [f.name for f in ProjectSummary._meta.fields]
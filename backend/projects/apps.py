@@ -12,3 +12,5 @@ class ProjectsConfig(AppConfig):
     def ready(self):
         """Import signals when app is ready."""
         import projects.signals
+        from .statistics import connect_signals
+        connect_signals()
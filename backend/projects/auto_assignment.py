@@ -0,0 +1,314 @@
+"""
+Automatic advisor assignment for a cohort.
+
+``AutoAssignment`` gives every unassigned project group of an academic year
+(no ``Project`` yet, or one without an advisor) a supervisor, maximizing the
+total fit between projects and advisors:
+
+* major fit: the students' majors against the advisor's
+  ``AdvisorSpecialization`` majors, weighted by expertise level
+* topic fit: words shared by the project topic and the advisor's
+  ``research_interests`` and ``specialization``
+
+within each advisor's remaining ``quota`` (from the workload counters) and
+``max_students``. It is solved as a min-cost max-flow (``core.flow``), so as
+many projects as the capacity allows are assigned and, among those plans, the
+best-fitting one is chosen. Each project only gets edges to its
+``CANDIDATE_LIMIT`` best-fitting advisors, plus a zero-fit route through a hub
+to every advisor, which keeps the graph small for thousands of projects and
+hundreds of advisors. Student limits are not a flow constraint: an advisor
+taken past ``max_students`` keeps the best-fitting projects that still fit,
+and the remaining projects are solved again without them.
+
+``preview()`` returns the plan; ``apply()`` computes the same plan and writes
+it through ``BulkProjectOperation.assign_advisors`` in one transaction.
+"""
+
+import re
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from core.flow import MinCostFlow
+
+CANDIDATE_LIMIT = 12
+MAJOR_WEIGHT = 2        # per expertise level (1-5)
+TOPIC_WEIGHT = 2        # per shared topic word
+MAX_TOPIC_WORDS = 5
+MAX_FIT = 5 * MAJOR_WEIGHT + MAX_TOPIC_WORDS * TOPIC_WEIGHT
+
+WORD_RE = re.compile(r'\w{3,}')
+STOP_WORDS = frozenset({
+    'and', 'for', 'the', 'with', 'using', 'based', 'system', 'systems', 'management', 'development',
+    'application', 'study', 'design', 'from', 'into', 'via', 'its', 'their', 'this', 'that',
+})
+
+
+def topic_words(*texts):
+    return {
+        word for text in texts if text
+        for word in WORD_RE.findall(text.casefold()) if word not in STOP_WORDS and not word.isdigit()
+    }
+
+
+def normalize_major(value):
+    return (value or '').strip().casefold()
+
+
+@dataclass
+class ProjectProfile:
+    project_id: str
+    students: int = 0
+    majors: set = field(default_factory=set)
+    words: set = field(default_factory=set)
+
+
+@dataclass
+class AdvisorProfile:
+    pk: int
+    capacity: int                   # projects the advisor can still take
+    student_capacity: int           # students the advisor can still take
+    majors: dict = field(default_factory=dict)   # normalized major -> expertise level
+    words: set = field(default_factory=set)
+
+
+def fit_score(project, advisor):
+    """0 (no fit) to ``MAX_FIT``."""
+    expertise = max((advisor.majors.get(major, 0) for major in project.majors), default=0)
+    shared = len(project.words & advisor.words)
+    return min(expertise, 5) * MAJOR_WEIGHT + min(shared, MAX_TOPIC_WORDS) * TOPIC_WEIGHT
+
+
+def rank_candidates(projects, advisors):
+    """
+    ``{project_id: [(fit, advisor pk), ...]}`` best first, over the advisors sharing a major or topic word.
+
+    Looked up through inverted indices, so each project only meets the
+    advisors it can score with instead of all of them.
+    """
+    by_major = defaultdict(list)
+    by_word = defaultdict(list)
+    for advisor in advisors:
+        for major, level in advisor.majors.items():
+            by_major[major].append((advisor.pk, level))
+        for word in advisor.words:
+            by_word[word].append(advisor.pk)
+
+    ranked = {}
+    for project in projects:
+        expertise = Counter()
+        for major in project.majors:
+            for pk, level in by_major.get(major, ()):
+                expertise[pk] = max(expertise[pk], level)
+        shared = Counter()
+        for word in project.words:
+            shared.update(by_word.get(word, ()))
+        fits = (
+            (min(expertise[pk], 5) * MAJOR_WEIGHT + min(shared[pk], MAX_TOPIC_WORDS) * TOPIC_WEIGHT, pk)
+            for pk in expertise.keys() | shared.keys()
+        )
+        ranked[project.project_id] = sorted(
+            (item for item in fits if item[0] > 0), key=lambda item: (-item[0], item[1])
+        )
+    return ranked
+
+
+def solve_assignment(projects, advisors, candidate_limit=CANDIDATE_LIMIT):
+    """
+    ``{project_id: (advisor pk, fit)}`` for ``ProjectProfile``/``AdvisorProfile`` lists.
+
+    Projects that cannot be placed within the capacities are left out.
+    """
+    advisors = [a for a in advisors if a.capacity > 0 and a.student_capacity > 0]
+    ranked = rank_candidates(projects, advisors)
+    assignment = {}
+    pending = list(projects)
+    while pending and advisors:
+        plan = _solve_flow(pending, advisors, ranked, candidate_limit)
+        # Student limits: an overfull advisor keeps its best projects that fit and closes
+        closed = set()
+        by_advisor = defaultdict(list)
+        for project in pending:
+            if project.project_id in plan:
+                by_advisor[plan[project.project_id][0]].append(project)
+        for advisor in advisors:
+            taken = by_advisor.get(advisor.pk, [])
+            if sum(p.students for p in taken) <= advisor.student_capacity:
+                continue
+            room = advisor.student_capacity
+            for project in sorted(taken, key=lambda p: (-plan[p.project_id][1], p.project_id)):
+                if project.students <= room:
+                    room -= project.students
+                    assignment[project.project_id] = plan[project.project_id]
+            closed.add(advisor.pk)
+        if not closed:
+            assignment.update(plan)
+            break
+        pending = [p for p in pending if p.project_id not in assignment]
+        advisors = [a for a in advisors if a.pk not in closed]
+    return assignment
+
+
+def _solve_flow(projects, advisors, ranked, candidate_limit):
+    source, sink, hub = 0, 1, 2
+    first_project = 3
+    first_advisor = first_project + len(projects)
+    advisor_nodes = {advisor.pk: first_advisor + index for index, advisor in enumerate(advisors)}
+    graph = MinCostFlow(first_advisor + len(advisors))
+    candidate_edges = []
+    hub_edges = []
+    for p_index, project in enumerate(projects):
+        node = first_project + p_index
+        graph.add_edge(source, node, 1, 0)
+        candidates = (item for item in ranked[project.project_id] if item[1] in advisor_nodes)
+        for fit, pk in islice(candidates, candidate_limit):
+            edge = graph.add_edge(node, advisor_nodes[pk], 1, MAX_FIT - fit)
+            candidate_edges.append((edge, project.project_id, pk, fit))
+        hub_edges.append(graph.add_edge(node, hub, 1, MAX_FIT))
+    hub_advisor_edges = []
+    for advisor in advisors:
+        hub_advisor_edges.append(graph.add_edge(hub, advisor_nodes[advisor.pk], advisor.capacity, 0))
+        graph.add_edge(advisor_nodes[advisor.pk], sink, advisor.capacity, 0)
+
+    graph.solve(source, sink)
+
+    plan = {
+        project_id: (pk, fit)
+        for edge, project_id, pk, fit in candidate_edges if graph.flow_on(edge)
+    }
+    # Zero-fit placements: pair the projects routed through the hub with the hub's advisor slots
+    slots = [
+        advisor for advisor, edge in zip(advisors, hub_advisor_edges) for _ in range(graph.flow_on(edge))
+    ]
+    routed = [project for project, edge in zip(projects, hub_edges) if graph.flow_on(edge)]
+    for project, advisor in zip(routed, slots):
+        plan[project.project_id] = (advisor.pk, fit_score(project, advisor))
+    return plan
+
+
+class AutoAssignment:
+    """Supervisor assignment for the unassigned project groups of ``academic_year``."""
+
+    def __init__(self, academic_year, candidate_limit=CANDIDATE_LIMIT):
+        self.academic_year = academic_year
+        self.candidate_limit = candidate_limit
+
+    def unassigned_groups(self):
+        from .models import ProjectGroup, ProjectStatus
+
+        return (
+            ProjectGroup.objects.filter(project_id__startswith=f'{self.academic_year}-')
+            .exclude(status=ProjectStatus.REJECTED)
+            .filter(Q(legacy_project__isnull=True) | Q(legacy_project__advisor__isnull=True))
+            .order_by('project_id')
+        )
+
+    def project_profiles(self):
+        from .models import ProjectStudent
+
+        profiles = {
+            project_id: ProjectProfile(project_id, words=topic_words(topic_eng, topic_lao))
+            for project_id, topic_eng, topic_lao in self.unassigned_groups().values_list(
+                'project_id', 'topic_eng', 'topic_lao'
+            )
+        }
+        students = ProjectStudent.objects.filter(
+            project_group__project_id__in=profiles
+        ).values_list('project_group__project_id', 'student__student_profile__major')
+        for project_id, major in students:
+            profiles[project_id].students += 1
+            if normalize_major(major):
+                profiles[project_id].majors.add(normalize_major(major))
+        return list(profiles.values())
+
+    def advisor_profiles(self):
+        from advisors.models import Advisor, AdvisorSpecialization
+        from advisors.workload import workload_queryset
+        from .models import ProjectStudent
+
+        advisors = {
+            advisor.pk: advisor
+            for advisor in workload_queryset(
+                Advisor.objects.filter(is_active=True).select_related('user'), self.academic_year,
+            )
+        }
+        supervised_students = dict(
+            ProjectStudent.objects.filter(
+                project_group__legacy_project__advisor__in=advisors,
+                project_group__project_id__startswith=f'{self.academic_year}-',
+            )
+            .values('project_group__legacy_project__advisor')
+            .annotate(n=Count('id'))
+            .values_list('project_group__legacy_project__advisor', 'n')
+        )
+        profiles = {
+            pk: AdvisorProfile(
+                pk,
+                capacity=max(advisor.quota - advisor.supervised_projects_total, 0),
+                student_capacity=max(advisor.max_students - supervised_students.get(pk, 0), 0),
+                words=topic_words(advisor.research_interests, advisor.specialization),
+            )
+            for pk, advisor in advisors.items()
+        }
+        specializations = AdvisorSpecialization.objects.filter(
+            advisor__in=advisors
+        ).values_list('advisor_id', 'major', 'expertise_level')
+        for advisor_id, major, level in specializations:
+            profiles[advisor_id].majors[normalize_major(major)] = level
+        return advisors, list(profiles.values())
+
+    def plan(self):
+        started = time.monotonic()
+        projects = self.project_profiles()
+        advisors, advisor_profiles = self.advisor_profiles()
+        solved = solve_assignment(projects, advisor_profiles, self.candidate_limit)
+        elapsed_ms = round((time.monotonic() - started) * 1000)
+        return projects, advisors, solved, elapsed_ms
+
+    def preview(self):
+        projects, advisors, solved, elapsed_ms = self.plan()
+        return self._report(projects, advisors, solved, elapsed_ms)
+
+    def apply(self, user):
+        """Compute the plan and write it in one transaction; returns the preview plus the bulk report."""
+        from .bulk_operations import BulkProjectOperation, projects_for_groups
+
+        with transaction.atomic():
+            projects, advisors, solved, elapsed_ms = self.plan()
+            report = self._report(projects, advisors, solved, elapsed_ms)
+            if not solved:
+                report['applied'] = None
+                return report
+            bulk = BulkProjectOperation(user, projects_for_groups(solved))
+            report['applied'] = bulk.assign_advisors(
+                {project_id: advisors[advisor_pk] for project_id, (advisor_pk, _) in solved.items()},
+                reason='Automatic assignment',
+            )
+        return report
+
+    def _report(self, projects, advisors, solved, elapsed_ms):
+        assignments = []
+        for project_id, (advisor_pk, fit) in sorted(solved.items()):
+            advisor = advisors[advisor_pk]
+            assignments.append({
+                'project_id': project_id,
+                'advisor': advisor_pk,
+                'advisor_id': advisor.advisor_id,
+                'advisor_name': advisor.user.get_full_name() or advisor.user.username,
+                'fit': fit,
+            })
+        fits = [fit for _, fit in solved.values()]
+        return {
+            'academic_year': self.academic_year,
+            'assignments': assignments,
+            'unassigned_project_ids': sorted(p.project_id for p in projects if p.project_id not in solved),
+            'total_fit': sum(fits),
+            'average_fit': round(sum(fits) / len(fits), 2) if fits else 0,
+            'max_fit': MAX_FIT,
+            'advisors_used': len(Counter(advisor_pk for advisor_pk, _ in solved.values())),
+            'elapsed_ms': elapsed_ms,
+        }
@@ -0,0 +1,111 @@
+"""
+Bulk loading of the rows a page of projects needs for serialization.
+
+``Project`` and ``ProjectGroup`` are matched on the ``project_id`` string,
+committee advisors come from the ``ProjectCommitteeMember`` rows, and students,
+milestones and log entries hang off ``ProjectGroup``. Resolving those per field and per
+row is what made list endpoints issue hundreds of queries; ``ProjectBatch``
+resolves them for a whole page in a fixed number of queries instead.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+RECENT_ACTIVITY_DAYS = 7
+RECENT_ACTIVITY_LIMIT = 5
+
+# Parts a batch can load; every part other than 'groups' needs the project groups too
+BATCH_PARTS = frozenset({'groups', 'committee', 'students', 'milestones', 'activity'})
+
+
+class ProjectBatch:
+    """Related rows for a set of projects, keyed for O(1) lookups."""
+
+    def __init__(self, project_ids=(), parts=BATCH_PARTS):
+        self.project_ids = set(project_ids)
+        self.parts = frozenset(parts)
+        self.project_groups = {}      # project_id -> ProjectGroup
+        self.committees = {}          # ProjectGroup.pk -> {role: Advisor}
+        self.project_students = {}    # ProjectGroup.pk -> [ProjectStudent]
+        self.milestone_counts = {}    # ProjectGroup.pk -> (total, pending)
+        self.recent_logs = {}         # ProjectGroup.pk -> [LogEntry]
+
+    @classmethod
+    def for_projects(cls, projects, parts=BATCH_PARTS):
+        """
+        Load everything the project serializers need for ``projects``.
+
+        Issues at most five queries regardless of how many projects are passed:
+        project groups, committee advisors, project students, milestone counts
+        and recent log entries. ``parts`` limits them to what the serialized
+        fields use (see ``ProjectSerializer.batch_parts``).
+        """
+        from committees.membership import committee_members_for
+        from milestones.models import Milestone
+        from .models import LogEntry, ProjectGroup, ProjectStudent
+
+        batch = cls((p.project_id for p in projects), parts)
+        if not batch.project_ids or not batch.parts:
+            return batch
+
+        groups = list(ProjectGroup.objects.filter(project_id__in=batch.project_ids))
+        batch.project_groups = {pg.project_id: pg for pg in groups}
+        if not groups:
+            return batch
+        group_ids = [pg.pk for pg in groups]
+
+        if 'committee' in batch.parts:
+            batch.committees = committee_members_for(group_ids)
+
+        if 'students' in batch.parts:
+            students = defaultdict(list)
+            for ps in ProjectStudent.objects.select_related('student').filter(project_group_id__in=group_ids):
+                students[ps.project_group_id].append(ps)
+            batch.project_students = dict(students)
+
+        if 'milestones' in batch.parts:
+            counts = (
+                Milestone.objects.filter(project_group_id__in=group_ids)
+                .values('project_group_id')
+                .annotate(total=Count('id'), pending=Count('id', filter=Q(status='Pending')))
+            )
+            batch.milestone_counts = {
+                row['project_group_id']: (row['total'], row['pending']) for row in counts
+            }
+
+        if 'activity' in batch.parts:
+            cutoff = timezone.now() - timedelta(days=RECENT_ACTIVITY_DAYS)
+            logs = defaultdict(list)
+            for entry in LogEntry.objects.filter(project_id__in=group_ids, created_at__gte=cutoff).order_by('-created_at'):
+                if len(logs[entry.project_id]) < RECENT_ACTIVITY_LIMIT:
+                    logs[entry.project_id].append(entry)
+            batch.recent_logs = dict(logs)
+
+        return batch
+
+    def covers(self, project, parts=()):
+        """Whether ``project`` was part of the loaded set, with ``parts`` loaded."""
+        return project.project_id in self.project_ids and self.parts.issuperset(parts)
+
+    def group_for(self, project):
+        return self.project_groups.get(project.project_id)
+
+    def committee_members(self, project):
+        """Committee advisors by role, mirroring ``Project.get_committee_members``."""
+        pg = self.group_for(project)
+        return self.committees.get(pg.pk, {}) if pg else {}
+
+    def students_for(self, project):
+        pg = self.group_for(project)
+        return self.project_students.get(pg.pk, []) if pg else []
+
+    def milestone_counts_for(self, project):
+        pg = self.group_for(project)
+        return self.milestone_counts.get(pg.pk, (0, 0)) if pg else (0, 0)
+
+    def recent_activity_for(self, project):
+        pg = self.group_for(project)
+        return self.recent_logs.get(pg.pk, []) if pg else []
@@ -0,0 +1,528 @@
+"""
+Set-based bulk project operations.
+
+``BulkProjectOperation`` applies a status change, advisor transfer or
+assignment, committee assignment or defense schedule to many projects at
+once. Affected ``Project`` and ``ProjectGroup`` rows are loaded in one query
+each, changed in memory and written with ``bulk_update`` inside a single
+transaction, together with the ``StatusHistory`` and ``LogEntry`` rows
+(``bulk_create``) the single-project actions write one by one.
+
+Bulk writes do not send ``pre_save``/``post_save``, so none of the per-row
+handlers in ``projects.signals`` run. Instead each recipient gets one
+aggregated notification for the whole operation, the committee member rows
+of reassigned groups and the advisor workload counters are updated in one
+pass, and the project summaries are refreshed once at the end.
+"""
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework import serializers
+
+from advisors.workload import PENDING_REVIEW_STATUS, WorkloadDelta, academic_year_of
+from committees.membership import sync_committee_members
+from .models import LogEntry, Project, ProjectGroup, ProjectStudent, StatusHistory
+from .read_model import safe_refresh_project_summaries
+
+BULK_BATCH_SIZE = 500
+NOTIFICATION_MAX_LINES = 20
+
+COMMITTEE_FIELDS = {
+    'main': ('main_committee_id', 'main_committee_quota'),
+    'second': ('second_committee_id', 'second_committee_quota'),
+    'third': ('third_committee_id', 'third_committee_quota'),
+}
+
+
+def advisor_display_name(advisor):
+    if advisor is None:
+        return ''
+    user = getattr(advisor, 'user', None)
+    if user is not None:
+        return user.get_full_name() or user.username
+    return str(advisor)
+
+
+class NotificationBatch:
+    """Collects notification lines per recipient and writes one notification each."""
+
+    def __init__(self):
+        self._lines = defaultdict(list)
+
+    def add(self, user_id, line):
+        if user_id:
+            self._lines[str(user_id)].append(line)
+
+    def add_many(self, user_ids, line):
+        for user_id in set(user_ids):
+            self.add(user_id, line)
+
+    def send(self, title):
+        """Create one notification per recipient; returns how many were created."""
+        from notifications.inbox import invalidate_inbox
+        from notifications.models import Notification
+
+        notifications = []
+        for user_id, lines in self._lines.items():
+            shown = lines[:NOTIFICATION_MAX_LINES]
+            if len(lines) > len(shown):
+                shown.append(f'... and {len(lines) - len(shown)} more')
+            notifications.append(Notification(
+                recipient_id=user_id,
+                recipient_type='user',
+                title=title if len(lines) == 1 else f'{title} ({len(lines)} projects)',
+                message='\n'.join(shown),
+                notification_type='info',
+            ))
+        if notifications:
+            Notification.objects.bulk_create(notifications, batch_size=BULK_BATCH_SIZE)
+            # bulk_create() skips the signals that maintain the cached inboxes
+            invalidate_inbox(*self._lines)
+        return len(notifications)
+
+
+class BulkProjectOperation:
+    """Apply one operation to a set of projects in a single transaction."""
+
+    def __init__(self, user, projects):
+        self.user = user
+        self.now = timezone.now()
+        self.projects = {p.project_id: p for p in projects}
+        self.groups = {}
+        self.students = defaultdict(list)   # ProjectGroup.pk -> [student user id]
+        self.history = []
+        self.log_entries = []
+        self.notifications = NotificationBatch()
+        self.workload = WorkloadDelta()     # advisor workload counter changes
+        self._previous_advisors = {}        # project_id -> Advisor.pk before a transfer
+        self._committee_users = {}
+        self.changed = []
+        self.unchanged = []
+
+    # Loading
+
+    def _load_groups(self):
+        """ProjectGroup and student ids for every project, creating missing groups in bulk."""
+        self.groups = {
+            g.project_id: g for g in ProjectGroup.objects.filter(project_id__in=self.projects)
+        }
+        missing = [
+            ProjectGroup(
+                project_id=project.project_id,
+                topic_eng=project.title or '',
+                topic_lao='',
+                advisor_name=advisor_display_name(project.advisor),
+                status=project.status,
+            )
+            for project_id, project in self.projects.items() if project_id not in self.groups
+        ]
+        if missing:
+            ProjectGroup.objects.bulk_create(missing, batch_size=BULK_BATCH_SIZE)
+            # Re-read for primary keys on backends that don't return them from bulk_create
+            created = ProjectGroup.objects.filter(project_id__in=[g.project_id for g in missing])
+            self.groups.update({g.project_id: g for g in created})
+            self.history.extend(
+                StatusHistory(project_group=g, old_status='', new_status=g.status, reason='Project created')
+                for g in created
+            )
+
+        rows = ProjectStudent.objects.filter(
+            project_group_id__in=[g.pk for g in self.groups.values()]
+        ).values_list('project_group_id', 'student_id')
+        for group_id, student_id in rows:
+            self.students[group_id].append(student_id)
+
+    # Helpers
+
+    def _log(self, group, log_type, content, metadata):
+        self.log_entries.append(LogEntry(
+            project=group,
+            type=log_type,
+            author_id=self.user.id,
+            content=content,
+            metadata=metadata,
+        ))
+
+    def _participants(self, project, group):
+        """User ids of the project's advisor and students."""
+        user_ids = list(self.students.get(group.pk, []))
+        if project.advisor is not None and project.advisor.user_id:
+            user_ids.append(project.advisor.user_id)
+        return user_ids
+
+    def _save(self, project_fields=(), group_fields=(), title='', extra=None):
+        """Write all collected changes, history, log entries and notifications.
+
+        ``extra`` is called inside the same transaction, after the changes are written.
+        """
+        changed_projects = [self.projects[pid] for pid in self.changed]
+        changed_groups = [self.groups[pid] for pid in self.changed]
+        with transaction.atomic():
+            if project_fields and changed_projects:
+                for project in changed_projects:
+                    project.updated_at = self.now
+                Project.objects.bulk_update(
+                    changed_projects, [*project_fields, 'updated_at'], batch_size=BULK_BATCH_SIZE,
+                )
+            if group_fields and changed_groups:
+                for group in changed_groups:
+                    group.updated_at = self.now
+                ProjectGroup.objects.bulk_update(
+                    changed_groups, [*group_fields, 'updated_at'], batch_size=BULK_BATCH_SIZE,
+                )
+            StatusHistory.objects.bulk_create(self.history, batch_size=BULK_BATCH_SIZE)
+            LogEntry.objects.bulk_create(self.log_entries, batch_size=BULK_BATCH_SIZE)
+            if extra is not None:
+                extra()
+            notifications = self.notifications.send(title) if title else 0
+        safe_refresh_project_summaries(self.changed)
+        return notifications
+
+    def _report(self, operation, notifications):
+        return {
+            'operation': operation,
+            'requested': len(self.projects),
+            'updated': len(self.changed),
+            'updated_project_ids': self.changed,
+            'unchanged_project_ids': self.unchanged,
+            'notifications_sent': notifications,
+        }
+
+    # Operations
+
+    def update_status(self, status, comment='', template=None):
+        self._load_groups()
+        for project_id, project in self.projects.items():
+            group = self.groups[project_id]
+            old_status = group.status
+            if old_status == status and project.status == status:
+                self.unchanged.append(project_id)
+                continue
+            project.status = status
+            group.status = status
+            self.changed.append(project_id)
+            self.history.append(StatusHistory(
+                project_group=group,
+                old_status=old_status,
+                new_status=status,
+                changed_by=self.user,
+                reason=comment or f'Status changed from {old_status} to {status}',
+            ))
+            self._log(group, 'status_change', f"Project status changed to {status}. {comment}", {
+                'old_status': old_status,
+                'new_status': status,
+                'author_name': self.user.get_full_name(),
+                'author_role': self.user.role,
+                'bulk': True,
+            })
+            self.notifications.add_many(
+                self._participants(project, group),
+                f'Project "{group.topic_eng or project_id}" status changed to {status}',
+            )
+
+        extra = None
+        if status == 'Approved' and template is not None:
+            extra = lambda: self._create_milestones(template)
+        notifications = self._save(('status',), ('status',), title='Project Status Changed', extra=extra)
+        return self._report('update_status', notifications)
+
+    def _create_milestones(self, template):
+        """Milestones from ``template`` for newly approved projects that have none from it yet."""
+        from milestones.models import Milestone
+
+        group_ids = [self.groups[pid].pk for pid in self.changed]
+        existing = set(
+            Milestone.objects.filter(project_group_id__in=group_ids, template=template)
+            .values_list('project_group_id', flat=True)
+        )
+        tasks = list(template.tasks.order_by('order'))
+        milestones = []
+        for group_id in group_ids:
+            if group_id in existing:
+                continue
+            due_date = self.now.date()
+            for task in tasks:
+                due_date += timedelta(days=task.duration_days)
+                milestones.append(Milestone(
+                    project_group_id=group_id,
+                    template=template,
+                    name=task.name,
+                    description=task.description,
+                    due_date=due_date,
+                ))
+        Milestone.objects.bulk_create(milestones, batch_size=BULK_BATCH_SIZE)
+
+    def transfer(self, advisor, comment):
+        self._check_supervision_quotas(dict.fromkeys(self.projects, advisor), field='new_advisor_id')
+
+        self._load_groups()
+        new_name = advisor_display_name(advisor)
+        for project_id, project in self.projects.items():
+            group = self.groups[project_id]
+            if project.advisor_id == advisor.pk:
+                self.unchanged.append(project_id)
+                continue
+            old_advisor = project.advisor
+            self._previous_advisors[project_id] = project.advisor_id
+            old_name = group.advisor_name or advisor_display_name(old_advisor)
+            project.advisor = advisor
+            group.advisor_name = new_name
+            self.changed.append(project_id)
+            self._log(group, 'event', f'Project transferred from {old_name} to {new_name}. Reason: {comment}', {
+                'old_advisor_name': old_name,
+                'new_advisor_id': advisor.pk,
+                'new_advisor_name': new_name,
+                'bulk': True,
+            })
+            label = group.topic_eng or project_id
+            self.notifications.add(advisor.user_id, f'Project "{label}" was transferred to you from {old_name}')
+            if old_advisor is not None:
+                self.notifications.add(old_advisor.user_id, f'Project "{label}" was transferred to {new_name}')
+            self.notifications.add_many(
+                self.students.get(group.pk, []), f'Your project "{label}" is now supervised by {new_name}',
+            )
+
+        notifications = self._save(
+            ('advisor',), ('advisor_name',), title='Project Transferred', extra=self._move_pending_reviews,
+        )
+        return self._report('transfer', notifications)
+
+    def assign_advisors(self, assignments, reason=''):
+        """Supervise each project by ``assignments[project_id]`` (an ``Advisor``), e.g. from auto-assignment."""
+        self._check_supervision_quotas(assignments)
+
+        self._load_groups()
+        for project_id, project in self.projects.items():
+            advisor = assignments.get(project_id)
+            group = self.groups[project_id]
+            if advisor is None or project.advisor_id == advisor.pk:
+                self.unchanged.append(project_id)
+                continue
+            old_advisor = project.advisor
+            self._previous_advisors[project_id] = project.advisor_id
+            name = advisor_display_name(advisor)
+            project.advisor = advisor
+            group.advisor_name = name
+            self.changed.append(project_id)
+            self._log(group, 'event', f'Advisor set to {name}' + (f'. Reason: {reason}' if reason else ''), {
+                'new_advisor_id': advisor.pk,
+                'new_advisor_name': name,
+                'bulk': True,
+            })
+            label = group.topic_eng or project_id
+            self.notifications.add(advisor.user_id, f'You were assigned to supervise "{label}"')
+            if old_advisor is not None:
+                self.notifications.add(old_advisor.user_id, f'Project "{label}" is now supervised by {name}')
+            self.notifications.add_many(
+                self.students.get(group.pk, []), f'Your project "{label}" is now supervised by {name}',
+            )
+
+        notifications = self._save(
+            ('advisor',), ('advisor_name',), title='Advisor Assigned', extra=self._move_pending_reviews,
+        )
+        return self._report('assign_advisors', notifications)
+
+    def assign_committee(self, committee_type, advisor=None):
+        field, quota_field = COMMITTEE_FIELDS[committee_type]
+        value = advisor.advisor_id if advisor is not None else None
+
+        self._load_groups()
+        if advisor is not None:
+            joining = Counter(
+                academic_year_of(g.project_id) for g in self.groups.values() if getattr(g, field) != value
+            )
+            quota = getattr(advisor, quota_field)
+            for year, n in sorted(joining.items()):
+                current = advisor.get_committee_count(committee_type, year)
+                if current + n > quota:
+                    raise serializers.ValidationError({
+                        'advisor_id': f'{committee_type.title()} committee quota exceeded: {current} assigned in '
+                                      f'{year or "no academic year"} + {n} new > quota {quota}.'
+                    })
+
+        name = advisor_display_name(advisor)
+        for project_id, project in self.projects.items():
+            group = self.groups[project_id]
+            if getattr(group, field) == value:
+                self.unchanged.append(project_id)
+                continue
+            setattr(group, field, value)
+            self.changed.append(project_id)
+            self._log(group, 'event', f'{committee_type.title()} committee member set to {name}', {
+                'committee_type': committee_type,
+                'advisor_id': advisor.pk if advisor is not None else None,
+                'advisor_name': name,
+                'bulk': True,
+            })
+            if advisor is not None:
+                self.notifications.add(
+                    advisor.user_id,
+                    f'You were added to the {committee_type} committee of "{group.topic_eng or project_id}"',
+                )
+
+        notifications = self._save(
+            group_fields=(field,), title='Committee Assignment',
+            extra=lambda: sync_committee_members([self.groups[pid] for pid in self.changed]),
+        )
+        return self._report('assign_committee', notifications)
+
+    def schedule_defense(self, schedules):
+        """``schedules`` maps project_id to ``{'defense_date', 'defense_time', 'defense_room'}``."""
+        self._load_groups()
+        self._check_room_conflicts(schedules)
+        self._load_committee_users()
+
+        for project_id, project in self.projects.items():
+            group = self.groups[project_id]
+            slot = schedules[project_id]
+            new = (slot.get('defense_date'), slot.get('defense_time'), slot.get('defense_room') or None)
+            if (group.defense_date, group.defense_time, group.defense_room) == new:
+                self.unchanged.append(project_id)
+                continue
+            group.defense_date, group.defense_time, group.defense_room = new
+            self.changed.append(project_id)
+            self._log(
+                group, 'defense_scheduled',
+                f'Defense scheduled for {group.defense_date} at {group.defense_time} in {group.defense_room}',
+                {
+                    'defense_date': str(group.defense_date) if group.defense_date else None,
+                    'defense_time': str(group.defense_time) if group.defense_time else None,
+                    'defense_room': group.defense_room,
+                    'bulk': True,
+                },
+            )
+            participants = self._participants(project, group)
+            participants += self._committee_user_ids(group)
+            self.notifications.add_many(
+                participants,
+                f'Defense of "{group.topic_eng or project_id}": {group.defense_date} '
+                f'{group.defense_time} in {group.defense_room}',
+            )
+
+        notifications = self._save(
+            group_fields=('defense_date', 'defense_time', 'defense_room'), title='Defense Scheduled',
+        )
+        return self._report('schedule_defense', notifications)
+
+    def _committee_user_ids(self, group):
+        advisor_ids = [getattr(group, field) for field, _ in COMMITTEE_FIELDS.values()]
+        return [self._committee_users.get(advisor_id) for advisor_id in advisor_ids if advisor_id]
+
+    def _check_room_conflicts(self, schedules):
+        """Reject two defenses in the same room and slot, within the batch or with existing ones."""
+        slots = {}
+        errors = []
+        for project_id, slot in schedules.items():
+            if not (slot.get('defense_date') and slot.get('defense_time') and slot.get('defense_room')):
+                continue
+            key = (slot['defense_date'], slot['defense_time'], slot['defense_room'])
+            if key in slots:
+                errors.append(f'{project_id} and {slots[key]} are both scheduled in {key[2]} on {key[0]} at {key[1]}.')
+            slots[key] = project_id
+
+        if slots:
+            taken = (
+                ProjectGroup.objects.exclude(project_id__in=schedules)
+                .filter(defense_date__in={k[0] for k in slots}, defense_room__in={k[2] for k in slots})
+                .values_list('defense_date', 'defense_time', 'defense_room', 'project_id')
+            )
+            for date, time, room, other in taken:
+                if (date, time, room) in slots:
+                    errors.append(f'{slots[(date, time, room)]} conflicts with {other} in {room} on {date} at {time}.')
+        if errors:
+            raise serializers.ValidationError({'schedules': errors})
+
+    def _check_supervision_quotas(self, assignments, field='assignments'):
+        """
+        Reject assignments taking any advisor past ``quota`` in the academic
+        year of the projects, checking all advisors and years in one query.
+        """
+        from advisors.models import Advisor, AdvisorWorkloadCounter
+
+        joining = Counter(
+            (advisor.pk, academic_year_of(project_id)) for project_id, advisor in assignments.items()
+            if project_id in self.projects and self.projects[project_id].advisor_id != advisor.pk
+        )
+        if not joining:
+            return
+        advisors = Advisor.objects.select_related('user').in_bulk({pk for pk, _ in joining})
+        supervised = {
+            (advisor_id, year): n
+            for advisor_id, year, n in AdvisorWorkloadCounter.objects.filter(
+                advisor__in=advisors, academic_year__in={year for _, year in joining},
+            ).values_list('advisor_id', 'academic_year', 'supervised_projects')
+        }
+        errors = []
+        for (pk, year), n in sorted(joining.items()):
+            advisor, current = advisors[pk], supervised.get((pk, year), 0)
+            if current + n > advisor.quota:
+                errors.append(
+                    f'{advisor_display_name(advisor)}: {current} supervised in {year or "no academic year"} + '
+                    f'{n} new > quota {advisor.quota}.'
+                )
+        if errors:
+            raise serializers.ValidationError({field: errors})
+
+    def _move_pending_reviews(self):
+        """Move supervision and pending reviews of transferred projects between workload counters."""
+        from milestones.models import Milestone
+
+        pending = dict(
+            Milestone.objects.filter(
+                project_group__in=[self.groups[pid] for pid in self.changed], status=PENDING_REVIEW_STATUS,
+            ).values('project_group__project_id').annotate(n=Count('id')).values_list('project_group__project_id', 'n')
+        )
+        for project_id in self.changed:
+            old_advisor_id = self._previous_advisors[project_id]
+            new_advisor_id = self.projects[project_id].advisor_id
+            self.workload.move(old_advisor_id, new_advisor_id, project_id, 'supervised_projects')
+            self.workload.move(old_advisor_id, new_advisor_id, project_id, 'pending_reviews', pending.get(project_id, 0))
+        self.workload.apply()
+
+    def _load_committee_users(self):
+        """Committee members are notified too; resolve their users in one query."""
+        from advisors.models import Advisor
+
+        advisor_ids = {
+            getattr(group, field) for group in self.groups.values()
+            for field, _ in COMMITTEE_FIELDS.values() if getattr(group, field)
+        }
+        self._committee_users = dict(
+            Advisor.objects.filter(advisor_id__in=advisor_ids).values_list('advisor_id', 'user_id')
+        ) if advisor_ids else {}
+
+
+def projects_for_groups(project_ids):
+    """``Project`` rows for ``project_ids``, created in bulk for project groups that have none."""
+    existing = set(Project.objects.filter(project_id__in=project_ids).values_list('project_id', flat=True))
+    Project.objects.bulk_create([
+        Project(project_id=group.project_id, title=group.topic_eng or group.project_id,
+                status=group.status, project_group=group)
+        for group in ProjectGroup.objects.filter(project_id__in=set(project_ids) - existing)
+    ])
+    return list(
+        Project.objects.select_related('advisor__user').filter(project_id__in=project_ids).order_by('project_id')
+    )
+
+
+def run_bulk_operation(user, projects, operation, params):
+    """Dispatch a validated ``BulkProjectOperationSerializer`` payload."""
+    with transaction.atomic():
+        # Groups created while loading are rolled back if the operation is rejected
+        return _dispatch(BulkProjectOperation(user, projects), operation, params)
+
+
+def _dispatch(bulk, operation, params):
+    if operation == 'update_status':
+        return bulk.update_status(params['status'], params.get('comment', ''), params.get('template'))
+    if operation == 'transfer':
+        return bulk.transfer(params['advisor'], params['comment'])
+    if operation == 'assign_committee':
+        return bulk.assign_committee(params['committee_type'], params.get('advisor'))
+    if operation == 'schedule_defense':
+        return bulk.schedule_defense({item['project_id']: item for item in params['schedules']})
+    raise serializers.ValidationError({'operation': f'Unknown operation: {operation}'})
@@ -0,0 +1,319 @@
+"""
+Set-based CSV import for projects.
+
+The whole file is parsed and validated first, then diffed against the
+existing ``ProjectGroup``/``Project`` rows in bulk and applied with
+``bulk_create``/``bulk_update`` in batches. Students listed in the
+"Student IDs" column are resolved by ``Student.student_id`` and linked in
+bulk. Every row gets an entry in the report; with ``dry_run`` nothing is
+written and the report describes what would change.
+
+Bulk writes do not send ``post_save`` signals, so the project summaries and
+search index are refreshed once for all imported projects at the end.
+"""
+
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Project, ProjectGroup, ProjectStatus, ProjectStudent
+from .read_model import safe_refresh_project_summaries
+
+IMPORT_BATCH_SIZE = 500
+
+# CSV column -> ProjectGroup field; empty cells leave existing values untouched
+GROUP_COLUMNS = {
+    'Topic (Lao)': 'topic_lao',
+    'Topic (English)': 'topic_eng',
+    'Advisor Name': 'advisor_name',
+    'Status': 'status',
+    'Defense Date': 'defense_date',
+    'Defense Time': 'defense_time',
+    'Defense Room': 'defense_room',
+    'Final Grade': 'final_grade',
+}
+
+STATUS_LOOKUP = {value.lower(): value for value in ProjectStatus.values}
+
+
+@dataclass
+class ImportRow:
+    """One parsed CSV row and its outcome."""
+    row: int
+    project_id: str = ''
+    values: dict = field(default_factory=dict)
+    student_codes: list = field(default_factory=list)
+    action: str = 'skip'
+    changes: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    warnings: list = field(default_factory=list)
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    def to_dict(self):
+        return {
+            'row': self.row,
+            'project_id': self.project_id,
+            'action': self.action,
+            'changes': self.changes,
+            'errors': self.errors,
+            'warnings': self.warnings,
+        }
+
+
+class ProjectCSVImporter:
+    """Parse, validate, diff and apply a project CSV in bulk."""
+
+    def __init__(self, academic_year=None, user=None, dry_run=False, batch_size=IMPORT_BATCH_SIZE):
+        self.academic_year = academic_year
+        self.user = user
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.rows = []
+        self.students_linked = 0
+
+    def run(self, file):
+        """Import ``file`` and return the report dict."""
+        self.rows = self.parse(file)
+        valid_rows = [row for row in self.rows if row.is_valid]
+        if valid_rows:
+            groups, projects = self._load_existing([row.project_id for row in valid_rows])
+            student_users = self._resolve_students(valid_rows)
+            new_groups, changed_groups, new_projects, changed_projects = self._diff(
+                valid_rows, groups, projects
+            )
+            links = self._plan_links(valid_rows, groups, student_users)
+            if not self.dry_run:
+                self._apply(valid_rows, new_groups, changed_groups, new_projects, changed_projects, links)
+        return self.report()
+
+    def parse(self, file):
+        """Read and validate every row of the CSV file."""
+        content = file.read()
+        if isinstance(content, bytes):
+            content = content.decode('utf-8-sig')
+        reader = csv.DictReader(io.StringIO(content))
+
+        rows = []
+        seen = {}
+        for row_num, raw in enumerate(reader, start=2):  # Row 1 is the header
+            row = ImportRow(row=row_num)
+            rows.append(row)
+            raw = {key.strip(): (value or '').strip() for key, value in raw.items() if key}
+
+            row.project_id = raw.get('Project ID', '')
+            if not row.project_id:
+                row.errors.append('Project ID is required')
+                continue
+            if len(row.project_id) > 50:
+                row.errors.append('Project ID must be at most 50 characters')
+            if row.project_id in seen:
+                row.errors.append(f'Duplicate Project ID (first seen on row {seen[row.project_id]})')
+            else:
+                seen[row.project_id] = row_num
+            if self.academic_year and not row.project_id.startswith(str(self.academic_year)):
+                row.warnings.append(f'Project ID does not start with academic year {self.academic_year}')
+
+            for column, field_name in GROUP_COLUMNS.items():
+                value = raw.get(column, '')
+                if value:
+                    self._parse_value(row, column, field_name, value)
+
+            row.student_codes = [code.strip() for code in raw.get('Student IDs', '').split(',') if code.strip()]
+        return rows
+
+    def _parse_value(self, row, column, field_name, value):
+        if field_name == 'status':
+            status = STATUS_LOOKUP.get(value.lower())
+            if status is None:
+                row.errors.append(f'{column}: "{value}" is not one of {", ".join(ProjectStatus.values)}')
+                return
+            value = status
+        elif field_name == 'defense_date':
+            try:
+                value = datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                row.errors.append(f'{column}: expected YYYY-MM-DD, got "{value}"')
+                return
+        elif field_name == 'defense_time':
+            try:
+                value = datetime.strptime(value, '%H:%M').time()
+            except ValueError:
+                row.errors.append(f'{column}: expected HH:MM, got "{value}"')
+                return
+        else:
+            max_length = ProjectGroup._meta.get_field(field_name).max_length
+            if max_length and len(value) > max_length:
+                row.errors.append(f'{column} must be at most {max_length} characters')
+                return
+        row.values[field_name] = value
+
+    def _load_existing(self, project_ids):
+        groups, projects = {}, {}
+        for start in range(0, len(project_ids), self.batch_size):
+            chunk = project_ids[start:start + self.batch_size]
+            groups.update((g.project_id, g) for g in ProjectGroup.objects.filter(project_id__in=chunk))
+            projects.update((p.project_id, p) for p in Project.objects.filter(project_id__in=chunk))
+        return groups, projects
+
+    def _resolve_students(self, rows):
+        """Map student codes to user ids, warning about unknown codes."""
+        from students.models import Student
+
+        codes = sorted({code for row in rows for code in row.student_codes})
+        student_users = {}
+        for start in range(0, len(codes), self.batch_size):
+            student_users.update(
+                Student.objects.filter(student_id__in=codes[start:start + self.batch_size])
+                .values_list('student_id', 'user_id')
+            )
+        for row in rows:
+            unknown = [code for code in row.student_codes if code not in student_users]
+            if unknown:
+                row.warnings.append(f'Unknown student IDs: {", ".join(unknown)}')
+        return student_users
+
+    def _diff(self, rows, groups, projects):
+        new_groups, changed_groups, new_projects, changed_projects = [], {}, [], {}
+        for row in rows:
+            group = groups.get(row.project_id)
+            if group is None:
+                group = ProjectGroup(
+                    project_id=row.project_id,
+                    topic_lao=row.values.get('topic_lao', ''),
+                    topic_eng=row.values.get('topic_eng', ''),
+                    advisor_name=row.values.get('advisor_name', ''),
+                    status=row.values.get('status', ProjectStatus.PENDING),
+                    defense_date=row.values.get('defense_date'),
+                    defense_time=row.values.get('defense_time'),
+                    defense_room=row.values.get('defense_room'),
+                    final_grade=row.values.get('final_grade'),
+                )
+                new_groups.append(group)
+                row.action = 'create'
+                row.changes = sorted(row.values)
+            else:
+                changed = [name for name, value in row.values.items() if getattr(group, name) != value]
+                for name in changed:
+                    setattr(group, name, row.values[name])
+                if changed:
+                    changed_groups[group.pk] = group
+                    row.action = 'update'
+                    row.changes = sorted(changed)
+                else:
+                    row.action = 'unchanged'
+
+            title = row.values.get('topic_eng') or row.values.get('topic_lao')
+            project = projects.get(row.project_id)
+            if project is None:
+                if row.action == 'unchanged':
+                    row.action = 'update'
+                new_projects.append(Project(
+                    project_id=row.project_id,
+                    title=title or '',
+                    status=row.values.get('status', ProjectStatus.PENDING),
+                ))
+            else:
+                project_changed = False
+                if title and 'topic_eng' in row.values and project.title != title:
+                    project.title = title
+                    project_changed = True
+                if 'status' in row.values and project.status != row.values['status']:
+                    project.status = row.values['status']
+                    project_changed = True
+                if project_changed:
+                    changed_projects[project.pk] = project
+                    if row.action == 'unchanged':
+                        row.action = 'update'
+        return new_groups, list(changed_groups.values()), new_projects, list(changed_projects.values())
+
+    def _plan_links(self, rows, groups, student_users):
+        """Return ``{project_id: [user_id, ...]}`` of links that do not exist yet."""
+        existing = set()
+        group_ids = [groups[row.project_id].pk for row in rows if row.project_id in groups]
+        for start in range(0, len(group_ids), self.batch_size):
+            existing.update(
+                ProjectStudent.objects.filter(project_group_id__in=group_ids[start:start + self.batch_size])
+                .values_list('project_group__project_id', 'student_id')
+            )
+
+        links = {}
+        for row in rows:
+            user_ids = []
+            for code in row.student_codes:
+                user_id = student_users.get(code)
+                if user_id and (row.project_id, user_id) not in existing and user_id not in user_ids:
+                    user_ids.append(user_id)
+            if user_ids:
+                links[row.project_id] = user_ids
+                self.students_linked += len(user_ids)
+                if row.action == 'unchanged':
+                    row.action = 'update'
+                row.changes = sorted(set(row.changes) | {'students'})
+        return links
+
+    def _apply(self, rows, new_groups, changed_groups, new_projects, changed_projects, links):
+        now = timezone.now()
+        group_fields = sorted(set(GROUP_COLUMNS.values()) | {'updated_at'})
+        for obj in changed_groups + changed_projects:
+            obj.updated_at = now
+
+        with transaction.atomic():
+            ProjectGroup.objects.bulk_create(new_groups, batch_size=self.batch_size)
+            ProjectGroup.objects.bulk_update(changed_groups, group_fields, batch_size=self.batch_size)
+            Project.objects.bulk_create(new_projects, batch_size=self.batch_size)
+            Project.objects.bulk_update(changed_projects, ['title', 'status', 'updated_at'], batch_size=self.batch_size)
+
+            if links:
+                # Re-read ids: not every backend returns primary keys from bulk_create
+                linked_ids = list(links)
+                group_pks = {}
+                for start in range(0, len(linked_ids), self.batch_size):
+                    group_pks.update(
+                        ProjectGroup.objects.filter(project_id__in=linked_ids[start:start + self.batch_size])
+                        .values_list('project_id', 'pk')
+                    )
+                primary_groups = set(
+                    ProjectStudent.objects.filter(project_group_id__in=group_pks.values(), is_primary=True)
+                    .values_list('project_group_id', flat=True)
+                )
+                new_links = []
+                for project_id, user_ids in links.items():
+                    group_pk = group_pks[project_id]
+                    for index, user_id in enumerate(user_ids):
+                        new_links.append(ProjectStudent(
+                            project_group_id=group_pk,
+                            student_id=user_id,
+                            is_primary=index == 0 and group_pk not in primary_groups,
+                        ))
+                ProjectStudent.objects.bulk_create(new_links, batch_size=self.batch_size, ignore_conflicts=True)
+
+        touched = [row.project_id for row in rows if row.action in ('create', 'update')]
+        for start in range(0, len(touched), self.batch_size):
+            safe_refresh_project_summaries(touched[start:start + self.batch_size])
+
+    def report(self):
+        counts = {'create': 0, 'update': 0, 'unchanged': 0, 'skip': 0}
+        for row in self.rows:
+            counts[row.action] += 1
+        return {
+            'dry_run': self.dry_run,
+            'total_rows': len(self.rows),
+            'created': counts['create'],
+            'updated': counts['update'],
+            'unchanged': counts['unchanged'],
+            'failed': counts['skip'],
+            'students_linked': self.students_linked,
+            'rows': [row.to_dict() for row in self.rows],
+        }
+
+
+def import_projects(file, academic_year=None, user=None, dry_run=False):
+    """Import a project CSV and return the per-row report."""
+    return ProjectCSVImporter(academic_year=academic_year, user=user, dry_run=dry_run).run(file)
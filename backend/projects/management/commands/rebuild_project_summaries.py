@@ -0,0 +1,43 @@
+"""
+Management command to rebuild the ProjectSummary read model
+Usage: python manage.py rebuild_project_summaries [--project-id=2024-2025-P001] [--search-index]
+"""
+from django.core.management.base import BaseCommand
+from projects.read_model import rebuild_all_project_summaries, refresh_project_summaries
+from projects.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized project summary rows from Project/ProjectGroup data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project-id',
+            action='append',
+            dest='project_ids',
+            default=[],
+            help='Only rebuild these project IDs (may be repeated)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of projects refreshed per batch (default: 500)',
+        )
+        parser.add_argument(
+            '--search-index',
+            action='store_true',
+            help='Also recreate the project full-text search index from scratch',
+        )
+
+    def handle(self, *args, **options):
+        project_ids = options['project_ids']
+        if project_ids:
+            written = refresh_project_summaries(project_ids)
+        else:
+            written = rebuild_all_project_summaries(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} project summaries"))
+
+        if options['search_index']:
+            rebuild_search_index(chunk_size=options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS("Rebuilt project search index"))
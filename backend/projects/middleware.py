@@ -5,7 +5,6 @@ Project-specific middleware for project management and tracking.
 import logging
 from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
-from django.utils import timezone
 from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
@@ -74,7 +73,10 @@ class ProjectActivityMiddleware(MiddlewareMixin):
     def track_project_activity(self, request):
         """Track project activity for analytics."""
         try:
-            from analytics.models import AnalyticsMetric
+            from accounts.activity import get_activity_counters, get_activity_settings
+
+            if not get_activity_settings()['ENABLED']:
+                return
             
             # Extract project ID from URL
             path_parts = request.path.split('/')
@@ -82,17 +84,9 @@ class ProjectActivityMiddleware(MiddlewareMixin):
             if len(path_parts) >= 4 and path_parts[3].isdigit():
                 project_id = int(path_parts[3])
             
-            AnalyticsMetric.objects.create(
-                metric_name='project_activity',
-                value=1,
-                recorded_at=timezone.now(),
-                description={
-                    'path': request.path,
-                    'method': request.method,
-                    'user_id': request.user.id,
-                    'user_role': request.user.role,
-                    'project_id': project_id,
-                }
+            # Counted per minute and written as rolled-up rows by accounts.activity
+            get_activity_counters().increment(
+                'project_activity', request.user, request.path, request.method, project_id=project_id,
             )
         except Exception as e:
             logger.warning(f"Could not track project activity: {e}")
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.7 on 2026-10-17 01:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('advisors', '0002_advisor_employee_id_advisor_max_students_and_more'),
+        ('projects', '0003_logentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project_id', models.CharField(max_length=50, unique=True)),
+                ('academic_year', models.CharField(blank=True, default='', max_length=20)),
+                ('title', models.CharField(blank=True, default='', max_length=500)),
+                ('topic_lao', models.CharField(blank=True, default='', max_length=500)),
+                ('topic_eng', models.CharField(blank=True, default='', max_length=500)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Approved', 'Approved'), ('Rejected', 'Rejected')], default='Pending', max_length=20)),
+                ('advisor_name', models.CharField(blank=True, default='', max_length=200)),
+                ('main_committee_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('second_committee_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('third_committee_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('defense_date', models.DateField(blank=True, null=True)),
+                ('defense_time', models.TimeField(blank=True, null=True)),
+                ('defense_room', models.CharField(blank=True, max_length=100, null=True)),
+                ('final_grade', models.CharField(blank=True, max_length=10, null=True)),
+                ('final_score', models.FloatField(blank=True, null=True)),
+                ('student_ids', models.TextField(blank=True, default='')),
+                ('student_names', models.TextField(blank=True, default='')),
+                ('student_count', models.IntegerField(default=0)),
+                ('milestone_count', models.IntegerField(default=0)),
+                ('pending_milestone_count', models.IntegerField(default=0)),
+                ('overdue_milestone_count', models.IntegerField(default=0)),
+                ('last_activity_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('advisor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='project_summaries', to='advisors.advisor')),
+                ('legacy_project', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='summary', to='projects.project')),
+                ('project_group', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='summary', to='projects.projectgroup')),
+            ],
+            options={
+                'verbose_name': 'Project Summary',
+                'verbose_name_plural': 'Project Summaries',
+                'db_table': 'project_summaries',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['academic_year', 'status'], name='project_sum_academi_6cfdc5_idx'), models.Index(fields=['status', 'created_at'], name='project_sum_status_dae040_idx'), models.Index(fields=['advisor_name'], name='project_sum_advisor_8b9e8a_idx'), models.Index(fields=['defense_date'], name='project_sum_defense_b58df3_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-17 02:10
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """Create the vendor specific project search table and index existing summaries."""
+    from projects.search import get_search_backend
+
+    backend = get_search_backend(schema_editor.connection)
+    backend.create_index()
+
+    ProjectSummary = apps.get_model('projects', 'ProjectSummary')
+    backend.index(ProjectSummary.objects.using(schema_editor.connection.alias).all())
+
+
+def drop_search_index(apps, schema_editor):
+    from projects.search import get_search_backend
+
+    get_search_backend(schema_editor.connection).drop_index()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_projectsummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
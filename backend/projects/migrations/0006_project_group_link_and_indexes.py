@@ -0,0 +1,82 @@
+# Generated by Django 5.0.7 on 2026-10-17 02:54
+
+import logging
+
+import django.db.models.deletion
+from django.db import DatabaseError, migrations, models, transaction
+from django.db.models import OuterRef, Subquery
+
+logger = logging.getLogger(__name__)
+
+ADVISOR_NAME_TRGM_INDEX = 'project_groups_advisor_name_trgm'
+
+
+def link_project_groups(apps, schema_editor):
+    """Point every Project at the ProjectGroup with the same project_id, in one UPDATE."""
+    Project = apps.get_model('projects', 'Project')
+    ProjectGroup = apps.get_model('projects', 'ProjectGroup')
+    alias = schema_editor.connection.alias
+    group_pk = ProjectGroup.objects.using(alias).filter(project_id=OuterRef('project_id')).values('pk')[:1]
+    Project.objects.using(alias).filter(project_group__isnull=True).update(project_group=Subquery(group_pk))
+
+
+def create_advisor_name_trigram_index(apps, schema_editor):
+    """
+    Trigram index for advisor_name__icontains (UPPER(advisor_name) LIKE ...) on PostgreSQL.
+
+    Needs the pg_trgm extension; when it can't be created the plain index is all there is.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {ADVISOR_NAME_TRGM_INDEX} '
+                'ON project_groups USING gin (UPPER(advisor_name) gin_trgm_ops)'
+            )
+    except DatabaseError as e:
+        logger.warning(f"Skipping trigram index on project_groups.advisor_name: {e}")
+
+
+def drop_advisor_name_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {ADVISOR_NAME_TRGM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_project_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='project_group',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='legacy_project', to='projects.projectgroup'),
+        ),
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['status', '-created_at'], name='project_gro_status_1fa63a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['main_committee_id'], name='project_gro_main_co_b8d6d4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['second_committee_id'], name='project_gro_second__dd5701_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['third_committee_id'], name='project_gro_third_c_ed09d1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['advisor_name'], name='project_gro_advisor_8af01b_idx'),
+        ),
+        migrations.RunPython(link_project_groups, migrations.RunPython.noop),
+        migrations.RunPython(create_advisor_name_trigram_index, drop_advisor_name_trigram_index),
+    ]
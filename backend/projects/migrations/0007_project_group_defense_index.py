@@ -0,0 +1,17 @@
+# Generated by Django 5.0.7 on 2026-10-17 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_project_group_link_and_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['defense_date', 'defense_time'], name='project_gro_defense_06561b_idx'),
+        ),
+    ]
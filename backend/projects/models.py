@@ -52,7 +52,16 @@ class ProjectGroup(models.Model):
         verbose_name = 'Project Group'
         verbose_name_plural = 'Project Groups'
         ordering = ['-created_at']
-    
+        indexes = [
+            models.Index(fields=['status', '-created_at']),
+            models.Index(fields=['main_committee_id']),
+            models.Index(fields=['second_committee_id']),
+            models.Index(fields=['third_committee_id']),
+            # advisor_name__icontains also gets a trigram index on PostgreSQL (migration 0006)
+            models.Index(fields=['advisor_name']),
+            models.Index(fields=['defense_date', 'defense_time']),
+        ]
+
     def __str__(self):
         return f"{self.project_id} - {self.topic_eng[:50]}"
 
@@ -66,6 +75,11 @@ class Project(models.Model):
     description = models.TextField(blank=True, null=True)
     status = models.CharField(max_length=20, choices=ProjectStatus.choices, default=ProjectStatus.PENDING)
     advisor = models.ForeignKey(Advisor, on_delete=models.SET_NULL, null=True, blank=True, related_name='projects')
+    # The ProjectGroup with the same project_id; linked on save, when the group is
+    # created (projects.signals) and by projects.read_model for bulk writes
+    project_group = models.OneToOneField(
+        ProjectGroup, on_delete=models.SET_NULL, null=True, blank=True, related_name='legacy_project'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -77,6 +91,12 @@ class Project(models.Model):
 
     def __str__(self):
         return self.project_id
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self.project_group_id is None and (update_fields is None or 'project_group' in update_fields):
+            self.project_group = ProjectGroup.objects.filter(project_id=self.project_id).first()
+        super().save(*args, **kwargs)
     
     # Helper methods for serializer compatibility
     def get_student_names(self):
@@ -93,30 +113,12 @@ class Project(models.Model):
     
     def get_committee_members(self):
         """Get committee members."""
+        from committees.membership import committee_members_for
         try:
             project_group = ProjectGroup.objects.get(project_id=self.project_id)
-            members = {}
-            if project_group.main_committee_id:
-                try:
-                    advisor = Advisor.objects.get(advisor_id=project_group.main_committee_id)
-                    members['main'] = advisor
-                except:
-                    pass
-            if project_group.second_committee_id:
-                try:
-                    advisor = Advisor.objects.get(advisor_id=project_group.second_committee_id)
-                    members['second'] = advisor
-                except:
-                    pass
-            if project_group.third_committee_id:
-                try:
-                    advisor = Advisor.objects.get(advisor_id=project_group.third_committee_id)
-                    members['third'] = advisor
-                except:
-                    pass
-            return members
-        except:
+        except ProjectGroup.DoesNotExist:
             return {}
+        return committee_members_for([project_group]).get(project_group.pk, {})
     
     def get_milestones(self):
         """Get milestones for this project."""
@@ -337,4 +339,73 @@ class LogEntry(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.project.project_id} - {self.type} by {self.author_id}"
\ No newline at end of file
+        return f"{self.project.project_id} - {self.type} by {self.author_id}"
+
+
+class ProjectSummary(models.Model):
+    """
+    Denormalized read model with one flattened row per project.
+
+    Combines the legacy ``Project`` row, its ``ProjectGroup``, students,
+    milestone counts and latest log activity so list, export and dashboard
+    reads need no cross-model join. Kept in sync by ``projects.read_model``.
+    """
+
+    project_id = models.CharField(max_length=50, unique=True)
+    legacy_project = models.OneToOneField(Project, on_delete=models.SET_NULL, null=True, blank=True, related_name='summary')
+    project_group = models.OneToOneField(ProjectGroup, on_delete=models.SET_NULL, null=True, blank=True, related_name='summary')
+    academic_year = models.CharField(max_length=20, blank=True, default='')
+
+    title = models.CharField(max_length=500, blank=True, default='')
+    topic_lao = models.CharField(max_length=500, blank=True, default='')
+    topic_eng = models.CharField(max_length=500, blank=True, default='')
+    status = models.CharField(max_length=20, choices=ProjectStatus.choices, default=ProjectStatus.PENDING)
+
+    # Supervision and committee
+    advisor = models.ForeignKey(Advisor, on_delete=models.SET_NULL, null=True, blank=True, related_name='project_summaries')
+    advisor_name = models.CharField(max_length=200, blank=True, default='')
+    main_committee_id = models.CharField(max_length=50, blank=True, null=True)
+    second_committee_id = models.CharField(max_length=50, blank=True, null=True)
+    third_committee_id = models.CharField(max_length=50, blank=True, null=True)
+
+    # Defense and scoring
+    defense_date = models.DateField(blank=True, null=True)
+    defense_time = models.TimeField(blank=True, null=True)
+    defense_room = models.CharField(max_length=100, blank=True, null=True)
+    final_grade = models.CharField(max_length=10, blank=True, null=True)
+    final_score = models.FloatField(blank=True, null=True)
+
+    # Students (comma separated, in ProjectStudent order)
+    student_ids = models.TextField(blank=True, default='')
+    student_names = models.TextField(blank=True, default='')
+    student_count = models.IntegerField(default=0)
+
+    # Milestones and activity
+    milestone_count = models.IntegerField(default=0)
+    pending_milestone_count = models.IntegerField(default=0)
+    overdue_milestone_count = models.IntegerField(default=0)
+    last_activity_at = models.DateTimeField(blank=True, null=True)
+
+    # Timestamps of the source project, plus when this row was rebuilt
+    created_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(blank=True, null=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'project_summaries'
+        verbose_name = 'Project Summary'
+        verbose_name_plural = 'Project Summaries'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['academic_year', 'status']),
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['advisor_name']),
+            models.Index(fields=['defense_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} - {self.topic_eng[:50]}"
+
+    @property
+    def is_scheduled(self):
+        return bool(self.defense_date and self.defense_time)
@@ -0,0 +1,268 @@
+"""
+Maintenance of the denormalized ``ProjectSummary`` read model.
+
+Saves and deletes of ``Project``, ``ProjectGroup`` and the rows a summary
+flattens (students, milestones, log entries) are caught by signals, wherever
+they are made, and the affected ``project_id`` values are refreshed once per
+transaction, on commit. Write paths that bypass signals (bulk operations, the
+CSV importer, ``QuerySet.update()``) call ``refresh_project_summaries``
+themselves. Refreshing is set-based: a fixed number of queries per call
+regardless of how many projects are passed. The project search index
+(``projects.search``) is updated from the same rows.
+"""
+
+import logging
+import threading
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# IDs already refreshed by the on-commit callbacks of the last commit, per thread
+_committed = threading.local()
+
+SUMMARY_FIELDS = [
+    'legacy_project', 'project_group', 'academic_year', 'title', 'topic_lao', 'topic_eng',
+    'status', 'advisor', 'advisor_name', 'main_committee_id', 'second_committee_id',
+    'third_committee_id', 'defense_date', 'defense_time', 'defense_room',
+    'final_grade', 'final_score', 'student_ids', 'student_names', 'student_count',
+    'milestone_count', 'pending_milestone_count', 'overdue_milestone_count',
+    'last_activity_at', 'created_at', 'updated_at', 'refreshed_at',
+]
+
+
+def academic_year_from_project_id(project_id):
+    """Project IDs are prefixed with the academic year, e.g. ``2024-2025-P001``."""
+    parts = (project_id or '').split('-')
+    if len(parts) >= 2 and parts[0].isdigit() and parts[1].isdigit():
+        return f"{parts[0]}-{parts[1]}"
+    return ''
+
+
+def compute_final_score(group):
+    """Average of the recorded advisor/committee scores, or ``None``."""
+    scores = [s for s in [
+        group.main_advisor_score,
+        group.main_committee_score,
+        group.second_committee_score,
+        group.third_committee_score,
+    ] if s is not None]
+    return sum(scores) / len(scores) if scores else None
+
+
+def refresh_project_summaries(project_ids):
+    """
+    Rebuild the summary rows for ``project_ids``.
+
+    Rows whose ``Project`` and ``ProjectGroup`` have both been deleted are removed.
+    Returns the number of summaries written.
+    """
+    from milestones.models import Milestone
+    from .models import LogEntry, Project, ProjectGroup, ProjectStudent, ProjectSummary
+    from .search import index_summaries
+
+    project_ids = {pid for pid in project_ids if pid}
+    if not project_ids:
+        return 0
+
+    projects = {
+        p.project_id: p
+        for p in Project.objects.select_related('advisor__user').filter(project_id__in=project_ids)
+    }
+    groups = {g.project_id: g for g in ProjectGroup.objects.filter(project_id__in=project_ids)}
+    group_ids = [g.pk for g in groups.values()]
+
+    students = defaultdict(list)
+    milestones = {}
+    activity = {}
+    if group_ids:
+        for ps in (ProjectStudent.objects.select_related('student__student_profile')
+                   .filter(project_group_id__in=group_ids).order_by('-is_primary', 'joined_at')):
+            students[ps.project_group_id].append(ps.student)
+
+        today = timezone.now().date()
+        milestones = {
+            row['project_group_id']: row
+            for row in Milestone.objects.filter(project_group_id__in=group_ids)
+            .values('project_group_id')
+            .annotate(
+                total=Count('id'),
+                pending=Count('id', filter=Q(status='Pending')),
+                overdue=Count('id', filter=Q(status='Pending', due_date__lt=today)),
+            )
+        }
+        activity = dict(
+            LogEntry.objects.filter(project_id__in=group_ids)
+            .values('project_id')
+            .annotate(last=Max('created_at'))
+            .values_list('project_id', 'last')
+        )
+
+    # Bulk writes (bulk_create of groups) bypass the save-time Project -> ProjectGroup link
+    unlinked = []
+    for project_id, project in projects.items():
+        group = groups.get(project_id)
+        if group is not None and project.project_group_id != group.pk:
+            project.project_group = group
+            unlinked.append(project)
+
+    existing = {s.project_id: s for s in ProjectSummary.objects.filter(project_id__in=project_ids)}
+    now = timezone.now()
+    to_create, to_update, stale = [], [], []
+
+    for project_id in project_ids:
+        project = projects.get(project_id)
+        group = groups.get(project_id)
+        if project is None and group is None:
+            if project_id in existing:
+                stale.append(project_id)
+            continue
+
+        summary = existing.get(project_id) or ProjectSummary(project_id=project_id)
+        _populate(summary, project, group, students, milestones, activity)
+        summary.refreshed_at = now
+        if summary.pk:
+            to_update.append(summary)
+        else:
+            to_create.append(summary)
+
+    with transaction.atomic():
+        if unlinked:
+            Project.objects.bulk_update(unlinked, ['project_group'], batch_size=500)
+        if stale:
+            ProjectSummary.objects.filter(project_id__in=stale).delete()
+        if to_update:
+            ProjectSummary.objects.bulk_update(to_update, SUMMARY_FIELDS, batch_size=500)
+        if to_create:
+            ProjectSummary.objects.bulk_create(to_create, batch_size=500)
+        index_summaries(to_create + to_update, removed_ids=stale)
+
+    # Bulk write paths bypass the model signals that invalidate cached statistics
+    from .statistics import invalidate_project_statistics
+    invalidate_project_statistics(project_ids)
+
+    return len(to_create) + len(to_update)
+
+
+def refresh_project_summary(project_id):
+    """Rebuild the summary row for a single project."""
+    return refresh_project_summaries([project_id])
+
+
+def safe_refresh_project_summaries(project_ids):
+    """Refresh summaries without letting a read-model failure break the write."""
+    try:
+        return refresh_project_summaries(project_ids)
+    except Exception as e:
+        logger.error(f"Error refreshing project summaries: {e}")
+        return 0
+
+
+def refresh_project_summaries_on_commit(project_ids, using=None):
+    """
+    Refresh the summaries of ``project_ids`` once the current transaction commits.
+
+    Each call queues its own on-commit callback holding its own IDs, so IDs
+    queued inside a transaction or savepoint that rolls back are dropped with
+    it. When the callbacks of one commit run, IDs an earlier callback already
+    refreshed are skipped, so a write that touches a project several times
+    refreshes it once. Outside a transaction they are refreshed right away.
+    """
+    project_ids = {pid for pid in project_ids if pid}
+    if not project_ids:
+        return
+    using = using or DEFAULT_DB_ALIAS
+    if not transaction.get_connection(using).in_atomic_block:
+        safe_refresh_project_summaries(project_ids)
+        return
+    # Queuing happens inside a transaction, so the callbacks of any earlier
+    # commit on this thread have finished running.
+    _committed_project_ids(using).clear()
+    transaction.on_commit(lambda: _refresh_committed_project_summaries(project_ids, using), using=using)
+
+
+def _committed_project_ids(using):
+    if not hasattr(_committed, 'project_ids'):
+        _committed.project_ids = defaultdict(set)
+    return _committed.project_ids[using]
+
+
+def _refresh_committed_project_summaries(project_ids, using):
+    refreshed = _committed_project_ids(using)
+    project_ids = project_ids - refreshed
+    if project_ids:
+        refreshed.update(project_ids)
+        safe_refresh_project_summaries(project_ids)
+
+
+def rebuild_all_project_summaries(chunk_size=500):
+    """Rebuild every summary row; returns the number written."""
+    from .models import Project, ProjectGroup, ProjectSummary
+
+    project_ids = set(Project.objects.values_list('project_id', flat=True))
+    project_ids.update(ProjectGroup.objects.values_list('project_id', flat=True))
+    project_ids.update(ProjectSummary.objects.values_list('project_id', flat=True))
+
+    ordered = sorted(project_ids)
+    written = 0
+    for start in range(0, len(ordered), chunk_size):
+        written += refresh_project_summaries(ordered[start:start + chunk_size])
+    return written
+
+
+def _populate(summary, project, group, students, milestones, activity):
+    summary.legacy_project = project
+    summary.project_group = group
+    summary.academic_year = academic_year_from_project_id(summary.project_id)
+    summary.title = project.title if project else (group.topic_eng if group else '')
+    summary.advisor = project.advisor if project else None
+    summary.created_at = (project or group).created_at
+    summary.updated_at = max(obj.updated_at for obj in (project, group) if obj is not None)
+
+    if group is not None:
+        summary.topic_lao = group.topic_lao or ''
+        summary.topic_eng = group.topic_eng or ''
+        summary.status = group.status or (project.status if project else summary.status)
+        summary.advisor_name = group.advisor_name or ''
+        summary.main_committee_id = group.main_committee_id
+        summary.second_committee_id = group.second_committee_id
+        summary.third_committee_id = group.third_committee_id
+        summary.defense_date = group.defense_date
+        summary.defense_time = group.defense_time
+        summary.defense_room = group.defense_room
+        summary.final_grade = group.final_grade
+        summary.final_score = compute_final_score(group)
+
+        members = students.get(group.pk, [])
+        summary.student_ids = ', '.join(student_code(user) for user in members)
+        summary.student_names = ', '.join(user.get_full_name() or user.username for user in members)
+        summary.student_count = len(members)
+
+        counts = milestones.get(group.pk, {})
+        summary.milestone_count = counts.get('total', 0)
+        summary.pending_milestone_count = counts.get('pending', 0)
+        summary.overdue_milestone_count = counts.get('overdue', 0)
+        summary.last_activity_at = activity.get(group.pk)
+    else:
+        summary.topic_lao = ''
+        summary.topic_eng = project.title or ''
+        summary.status = project.status
+        summary.advisor_name = ''
+        if project.advisor and hasattr(project.advisor, 'user'):
+            summary.advisor_name = project.advisor.user.get_full_name() or project.advisor.user.username
+        for field in ('main_committee_id', 'second_committee_id', 'third_committee_id',
+                      'defense_date', 'defense_time', 'defense_room', 'final_grade',
+                      'final_score', 'last_activity_at'):
+            setattr(summary, field, None)
+        summary.student_ids = summary.student_names = ''
+        summary.student_count = 0
+        summary.milestone_count = summary.pending_milestone_count = summary.overdue_milestone_count = 0
+
+
+def student_code(user):
+    """Student ID from the user's Student profile, falling back to the user id."""
+    profile = getattr(user, 'student_profile', None)
+    return profile.student_id if profile else str(user.id)
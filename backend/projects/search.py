@@ -0,0 +1,397 @@
+"""
+Full-text search index for projects.
+
+Documents are built from ``ProjectSummary`` rows (project ID, Lao and English
+topics, advisor name, student IDs and names) and stored in the
+``project_search_index`` table, whose layout depends on the database:
+
+* PostgreSQL: a weighted ``tsvector`` column with a GIN index for prefix
+  matching and a ``pg_trgm`` GIN index over the raw text for fuzzy matching.
+* SQLite: an FTS5 virtual table ranked with ``bm25``; fuzzy matching expands
+  unknown terms against the index vocabulary.
+
+Other databases fall back to ``icontains`` lookups on ``ProjectSummary``.
+The index is updated incrementally by ``refresh_project_summaries``.
+"""
+
+import difflib
+import logging
+import math
+import re
+
+from django.db import DatabaseError, transaction
+from django.db import connection as default_connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'project_search_index'
+
+# Characters that carry meaning in tsquery/FTS5 query syntax
+QUERY_SPLIT_RE = re.compile(r'[\s,;:!?()\[\]{}<>&|"\'*^+~@\\/]+')
+
+
+def tokenize_query(query):
+    """Split a user query into search terms."""
+    return [token.lower() for token in QUERY_SPLIT_RE.split(query or '') if token]
+
+
+def summary_document(summary):
+    """Return the (primary, students, advisor) text fields for a summary."""
+    primary = ' '.join(filter(None, [summary.project_id, summary.topic_lao, summary.topic_eng]))
+    students = ' '.join(filter(None, [summary.student_ids, summary.student_names]))
+    return primary, students, summary.advisor_name or ''
+
+
+class BaseSearchBackend:
+    """Interface shared by the vendor specific search backends."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def create_index(self):
+        raise NotImplementedError
+
+    def drop_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def index(self, summaries):
+        raise NotImplementedError
+
+    def remove(self, project_ids):
+        project_ids = list(project_ids)
+        if not project_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(project_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE project_id IN ({placeholders})', project_ids
+            )
+
+    def search(self, query, limit=None):
+        """Return ``[(project_id, score), ...]`` ordered by relevance."""
+        raise NotImplementedError
+
+    def filter_queryset(self, queryset, query):
+        """
+        Join ``queryset`` to the index rows matching ``query``.
+
+        Rows are annotated with ``search_rank`` (lower is more relevant). The
+        match and the rank stay in SQL, so later filters, counts and pages
+        never send the matching IDs back to the database.
+        """
+        raise NotImplementedError
+
+    def _join(self, queryset, match_sql, match_params, rank_sql, rank_params):
+        qn = self.connection.ops.quote_name
+        return queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[f'{qn(SEARCH_TABLE)}.project_id = {qn(queryset.model._meta.db_table)}.project_id', match_sql],
+            params=match_params,
+        ).annotate(search_rank=RawSQL(rank_sql, rank_params, output_field=FloatField()))
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """tsvector for ranked prefix search plus pg_trgm for typo tolerance."""
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self._has_trigram = None
+
+    def has_trigram(self):
+        if self._has_trigram is None:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                self._has_trigram = cursor.fetchone() is not None
+        return self._has_trigram
+
+    def create_index(self):
+        with self.connection.cursor() as cursor:
+            try:
+                with transaction.atomic(using=self.connection.alias):
+                    cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            except DatabaseError as e:
+                logger.warning(f"pg_trgm unavailable, fuzzy project search disabled: {e}")
+
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+                    project_id varchar(50) PRIMARY KEY,
+                    document text NOT NULL,
+                    search_vector tsvector NOT NULL
+                )
+            """)
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_vector_idx '
+                f'ON {SEARCH_TABLE} USING GIN (search_vector)'
+            )
+            self._has_trigram = None
+            if self.has_trigram():
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_trgm_idx '
+                    f'ON {SEARCH_TABLE} USING GIN (document gin_trgm_ops)'
+                )
+
+    def index(self, summaries):
+        rows = []
+        for summary in summaries:
+            primary, students, advisor = summary_document(summary)
+            rows.append((
+                summary.project_id, ' '.join(filter(None, [primary, students, advisor])),
+                primary, students, advisor,
+            ))
+        if not rows:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.executemany(f"""
+                INSERT INTO {SEARCH_TABLE} (project_id, document, search_vector)
+                VALUES (
+                    %s, lower(%s),
+                    setweight(to_tsvector('simple', %s), 'A') ||
+                    setweight(to_tsvector('simple', %s), 'B') ||
+                    setweight(to_tsvector('simple', %s), 'C')
+                )
+                ON CONFLICT (project_id) DO UPDATE
+                SET document = EXCLUDED.document, search_vector = EXCLUDED.search_vector
+            """, rows)
+
+    def _score_sql(self, tokens):
+        """``(score, score params, match, match params)`` SQL for ``tokens``."""
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        text = ' '.join(tokens)
+        score = f"ts_rank({SEARCH_TABLE}.search_vector, to_tsquery('simple', %s))"
+        match = f"{SEARCH_TABLE}.search_vector @@ to_tsquery('simple', %s)"
+        if not self.has_trigram():
+            return score, [tsquery], match, [tsquery]
+        return (
+            f'{score} + word_similarity(%s, {SEARCH_TABLE}.document)', [tsquery, text],
+            f'({match} OR %s <%% {SEARCH_TABLE}.document)', [tsquery, text],
+        )
+
+    def search(self, query, limit=None):
+        tokens = tokenize_query(query)
+        if not tokens:
+            return []
+        score, score_params, match, match_params = self._score_sql(tokens)
+        sql = f"""
+            SELECT project_id, {score} AS score
+            FROM {SEARCH_TABLE}
+            WHERE {match}
+            ORDER BY score DESC, project_id
+        """
+        params = score_params + match_params
+        if limit:
+            sql += ' LIMIT %s'
+            params.append(limit)
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(row[0], float(row[1])) for row in cursor.fetchall()]
+
+    def filter_queryset(self, queryset, query):
+        tokens = tokenize_query(query)
+        if not tokens:
+            return queryset.none()
+        score, score_params, match, match_params = self._score_sql(tokens)
+        # real -> double precision, so cursor values compare exactly against the rank
+        return self._join(queryset, match, match_params, f'-CAST({score} AS double precision)', score_params)
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """FTS5 table with prefix indexes and vocabulary based fuzzy expansion."""
+
+    # bm25 column weights: project_id (unindexed), primary, students, advisor
+    BM25_WEIGHTS = (0.0, 10.0, 5.0, 2.0)
+    FUZZY_CUTOFF = 0.75
+
+    def create_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+                    project_id UNINDEXED, primary_text, student_text, advisor_text,
+                    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+                )
+            """)
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE}_vocab '
+                f'USING fts5vocab({SEARCH_TABLE}, row)'
+            )
+
+    def drop_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}_vocab')
+        super().drop_index()
+
+    def index(self, summaries):
+        summaries = list(summaries)
+        if not summaries:
+            return
+        self.remove(s.project_id for s in summaries)
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (project_id, primary_text, student_text, advisor_text) '
+                f'VALUES (%s, %s, %s, %s)',
+                [(s.project_id, *summary_document(s)) for s in summaries]
+            )
+
+    def _has_prefix(self, cursor, token):
+        cursor.execute(
+            f'SELECT 1 FROM {SEARCH_TABLE}_vocab WHERE term >= %s AND term < %s LIMIT 1',
+            [token, token + '\U0010ffff']
+        )
+        return cursor.fetchone() is not None
+
+    def _close_terms(self, cursor, token):
+        """
+        Vocabulary terms within ``FUZZY_CUTOFF`` of ``token``.
+
+        Candidates share the first character and a length from which the
+        cutoff is reachable (a ratio of 2 * matches / total length), both
+        narrowed in SQL by a range scan of the vocabulary.
+        """
+        shortest = math.ceil(len(token) * self.FUZZY_CUTOFF / (2 - self.FUZZY_CUTOFF))
+        longest = math.floor(len(token) * (2 - self.FUZZY_CUTOFF) / self.FUZZY_CUTOFF)
+        cursor.execute(
+            f'SELECT term FROM {SEARCH_TABLE}_vocab '
+            f'WHERE term >= %s AND term < %s AND length(term) BETWEEN %s AND %s',
+            [token[0], token[0] + '\U0010ffff', shortest, longest]
+        )
+        candidates = [row[0] for row in cursor.fetchall()]
+        return difflib.get_close_matches(token, candidates, n=3, cutoff=self.FUZZY_CUTOFF)
+
+    def _match_expression(self, cursor, tokens):
+        clauses = []
+        for token in tokens:
+            phrase = '"{}"'.format(token.replace('"', '""'))
+            alternatives = [f'{phrase}*']
+            # Only single-word terms can be corrected against the vocabulary
+            if re.fullmatch(r'\w+', token) and not self._has_prefix(cursor, token):
+                alternatives += ['"{}"'.format(term) for term in self._close_terms(cursor, token)]
+            clauses.append('(' + ' OR '.join(alternatives) + ')')
+        return ' AND '.join(clauses)
+
+    def search(self, query, limit=None):
+        tokens = tokenize_query(query)
+        if not tokens:
+            return []
+        weights = ', '.join(str(w) for w in self.BM25_WEIGHTS)
+        with self.connection.cursor() as cursor:
+            sql = (
+                f'SELECT project_id, bm25({SEARCH_TABLE}, {weights}) AS score '
+                f'FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+                f'ORDER BY score, project_id'
+            )
+            params = [self._match_expression(cursor, tokens)]
+            if limit:
+                sql += ' LIMIT %s'
+                params.append(limit)
+            cursor.execute(sql, params)
+            # bm25 is lower-is-better; flip the sign so higher means more relevant
+            return [(row[0], -row[1]) for row in cursor.fetchall()]
+
+    def filter_queryset(self, queryset, query):
+        tokens = tokenize_query(query)
+        if not tokens:
+            return queryset.none()
+        with self.connection.cursor() as cursor:
+            expression = self._match_expression(cursor, tokens)
+        weights = ', '.join(str(w) for w in self.BM25_WEIGHTS)
+        qn = self.connection.ops.quote_name
+        return self._join(queryset, f'{qn(SEARCH_TABLE)} MATCH %s', [expression], f'bm25({SEARCH_TABLE}, {weights})', [])
+
+
+class FallbackSearchBackend(BaseSearchBackend):
+    """Unindexed substring search over ``ProjectSummary`` for other databases."""
+
+    def create_index(self):
+        pass
+
+    def drop_index(self):
+        pass
+
+    def index(self, summaries):
+        pass
+
+    def remove(self, project_ids):
+        pass
+
+    def _condition(self, query):
+        condition = Q()
+        for token in tokenize_query(query):
+            condition &= (
+                Q(project_id__icontains=token) | Q(topic_lao__icontains=token) |
+                Q(topic_eng__icontains=token) | Q(advisor_name__icontains=token) |
+                Q(student_ids__icontains=token) | Q(student_names__icontains=token)
+            )
+        return condition
+
+    def search(self, query, limit=None):
+        from .models import ProjectSummary
+
+        condition = self._condition(query)
+        if not condition:
+            return []
+        project_ids = ProjectSummary.objects.filter(condition).order_by('project_id').values_list('project_id', flat=True)
+        if limit:
+            project_ids = project_ids[:limit]
+        return [(project_id, 1.0) for project_id in project_ids]
+
+    def filter_queryset(self, queryset, query):
+        from .models import ProjectSummary
+
+        condition = self._condition(query)
+        if not condition:
+            return queryset.none()
+        return queryset.filter(
+            project_id__in=ProjectSummary.objects.filter(condition).values('project_id')
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def get_search_backend(connection=None):
+    """Return the search backend for ``connection`` (default database if omitted)."""
+    connection = connection or default_connection
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend(connection)
+    if connection.vendor == 'sqlite':
+        return SQLiteSearchBackend(connection)
+    return FallbackSearchBackend(connection)
+
+
+def index_summaries(summaries, removed_ids=()):
+    """Apply summary writes and deletions to the search index."""
+    backend = get_search_backend()
+    backend.remove(removed_ids)
+    backend.index(summaries)
+
+
+def rebuild_search_index(chunk_size=500):
+    """Recreate the search index from every ``ProjectSummary`` row."""
+    from .models import ProjectSummary
+
+    backend = get_search_backend()
+    backend.drop_index()
+    backend.create_index()
+    batch = []
+    for summary in ProjectSummary.objects.order_by('pk').iterator(chunk_size=chunk_size):
+        batch.append(summary)
+        if len(batch) >= chunk_size:
+            backend.index(batch)
+            batch = []
+    backend.index(batch)
+
+
+def search_project_ids(query, limit=None):
+    """Return matching project IDs, most relevant first."""
+    return [project_id for project_id, _ in get_search_backend().search(query, limit=limit)]
+
+
+def search_projects(queryset, query):
+    """
+    Restrict a ``Project`` or ``ProjectGroup`` queryset to rows matching ``query``.
+
+    The result is joined to the search index in SQL and annotated with
+    ``search_rank`` (lower is more relevant) so callers can
+    ``order_by('search_rank')`` and paginate on it.
+    """
+    return get_search_backend().filter_queryset(queryset, query)
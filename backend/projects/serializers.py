@@ -3,18 +3,42 @@ Project management serializers
 """
 
 from rest_framework import serializers
-from django.db import transaction
-from .models import Project, ProjectGroup, ProjectStatus, ProjectStudent
+from django.db import models, transaction
+from .models import Project, ProjectGroup, ProjectStatus, ProjectStudent, ProjectSummary
 from students.models import Student
 from advisors.models import Advisor
 from milestones.models import Milestone, MilestoneTemplate
 from projects.models import LogEntry
+from core.fieldsets import SparseFieldsetMixin
 from core.utils import generate_project_id
+from .batching import ProjectBatch
+from .read_model import academic_year_from_project_id
+from .statistics import is_academic_year
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(serializers.ListSerializer):
+    """
+    List serializer that bulk-loads related rows for the whole page.
+
+    The ``ProjectBatch`` is placed in the shared context so every child
+    ``ProjectSerializer`` reads from it instead of querying per row.
+    """
+
+    def to_representation(self, data):
+        projects = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        parts = self.child.batch_parts()
+        batch = self.context.get('project_batch')
+        if batch is None or not all(batch.covers(p, parts) for p in projects):
+            self.context['project_batch'] = ProjectBatch.for_projects(projects, parts)
+        return super().to_representation(projects)
+
+
+class ProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Project serializer for CRUD operations
+
+    Supports ``?fields=``/``?omit=`` (see ``core.fieldsets``); only the
+    ``ProjectBatch`` parts the remaining fields use are loaded.
     """
     # Fields from ProjectGroup
     topic_lao = serializers.SerializerMethodField()
@@ -59,28 +83,66 @@ class ProjectSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'project_id', 'academic_year', 'created_at', 'updated_at']
-    
+        list_serializer_class = ProjectListSerializer
+
+    # ProjectBatch parts each field reads; fields not listed come from the Project row
+    field_batch_parts = {
+        **dict.fromkeys([
+            'topic_lao', 'topic_eng', 'advisor_name', 'comment', 'defense_date', 'defense_time',
+            'defense_room', 'final_grade', 'main_advisor_score', 'main_committee_score', 'second_committee_score',
+            'third_committee_score', 'detailed_scores', 'is_scheduled', 'final_score',
+        ], {'groups'}),
+        'main_committee': {'groups', 'committee'},
+        'second_committee': {'groups', 'committee'},
+        'third_committee': {'groups', 'committee'},
+        'committee_member_names': {'groups', 'committee'},
+        'student_names': {'groups', 'students'},
+        'student_count': {'groups', 'students'},
+        'milestone_count': {'groups', 'milestones'},
+        'pending_milestone_count': {'groups', 'milestones'},
+        'recent_activity': {'groups', 'activity'},
+    }
+    # advisor_name falls back to the advisor's user when the project has no group
+    select_related_fields = {'advisor_name': ['advisor__user']}
+
+    def batch_parts(self):
+        """``ProjectBatch`` parts needed by the selected fields."""
+        return frozenset().union(*(self.field_batch_parts.get(name, ()) for name in self.fields))
+
+    def _get_batch(self, obj):
+        """
+        Related rows for ``obj``.
+
+        List serialization preloads a ``ProjectBatch`` for the whole page into
+        the context (see ``ProjectListSerializer``); a single instance gets its
+        own batch so every getter below still shares one set of lookups.
+        """
+        parts = self.batch_parts()
+        batch = self.context.get('project_batch')
+        if batch is not None and batch.covers(obj, parts):
+            return batch
+        cached = getattr(self, '_instance_batch', None)
+        if cached is None or not cached.covers(obj, parts):
+            cached = ProjectBatch.for_projects([obj], parts)
+            self._instance_batch = cached
+        return cached
+
     def _get_project_group(self, obj):
         """Helper to get project group."""
-        try:
-            return ProjectGroup.objects.get(project_id=obj.project_id)
-        except:
-            return None
-    
+        return self._get_batch(obj).group_for(obj)
+
+    def _get_committee_pk(self, obj, role):
+        advisor = self._get_batch(obj).committee_members(obj).get(role)
+        return advisor.id if advisor else None
+
     def get_topic_lao(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            return pg.topic_lao if pg else ''
-        except Exception:
-            return ''
-    
+        pg = self._get_project_group(obj)
+        return pg.topic_lao if pg else ''
+
     def get_topic_eng(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            return pg.topic_eng if pg else (obj.title if hasattr(obj, 'title') else '')
-        except Exception:
-            return obj.title if hasattr(obj, 'title') else ''
-    
+        pg = self._get_project_group(obj)
+        return pg.topic_eng if pg else (obj.title if hasattr(obj, 'title') else '')
+
     def get_advisor_name(self, obj):
         try:
             pg = self._get_project_group(obj)
@@ -91,121 +153,64 @@ class ProjectSerializer(serializers.ModelSerializer):
             return ''
         except Exception:
             return ''
-    
+
     def get_comment(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            return pg.comment if pg else ''
-        except Exception:
-            return ''
-    
+        pg = self._get_project_group(obj)
+        return pg.comment if pg else ''
+
     def get_main_committee(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            if pg and pg.main_committee_id:
-                try:
-                    return Advisor.objects.get(advisor_id=pg.main_committee_id).id
-                except:
-                    pass
-        except Exception:
-            pass
-        return None
-    
+        return self._get_committee_pk(obj, 'main')
+
     def get_second_committee(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            if pg and pg.second_committee_id:
-                try:
-                    return Advisor.objects.get(advisor_id=pg.second_committee_id).id
-                except:
-                    pass
-        except Exception:
-            pass
-        return None
-    
+        return self._get_committee_pk(obj, 'second')
+
     def get_third_committee(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            if pg and pg.third_committee_id:
-                try:
-                    return Advisor.objects.get(advisor_id=pg.third_committee_id).id
-                except:
-                    pass
-        except Exception:
-            pass
-        return None
-    
+        return self._get_committee_pk(obj, 'third')
+
     def get_defense_date(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            return pg.defense_date if pg else None
-        except Exception:
-            return None
-    
+        pg = self._get_project_group(obj)
+        return pg.defense_date if pg else None
+
     def get_defense_time(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            return pg.defense_time if pg else None
-        except Exception:
-            return None
-    
+        pg = self._get_project_group(obj)
+        return pg.defense_time if pg else None
+
     def get_defense_room(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            return pg.defense_room if pg else None
-        except Exception:
-            return None
-    
+        pg = self._get_project_group(obj)
+        return pg.defense_room if pg else None
+
     def get_final_grade(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            return pg.final_grade if pg else None
-        except Exception:
-            return None
-    
+        pg = self._get_project_group(obj)
+        return pg.final_grade if pg else None
+
     def get_main_advisor_score(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            return pg.main_advisor_score if pg else None
-        except Exception:
-            return None
-    
+        pg = self._get_project_group(obj)
+        return pg.main_advisor_score if pg else None
+
     def get_main_committee_score(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            return pg.main_committee_score if pg else None
-        except Exception:
-            return None
-    
+        pg = self._get_project_group(obj)
+        return pg.main_committee_score if pg else None
+
     def get_second_committee_score(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            return pg.second_committee_score if pg else None
-        except Exception:
-            return None
-    
+        pg = self._get_project_group(obj)
+        return pg.second_committee_score if pg else None
+
     def get_third_committee_score(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            return pg.third_committee_score if pg else None
-        except Exception:
-            return None
-    
+        pg = self._get_project_group(obj)
+        return pg.third_committee_score if pg else None
+
     def get_detailed_scores(self, obj):
-        try:
-            pg = self._get_project_group(obj)
-            if pg:
-                return {
-                    'main_advisor': pg.main_advisor_score,
-                    'main_committee': pg.main_committee_score,
-                    'second_committee': pg.second_committee_score,
-                    'third_committee': pg.third_committee_score,
-                    'final_grade': pg.final_grade
-                }
-        except Exception:
-            pass
+        pg = self._get_project_group(obj)
+        if pg:
+            return {
+                'main_advisor': pg.main_advisor_score,
+                'main_committee': pg.main_committee_score,
+                'second_committee': pg.second_committee_score,
+                'third_committee': pg.third_committee_score,
+                'final_grade': pg.final_grade
+            }
         return {}
-    
+
     def get_academic_year(self, obj):
         # Try to extract from project_id or use default
         try:
@@ -218,55 +223,39 @@ class ProjectSerializer(serializers.ModelSerializer):
         return '2024-2025'
 
     def get_student_names(self, obj):
-        try:
-            return obj.get_student_names()
-        except:
-            return []
+        return [ps.student.get_full_name() for ps in self._get_batch(obj).students_for(obj)]
 
     def get_student_count(self, obj):
-        try:
-            project_group = ProjectGroup.objects.get(project_id=obj.project_id)
-            # Use ProjectStudent relationship
-            from projects.models import ProjectStudent
-            return ProjectStudent.objects.filter(project_group=project_group).count()
-        except ProjectGroup.DoesNotExist:
-            return 0
-        except Exception as e:
-            return 0
+        return len(self._get_batch(obj).students_for(obj))
 
     def get_committee_member_names(self, obj):
-        try:
-            members = obj.get_committee_members()
-            return {role: advisor.user.get_full_name() if hasattr(advisor, 'user') else str(advisor) for role, advisor in members.items()}
-        except:
-            return {}
+        members = self._get_batch(obj).committee_members(obj)
+        return {role: advisor.user.get_full_name() if hasattr(advisor, 'user') else str(advisor) for role, advisor in members.items()}
 
     def get_milestone_count(self, obj):
-        return obj.get_milestones().count()
+        return self._get_batch(obj).milestone_counts_for(obj)[0]
 
     def get_pending_milestone_count(self, obj):
-        return obj.get_pending_milestones().count()
+        return self._get_batch(obj).milestone_counts_for(obj)[1]
 
     def get_is_scheduled(self, obj):
-        return obj.is_scheduled()
+        pg = self._get_project_group(obj)
+        return bool(pg and pg.defense_date and pg.defense_time)
 
     def get_final_score(self, obj):
-        return obj.get_final_score()
+        pg = self._get_project_group(obj)
+        return pg.final_grade if pg else None
 
     def get_recent_activity(self, obj):
-        try:
-            recent_logs = obj.get_recent_activity(days=7)
-            return [
-                {
-                    'type': log.type,
-                    'author': str(log.author_id),
-                    'message': log.content if hasattr(log, 'content') else '',
-                    'timestamp': log.created_at
-                }
-                for log in recent_logs[:5]  # Last 5 activities
-            ]
-        except:
-            return []
+        return [
+            {
+                'type': log.type,
+                'author': str(log.author_id),
+                'message': log.content if hasattr(log, 'content') else '',
+                'timestamp': log.created_at
+            }
+            for log in self._get_batch(obj).recent_activity_for(obj)
+        ]
 
     def create(self, validated_data):
         """Create project with auto-generated project ID"""
@@ -289,6 +278,26 @@ class ProjectSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class ProjectSummarySerializer(serializers.ModelSerializer):
+    """
+    Flattened project row read from the ProjectSummary read model
+    """
+    is_scheduled = serializers.BooleanField(read_only=True)
+    
+    class Meta:
+        model = ProjectSummary
+        fields = [
+            'project_id', 'academic_year', 'title', 'topic_lao', 'topic_eng',
+            'status', 'advisor', 'advisor_name', 'main_committee_id',
+            'second_committee_id', 'third_committee_id', 'defense_date',
+            'defense_time', 'defense_room', 'is_scheduled', 'final_grade',
+            'final_score', 'student_ids', 'student_names', 'student_count',
+            'milestone_count', 'pending_milestone_count', 'overdue_milestone_count',
+            'last_activity_at', 'created_at', 'updated_at', 'refreshed_at'
+        ]
+        read_only_fields = fields
+
+
 class ProjectCreateSerializer(serializers.ModelSerializer):
     """
     Project creation serializer with students
@@ -443,7 +452,8 @@ class ProjectUpdateSerializer(serializers.ModelSerializer):
 
     def validate_advisor(self, value):
         """Validate advisor availability"""
-        if value and not value.can_supervise_more_projects():
+        academic_year = academic_year_from_project_id(self.instance.project_id) if self.instance else None
+        if value and not value.can_supervise_more_projects(academic_year):
             raise serializers.ValidationError("Advisor has reached their quota limit.")
         return value
 
@@ -466,6 +476,12 @@ class ProjectStatusUpdateSerializer(serializers.Serializer):
         return value
 
 
+def project_academic_year(serializer):
+    """Academic year of the ``project`` in the serializer context; ``None`` (the user's current year) without one."""
+    project = serializer.context.get('project')
+    return academic_year_from_project_id(project.project_id) if project is not None else None
+
+
 class ProjectCommitteeUpdateSerializer(serializers.Serializer):
     """
     Project committee update serializer
@@ -479,7 +495,8 @@ class ProjectCommitteeUpdateSerializer(serializers.Serializer):
             try:
                 advisor = Advisor.objects.get(id=value)
                 # Check if advisor can join committee
-                if not advisor.can_join_committee(self.initial_data.get('committee_type')):
+                committee_type = self.initial_data.get('committee_type')
+                if not advisor.can_join_committee(committee_type, project_academic_year(self)):
                     raise serializers.ValidationError("Advisor has reached committee quota limit.")
             except Advisor.DoesNotExist:
                 raise serializers.ValidationError("Advisor not found.")
@@ -548,7 +565,7 @@ class ProjectTransferSerializer(serializers.Serializer):
         """Validate new advisor"""
         try:
             advisor = Advisor.objects.get(id=value)
-            if not advisor.can_supervise_more_projects():
+            if not advisor.can_supervise_more_projects(project_academic_year(self)):
                 raise serializers.ValidationError("New advisor has reached their quota limit.")
         except Advisor.DoesNotExist:
             raise serializers.ValidationError("Advisor not found.")
@@ -661,6 +678,94 @@ class BulkProjectUpdateSerializer(serializers.Serializer):
         return value
 
 
+class BulkDefenseScheduleItemSerializer(ProjectDefenseScheduleSerializer):
+    """
+    One project's slot in a bulk defense schedule
+    """
+    project_id = serializers.CharField()
+
+
+class BulkProjectOperationSerializer(serializers.Serializer):
+    """
+    Bulk project operation serializer (see projects.bulk_operations)
+    """
+    OPERATIONS = ['update_status', 'transfer', 'assign_committee', 'schedule_defense']
+    MAX_PROJECTS = 1000
+
+    operation = serializers.ChoiceField(choices=OPERATIONS)
+    project_ids = serializers.ListField(
+        child=serializers.CharField(),
+        required=False,
+        help_text="List of project IDs (schedule_defense takes them from schedules)"
+    )
+    # update_status
+    status = serializers.ChoiceField(choices=ProjectStatus.choices, required=False)
+    comment = serializers.CharField(required=False, allow_blank=True)
+    template_id = serializers.CharField(required=False, allow_null=True)
+    # transfer
+    new_advisor_id = serializers.IntegerField(required=False)
+    # assign_committee
+    committee_type = serializers.ChoiceField(choices=['main', 'second', 'third'], required=False)
+    advisor_id = serializers.IntegerField(required=False, allow_null=True)
+    # schedule_defense
+    schedules = BulkDefenseScheduleItemSerializer(many=True, required=False)
+
+    REQUIRED_FIELDS = {
+        'update_status': ['project_ids', 'status'],
+        'transfer': ['project_ids', 'new_advisor_id', 'comment'],
+        'assign_committee': ['project_ids', 'committee_type'],
+        'schedule_defense': ['schedules'],
+    }
+
+    def validate(self, attrs):
+        """Check the operation's fields and resolve advisors and templates"""
+        operation = attrs['operation']
+        missing = [name for name in self.REQUIRED_FIELDS[operation] if not attrs.get(name)]
+        if missing:
+            raise serializers.ValidationError({name: f"Required for {operation}." for name in missing})
+
+        if operation == 'schedule_defense':
+            project_ids = [item['project_id'] for item in attrs['schedules']]
+        else:
+            project_ids = attrs['project_ids']
+        if len(set(project_ids)) != len(project_ids):
+            raise serializers.ValidationError({'project_ids': "Duplicate project IDs."})
+        if len(project_ids) > self.MAX_PROJECTS:
+            raise serializers.ValidationError({'project_ids': f"At most {self.MAX_PROJECTS} projects per request."})
+        attrs['project_ids'] = project_ids
+
+        if operation == 'update_status' and attrs.get('template_id'):
+            try:
+                attrs['template'] = MilestoneTemplate.objects.get(id=attrs['template_id'])
+            except (MilestoneTemplate.DoesNotExist, ValueError):
+                raise serializers.ValidationError({'template_id': "Milestone template not found."})
+
+        advisor_field = {'transfer': 'new_advisor_id', 'assign_committee': 'advisor_id'}.get(operation)
+        if advisor_field and attrs.get(advisor_field) is not None:
+            try:
+                attrs['advisor'] = Advisor.objects.select_related('user').get(id=attrs[advisor_field])
+            except Advisor.DoesNotExist:
+                raise serializers.ValidationError({advisor_field: "Advisor not found."})
+        return attrs
+
+
+class AutoAssignmentSerializer(serializers.Serializer):
+    """
+    Automatic advisor assignment request (see projects.auto_assignment)
+    """
+    academic_year = serializers.CharField(help_text="Academic year such as 2024-2025")
+    apply = serializers.BooleanField(default=False, help_text="Write the plan instead of previewing it")
+    candidate_limit = serializers.IntegerField(
+        required=False, min_value=1, max_value=50,
+        help_text="Best-fitting advisors considered per project"
+    )
+
+    def validate_academic_year(self, value):
+        if not is_academic_year(value):
+            raise serializers.ValidationError("Expected an academic year such as 2024-2025.")
+        return value
+
+
 class ProjectSearchSerializer(serializers.Serializer):
     """
     Advanced project search serializer with comprehensive filtering options
@@ -704,29 +809,29 @@ class ProjectSearchSerializer(serializers.Serializer):
     defense_before = serializers.DateField(required=False, help_text="Filter defenses scheduled before this date")
     
     # Defense filters
-    scheduled = serializers.BooleanField(required=False, help_text="Filter by scheduled status")
-    has_defense_date = serializers.BooleanField(required=False, help_text="Filter projects with/without defense date")
+    scheduled = serializers.BooleanField(required=False, allow_null=True, default=None, help_text="Filter by scheduled status")
+    has_defense_date = serializers.BooleanField(required=False, allow_null=True, default=None, help_text="Filter projects with/without defense date")
     defense_room = serializers.CharField(required=False, help_text="Filter by defense room")
     
     # Score filters
     min_score = serializers.FloatField(required=False, min_value=0, max_value=100, help_text="Minimum final score")
     max_score = serializers.FloatField(required=False, min_value=0, max_value=100, help_text="Maximum final score")
-    has_grade = serializers.BooleanField(required=False, help_text="Filter projects with/without final grade")
+    has_grade = serializers.BooleanField(required=False, allow_null=True, default=None, help_text="Filter projects with/without final grade")
     
     # Milestone filters
-    has_pending_milestones = serializers.BooleanField(required=False, help_text="Filter projects with pending milestones")
+    has_pending_milestones = serializers.BooleanField(required=False, allow_null=True, default=None, help_text="Filter projects with pending milestones")
     milestone_count_min = serializers.IntegerField(required=False, min_value=0, help_text="Minimum milestone count")
     milestone_count_max = serializers.IntegerField(required=False, min_value=0, help_text="Maximum milestone count")
     
     # Committee filters
-    has_committee = serializers.BooleanField(required=False, help_text="Filter projects with/without committee")
+    has_committee = serializers.BooleanField(required=False, allow_null=True, default=None, help_text="Filter projects with/without committee")
     committee_member = serializers.CharField(required=False, help_text="Filter by committee member name")
     
     # Academic year
     academic_year = serializers.CharField(required=False, help_text="Filter by academic year")
     
     # Similarity filter
-    has_similarity_issues = serializers.BooleanField(required=False, help_text="Filter projects with similarity issues")
+    has_similarity_issues = serializers.BooleanField(required=False, allow_null=True, default=None, help_text="Filter projects with similarity issues")
     
     # Sorting and pagination
     ordering = serializers.CharField(required=False, help_text="Order by field (prefix with - for descending)")
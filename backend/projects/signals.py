@@ -525,11 +525,13 @@ def milestone_completion_handler(sender, instance, created, **kwargs):
 @receiver(post_save, sender='projects.ProjectGroup')
 def project_deadline_monitor(sender, instance, created, **kwargs):
     """Monitor project deadlines."""
-    if not created and instance.end_date:
+    # ProjectGroup has no end_date field; skip until deadlines are modelled
+    end_date = getattr(instance, 'end_date', None)
+    if not created and end_date:
         from datetime import timedelta
         
         # Check if project is approaching deadline
-        days_remaining = (instance.end_date - timezone.now().date()).days
+        days_remaining = (end_date - timezone.now().date()).days
         
         if days_remaining <= 7 and days_remaining > 0:  # 7 days or less
             try:
@@ -586,3 +588,56 @@ def project_deadline_monitor(sender, instance, created, **kwargs):
                     )
             except Exception as e:
                 logger.error(f"Error creating overdue notification: {e}")
+
+
+# ProjectSummary read model: keep student, milestone and activity figures current
+@receiver(post_save, sender='projects.ProjectStudent')
+@receiver(post_delete, sender='projects.ProjectStudent')
+@receiver(post_save, sender='milestones.Milestone')
+@receiver(post_delete, sender='milestones.Milestone')
+def project_summary_dependency_changed_handler(sender, instance, using=None, **kwargs):
+    """Refresh the project's summary row when its students or milestones change."""
+    try:
+        project_id = instance.project_group.project_id
+    except Exception:
+        return
+    # On commit, so rows deleted along with their group refresh once the group row is gone
+    from .read_model import refresh_project_summaries_on_commit
+    refresh_project_summaries_on_commit([project_id], using=using)
+
+
+@receiver(post_save, sender='projects.LogEntry')
+@receiver(post_delete, sender='projects.LogEntry')
+def project_summary_activity_handler(sender, instance, using=None, **kwargs):
+    """Refresh the project's last activity when a log entry is written or removed."""
+    try:
+        project_id = instance.project.project_id
+    except Exception:
+        return
+    from .read_model import refresh_project_summaries_on_commit
+    refresh_project_summaries_on_commit([project_id], using=using)
+
+
+@receiver(post_save, sender='projects.Project')
+@receiver(post_delete, sender='projects.Project')
+@receiver(post_save, sender='projects.ProjectGroup')
+@receiver(post_delete, sender='projects.ProjectGroup')
+def project_summary_project_changed_handler(sender, instance, using=None, **kwargs):
+    """Refresh the summary (and search index) of a saved or deleted project once its transaction commits."""
+    from .read_model import refresh_project_summaries_on_commit
+    refresh_project_summaries_on_commit([instance.project_id], using=using)
+
+
+@receiver(post_save, sender='projects.ProjectGroup')
+def project_group_link_handler(sender, instance, created, **kwargs):
+    """Link the legacy Project with the same project_id to a new ProjectGroup."""
+    if created:
+        from .models import Project
+        Project.objects.filter(project_id=instance.project_id, project_group__isnull=True).update(project_group=instance)
+
+
+@receiver(post_save, sender='projects.ProjectGroup')
+def project_group_committee_handler(sender, instance, **kwargs):
+    """Keep the committee member rows in step with the committee slots."""
+    from committees.membership import sync_committee_members
+    sync_committee_members([instance])
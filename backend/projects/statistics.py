@@ -0,0 +1,228 @@
+"""
+Cached project statistics.
+
+``ProjectStatistics`` computes every figure of the ``statistics`` endpoint for
+a user's visible projects in one grouped, conditional-aggregation query over
+``ProjectGroup`` (where status, advisor, defense and milestone data live),
+grouped by status, advisor name and the primary student's major.
+
+Results are cached per (academic year, visibility scope, day) under a
+generation number per academic year. Project, project-group, student and
+milestone writes bump the generation of the project's academic year (and of
+the all-years figures) through signals and ``refresh_project_summaries``, so
+stale entries are never read again and simply expire.
+
+Configured through ``settings.PROJECT_STATISTICS``:
+
+* ``ENABLED``: cache results at all
+* ``TIMEOUT``: seconds a result is kept in the cache
+"""
+
+import logging
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .read_model import academic_year_from_project_id
+from .visibility import ProjectVisibility
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATISTICS_SETTINGS = {
+    'ENABLED': True,
+    'TIMEOUT': 300,
+}
+
+ALL_YEARS = 'all'
+ACADEMIC_YEAR_RE = re.compile(r'^\d{4}-\d{4}$')
+
+
+def get_statistics_settings():
+    """Return project statistics settings merged over the defaults."""
+    return {**DEFAULT_STATISTICS_SETTINGS, **getattr(settings, 'PROJECT_STATISTICS', {})}
+
+
+def is_academic_year(value):
+    return bool(ACADEMIC_YEAR_RE.match(value or ''))
+
+
+def _generation_key(academic_year):
+    return f'project_statistics_generation_{academic_year}'
+
+
+def _generation(academic_year):
+    key = _generation_key(academic_year)
+    generation = cache.get(key)
+    if generation is None:
+        # Start from the clock so a lost counter never reuses an older generation
+        cache.add(key, int(time.time() * 1000), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(*academic_years):
+    """Invalidate the cached statistics of ``academic_years`` and of all years."""
+    for academic_year in {*academic_years, ALL_YEARS}:
+        key = _generation_key(academic_year)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), None)
+        except Exception as e:
+            logger.warning(f"Could not invalidate project statistics for {academic_year}: {e}")
+
+
+def invalidate_project_statistics(project_ids):
+    """Invalidate statistics for the academic years of ``project_ids``, now and after commit."""
+    years = {academic_year_from_project_id(pid) for pid in project_ids} - {''}
+    bump_generation(*years)
+    # Again after commit, in case a concurrent request cached the old figures meanwhile
+    transaction.on_commit(lambda: bump_generation(*years))
+
+
+def empty_statistics():
+    return {
+        'total_projects': 0,
+        'pending_projects': 0,
+        'approved_projects': 0,
+        'rejected_projects': 0,
+        'scheduled_defenses': 0,
+        'unscheduled_defenses': 0,
+        'projects_by_status': {},
+        'projects_by_advisor': {},
+        'projects_by_major': {},
+        'average_milestone_completion': 0,
+        'projects_needing_attention': 0,
+    }
+
+
+class ProjectStatistics:
+    """Statistics over the projects ``user`` may see, optionally for one academic year."""
+
+    def __init__(self, user, academic_year=None):
+        self.user = user
+        self.academic_year = academic_year or ALL_YEARS
+
+    def scope(self):
+        """Cache scope: admins share one entry, everyone else gets their own."""
+        if self.user.is_admin():
+            return 'all'
+        return f'user_{self.user.pk}'
+
+    def cache_key(self):
+        return 'project_statistics_{}_{}_{}_{}'.format(
+            self.academic_year, _generation(self.academic_year), self.scope(), timezone.now().date(),
+        )
+
+    def get(self):
+        config = get_statistics_settings()
+        if not config['ENABLED']:
+            return self.compute()
+        try:
+            key = self.cache_key()
+            stats = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Could not read cached project statistics: {e}")
+            return self.compute()
+        if stats is None:
+            stats = self.compute()
+            try:
+                cache.set(key, stats, config['TIMEOUT'])
+            except Exception as e:
+                logger.warning(f"Could not cache project statistics: {e}")
+        return stats
+
+    def queryset(self):
+        from .models import ProjectGroup, ProjectStudent
+
+        groups = ProjectVisibility(self.user).filter_groups(ProjectGroup.objects.all())
+        if self.academic_year != ALL_YEARS:
+            groups = groups.filter(project_id__startswith=f'{self.academic_year}-')
+        primary_major = (
+            ProjectStudent.objects.filter(project_group=OuterRef('pk'))
+            .order_by('-is_primary', 'joined_at')
+            .values('student__student_profile__major')[:1]
+        )
+        today = timezone.now().date()
+        # Milestones are LEFT JOINed, so every project count is DISTINCT
+        return (
+            groups.annotate(major=Subquery(primary_major))
+            .values('status', 'advisor_name', 'major')
+            .annotate(
+                total=Count('id', distinct=True),
+                scheduled=Count('id', distinct=True, filter=Q(
+                    defense_date__isnull=False, defense_time__isnull=False, defense_room__isnull=False,
+                )),
+                needing_attention=Count('id', distinct=True, filter=Q(
+                    milestones__status='Pending', milestones__due_date__lt=today,
+                )),
+                milestone_count=Count('milestones', distinct=True),
+                approved_milestone_count=Count('milestones', distinct=True, filter=Q(milestones__status='Approved')),
+            )
+            .order_by()
+        )
+
+    def compute(self):
+        stats = empty_statistics()
+        milestones = approved_milestones = 0
+        for row in self.queryset():
+            total = row['total']
+            stats['total_projects'] += total
+            stats['scheduled_defenses'] += row['scheduled']
+            stats['projects_needing_attention'] += row['needing_attention']
+            milestones += row['milestone_count']
+            approved_milestones += row['approved_milestone_count']
+            for field, value in (
+                ('projects_by_status', row['status']),
+                ('projects_by_advisor', row['advisor_name']),
+                ('projects_by_major', row['major']),
+            ):
+                if value is not None:
+                    stats[field][value] = stats[field].get(value, 0) + total
+
+        by_status = stats['projects_by_status']
+        stats['pending_projects'] = by_status.get('Pending', 0)
+        stats['approved_projects'] = by_status.get('Approved', 0)
+        stats['rejected_projects'] = by_status.get('Rejected', 0)
+        stats['unscheduled_defenses'] = stats['total_projects'] - stats['scheduled_defenses']
+        if milestones:
+            stats['average_milestone_completion'] = round(approved_milestones * 100 / milestones, 2)
+        return stats
+
+
+def _invalidate_instance(sender, instance, **kwargs):
+    invalidate_project_statistics([instance.project_id])
+
+
+def _invalidate_related_group(sender, instance, **kwargs):
+    from .models import ProjectGroup
+
+    project_id = (
+        ProjectGroup.objects.filter(pk=instance.project_group_id).values_list('project_id', flat=True).first()
+    )
+    if project_id:
+        invalidate_project_statistics([project_id])
+
+
+def connect_signals():
+    """Invalidate statistics when projects, their students or milestones change."""
+    from django.apps import apps
+    from django.db.models.signals import post_delete, post_save
+
+    for signal in (post_save, post_delete):
+        suffix = 'save' if signal is post_save else 'delete'
+        for label in ('projects.Project', 'projects.ProjectGroup'):
+            signal.connect(
+                _invalidate_instance, sender=apps.get_model(label),
+                dispatch_uid=f'project_statistics_{label}_{suffix}',
+            )
+        for label in ('projects.ProjectStudent', 'milestones.Milestone'):
+            signal.connect(
+                _invalidate_related_group, sender=apps.get_model(label),
+                dispatch_uid=f'project_statistics_{label}_{suffix}',
+            )
@@ -7,17 +7,28 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Avg
+from django.db import transaction
+from django.db.models import Q, Count
 from django.utils import timezone
 
-from .models import Project, ProjectGroup
+from .models import Project, ProjectGroup, ProjectStudent, ProjectSummary
 from students.models import Student
 from advisors.models import Advisor
 from milestones.models import Milestone, MilestoneTemplate
 from projects.models import LogEntry
+from .visibility import ProjectVisibility
+from .read_model import safe_refresh_project_summaries
+from .bulk_operations import run_bulk_operation
+from .auto_assignment import CANDIDATE_LIMIT, AutoAssignment
+from .statistics import ProjectStatistics, is_academic_year
+from .search import search_projects
+from committees.membership import COMMITTEE_FIELDS
+from defense_management.timetabling import booking_conflicts, defense_people
+from .export_import import EXPORT_RENDERERS, export_projects_to_csv, export_projects_to_excel
+from core.pagination import KeysetCursorPagination
 from core.permissions import (
     CanManageProject, CanViewProject, IsProjectParticipant,
-    AcademicYearPermission, IsAdvisorOrAdmin
+    AcademicYearPermission, IsAdvisorOrAdmin, IsAdminOrDepartmentAdmin
 )
 from .serializers import (
     ProjectSerializer, ProjectCreateSerializer, ProjectUpdateSerializer,
@@ -25,7 +36,7 @@ from .serializers import (
     ProjectDefenseScheduleSerializer, ProjectScoringSerializer,
     ProjectTransferSerializer, ProjectLogEntrySerializer,
     ProjectStatisticsSerializer, BulkProjectUpdateSerializer,
-    ProjectSearchSerializer
+    AutoAssignmentSerializer, BulkProjectOperationSerializer, ProjectSearchSerializer, ProjectSummarySerializer
 )
 
 
@@ -33,14 +44,11 @@ class ProjectViewSet(viewsets.ModelViewSet):
     """
     Project management viewset
     """
+    # ProjectGroup, students, committee advisors, milestone counts and log
+    # entries are bulk-loaded per page by ProjectListSerializer.
     queryset = Project.objects.select_related(
         'advisor',
         'advisor__user'  # Optimize advisor user access
-    ).prefetch_related(
-        'milestones',
-        'log_entries',
-        'project_students__student',
-        'project_students__student__user'  # Optimize student user access
     )
     serializer_class = ProjectSerializer
     permission_classes = [IsAuthenticated]  # Temporarily simplified to debug 500 error
@@ -50,6 +58,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
     ordering_fields = ['project_id', 'topic_eng', 'created_at', 'defense_date']
     ordering = ['-created_at']
     
+    @transaction.atomic
     def perform_destroy(self, instance):
         """Handle project deletion"""
         try:
@@ -114,6 +123,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
             return ProjectUpdateSerializer
         return ProjectSerializer
     
+    @transaction.atomic
     def perform_update(self, serializer):
         """Handle project update"""
         try:
@@ -198,100 +208,11 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter queryset based on user permissions"""
-        queryset = super().get_queryset()
-        user = self.request.user
-        
-        # Admins can see all projects
-        if user.is_admin():
-            pass  # No filtering
-        # Students can only see their own projects
-        elif user.is_student():
-            try:
-                # Get student profile
-                student = getattr(user, 'student_profile', None)
-                if not student:
-                    # Try to get Student model directly
-                    from students.models import Student
-                    try:
-                        student = Student.objects.get(user=user)
-                    except Student.DoesNotExist:
-                        queryset = queryset.none()
-                        return queryset
-                
-                # Filter by ProjectStudent relationship
-                # ProjectStudent.student is User, not Student model
-                from projects.models import ProjectStudent
-                project_students = ProjectStudent.objects.filter(student=user)
-                project_group_ids = [ps.project_group.id for ps in project_students]
-                project_groups = ProjectGroup.objects.filter(id__in=project_group_ids)
-                project_ids = [pg.project_id for pg in project_groups]
-                queryset = queryset.filter(project_id__in=project_ids)
-            except Exception as e:
-                queryset = queryset.none()  # No projects if error
-        
-        # Advisors can see their supervised projects and committee projects
-        elif user.is_advisor():
-            try:
-                # Get advisor profile
-                advisor = getattr(user, 'advisor_profile', None)
-                if not advisor:
-                    # Try to get Advisor model directly
-                    from advisors.models import Advisor
-                    try:
-                        advisor = Advisor.objects.get(user=user)
-                    except Advisor.DoesNotExist:
-                        queryset = queryset.none()
-                        return queryset
-                
-                # Get advisor name for matching
-                advisor_name = user.get_full_name() or user.username
-                advisor_id = advisor.advisor_id
-                
-                # Filter projects where advisor is the advisor or committee member
-                # Use ProjectGroup to filter by advisor_name or committee IDs
-                project_groups = ProjectGroup.objects.filter(
-                    Q(advisor_name__icontains=advisor_name) |
-                    Q(main_committee_id=advisor_id) |
-                    Q(second_committee_id=advisor_id) |
-                    Q(third_committee_id=advisor_id)
-                )
-                project_ids = [pg.project_id for pg in project_groups]
-                queryset = queryset.filter(project_id__in=project_ids)
-            except Exception as e:
-                queryset = queryset.none()  # No projects if error
-        
-        # Department admins can see projects in their departments
-        elif user.is_department_admin():
-            try:
-                # Get advisor profile (DepartmentAdmin is also an Advisor)
-                advisor = getattr(user, 'advisor_profile', None)
-                if not advisor:
-                    from advisors.models import Advisor
-                    try:
-                        advisor = Advisor.objects.get(user=user)
-                    except Advisor.DoesNotExist:
-                        queryset = queryset.none()
-                        return queryset
-                
-                # Filter by specialized majors if available
-                if hasattr(advisor, 'specialized_major_ids') and advisor.specialized_major_ids:
-                    # Get students in those majors
-                    from students.models import Student
-                    students = Student.objects.filter(major_id__in=advisor.specialized_major_ids)
-                    # Get projects for those students
-                    from projects.models import ProjectStudent
-                    project_students = ProjectStudent.objects.filter(
-                        student__in=students
-                    )
-                    project_group_ids = [ps.project_group.id for ps in project_students]
-                    project_groups = ProjectGroup.objects.filter(id__in=project_group_ids)
-                    project_ids = [pg.project_id for pg in project_groups]
-                    queryset = queryset.filter(project_id__in=project_ids)
-                # If no specialized majors, DepartmentAdmin can see all projects
-                # (This can be customized based on business requirements)
-            except Exception as e:
-                queryset = queryset.none()  # No projects if error
-        
+        # Each role's rule is a single ProjectGroup subquery; see projects.visibility
+        queryset = ProjectVisibility(self.request.user).filter_projects(super().get_queryset())
+        if self.action in ('list', 'retrieve'):
+            # Join only what the requested ?fields= need
+            queryset = ProjectSerializer.optimize_queryset(queryset.select_related(None), self.request)
         return queryset
     
     def get_queryset_old(self):
@@ -321,6 +242,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         
         return queryset
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """Set academic year and create project group"""
         try:
@@ -420,6 +342,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
             # Don't fail project creation if milestone creation fails
 
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def update_status(self, request, pk=None):
         """Update project status"""
         project = self.get_object()
@@ -433,9 +356,13 @@ class ProjectViewSet(viewsets.ModelViewSet):
             # Store old status before update
             old_status = project.status
             
-            # Update project status
+            # Update project status on both models
             project.status = new_status
             project.save()
+            project_group = self._get_or_create_project_group(project)
+            if project_group.status != new_status:
+                project_group.status = new_status
+                project_group.save()
             
             # Create log entry using helper method
             self._create_log_entry(
@@ -471,34 +398,27 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def update_committee(self, request, pk=None):
         """Update project committee"""
         project = self.get_object()
-        serializer = ProjectCommitteeUpdateSerializer(data=request.data)
+        serializer = ProjectCommitteeUpdateSerializer(data=request.data, context={'project': project})
         
         if serializer.is_valid():
             committee_type = serializer.validated_data['committee_type']
             advisor_id = serializer.validated_data.get('advisor_id')
             
-            # Update committee member
-            field_map = {
-                'main': 'main_committee',
-                'second': 'second_committee',
-                'third': 'third_committee'
-            }
+            advisor = Advisor.objects.select_related('user').get(id=advisor_id) if advisor_id else None
             
-            setattr(project, field_map[committee_type], 
-                   Advisor.objects.get(id=advisor_id) if advisor_id else None)
-            project.save()
+            # Committee slots live on ProjectGroup; saving it syncs the member rows
+            project_group = self._get_or_create_project_group(project)
+            setattr(project_group, COMMITTEE_FIELDS[committee_type], advisor.advisor_id if advisor else None)
+            project_group.save()
             
             # Create log entry using helper method
             advisor_name = ''
-            if advisor_id:
-                try:
-                    advisor = Advisor.objects.get(id=advisor_id)
-                    advisor_name = advisor.user.get_full_name() if hasattr(advisor, 'user') else str(advisor)
-                except Advisor.DoesNotExist:
-                    advisor_name = 'Unknown'
+            if advisor:
+                advisor_name = advisor.user.get_full_name() or advisor.user.username
             
             self._create_log_entry(
                 project=project,
@@ -519,27 +439,38 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def schedule_defense(self, request, pk=None):
         """Schedule project defense"""
         project = self.get_object()
         serializer = ProjectDefenseScheduleSerializer(data=request.data)
         
         if serializer.is_valid():
-            project.defense_date = serializer.validated_data.get('defense_date')
-            project.defense_time = serializer.validated_data.get('defense_time')
-            project.defense_room = serializer.validated_data.get('defense_room')
-            project.save()
+            # Defense details live on ProjectGroup
+            project_group = self._get_or_create_project_group(project)
+            data = serializer.validated_data
+            if data.get('defense_date') and data.get('defense_time'):
+                people = defense_people(ProjectGroup.objects.filter(pk=project_group.pk)).get(project.project_id, ())
+                conflicts = booking_conflicts(
+                    project.project_id, data['defense_date'], data['defense_time'], data.get('defense_room'), people
+                )
+                if conflicts:
+                    return Response({'conflicts': conflicts}, status=status.HTTP_400_BAD_REQUEST)
+            project_group.defense_date = serializer.validated_data.get('defense_date')
+            project_group.defense_time = serializer.validated_data.get('defense_time')
+            project_group.defense_room = serializer.validated_data.get('defense_room')
+            project_group.save()
             
             # Create log entry using helper method
             self._create_log_entry(
                 project=project,
                 log_type='defense_scheduled',
-                content=f'Defense scheduled for {project.defense_date} at {project.defense_time} in {project.defense_room}',
+                content=f'Defense scheduled for {project_group.defense_date} at {project_group.defense_time} in {project_group.defense_room}',
                 author=request.user,
                 metadata={
-                    'defense_date': str(project.defense_date) if project.defense_date else None,
-                    'defense_time': str(project.defense_time) if project.defense_time else None,
-                    'defense_room': project.defense_room,
+                    'defense_date': str(project_group.defense_date) if project_group.defense_date else None,
+                    'defense_time': str(project_group.defense_time) if project_group.defense_time else None,
+                    'defense_room': project_group.defense_room,
                 }
             )
             
@@ -550,6 +481,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def submit_score(self, request, pk=None):
         """Submit project score"""
         project = self.get_object()
@@ -585,10 +517,11 @@ class ProjectViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def transfer(self, request, pk=None):
         """Transfer project to another advisor"""
         project = self.get_object()
-        serializer = ProjectTransferSerializer(data=request.data)
+        serializer = ProjectTransferSerializer(data=request.data, context={'project': project})
         
         if serializer.is_valid():
             new_advisor_id = serializer.validated_data['new_advisor_id']
@@ -679,6 +612,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         ])
 
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def add_log_entry(self, request, pk=None):
         """Add log entry to project"""
         project = self.get_object()
@@ -702,14 +636,31 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 'log_entry': {
                     'id': str(log_entry.id),
                     'type': log_entry.type,
-                    'author_name': log_entry.author_name,
-                    'message': log_entry.message,
+                    'author_name': request.user.get_full_name(),
+                    'content': log_entry.content,
                     'created_at': log_entry.created_at
                 }
             })
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['get'])
+    def summaries(self, request):
+        """List flattened project rows from the ProjectSummary read model"""
+        queryset = ProjectVisibility(request.user).filter_groups(ProjectSummary.objects.all())
+        
+        academic_year = request.query_params.get('academic_year')
+        if academic_year:
+            queryset = queryset.filter(academic_year=academic_year)
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(ProjectSummarySerializer(page, many=True).data)
+        return Response(ProjectSummarySerializer(queryset, many=True).data)
+
     @action(detail=False, methods=['post'])
     def bulk_update(self, request):
         """Bulk update projects"""
@@ -721,6 +672,8 @@ class ProjectViewSet(viewsets.ModelViewSet):
             updated_count = Project.objects.filter(
                 project_id__in=project_ids
             ).update(**updates)
+            # QuerySet.update() sends no model signals
+            safe_refresh_project_summaries(project_ids)
             
             return Response({
                 'message': f'{updated_count} projects updated successfully'
@@ -728,66 +681,50 @@ class ProjectViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminOrDepartmentAdmin])
+    def bulk_operations(self, request):
+        """Change status, advisor, committee or defense schedule of many projects at once"""
+        serializer = BulkProjectOperationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        project_ids = data['project_ids']
+        projects = list(self.get_queryset().filter(project_id__in=project_ids).order_by('project_id'))
+        missing_ids = set(project_ids) - {project.project_id for project in projects}
+        if missing_ids:
+            return Response(
+                {'project_ids': [f"Project IDs not found: {', '.join(sorted(missing_ids))}"]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        report = run_bulk_operation(request.user, projects, data['operation'], data)
+        return Response(report)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminOrDepartmentAdmin])
+    def auto_assign(self, request):
+        """Preview or apply an optimal advisor assignment for the unassigned projects of a year"""
+        serializer = AutoAssignmentSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        engine = AutoAssignment(data['academic_year'], data.get('candidate_limit', CANDIDATE_LIMIT))
+        report = engine.apply(request.user) if data['apply'] else engine.preview()
+        return Response(report)
+
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Get project statistics"""
-        queryset = self.get_queryset()
-        
-        # Calculate statistics
-        total_projects = queryset.count()
-        pending_projects = queryset.filter(status='Pending').count()
-        approved_projects = queryset.filter(status='Approved').count()
-        rejected_projects = queryset.filter(status='Rejected').count()
-        
-        scheduled_defenses = queryset.filter(
-            defense_date__isnull=False,
-            defense_time__isnull=False,
-            defense_room__isnull=False
-        ).count()
-        unscheduled_defenses = total_projects - scheduled_defenses
-        
-        # Projects by status
-        projects_by_status = dict(
-            queryset.values('status').annotate(count=Count('id')).values_list('status', 'count')
-        )
-        
-        # Projects by advisor
-        projects_by_advisor = dict(
-            queryset.values('advisor_name').annotate(count=Count('id')).values_list('advisor_name', 'count')
-        )
-        
-        # Projects by major
-        projects_by_major = dict(
-            queryset.values('projectgroup__students__major__name')
-            .annotate(count=Count('id'))
-            .values_list('projectgroup__students__major__name', 'count')
-        )
-        
-        # Average milestone completion
-        milestone_completion = queryset.aggregate(
-            avg_completion=Avg('milestones__status')
-        )['avg_completion'] or 0
-        
-        # Projects needing attention (overdue milestones)
-        projects_needing_attention = queryset.filter(
-            milestones__due_date__lt=timezone.now().date(),
-            milestones__status='Pending'
-        ).distinct().count()
-        
-        stats = {
-            'total_projects': total_projects,
-            'pending_projects': pending_projects,
-            'approved_projects': approved_projects,
-            'rejected_projects': rejected_projects,
-            'scheduled_defenses': scheduled_defenses,
-            'unscheduled_defenses': unscheduled_defenses,
-            'projects_by_status': projects_by_status,
-            'projects_by_advisor': projects_by_advisor,
-            'projects_by_major': projects_by_major,
-            'average_milestone_completion': round(milestone_completion, 2),
-            'projects_needing_attention': projects_needing_attention,
-        }
-        
+        """Get project statistics, optionally for one ``academic_year``"""
+        academic_year = request.query_params.get('academic_year')
+        if academic_year and not is_academic_year(academic_year):
+            return Response(
+                {'academic_year': ['Expected an academic year such as 2024-2025.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # One aggregation query over the visible ProjectGroups, cached per year and scope
+        stats = ProjectStatistics(request.user, academic_year).get()
         serializer = ProjectStatisticsSerializer(stats)
         return Response(serializer.data)
 
@@ -801,18 +738,9 @@ class ProjectViewSet(viewsets.ModelViewSet):
         data = serializer.validated_data
         queryset = self.get_queryset()
         
-        # Text search - search across multiple fields
+        # Text search - ranked lookup in the project search index
         if data.get('query'):
-            query = data['query']
-            queryset = queryset.filter(
-                Q(project_id__icontains=query) |
-                Q(topic_lao__icontains=query) |
-                Q(topic_eng__icontains=query) |
-                Q(advisor_name__icontains=query) |
-                Q(projectgroup__students__student_id__icontains=query) |
-                Q(projectgroup__students__name__icontains=query) |
-                Q(projectgroup__students__surname__icontains=query)
-            ).distinct()
+            queryset = search_projects(queryset, data['query'])
         
         # Status filters
         if data.get('status'):
@@ -901,24 +829,16 @@ class ProjectViewSet(viewsets.ModelViewSet):
         
         # Committee filters
         if data.get('has_committee') is not None:
-            if data['has_committee']:
-                queryset = queryset.filter(
-                    Q(main_committee__isnull=False) |
-                    Q(second_committee__isnull=False) |
-                    Q(third_committee__isnull=False)
-                )
-            else:
-                queryset = queryset.filter(
-                    main_committee__isnull=True,
-                    second_committee__isnull=True,
-                    third_committee__isnull=True
-                )
+            queryset = queryset.filter(
+                project_group__committee_members__isnull=not data['has_committee']
+            ).distinct()
         if data.get('committee_member'):
+            term = data['committee_member']
             queryset = queryset.filter(
-                Q(main_committee__name__icontains=data['committee_member']) |
-                Q(second_committee__name__icontains=data['committee_member']) |
-                Q(third_committee__name__icontains=data['committee_member'])
-            )
+                Q(project_group__committee_members__advisor__user__first_name__icontains=term) |
+                Q(project_group__committee_members__advisor__user__last_name__icontains=term) |
+                Q(project_group__committee_members__advisor__advisor_id__icontains=term)
+            ).distinct()
         
         # Academic year
         if data.get('academic_year'):
@@ -929,12 +849,24 @@ class ProjectViewSet(viewsets.ModelViewSet):
             # This would require actual similarity detection implementation
             pass
         
-        # Apply ordering
+        # Apply ordering (text searches default to relevance)
         if data.get('ordering'):
             queryset = queryset.order_by(data['ordering'])
+        elif data.get('query'):
+            queryset = queryset.order_by('search_rank', '-created_at')
         else:
             queryset = queryset.order_by('-created_at')
         
+        # Keyset pagination on request (?cursor=): relevance or newest first,
+        # without OFFSET scans or a mandatory count
+        if KeysetCursorPagination.is_requested(request):
+            paginator = KeysetCursorPagination()
+            paginator.ordering = (
+                ('search_rank', '-created_at', '-id') if data.get('query') else ('-created_at', '-id')
+            )
+            projects = paginator.paginate_queryset(queryset, request, view=self)
+            return paginator.get_paginated_response(ProjectSerializer(projects, many=True).data)
+        
         # Get total count before pagination
         total_count = queryset.count()
         
@@ -954,144 +886,57 @@ class ProjectViewSet(viewsets.ModelViewSet):
             'total_pages': (total_count + page_size - 1) // page_size if total_count > 0 else 0
         })
 
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], renderer_classes=EXPORT_RENDERERS)
     def export(self, request):
         """Export projects to CSV or Excel"""
-        format_type = request.query_params.get('format', 'csv').lower()
-        queryset = self.get_queryset()
-        
-        # Debug logging
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.info(f"Export endpoint called: format={format_type}, queryset_count={queryset.count()}")
-        
-        # Apply filters from query params (same as search)
-        # We'll reuse the search method's filtering logic
-        search_serializer = ProjectSearchSerializer(data=request.query_params)
-        if search_serializer.is_valid():
-            data = search_serializer.validated_data
-            
-            # Apply text search - search in Project and ProjectGroup
-            if data.get('query'):
-                query = data['query']
-                queryset = queryset.filter(
-                    Q(project_id__icontains=query) |
-                    Q(title__icontains=query) |
-                    Q(projectgroup__topic_lao__icontains=query) |
-                    Q(projectgroup__topic_eng__icontains=query) |
-                    Q(projectgroup__advisor_name__icontains=query) |
-                    Q(projectgroup__students__student__student_id__icontains=query) |
-                    Q(projectgroup__students__student__name__icontains=query) |
-                    Q(projectgroup__students__student__surname__icontains=query)
-                ).distinct()
-            
-            # Apply status filter
-            if data.get('status'):
-                queryset = queryset.filter(
-                    Q(status=data['status']) |
-                    Q(projectgroup__status=data['status'])
-                ).distinct()
-            elif data.get('statuses'):
-                queryset = queryset.filter(
-                    Q(status__in=data['statuses']) |
-                    Q(projectgroup__status__in=data['statuses'])
-                ).distinct()
-            
-            # Apply advisor filter
-            if data.get('advisor'):
-                queryset = queryset.filter(projectgroup__advisor_name__icontains=data['advisor']).distinct()
-            
-            # Apply major filter
-            if data.get('major'):
-                queryset = queryset.filter(projectgroup__students__student__major__name=data['major']).distinct()
-            
-            # Apply academic year filter
-            if data.get('academic_year'):
-                queryset = queryset.filter(project_id__startswith=data['academic_year'])
-        
-        try:
-            if format_type == 'excel':
-                from .export_import import export_projects_to_excel
-                return export_projects_to_excel(queryset)
-            else:
-                from .export_import import export_projects_to_csv
-                return export_projects_to_csv(queryset)
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Export error: {str(e)}")
-            return Response(
-                {'error': f'Export failed: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        return _export_projects(request, self.get_queryset())
 
 
-# Function-based views for export/import (to avoid router issues)
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+def _apply_export_filters(queryset, data):
+    """Apply the search serializer filters supported by the export endpoints."""
+    # Apply text search using the project search index
+    if data.get('query'):
+        queryset = search_projects(queryset, data['query'])
+    
+    # Apply status filter (legacy Project status or ProjectGroup status)
+    statuses = [data['status']] if data.get('status') else data.get('statuses')
+    if statuses:
+        queryset = queryset.filter(
+            Q(status__in=statuses) |
+            Q(project_id__in=ProjectGroup.objects.filter(status__in=statuses).values('project_id'))
+        )
+    
+    # Apply advisor filter
+    if data.get('advisor'):
+        queryset = queryset.filter(project_id__in=ProjectGroup.objects.filter(
+            advisor_name__icontains=data['advisor']
+        ).values('project_id'))
+    
+    # Apply major filter
+    if data.get('major'):
+        queryset = queryset.filter(project_id__in=ProjectGroup.objects.filter(
+            students__student__student_profile__major=data['major']
+        ).values('project_id'))
+    
+    # Apply academic year filter
+    if data.get('academic_year'):
+        queryset = queryset.filter(project_id__startswith=data['academic_year'])
+    
+    return queryset
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def export_projects_view(request):
-    """Export projects to CSV or Excel - function-based view"""
+
+def _export_projects(request, queryset):
+    """Filter ``queryset`` from the query string and stream it as CSV or Excel."""
     format_type = request.query_params.get('format', 'csv').lower()
     
-    # Get queryset using ProjectViewSet logic
-    viewset = ProjectViewSet()
-    viewset.request = request
-    viewset.format_kwarg = None
-    queryset = viewset.get_queryset()
-    
-    # Apply filters from query params (same as search)
     search_serializer = ProjectSearchSerializer(data=request.query_params)
     if search_serializer.is_valid():
-        data = search_serializer.validated_data
-        
-        # Apply text search
-        if data.get('query'):
-            query = data['query']
-            queryset = queryset.filter(
-                Q(project_id__icontains=query) |
-                Q(title__icontains=query) |
-                Q(projectgroup__topic_lao__icontains=query) |
-                Q(projectgroup__topic_eng__icontains=query) |
-                Q(projectgroup__advisor_name__icontains=query) |
-                Q(projectgroup__students__student__student_id__icontains=query) |
-                Q(projectgroup__students__student__name__icontains=query) |
-                Q(projectgroup__students__student__surname__icontains=query)
-            ).distinct()
-        
-        # Apply status filter
-        if data.get('status'):
-            queryset = queryset.filter(
-                Q(status=data['status']) |
-                Q(projectgroup__status=data['status'])
-            ).distinct()
-        elif data.get('statuses'):
-            queryset = queryset.filter(
-                Q(status__in=data['statuses']) |
-                Q(projectgroup__status__in=data['statuses'])
-            ).distinct()
-        
-        # Apply advisor filter
-        if data.get('advisor'):
-            queryset = queryset.filter(projectgroup__advisor_name__icontains=data['advisor']).distinct()
-        
-        # Apply major filter
-        if data.get('major'):
-            queryset = queryset.filter(projectgroup__students__student__major__name=data['major']).distinct()
-        
-        # Apply academic year filter
-        if data.get('academic_year'):
-            queryset = queryset.filter(project_id__startswith=data['academic_year'])
+        queryset = _apply_export_filters(queryset, search_serializer.validated_data)
     
     try:
         if format_type == 'excel':
-            from .export_import import export_projects_to_excel
             return export_projects_to_excel(queryset)
-        else:
-            from .export_import import export_projects_to_csv
-            return export_projects_to_csv(queryset)
+        return export_projects_to_csv(queryset)
     except Exception as e:
         import logging
         logger = logging.getLogger(__name__)
@@ -1102,6 +947,20 @@ def export_projects_view(request):
         )
 
 
+# Function-based views for export/import (to avoid router issues)
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import IsAuthenticated
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes(EXPORT_RENDERERS)
+def export_projects_view(request):
+    """Export projects to CSV or Excel - function-based view"""
+    # Same row-level visibility as ProjectViewSet.get_queryset
+    queryset = ProjectVisibility(request.user).filter_projects(ProjectViewSet.queryset.all())
+    return _export_projects(request, queryset)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def import_projects_view(request):
@@ -1115,24 +974,30 @@ def import_projects_view(request):
     file = request.FILES['file']
     academic_year = request.data.get('academic_year')
     format_type = request.data.get('format', 'csv').lower()
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
     
     try:
         if format_type == 'csv':
-            from .export_import import import_projects_from_csv
-            success_count, error_count, errors = import_projects_from_csv(
-                file, academic_year, request.user
-            )
+            from .importer import import_projects
+            report = import_projects(file, academic_year=academic_year, user=request.user, dry_run=dry_run)
         else:
             return Response(
                 {'error': f'Unsupported format: {format_type}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        errors = [
+            f"Row {row['row']}: {error}"
+            for row in report['rows'] for error in row['errors']
+        ]
+        success_count = report['total_rows'] - report['failed']
+        verb = 'Dry run' if dry_run else 'Import'
         return Response({
             'success_count': success_count,
-            'error_count': error_count,
+            'error_count': report['failed'],
             'errors': errors[:10],  # Limit errors to first 10
-            'message': f'Import completed: {success_count} successful, {error_count} errors'
+            'message': f'{verb} completed: {success_count} successful, {report["failed"]} errors',
+            **report,
         })
     except Exception as e:
         import logging
@@ -0,0 +1,110 @@
+"""
+Row-level visibility rules for projects.
+
+Each role's access rule is expressed as a single ``ProjectGroup`` subquery,
+applied to the legacy ``Project`` table through its ``project_group`` key and
+to ``ProjectGroup`` through ``project_id``, without materializing id lists in
+Python. The list, search, statistics and export endpoints all share it.
+"""
+
+from django.db.models import Q
+
+from .models import ProjectGroup
+
+
+class ProjectVisibility:
+    """Resolve which projects a user may see."""
+
+    def __init__(self, user):
+        self.user = user
+
+    def _advisor_profile(self):
+        from advisors.models import Advisor
+        advisor = getattr(self.user, 'advisor_profile', None)
+        if advisor is None:
+            advisor = Advisor.objects.filter(user=self.user).first()
+        return advisor
+
+    def _has_student_profile(self):
+        from students.models import Student
+        return Student.objects.filter(user=self.user).exists()
+
+    def group_filter(self):
+        """
+        Return the ``ProjectGroup`` filter for this user.
+
+        ``None`` means unrestricted and ``False`` means nothing is visible.
+        """
+        user = self.user
+        if not user or not user.is_authenticated:
+            return False
+
+        if user.is_admin():
+            return None
+
+        if user.is_student():
+            if not self._has_student_profile():
+                return False
+            # ProjectStudent.student is the User, not the Student model
+            return Q(students__student=user)
+
+        if user.is_advisor():
+            advisor = self._advisor_profile()
+            if advisor is None:
+                return False
+            advisor_name = user.get_full_name() or user.username
+            return (
+                Q(advisor_name__icontains=advisor_name) |
+                Q(committee_members__advisor=advisor)
+            )
+
+        if user.is_department_admin():
+            advisor = self._advisor_profile()
+            if advisor is None:
+                return False
+            major_ids = getattr(advisor, 'specialized_major_ids', None)
+            if major_ids:
+                return Q(students__student__student_profile__major__in=major_ids)
+            # Without specialized majors a department admin sees every project
+            return None
+
+        return None
+
+    def visible_project_ids(self):
+        """Subquery of visible ``project_id`` values, or ``None`` if unrestricted."""
+        condition = self.group_filter()
+        if condition is None:
+            return None
+        if condition is False:
+            return ProjectGroup.objects.none().values('project_id')
+        return ProjectGroup.objects.filter(condition).values('project_id')
+
+    def filter_projects(self, queryset):
+        """Restrict a ``Project`` queryset to rows the user may see."""
+        condition = self.group_filter()
+        if condition is None:
+            return queryset
+        if condition is False:
+            return queryset.none()
+        # Join on the Project.project_group key rather than the project_id string
+        return queryset.filter(project_group__in=ProjectGroup.objects.filter(condition).values('pk'))
+
+    def filter_groups(self, queryset):
+        """Restrict a ``ProjectGroup`` queryset to rows the user may see."""
+        return self._apply(queryset)
+
+    def _apply(self, queryset):
+        condition = self.group_filter()
+        if condition is None:
+            return queryset
+        if condition is False:
+            return queryset.none()
+        return queryset.filter(project_id__in=ProjectGroup.objects.filter(condition).values('project_id'))
+
+
+def visible_projects(user, queryset=None):
+    """Shortcut for ``ProjectVisibility(user).filter_projects(queryset)``."""
+    from .models import Project
+    if queryset is None:
+        queryset = Project.objects.all()
+    return ProjectVisibility(user).filter_projects(queryset)
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from core.fieldsets import SparseFieldsetMixin
 from .models import (
     Student, StudentAcademicRecord, StudentSkill, StudentAchievement,
     StudentAttendance, StudentNote
@@ -8,8 +10,8 @@ from .models import (
 User = get_user_model()
 
 
-class StudentSerializer(serializers.ModelSerializer):
-    """Serializer for Student model."""
+class StudentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Serializer for Student model (supports ``?fields=``/``?omit=``)."""
     
     user = serializers.SerializerMethodField()
     academic_records = serializers.SerializerMethodField()
@@ -29,6 +31,18 @@ class StudentSerializer(serializers.ModelSerializer):
             'recent_notes'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'progress_percentage']
+
+    select_related_fields = {'user': ['user']}
+    prefetch_related_fields = {
+        'academic_records': ['academic_records'],
+        'skills': ['skills'],
+        'achievements': ['achievements'],
+        'attendance_summary': ['attendance_records'],
+        'recent_notes': [Prefetch(
+            'notes', queryset=StudentNote.objects.filter(is_private=False).select_related('created_by'),
+            to_attr='public_notes',
+        )],
+    }
     
     def get_user(self, obj):
         """Get user information."""
@@ -69,7 +83,7 @@ class StudentSerializer(serializers.ModelSerializer):
                 'category': skill.category,
                 'proficiency_level': skill.proficiency_level,
                 'description': skill.description,
-                'is_verified': bool(skill.verified_by),
+                'is_verified': bool(skill.verified_by_id),
                 'verified_at': skill.verified_at
             }
             for skill in skills
@@ -93,11 +107,11 @@ class StudentSerializer(serializers.ModelSerializer):
     
     def get_attendance_summary(self, obj):
         """Get attendance summary."""
-        attendance_records = obj.attendance_records.all()
-        total_days = attendance_records.count()
-        present_days = attendance_records.filter(status='present').count()
-        absent_days = attendance_records.filter(status='absent').count()
-        late_days = attendance_records.filter(status='late').count()
+        statuses = [record.status for record in obj.attendance_records.all()]
+        total_days = len(statuses)
+        present_days = statuses.count('present')
+        absent_days = statuses.count('absent')
+        late_days = statuses.count('late')
         
         attendance_rate = (present_days / total_days * 100) if total_days > 0 else 0
         
@@ -111,7 +125,10 @@ class StudentSerializer(serializers.ModelSerializer):
     
     def get_recent_notes(self, obj):
         """Get recent notes."""
-        notes = obj.notes.filter(is_private=False).all()[:5]  # Last 5 public notes
+        notes = getattr(obj, 'public_notes', None)
+        if notes is None:
+            notes = obj.notes.filter(is_private=False).select_related('created_by')
+        notes = notes[:5]  # Last 5 public notes
         return [
             {
                 'id': note.id,
@@ -102,7 +102,8 @@ class StudentListView(generics.ListCreateAPIView):
         elif hasattr(user, 'role') and user.role == 'Admin':
             pass  # No filtering
         
-        return queryset
+        # Load only the related rows the requested ?fields= need
+        return StudentSerializer.optimize_queryset(queryset, self.request)
 
 
 class StudentDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -931,4 +932,6 @@ class StudentViewSet(viewsets.ModelViewSet):
         elif hasattr(user, 'role') and user.role == 'Admin':
             pass
         
+        if self.action in ('list', 'retrieve'):
+            queryset = StudentSerializer.optimize_queryset(queryset, self.request)
         return queryset
\ No newline at end of file
@@ -3,7 +3,7 @@ Admin interface for system monitoring
 """
 from django.contrib import admin
 from .models import (
-    SystemMetrics, RequestLog, ErrorLog, HealthCheck, PerformanceMetric
+    SystemMetrics, RequestLog, ErrorLog, HealthCheck, PerformanceMetric, MetricRollup
 )
 
 
@@ -54,3 +54,11 @@ class PerformanceMetricAdmin(admin.ModelAdmin):
     search_fields = ['endpoint']
     readonly_fields = ['timestamp']
     date_hierarchy = 'timestamp'
+
+
+@admin.register(MetricRollup)
+class MetricRollupAdmin(admin.ModelAdmin):
+    list_display = ['bucket_start', 'resolution', 'metric_type', 'method', 'endpoint', 'status_code', 'count', 'max_value']
+    list_filter = ['resolution', 'metric_type', 'method']
+    search_fields = ['endpoint']
+    date_hierarchy = 'bucket_start'
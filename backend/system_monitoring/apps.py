@@ -8,3 +8,10 @@ class SystemMonitoringConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'system_monitoring'
     verbose_name = 'System Monitoring'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .telemetry import install_query_timer
+
+        # Time queries on every connection so request telemetry works without DEBUG
+        connection_created.connect(install_query_timer, dispatch_uid='system_monitoring_query_timer')
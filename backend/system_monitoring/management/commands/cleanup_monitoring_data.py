@@ -1,13 +1,18 @@
 """
 Management command to cleanup old monitoring data
 Usage: python manage.py cleanup_monitoring_data --days=30
+
+Raw request logs and system metrics are rolled up (see
+system_monitoring.rollups) before they are deleted, so the dashboard keeps
+their history.
 """
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 from system_monitoring.models import (
-    RequestLog, ErrorLog, SystemMetrics, PerformanceMetric, HealthCheck
+    RequestLog, ErrorLog, SystemMetrics, PerformanceMetric, HealthCheck, MetricRollup
 )
+from system_monitoring import rollups
 
 
 class Command(BaseCommand):
@@ -25,6 +30,18 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be deleted without actually deleting',
         )
+        parser.add_argument(
+            '--minute-rollup-days',
+            type=int,
+            default=7,
+            help='Number of days to keep per-minute rollups (default: 7)',
+        )
+        parser.add_argument(
+            '--hour-rollup-days',
+            type=int,
+            default=365,
+            help='Number of days to keep per-hour rollups (default: 365)',
+        )
 
     def handle(self, *args, **options):
         days = options['days']
@@ -34,6 +51,13 @@ class Command(BaseCommand):
         self.stdout.write(f"Cleaning up monitoring data older than {days} days...")
         self.stdout.write(f"Cutoff date: {cutoff_date}")
 
+        # Compact raw rows into rollups before deleting them
+        if dry_run:
+            self.stdout.write("Would roll up raw rows in hours without rollups before deleting them")
+        else:
+            rolled_up = rollups.backfill_rollups(cutoff_date)
+            self.stdout.write(self.style.SUCCESS(f"Rolled up {rolled_up} raw rows"))
+
         # Cleanup RequestLogs
         request_logs = RequestLog.objects.filter(timestamp__lt=cutoff_date)
         request_count = request_logs.count()
@@ -52,6 +76,20 @@ class Command(BaseCommand):
             self.style.SUCCESS(f"{'Would delete' if dry_run else 'Deleted'} {metrics_count} system metrics")
         )
 
+        # Cleanup rollups past their retention
+        for resolution, retention_days in (
+            (rollups.MINUTE, options['minute_rollup_days']),
+            (rollups.HOUR, options['hour_rollup_days']),
+        ):
+            rollup_cutoff = timezone.now() - timedelta(days=retention_days)
+            old_rollups = MetricRollup.objects.filter(resolution=resolution, bucket_start__lt=rollup_cutoff)
+            rollup_count = old_rollups.count()
+            if not dry_run:
+                old_rollups.delete()
+            self.stdout.write(
+                self.style.SUCCESS(f"{'Would delete' if dry_run else 'Deleted'} {rollup_count} {resolution} rollups")
+            )
+
         # Cleanup PerformanceMetrics
         perf_metrics = PerformanceMetric.objects.filter(timestamp__lt=cutoff_date)
         perf_count = perf_metrics.count()
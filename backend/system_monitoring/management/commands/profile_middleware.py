@@ -0,0 +1,98 @@
+"""
+Management command to rank the cost of each configured middleware
+Usage: python manage.py profile_middleware --sample=50 --repeat=3 --user=admin
+
+Replays GET requests (recent request log paths and/or --path values) through
+an instrumented copy of MIDDLEWARE and prints each middleware's own wall time,
+database queries and cache calls, most expensive first.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from system_monitoring.middleware_profiler import instrument_middleware, profile_store
+from system_monitoring.models import RequestLog
+
+
+class Command(BaseCommand):
+    help = 'Replay sample requests and print a ranked per-middleware cost report'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=50,
+            help='Number of distinct recent GET paths to replay from the request log (default: 50)',
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            default=[],
+            help='Extra path to replay (may be repeated)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Times to replay each path (default: 3)',
+        )
+        parser.add_argument(
+            '--user',
+            help='Username to authenticate the replayed requests as',
+        )
+
+    def handle(self, *args, **options):
+        paths = list(options['path'])
+        if options['sample'] > 0:
+            recent = (RequestLog.objects.filter(method='GET', status_code__lt=400)
+                      .order_by('-timestamp').values_list('path', flat=True)[:options['sample'] * 20])
+            for path in dict.fromkeys(recent):
+                if len(paths) >= len(options['path']) + options['sample']:
+                    break
+                if path not in paths:
+                    paths.append(path)
+        if not paths:
+            paths = ['/api/monitoring/health/']
+
+        headers = {}
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist")
+            # API auth is JWT only, a session login would replay the 401 path
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+        client = Client(**headers)
+
+        # Keep the rate limiter running (its cost is measured) without letting it reject the replay
+        api_security = {
+            **getattr(settings, 'API_SECURITY', {}),
+            'MAX_REQUESTS_PER_MINUTE': 10 ** 9,
+            'MAX_REQUESTS_PER_HOUR': 10 ** 9,
+        }
+        profile_store.reset()
+        statuses = {}
+        with override_settings(MIDDLEWARE=instrument_middleware(settings.MIDDLEWARE), API_SECURITY=api_security):
+            for _ in range(options['repeat']):
+                for path in paths:
+                    response = client.get(path)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        report = profile_store.snapshot()
+        profile_store.reset()
+
+        self.stdout.write(
+            f"Replayed {report['requests']} requests over {len(paths)} paths "
+            f"(status codes: {', '.join(f'{code}={count}' for code, count in sorted(statuses.items()))})\n"
+        )
+        self.stdout.write(
+            f"{'#':>3}  {'middleware':<72} {'avg ms':>9} {'p95 ms':>8} {'max ms':>9} "
+            f"{'share':>7} {'queries':>8} {'cache':>7}"
+        )
+        for rank, row in enumerate(report['middleware'], start=1):
+            p95 = f"{row['p95_ms']:.2f}" if row['p95_ms'] is not None else '>250'
+            self.stdout.write(
+                f"{rank:>3}  {row['middleware']:<72} {row['avg_ms']:>9.3f} {p95:>8} {row['max_ms']:>9.3f} "
+                f"{row['share']:>7.1%} {row['avg_queries']:>8.2f} {row['avg_cache_calls']:>7.2f}"
+            )
@@ -4,9 +4,12 @@ Middleware for performance monitoring and request logging
 import time
 import logging
 from django.utils.deprecation import MiddlewareMixin
-from django.db import connection
 from django.core.cache import cache
+from core.utils import response_size
 from .models import RequestLog, PerformanceMetric, SystemMetrics
+from .telemetry import (
+    get_buffer, get_telemetry_settings, should_record, start_query_stats, stop_query_stats
+)
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -14,12 +17,19 @@ logger = logging.getLogger(__name__)
 
 
 class PerformanceMonitoringMiddleware(MiddlewareMixin):
-    """Monitor request performance and log metrics"""
+    """
+    Monitor request performance and log metrics
+
+    Records are buffered and written in batches by ``telemetry.TelemetryBuffer``
+    (timestamps therefore reflect the flush, at most ``FLUSH_INTERVAL`` late).
+    When sampling is enabled, ``request_count`` metrics carry the inverse of
+    the sample rate so that sums remain unbiased.
+    """
     
     def process_request(self, request):
-        """Record start time and initial query count"""
-        request._start_time = time.time()
-        request._initial_queries = len(connection.queries)
+        """Record start time and begin collecting query stats"""
+        request._start_time = time.perf_counter()
+        request._query_stats, request._query_stats_token = start_query_stats()
         # Cache info tracking (may not be available in all cache backends)
         try:
             request._cache_info = {
@@ -31,16 +41,38 @@ class PerformanceMonitoringMiddleware(MiddlewareMixin):
         return None
     
     def process_response(self, request, response):
-        """Log performance metrics after response"""
+        """Queue performance metrics after response"""
         if not hasattr(request, '_start_time'):
             return response
         
         # Calculate metrics
-        response_time = (time.time() - request._start_time) * 1000  # Convert to milliseconds
-        query_count = len(connection.queries) - request._initial_queries
+        response_time = (time.perf_counter() - request._start_time) * 1000  # Convert to milliseconds
+        stop_query_stats(request._query_stats_token)
+        query_count = request._query_stats.count
+        db_time = request._query_stats.duration * 1000
+        
+        # Skip logging for static files and health checks
+        if request.path.startswith('/static/') or request.path.startswith('/media/'):
+            return response
+        
+        if request.path.startswith('/api/monitoring/health/'):
+            return response
+        
+        # Log slow requests
+        if response_time > 1000:  # More than 1 second
+            logger.warning(
+                f"Slow request: {request.method} {request.path} took {response_time:.2f}ms"
+            )
         
-        # Calculate database time
-        db_time = sum(float(q['time']) for q in connection.queries[-query_count:]) * 1000 if query_count > 0 else 0
+        # Log high query count
+        if query_count > 20:
+            logger.warning(
+                f"High query count: {request.method} {request.path} executed {query_count} queries"
+            )
+        
+        config = get_telemetry_settings()
+        if not should_record(response_time, response.status_code, config):
+            return response
         
         # Get cache info (may not be available in all cache backends)
         try:
@@ -50,33 +82,49 @@ class PerformanceMonitoringMiddleware(MiddlewareMixin):
             cache_hits = 0
             cache_misses = 0
         
-        # Skip logging for static files and health checks
-        if request.path.startswith('/static/') or request.path.startswith('/media/'):
-            return response
-        
-        if request.path.startswith('/api/monitoring/health/'):
-            return response
-        
         try:
-            # Log request
             user = request.user if hasattr(request, 'user') and request.user.is_authenticated else None
+            sample_weight = 1 / config['SAMPLE_RATE'] if 0 < config['SAMPLE_RATE'] < 1 else 1
             
-            RequestLog.objects.create(
-                method=request.method,
-                path=request.path,
-                query_params=dict(request.GET),
-                status_code=response.status_code,
-                response_time=response_time,
-                user=user,
-                ip_address=self.get_client_ip(request),
-                user_agent=request.META.get('HTTP_USER_AGENT', ''),
-                referer=request.META.get('HTTP_REFERER', ''),
-                response_size=len(response.content) if hasattr(response, 'content') else None,
-            )
+            records = [
+                RequestLog(
+                    method=request.method,
+                    path=request.path,
+                    query_params=dict(request.GET),
+                    status_code=response.status_code,
+                    response_time=response_time,
+                    user=user,
+                    ip_address=self.get_client_ip(request),
+                    user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                    referer=request.META.get('HTTP_REFERER', ''),
+                    response_size=response_size(response),
+                ),
+                SystemMetrics(
+                    metric_type='response_time',
+                    value=response_time,
+                    metadata={
+                        'endpoint': request.path,
+                        'method': request.method,
+                        'status_code': response.status_code,
+                    },
+                    endpoint=request.path,
+                    user=user,
+                ),
+                SystemMetrics(
+                    metric_type='request_count',
+                    value=sample_weight,
+                    metadata={
+                        'method': request.method,
+                        'status_code': response.status_code,
+                    },
+                    endpoint=request.path,
+                    user=user,
+                ),
+            ]
             
             # Log performance metric for API endpoints
             if request.path.startswith('/api/'):
-                PerformanceMetric.objects.create(
+                records.append(PerformanceMetric(
                     endpoint=request.path,
                     method=request.method,
                     response_time=response_time,
@@ -85,43 +133,9 @@ class PerformanceMonitoringMiddleware(MiddlewareMixin):
                     cache_hits=cache_hits,
                     cache_misses=cache_misses,
                     user=user,
-                )
-            
-            # Log system metrics
-            SystemMetrics.objects.create(
-                metric_type='response_time',
-                value=response_time,
-                metadata={
-                    'endpoint': request.path,
-                    'method': request.method,
-                    'status_code': response.status_code,
-                },
-                endpoint=request.path,
-                user=user,
-            )
-            
-            SystemMetrics.objects.create(
-                metric_type='request_count',
-                value=1,
-                metadata={
-                    'method': request.method,
-                    'status_code': response.status_code,
-                },
-                endpoint=request.path,
-                user=user,
-            )
-            
-            # Log slow requests
-            if response_time > 1000:  # More than 1 second
-                logger.warning(
-                    f"Slow request: {request.method} {request.path} took {response_time:.2f}ms"
-                )
+                ))
             
-            # Log high query count
-            if query_count > 20:
-                logger.warning(
-                    f"High query count: {request.method} {request.path} executed {query_count} queries"
-                )
+            get_buffer().add(*records)
                 
         except Exception as e:
             # Don't break the request if logging fails
@@ -0,0 +1,261 @@
+"""
+Opt-in per-middleware cost profiling.
+
+``instrument_middleware`` interleaves a ``MiddlewareProbe`` before every entry
+of ``MIDDLEWARE`` and one around the view. Each probe measures the wall time,
+database queries and cache calls of everything inside it; subtracting the next
+probe's figures gives each middleware's own cost. Results are aggregated per
+process into histograms by ``MiddlewareProfileStore``.
+
+Enable it with ``MIDDLEWARE_PROFILING=True`` in the environment, read it from
+``/api/monitoring/middleware-profile/`` or run ``manage.py profile_middleware``
+to replay sample requests through an instrumented chain.
+
+``process_view``/``process_exception`` hooks run inside Django's view stage,
+so their cost is reported under ``view``. Cache calls are counted by wrapping
+the configured Django cache backends while profiling is active.
+
+This module is imported from settings, so it must not import models.
+"""
+
+import contextvars
+import os
+import threading
+import time
+import types
+from bisect import bisect_left
+from datetime import datetime, timezone as dt_timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+PROBE_PATH = 'system_monitoring.middleware_profiler.MiddlewareProbe'
+VIEW = 'view'
+
+# Upper bounds (ms) of the per-middleware histogram buckets; the last bucket is open-ended
+PROFILE_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250)
+
+CACHE_METHODS = (
+    'get', 'set', 'add', 'delete', 'touch', 'has_key', 'incr', 'decr',
+    'get_many', 'set_many', 'delete_many', 'clear',
+)
+
+
+def instrument_middleware(middleware):
+    """Return ``middleware`` with a probe before every entry and around the view."""
+    instrumented = []
+    for path in middleware:
+        if path == PROBE_PATH:
+            continue
+        instrumented += [PROBE_PATH, path]
+    instrumented.append(PROBE_PATH)
+    return instrumented
+
+
+class RequestProfile:
+    """Counters and probe spans of one request."""
+    __slots__ = ('queries', 'cache_calls', 'spans')
+
+    def __init__(self):
+        self.queries = 0
+        self.cache_calls = 0
+        self.spans = []  # [name, elapsed_ms, queries, cache_calls], outermost first
+
+
+_current_profile = contextvars.ContextVar('current_middleware_profile', default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    """Execute wrapper counting queries into the active ``RequestProfile``."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.queries += 1
+    return execute(sql, params, many, context)
+
+
+def _counting(method):
+    def wrapper(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.cache_calls += 1
+        return method(*args, **kwargs)
+    wrapper.__wrapped__ = method
+    wrapper.counts_cache_calls = True
+    return wrapper
+
+
+def _install_query_counter(sender=None, connection=None, **kwargs):
+    if connection is not None and count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+_counters_installed = False
+_install_lock = threading.Lock()
+
+
+def install_counters():
+    """Count queries on every connection and calls on every configured cache."""
+    global _counters_installed
+    if _counters_installed:
+        return
+    with _install_lock:
+        if _counters_installed:
+            return
+        from django.core.cache import caches
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        connection_created.connect(_install_query_counter, dispatch_uid='middleware_profiler_query_counter')
+        for connection in connections.all():
+            _install_query_counter(connection=connection)
+
+        for backend in {type(caches[alias]) for alias in caches}:
+            for name in CACHE_METHODS:
+                method = backend.__dict__.get(name) or getattr(backend, name, None)
+                if method is not None and not getattr(method, 'counts_cache_calls', False):
+                    setattr(backend, name, _counting(method))
+        _counters_installed = True
+
+
+class MiddlewareProfileStore:
+    """Thread-safe per-process aggregate of middleware costs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.started_at = datetime.now(dt_timezone.utc)
+            self._stats = {}
+            self._order = []
+
+    def record(self, profile):
+        """Fold one finished request into the aggregates."""
+        spans = profile.spans
+        with self._lock:
+            self.requests += 1
+            for index, (name, elapsed, queries, cache_calls) in enumerate(spans):
+                if index + 1 < len(spans):
+                    _, inner_elapsed, inner_queries, inner_cache = spans[index + 1]
+                    elapsed -= inner_elapsed
+                    queries -= inner_queries
+                    cache_calls -= inner_cache
+                stats = self._stats.get(name)
+                if stats is None:
+                    stats = self._stats[name] = {
+                        'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'queries': 0, 'cache_calls': 0,
+                        'histogram': [0] * (len(PROFILE_BUCKETS_MS) + 1),
+                    }
+                    self._order.append(name)
+                elapsed = max(elapsed, 0.0)
+                stats['calls'] += 1
+                stats['total_ms'] += elapsed
+                stats['max_ms'] = max(stats['max_ms'], elapsed)
+                stats['queries'] += queries
+                stats['cache_calls'] += cache_calls
+                stats['histogram'][bisect_left(PROFILE_BUCKETS_MS, elapsed)] += 1
+
+    def snapshot(self):
+        """Return per-middleware stats ranked by total time, most expensive first."""
+        from .rollups import histogram_percentile
+
+        with self._lock:
+            stats = {name: dict(values, histogram=list(values['histogram'])) for name, values in self._stats.items()}
+            order = list(self._order)
+            requests = self.requests
+        grand_total = sum(values['total_ms'] for values in stats.values())
+
+        ranked = []
+        for name, values in stats.items():
+            calls = values['calls']
+            ranked.append({
+                'middleware': name,
+                'position': order.index(name),
+                'calls': calls,
+                'total_ms': round(values['total_ms'], 3),
+                'avg_ms': round(values['total_ms'] / calls, 4) if calls else None,
+                'p95_ms': histogram_percentile(values['histogram'], 95, bounds=PROFILE_BUCKETS_MS),
+                'max_ms': round(values['max_ms'], 3),
+                'share': round(values['total_ms'] / grand_total, 4) if grand_total else 0.0,
+                'avg_queries': round(values['queries'] / calls, 2) if calls else 0,
+                'avg_cache_calls': round(values['cache_calls'] / calls, 2) if calls else 0,
+                'histogram': values['histogram'],
+            })
+        ranked.sort(key=lambda row: row['total_ms'], reverse=True)
+        return {
+            'pid': os.getpid(),
+            'since': self.started_at.isoformat(),
+            'requests': requests,
+            'bucket_bounds_ms': list(PROFILE_BUCKETS_MS),
+            'middleware': ranked,
+        }
+
+
+profile_store = MiddlewareProfileStore()
+
+
+def _layer_name(get_response):
+    """Dotted class path of the middleware behind ``get_response``, or ``view``."""
+    layer = get_response
+    for _ in range(10):
+        inner = getattr(layer, '__wrapped__', None) or getattr(layer, 'func', None) or getattr(layer, 'awaitable', None)
+        if inner is None:
+            break
+        layer = inner
+    if getattr(layer, '__self__', None) is not None:
+        # A bound method: BaseHandler._get_response(_async) is the view stage
+        return VIEW
+    if isinstance(layer, types.FunctionType):
+        return f"{layer.__module__}.{layer.__qualname__}"
+    return f"{type(layer).__module__}.{type(layer).__qualname__}"
+
+
+class MiddlewareProbe:
+    """Measures the layer directly inside it; inserted by ``instrument_middleware``."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.name = _layer_name(get_response)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install_counters()
+
+    def _enter(self):
+        profile = _current_profile.get()
+        token = None
+        if profile is None:
+            profile = RequestProfile()
+            token = _current_profile.set(profile)
+        span = [self.name, 0.0, profile.queries, profile.cache_calls]
+        profile.spans.append(span)
+        return profile, span, token, time.perf_counter()
+
+    def _exit(self, profile, span, token, start):
+        span[1] = (time.perf_counter() - start) * 1000
+        span[2] = profile.queries - span[2]
+        span[3] = profile.cache_calls - span[3]
+        if token is not None:
+            # Outermost probe: the request is done
+            _current_profile.reset(token)
+            profile_store.record(profile)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self._enter()
+        try:
+            return self.get_response(request)
+        finally:
+            self._exit(*state)
+
+    async def __acall__(self, request):
+        state = self._enter()
+        try:
+            return await self.get_response(request)
+        finally:
+            self._exit(*state)
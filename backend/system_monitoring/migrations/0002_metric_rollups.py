@@ -0,0 +1,41 @@
+# Generated by Django 5.0.7 on 2026-10-17 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system_monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour')], max_length=10)),
+                ('bucket_start', models.DateTimeField()),
+                ('metric_type', models.CharField(max_length=50)),
+                ('endpoint', models.CharField(blank=True, default='', max_length=200)),
+                ('method', models.CharField(blank=True, default='', max_length=10)),
+                ('status_code', models.IntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('total', models.FloatField(default=0)),
+                ('min_value', models.FloatField(blank=True, null=True)),
+                ('max_value', models.FloatField(blank=True, null=True)),
+                ('histogram', models.JSONField(blank=True, default=list, help_text='Counts per latency bucket')),
+            ],
+            options={
+                'verbose_name': 'Metric Rollup',
+                'verbose_name_plural': 'Metric Rollups',
+                'db_table': 'metric_rollups',
+                'ordering': ['-bucket_start'],
+                'indexes': [models.Index(fields=['resolution', 'metric_type', 'bucket_start'], name='metric_roll_resolut_22a009_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='metricrollup',
+            constraint=models.UniqueConstraint(fields=('resolution', 'bucket_start', 'metric_type', 'endpoint', 'method', 'status_code'), name='unique_metric_rollup_bucket'),
+        ),
+    ]
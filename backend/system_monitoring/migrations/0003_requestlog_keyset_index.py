@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-17 02:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system_monitoring', '0002_metric_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='requestlog',
+            name='request_log_timesta_ca68b4_idx',
+        ),
+        migrations.AddIndex(
+            model_name='requestlog',
+            index=models.Index(fields=['-timestamp', '-id'], name='request_log_timesta_a7202c_idx'),
+        ),
+    ]
@@ -74,7 +74,8 @@ class RequestLog(models.Model):
         verbose_name_plural = 'Request Logs'
         ordering = ['-timestamp']
         indexes = [
-            models.Index(fields=['-timestamp']),
+            # Matches RequestLogCursorPagination's (-timestamp, -id) keyset
+            models.Index(fields=['-timestamp', '-id']),
             models.Index(fields=['method', '-timestamp']),
             models.Index(fields=['status_code', '-timestamp']),
             models.Index(fields=['user', '-timestamp']),
@@ -182,3 +183,49 @@ class PerformanceMetric(models.Model):
     
     def __str__(self):
         return f"{self.method} {self.endpoint}: {self.response_time}ms"
+
+
+class MetricRollup(models.Model):
+    """Pre-aggregated time bucket of request logs and system metrics"""
+    
+    RESOLUTION_CHOICES = [
+        ('minute', 'Minute'),
+        ('hour', 'Hour'),
+    ]
+    
+    # RequestLog rows are rolled up under this metric type
+    REQUEST = 'request'
+    
+    resolution = models.CharField(max_length=10, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField()
+    metric_type = models.CharField(max_length=50)
+    endpoint = models.CharField(max_length=200, blank=True, default='')
+    method = models.CharField(max_length=10, blank=True, default='')
+    status_code = models.IntegerField(default=0)
+    count = models.IntegerField(default=0)
+    total = models.FloatField(default=0)
+    min_value = models.FloatField(null=True, blank=True)
+    max_value = models.FloatField(null=True, blank=True)
+    histogram = models.JSONField(default=list, blank=True, help_text='Counts per latency bucket')
+    
+    class Meta:
+        db_table = 'metric_rollups'
+        verbose_name = 'Metric Rollup'
+        verbose_name_plural = 'Metric Rollups'
+        ordering = ['-bucket_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['resolution', 'bucket_start', 'metric_type', 'endpoint', 'method', 'status_code'],
+                name='unique_metric_rollup_bucket',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['resolution', 'metric_type', 'bucket_start']),
+        ]
+    
+    def __str__(self):
+        return f"{self.metric_type} {self.method} {self.endpoint} @ {self.bucket_start} ({self.resolution}): {self.count}"
+    
+    @property
+    def avg(self):
+        return self.total / self.count if self.count else None
@@ -0,0 +1,267 @@
+"""
+Per-minute and per-hour rollups of request telemetry.
+
+``MetricRollup`` rows hold count, sum, min, max and a latency histogram for
+each (bucket, metric type, endpoint, method, status) combination. They are
+kept up to date incrementally from every ``TelemetryBuffer`` flush, and
+``cleanup_monitoring_data`` backfills any hours that are missing before it
+deletes the raw ``RequestLog``/``SystemMetrics`` rows.
+
+The dashboard (``system_metrics``) reads only rollups, so its cost depends on
+the number of buckets in the period rather than the number of requests.
+"""
+
+from bisect import bisect_left
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Min, Sum
+from django.utils import timezone
+
+from core.utils import normalize_endpoint
+
+from .models import MetricRollup, RequestLog, SystemMetrics
+
+MINUTE = 'minute'
+HOUR = 'hour'
+RESOLUTIONS = (MINUTE, HOUR)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000)
+LATENCY_METRICS = {MetricRollup.REQUEST, 'response_time'}
+
+ENDPOINT_MAX_LENGTH = MetricRollup._meta.get_field('endpoint').max_length
+
+MERGE_RETRIES = 3
+
+
+def bucket_start(timestamp, resolution):
+    """Start of the ``resolution`` bucket containing ``timestamp``."""
+    timestamp = timestamp.replace(second=0, microsecond=0)
+    if resolution == HOUR:
+        timestamp = timestamp.replace(minute=0)
+    return timestamp
+
+
+def histogram_index(value):
+    """Index of the latency histogram bucket for ``value`` milliseconds."""
+    return bisect_left(LATENCY_BUCKETS_MS, value)
+
+
+def histogram_percentile(histogram, percentile, bounds=LATENCY_BUCKETS_MS):
+    """
+    Approximate percentile from merged histogram counts.
+
+    Returns the upper bound of the bucket holding the percentile, or ``None``
+    for the open-ended last bucket or an empty histogram.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    threshold = total * percentile / 100
+    running = 0
+    for index, count in enumerate(histogram):
+        running += count
+        if running >= threshold:
+            return bounds[index] if index < len(bounds) else None
+    return None
+
+
+def merge_histograms(histograms):
+    merged = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for histogram in histograms:
+        for index, count in enumerate(histogram or []):
+            merged[index] += count
+    return merged
+
+
+class RollupAccumulator:
+    """Aggregates samples in memory, keyed like ``MetricRollup`` rows."""
+
+    def __init__(self, resolutions=RESOLUTIONS):
+        self.resolutions = resolutions
+        self.buckets = {}
+
+    def __len__(self):
+        return len(self.buckets)
+
+    def add(self, timestamp, metric_type, value, endpoint='', method='', status_code=0):
+        timestamp = timestamp or timezone.now()
+        endpoint = normalize_endpoint(endpoint, ENDPOINT_MAX_LENGTH)
+        for resolution in self.resolutions:
+            key = (resolution, bucket_start(timestamp, resolution), metric_type,
+                   endpoint, method or '', status_code or 0)
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = {'count': 0, 'total': 0.0, 'min': value, 'max': value,
+                                              'histogram': None}
+                if metric_type in LATENCY_METRICS:
+                    bucket['histogram'] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            bucket['count'] += 1
+            bucket['total'] += value
+            bucket['min'] = min(bucket['min'], value)
+            bucket['max'] = max(bucket['max'], value)
+            if bucket['histogram'] is not None:
+                bucket['histogram'][histogram_index(value)] += 1
+
+    def add_request_log(self, log):
+        self.add(log.timestamp, MetricRollup.REQUEST, log.response_time,
+                 log.path, log.method, log.status_code)
+
+    def add_system_metric(self, metric):
+        metadata = metric.metadata or {}
+        self.add(metric.timestamp, metric.metric_type, metric.value,
+                 metric.endpoint or metadata.get('endpoint', ''),
+                 metadata.get('method', ''), metadata.get('status_code', 0))
+
+    def save(self):
+        """Merge the accumulated buckets into ``MetricRollup``; returns rows touched."""
+        if not self.buckets:
+            return 0
+        for attempt in range(MERGE_RETRIES):
+            try:
+                return self._merge()
+            except IntegrityError:
+                # Another process created one of our buckets first; re-read and merge again
+                if attempt == MERGE_RETRIES - 1:
+                    raise
+        return 0
+
+    def _merge(self):
+        starts = {}
+        for resolution, start, *_ in self.buckets:
+            starts.setdefault(resolution, set()).add(start)
+
+        with transaction.atomic():
+            existing = {}
+            for resolution, bucket_starts in starts.items():
+                rows = MetricRollup.objects.select_for_update().filter(
+                    resolution=resolution, bucket_start__in=bucket_starts
+                )
+                for rollup in rows:
+                    existing[(rollup.resolution, rollup.bucket_start, rollup.metric_type,
+                              rollup.endpoint, rollup.method, rollup.status_code)] = rollup
+
+            to_create, to_update = [], []
+            for key, bucket in self.buckets.items():
+                rollup = existing.get(key)
+                if rollup is None:
+                    resolution, start, metric_type, endpoint, method, status_code = key
+                    to_create.append(MetricRollup(
+                        resolution=resolution, bucket_start=start, metric_type=metric_type,
+                        endpoint=endpoint, method=method, status_code=status_code,
+                        count=bucket['count'], total=bucket['total'],
+                        min_value=bucket['min'], max_value=bucket['max'],
+                        histogram=bucket['histogram'] or [],
+                    ))
+                    continue
+                rollup.count += bucket['count']
+                rollup.total += bucket['total']
+                rollup.min_value = bucket['min'] if rollup.min_value is None else min(rollup.min_value, bucket['min'])
+                rollup.max_value = bucket['max'] if rollup.max_value is None else max(rollup.max_value, bucket['max'])
+                if bucket['histogram'] is not None:
+                    rollup.histogram = merge_histograms([rollup.histogram, bucket['histogram']])
+                to_update.append(rollup)
+
+            MetricRollup.objects.bulk_update(
+                to_update, ['count', 'total', 'min_value', 'max_value', 'histogram'], batch_size=500
+            )
+            MetricRollup.objects.bulk_create(to_create, batch_size=500)
+        return len(to_create) + len(to_update)
+
+
+def record_rollups(instances):
+    """Roll up freshly written ``RequestLog``/``SystemMetrics`` instances."""
+    accumulator = RollupAccumulator()
+    for instance in instances:
+        if isinstance(instance, RequestLog):
+            accumulator.add_request_log(instance)
+        elif isinstance(instance, SystemMetrics):
+            accumulator.add_system_metric(instance)
+    return accumulator.save()
+
+
+def backfill_rollups(end, start=None, chunk_size=2000):
+    """
+    Roll up raw rows older than ``end`` whose hour has no rollups yet.
+
+    Hours that already have rollups (written incrementally by the telemetry
+    writer) are skipped, so running this repeatedly never double counts.
+    Returns the number of raw rows rolled up.
+    """
+    end = bucket_start(end, HOUR)
+    covered = set(
+        MetricRollup.objects.filter(resolution=HOUR, bucket_start__lt=end)
+        .values_list('bucket_start', flat=True).distinct()
+    )
+
+    rolled_up = 0
+    for model, add in ((RequestLog, RollupAccumulator.add_request_log),
+                       (SystemMetrics, RollupAccumulator.add_system_metric)):
+        rows = model.objects.filter(timestamp__lt=end)
+        if start is not None:
+            rows = rows.filter(timestamp__gte=start)
+        accumulator = RollupAccumulator()
+        for row in rows.order_by('timestamp').iterator(chunk_size=chunk_size):
+            if bucket_start(row.timestamp, HOUR) in covered:
+                continue
+            add(accumulator, row)
+            rolled_up += 1
+            if len(accumulator) >= chunk_size:
+                accumulator.save()
+                accumulator = RollupAccumulator()
+        accumulator.save()
+    return rolled_up
+
+
+def dashboard_resolution(hours):
+    """Minute buckets for short periods, hour buckets otherwise."""
+    return MINUTE if hours <= 6 else HOUR
+
+
+def summarize(since, resolution):
+    """Aggregate rollups since ``since`` into the ``system_metrics`` payload."""
+    rollups = MetricRollup.objects.filter(
+        resolution=resolution, bucket_start__gte=bucket_start(since, resolution)
+    )
+    requests = rollups.filter(metric_type=MetricRollup.REQUEST)
+
+    metrics = {}
+    for row in (rollups.exclude(metric_type=MetricRollup.REQUEST).values('metric_type')
+                .annotate(count=Sum('count'), total=Sum('total'),
+                          min=Min('min_value'), max=Max('max_value'))):
+        metrics[row['metric_type']] = {
+            'count': row['count'],
+            'avg': row['total'] / row['count'] if row['count'] else None,
+            'min': row['min'],
+            'max': row['max'],
+        }
+
+    totals = requests.aggregate(count=Sum('count'), total=Sum('total'))
+    total_requests = totals['count'] or 0
+    histogram = merge_histograms(requests.values_list('histogram', flat=True))
+    request_stats = {
+        'total_requests': total_requests,
+        'by_method': dict(
+            requests.values('method').annotate(count=Sum('count')).values_list('method', 'count')
+        ),
+        'by_status': dict(
+            requests.values('status_code').annotate(count=Sum('count')).values_list('status_code', 'count')
+        ),
+        'avg_response_time': totals['total'] / total_requests if total_requests else None,
+        'p95_response_time': histogram_percentile(histogram, 95),
+        'latency_histogram': {
+            'bounds_ms': list(LATENCY_BUCKETS_MS),
+            'counts': histogram,
+        },
+    }
+
+    timeline = [
+        {
+            'bucket': row['bucket_start'].isoformat(),
+            'requests': row['count'],
+            'avg_response_time': row['total'] / row['count'] if row['count'] else None,
+        }
+        for row in requests.values('bucket_start').annotate(count=Sum('count'), total=Sum('total'))
+        .order_by('bucket_start')
+    ]
+    return metrics, request_stats, timeline
@@ -0,0 +1,279 @@
+"""
+Buffered request telemetry for system monitoring.
+
+``PerformanceMonitoringMiddleware`` hands finished request records to a
+process-wide ``TelemetryBuffer`` instead of writing them inline. A background
+writer thread flushes the buffer with ``bulk_create`` every
+``FLUSH_INTERVAL`` seconds or as soon as ``BATCH_SIZE`` records are queued.
+When the buffer is full new records are dropped (and counted) rather than
+slowing requests down. Each flush also folds the written records into the
+dashboard rollups (``system_monitoring.rollups``). ``accounts.activity`` queues
+its rolled-up activity rows on the same buffer.
+
+Query counts and database time are measured by a connection execute wrapper
+that is installed on every database connection, so they work without DEBUG.
+
+Configured through ``settings.MONITORING_TELEMETRY``:
+
+* ``ENABLED``: record request telemetry at all
+* ``SAMPLE_RATE``: fraction of ordinary requests recorded (errors and slow
+  requests are always recorded)
+* ``SLOW_REQUEST_MS``: threshold for slow requests
+* ``ASYNC_WRITER``: flush from a background thread; when off, the request
+  that fills a batch flushes it inline
+* ``FLUSH_INTERVAL``, ``BATCH_SIZE``, ``MAX_BUFFER``: writer tuning
+"""
+
+import atexit
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TELEMETRY_SETTINGS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1.0,
+    'SLOW_REQUEST_MS': 1000,
+    'ASYNC_WRITER': True,
+    'FLUSH_INTERVAL': 2.0,
+    'BATCH_SIZE': 500,
+    'MAX_BUFFER': 10000,
+}
+
+
+def get_telemetry_settings():
+    """Return telemetry settings merged over the defaults."""
+    return {**DEFAULT_TELEMETRY_SETTINGS, **getattr(settings, 'MONITORING_TELEMETRY', {})}
+
+
+# Query timing
+
+class QueryStats:
+    """Number of queries and total database time (seconds) for one request."""
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+_current_query_stats = contextvars.ContextVar('current_query_stats', default=None)
+
+
+def query_timer(execute, sql, params, many, context):
+    """Execute wrapper that accumulates timings into the active ``QueryStats``."""
+    stats = _current_query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.count += 1
+        stats.duration += time.perf_counter() - start
+
+
+def install_query_timer(sender=None, connection=None, **kwargs):
+    """``connection_created`` receiver adding ``query_timer`` once per connection."""
+    if connection is not None and query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+def start_query_stats():
+    """Begin collecting query stats in the current context."""
+    stats = QueryStats()
+    return stats, _current_query_stats.set(stats)
+
+
+def stop_query_stats(token):
+    """Stop collecting query stats started with ``start_query_stats``."""
+    try:
+        _current_query_stats.reset(token)
+    except (ValueError, RuntimeError):
+        # Token created in another context (e.g. middleware hopping threads)
+        _current_query_stats.set(None)
+
+
+# Buffering
+
+class TelemetryBuffer:
+    """Thread-safe in-process buffer of unsaved model instances."""
+
+    def __init__(self, flush_interval=2.0, batch_size=500, max_size=10000, async_writer=True):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_size = max_size
+        self.async_writer = async_writer
+        self.dropped = 0
+        self.flushed = 0
+        self._records = defaultdict(list)
+        self._size = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def __len__(self):
+        return self._size
+
+    def add(self, *instances):
+        """Queue model instances for a later ``bulk_create``."""
+        self._check_fork()
+        with self._lock:
+            if self._size + len(instances) > self.max_size:
+                self.dropped += len(instances)
+                return False
+            for instance in instances:
+                self._records[type(instance)].append(instance)
+            self._size += len(instances)
+            batch_ready = self._size >= self.batch_size
+            interval_elapsed = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if self.async_writer:
+            self._ensure_writer()
+            if batch_ready:
+                self._wakeup.set()
+        elif batch_ready or interval_elapsed:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Write every queued record; returns the number written."""
+        with self._flush_lock:
+            with self._lock:
+                records, self._records = self._records, defaultdict(list)
+                self._size = 0
+                self._last_flush = time.monotonic()
+
+            written = []
+            for model, instances in records.items():
+                try:
+                    model.objects.bulk_create(instances, batch_size=self.batch_size)
+                    written.extend(instances)
+                except Exception as e:
+                    logger.error(f"Error writing {len(instances)} {model.__name__} telemetry records: {e}")
+            if written:
+                self._update_rollups(written)
+            self.flushed += len(written)
+            return len(written)
+
+    def _update_rollups(self, instances):
+        from .rollups import record_rollups
+
+        try:
+            record_rollups(instances)
+        except Exception as e:
+            logger.error(f"Error updating metric rollups: {e}")
+
+    def stop(self, flush=True, timeout=5.0):
+        """Stop the writer thread, then write (or with ``flush=False`` discard) what is still queued."""
+        self._stopping.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+        if flush:
+            return self.flush()
+        with self._lock:
+            self._records = defaultdict(list)
+            self._size = 0
+        return 0
+
+    def _ensure_writer(self):
+        if self._stopping.is_set() or (self._thread is not None and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='telemetry-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break   # stop() writes the rest from the caller's thread
+            try:
+                if self._size:
+                    self.flush()
+            finally:
+                # The writer thread owns its connections; don't leave them open between flushes
+                connections.close_all()
+
+    def _check_fork(self):
+        # Worker processes forked from a parent must not inherit its queue or thread
+        pid = os.getpid()
+        if pid != self._pid:
+            with self._lock:
+                self._pid = pid
+                self._records = defaultdict(list)
+                self._size = 0
+                self._thread = None
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """Return the process-wide ``TelemetryBuffer``, creating it on first use."""
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = get_telemetry_settings()
+                _buffer = TelemetryBuffer(
+                    flush_interval=config['FLUSH_INTERVAL'],
+                    batch_size=config['BATCH_SIZE'],
+                    max_size=config['MAX_BUFFER'],
+                    async_writer=config['ASYNC_WRITER'],
+                )
+    return _buffer
+
+
+def shutdown_buffer(flush=True):
+    """Stop the process-wide writer and write (or discard) what is queued; the next use starts afresh."""
+    global _buffer
+    with _buffer_lock:
+        buffer, _buffer = _buffer, None
+    if buffer is not None:
+        buffer.stop(flush=flush)
+
+
+atexit.register(shutdown_buffer)
+
+
+def reset_buffer():
+    """Drop the process-wide buffer and its queued records so it is rebuilt from current settings."""
+    shutdown_buffer(flush=False)
+
+
+@receiver(setting_changed)
+def _reset_on_setting_changed(setting, **kwargs):
+    if setting == 'MONITORING_TELEMETRY':
+        reset_buffer()
+
+
+def should_record(response_time, status_code, config=None):
+    """Sampling decision: always keep errors and slow requests."""
+    config = config or get_telemetry_settings()
+    if not config['ENABLED']:
+        return False
+    if status_code >= 500 or response_time >= config['SLOW_REQUEST_MS']:
+        return True
+    return random.random() < config['SAMPLE_RATE']
@@ -12,7 +12,7 @@ User = get_user_model()
 # Import models after User is defined
 try:
     from system_monitoring.models import (
-        SystemMetrics, RequestLog, ErrorLog, HealthCheck, PerformanceMetric
+        SystemMetrics, RequestLog, ErrorLog, HealthCheck, PerformanceMetric, MetricRollup
     )
 except ImportError:
     # Fallback if import fails
@@ -21,6 +21,7 @@ except ImportError:
     ErrorLog = None
     HealthCheck = None
     PerformanceMetric = None
+    MetricRollup = None
 
 
 class SystemMonitoringModelTestCase(TestCase):
@@ -190,3 +191,246 @@ class SystemMonitoringAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         error.refresh_from_db()
         self.assertTrue(error.resolved)
+
+
+TELEMETRY_TEST_SETTINGS = {
+    'ENABLED': True,
+    'SAMPLE_RATE': 1.0,
+    'SLOW_REQUEST_MS': 1000,
+    'ASYNC_WRITER': False,
+    'FLUSH_INTERVAL': 3600,
+    'BATCH_SIZE': 1000,
+    'MAX_BUFFER': 1000,
+}
+
+
+class TelemetryPipelineTestCase(APITestCase):
+    """Test buffered request telemetry"""
+    
+    def setUp(self):
+        from system_monitoring import telemetry
+        self.telemetry = telemetry
+        telemetry.reset_buffer()
+        self.user = User.objects.create_user(
+            username='telemetry',
+            email='telemetry@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(user=self.user)
+    
+    def tearDown(self):
+        self.telemetry.reset_buffer()
+    
+    def test_request_is_buffered_until_flush(self):
+        """Telemetry rows should only be written when the buffer flushes"""
+        with self.settings(MONITORING_TELEMETRY=TELEMETRY_TEST_SETTINGS):
+            self.client.get('/api/notifications/')
+            self.assertFalse(RequestLog.objects.filter(path='/api/notifications/').exists())
+            
+            self.assertGreaterEqual(self.telemetry.get_buffer().flush(), 4)
+        
+        self.assertTrue(RequestLog.objects.filter(path='/api/notifications/').exists())
+        metric = PerformanceMetric.objects.get(endpoint='/api/notifications/')
+        # Query timing comes from the execute wrapper, not connection.queries
+        self.assertGreater(metric.query_count, 0)
+        self.assertGreater(metric.database_time, 0)
+    
+    def test_sampling_skips_ordinary_requests(self):
+        """A zero sample rate should drop ordinary requests"""
+        config = {**TELEMETRY_TEST_SETTINGS, 'SAMPLE_RATE': 0.0}
+        with self.settings(MONITORING_TELEMETRY=config):
+            self.client.get('/api/notifications/')
+            self.assertEqual(len(self.telemetry.get_buffer()), 0)
+            self.assertTrue(self.telemetry.should_record(5.0, 500, config))
+            self.assertTrue(self.telemetry.should_record(5000.0, 200, config))
+    
+    def test_full_buffer_drops_records(self):
+        """Records beyond MAX_BUFFER should be dropped, not block"""
+        buffer = self.telemetry.TelemetryBuffer(max_size=2, batch_size=10, async_writer=False, flush_interval=3600)
+        self.assertTrue(buffer.add(SystemMetrics(metric_type='request_count', value=1)))
+        self.assertFalse(buffer.add(*[SystemMetrics(metric_type='request_count', value=1)] * 2))
+        self.assertEqual(buffer.dropped, 2)
+        self.assertEqual(buffer.flush(), 1)
+    
+    def test_stop_ends_writer_and_flushes(self):
+        """Stopping the buffer should end its writer thread and write what is left"""
+        buffer = self.telemetry.TelemetryBuffer(max_size=10, batch_size=10, async_writer=True, flush_interval=3600)
+        buffer.add(SystemMetrics(metric_type='request_count', value=1))
+        thread = buffer._thread
+        self.assertTrue(thread.is_alive())
+        self.assertEqual(buffer.stop(), 1)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(SystemMetrics.objects.count(), 1)
+        # A stopped buffer does not start another writer
+        buffer.add(SystemMetrics(metric_type='request_count', value=1))
+        self.assertIsNone(buffer._thread)
+    
+    def test_batch_size_triggers_inline_flush(self):
+        """Without the writer thread, a full batch flushes inline"""
+        buffer = self.telemetry.TelemetryBuffer(max_size=10, batch_size=2, async_writer=False, flush_interval=3600)
+        buffer.add(SystemMetrics(metric_type='request_count', value=1))
+        self.assertEqual(SystemMetrics.objects.count(), 0)
+        buffer.add(SystemMetrics(metric_type='request_count', value=1))
+        self.assertEqual(SystemMetrics.objects.count(), 2)
+        self.assertEqual(len(buffer), 0)
+
+
+
+class MetricRollupTestCase(APITestCase):
+    """Test pre-aggregated dashboard rollups"""
+    
+    def setUp(self):
+        from system_monitoring import rollups
+        self.rollups = rollups
+        self.admin_user = User.objects.create_user(
+            username='rollupadmin',
+            email='rollupadmin@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+    
+    def _log(self, path, method='GET', status_code=200, response_time=40.0, timestamp=None):
+        log = RequestLog.objects.create(
+            method=method, path=path, status_code=status_code, response_time=response_time
+        )
+        if timestamp is not None:
+            RequestLog.objects.filter(pk=log.pk).update(timestamp=timestamp)
+            log.timestamp = timestamp
+        return log
+    
+    def test_flush_merges_into_minute_and_hour_buckets(self):
+        """Each telemetry flush should merge into existing rollup rows"""
+        from system_monitoring.telemetry import TelemetryBuffer
+        buffer = TelemetryBuffer(max_size=100, batch_size=100, async_writer=False, flush_interval=3600)
+        for path, response_time in [('/api/projects/12/', 30.0), ('/api/projects/13/', 700.0)]:
+            buffer.add(RequestLog(method='GET', path=path, status_code=200, response_time=response_time))
+            buffer.flush()
+        
+        rollup = MetricRollup.objects.get(resolution='hour', metric_type='request')
+        self.assertEqual(rollup.endpoint, '/api/projects/{id}/')
+        self.assertEqual(rollup.count, 2)
+        self.assertEqual(rollup.total, 730.0)
+        self.assertEqual((rollup.min_value, rollup.max_value), (30.0, 700.0))
+        self.assertEqual(sum(rollup.histogram), 2)
+        self.assertEqual(rollup.histogram[0], 1)
+        self.assertTrue(MetricRollup.objects.filter(resolution='minute', metric_type='request').exists())
+    
+    def test_system_metrics_reads_rollups(self):
+        """The dashboard should report totals from rollups, not raw rows"""
+        self.rollups.record_rollups([
+            self._log('/api/projects/', response_time=20.0),
+            self._log('/api/projects/', method='POST', status_code=201, response_time=120.0),
+            self._log('/api/projects/', status_code=500, response_time=3000.0),
+        ])
+        RequestLog.objects.all().delete()
+        
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get('/api/monitoring/system-metrics/', {'hours': 2})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['resolution'], 'minute')
+        requests = response.data['requests']
+        self.assertEqual(requests['total_requests'], 3)
+        self.assertEqual(requests['by_method'], {'GET': 2, 'POST': 1})
+        self.assertEqual(requests['by_status'], {200: 1, 201: 1, 500: 1})
+        self.assertAlmostEqual(requests['avg_response_time'], 3140.0 / 3)
+        self.assertEqual(requests['p95_response_time'], 5000)
+        self.assertEqual(sum(point['requests'] for point in response.data['timeline']), 3)
+    
+    def test_cleanup_compacts_raw_rows(self):
+        """Cleanup should roll up old raw rows before deleting them"""
+        from datetime import timedelta
+        from django.core.management import call_command
+        from io import StringIO
+        
+        old = timezone.now() - timedelta(days=40)
+        self._log('/api/projects/', timestamp=old)
+        self._log('/api/projects/', timestamp=old)
+        
+        call_command('cleanup_monitoring_data', days=30, hour_rollup_days=365, stdout=StringIO())
+        
+        self.assertFalse(RequestLog.objects.exists())
+        rollup = MetricRollup.objects.get(resolution='hour', metric_type='request')
+        self.assertEqual(rollup.count, 2)
+        # Minute rollups of old data fall outside their retention
+        self.assertFalse(MetricRollup.objects.filter(resolution='minute').exists())
+        
+        # A second run must not count the same hour twice
+        call_command('cleanup_monitoring_data', days=30, stdout=StringIO())
+        self.assertEqual(MetricRollup.objects.get(resolution='hour').count, 2)
+
+
+class MiddlewareProfilerTestCase(APITestCase):
+    """Test per-middleware cost instrumentation"""
+    
+    def setUp(self):
+        from system_monitoring.middleware_profiler import profile_store
+        self.store = profile_store
+        self.store.reset()
+        self.addCleanup(self.store.reset)
+        self.admin_user = User.objects.create_user(
+            username='profileadmin',
+            email='profileadmin@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+    
+    def test_instrumented_chain_attributes_cost_to_each_middleware(self):
+        """Every middleware and the view should get their own span"""
+        from django.conf import settings
+        from system_monitoring.middleware_profiler import PROBE_PATH, VIEW, instrument_middleware
+        
+        middleware = instrument_middleware(settings.MIDDLEWARE)
+        self.assertEqual(middleware.count(PROBE_PATH), len(settings.MIDDLEWARE) + 1)
+        self.assertEqual(instrument_middleware(middleware), middleware)
+        
+        with self.settings(MIDDLEWARE=middleware):
+            self.client.force_authenticate(user=self.admin_user)
+            self.client.get('/api/monitoring/health/')
+            self.client.get('/api/monitoring/health/')
+        
+        report = self.store.snapshot()
+        names = {row['middleware']: row for row in report['middleware']}
+        self.assertEqual(report['requests'], 2)
+        self.assertIn(VIEW, names)
+        self.assertIn('core.middleware.RateLimitMiddleware', names)
+        self.assertEqual(len(names), len(settings.MIDDLEWARE) + 1)
+        self.assertTrue(all(row['calls'] == 2 for row in names.values()))
+        # The health check runs a database query inside the view
+        self.assertGreater(names[VIEW]['avg_queries'], 0)
+        self.assertAlmostEqual(sum(row['share'] for row in names.values()), 1.0, places=2)
+    
+    def test_middleware_profile_endpoint(self):
+        """Admins can read and reset the per-process profile"""
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get('/api/monitoring/middleware-profile/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('middleware', response.data)
+        self.assertFalse(response.data['enabled'])
+        
+        response = self.client.delete('/api/monitoring/middleware-profile/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+    
+    def test_profile_middleware_command(self):
+        """The command should print a ranked report for the replayed paths"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        out = StringIO()
+        call_command('profile_middleware', path=['/api/monitoring/health/'], repeat=2, sample=0, stdout=out)
+        output = out.getvalue()
+        self.assertIn('Replayed 2 requests over 1 paths', output)
+        self.assertIn('core.middleware.SecurityMiddleware', output)
+        self.assertIn('view', output)
+    
+    def test_profile_middleware_command_authenticates_user(self):
+        """--user should replay the requests with a JWT for that user"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        out = StringIO()
+        call_command(
+            'profile_middleware', path=['/api/users/me/'], repeat=2, sample=0,
+            user=self.admin_user.username, stdout=out,
+        )
+        self.assertIn('status codes: 200=2', out.getvalue())
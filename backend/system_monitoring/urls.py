@@ -17,6 +17,7 @@ urlpatterns = [
     path('', include(router.urls)),
     path('health/', views.health_check, name='health-check'),
     path('system-metrics/', views.system_metrics, name='system-metrics-summary'),
+    path('middleware-profile/', views.middleware_profile, name='middleware-profile'),
     # WebSocket monitoring endpoints
     path('websocket/metrics/', views_websocket.websocket_metrics, name='websocket-metrics'),
     path('websocket/active-connections/', views_websocket.websocket_active_connections, name='websocket-active-connections'),
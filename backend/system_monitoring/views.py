@@ -5,15 +5,19 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from django.conf import settings
 from django.db import connection, models
 from django.core.cache import cache
 from django.utils import timezone
 from datetime import timedelta
 import psutil
 import os
+from core.pagination import RequestLogPageOrCursorPagination
 from .models import (
     SystemMetrics, RequestLog, ErrorLog, HealthCheck, PerformanceMetric
 )
+from . import rollups
+from .middleware_profiler import profile_store
 from .serializers import (
     SystemMetricsSerializer, RequestLogSerializer, ErrorLogSerializer,
     HealthCheckSerializer, PerformanceMetricSerializer
@@ -180,67 +184,48 @@ def health_check(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def system_metrics(request):
-    """Get system metrics summary"""
+    """Get system metrics summary from the pre-aggregated rollups"""
     hours = int(request.GET.get('hours', 24))
     since = timezone.now() - timedelta(hours=hours)
+    resolution = rollups.dashboard_resolution(hours)
     
-    # Get metrics
-    metrics = SystemMetrics.objects.filter(timestamp__gte=since)
-    
-    # Aggregate by type
-    aggregated = {}
-    for metric_type, _ in SystemMetrics.METRIC_TYPES:
-        type_metrics = metrics.filter(metric_type=metric_type)
-        if type_metrics.exists():
-            from django.db.models import Avg, Min, Max
-            aggregated[metric_type] = {
-                'count': type_metrics.count(),
-                'avg': type_metrics.aggregate(Avg('value'))['value__avg'],
-                'min': type_metrics.aggregate(Min('value'))['value__min'],
-                'max': type_metrics.aggregate(Max('value'))['value__max'],
-            }
-    
-    # Get request statistics
-    from django.db.models import Avg
-    request_logs = RequestLog.objects.filter(timestamp__gte=since)
-    request_stats = {
-        'total_requests': request_logs.count(),
-        'by_method': {},
-        'by_status': {},
-        'avg_response_time': request_logs.aggregate(Avg('response_time'))['response_time__avg'],
-    }
-    
-    for method in ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']:
-        count = request_logs.filter(method=method).count()
-        if count > 0:
-            request_stats['by_method'][method] = count
-    
-    for status_code in [200, 201, 400, 401, 403, 404, 500]:
-        count = request_logs.filter(status_code=status_code).count()
-        if count > 0:
-            request_stats['by_status'][status_code] = count
+    aggregated, request_stats, timeline = rollups.summarize(since, resolution)
     
     # Get error statistics
     error_logs = ErrorLog.objects.filter(timestamp__gte=since, resolved=False)
+    by_level = dict(
+        error_logs.values('level').annotate(count=models.Count('id')).values_list('level', 'count')
+    )
     error_stats = {
-        'total_errors': error_logs.count(),
-        'by_level': {},
+        'total_errors': sum(by_level.values()),
+        'by_level': by_level,
     }
     
-    for level, _ in ErrorLog.ERROR_LEVELS:
-        count = error_logs.filter(level=level).count()
-        if count > 0:
-            error_stats['by_level'][level] = count
-    
     return Response({
         'period_hours': hours,
         'since': since.isoformat(),
+        'resolution': resolution,
         'metrics': aggregated,
         'requests': request_stats,
+        'timeline': timeline,
         'errors': error_stats,
     })
 
 
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def middleware_profile(request):
+    """Per-middleware cost ranking for this worker process; DELETE resets it"""
+    if request.method == 'DELETE':
+        profile_store.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    return Response({
+        'enabled': getattr(settings, 'MIDDLEWARE_PROFILING', False),
+        **profile_store.snapshot(),
+    })
+
+
 class SystemMetricsViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for system metrics"""
     queryset = SystemMetrics.objects.all()
@@ -256,6 +241,7 @@ class RequestLogViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = RequestLog.objects.all()
     serializer_class = RequestLogSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = RequestLogPageOrCursorPagination
     filterset_fields = ['method', 'status_code', 'user']
     search_fields = ['path', 'ip_address']
     ordering = ['-timestamp']
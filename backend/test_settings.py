@@ -46,8 +46,8 @@ LOGGING = {
     },
 }
 
-# Test-specific settings
-TEST_RUNNER = 'django.test.runner.DiscoverRunner'
+# Test-specific settings (the runner applies core.testing.settings_overrides())
+TEST_RUNNER = 'core.testing.TestRunner'
 
 # Disable cache during tests
 CACHES = {
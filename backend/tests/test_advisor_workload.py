@@ -0,0 +1,197 @@
+"""
+Tests for incrementally maintained advisor workload counters
+"""
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from advisors.models import Advisor, AdvisorSpecialization, AdvisorWorkloadCounter
+from advisors.workload import COUNTER_FIELDS, rebuild_workload_counters
+from milestones.models import Milestone, MilestoneTemplate
+from projects.models import Project, ProjectGroup
+
+User = get_user_model()
+
+
+class AdvisorWorkloadTestCase(TestCase):
+    """Counters should follow assignment changes without recounting"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='workload_admin', email='workload_admin@example.com', password='testpass123', role='Admin'
+        )
+        self.advisor = self._advisor('workload_one', 'ADV-W01', quota=2, main_committee_quota=1)
+        self.other = self._advisor('workload_two', 'ADV-W02')
+        self.template = MilestoneTemplate.objects.create(name='Workload', description='Workload plan')
+        self.projects = []
+        for i, year in enumerate(['2024-2025', '2024-2025', '2025-2026']):
+            project_id = f'{year}-W{i:03d}'
+            ProjectGroup.objects.create(project_id=project_id, topic_lao='', topic_eng=f'Workload {i}')
+            self.projects.append(Project.objects.create(project_id=project_id, title=f'Workload {i}', advisor=self.advisor))
+
+    def _advisor(self, username, advisor_id, **quotas):
+        user = User.objects.create_user(
+            username=username, email=f'{username}@example.com', password='testpass123',
+            role='Advisor', first_name='Workload', last_name=username
+        )
+        return Advisor.objects.create(user=user, advisor_id=advisor_id, **quotas)
+
+    def _counters(self, advisor, academic_year):
+        return dict(zip(COUNTER_FIELDS, AdvisorWorkloadCounter.objects.filter(
+            advisor=advisor, academic_year=academic_year
+        ).values_list(*COUNTER_FIELDS).get()))
+
+    def _milestone(self, project, status='Pending'):
+        return Milestone.objects.create(
+            project_group=ProjectGroup.objects.get(project_id=project.project_id),
+            template=self.template, name='Report', status=status, due_date=date(2025, 5, 1),
+        )
+
+    def test_supervision_is_counted_per_academic_year(self):
+        self.assertEqual(self._counters(self.advisor, '2024-2025')['supervised_projects'], 2)
+        self.assertEqual(self._counters(self.advisor, '2025-2026')['supervised_projects'], 1)
+        # Quotas apply per academic year; the user's current year is 2024-2025
+        self.assertEqual(self.advisor.current_load, 2)
+        self.assertFalse(self.advisor.is_overloaded)
+        self.assertFalse(self.advisor.can_supervise_more_projects())
+        self.assertTrue(self.advisor.can_supervise_more_projects('2025-2026'))
+        self.assertEqual(self.advisor.get_workload(all_years=True)['supervised_projects'], 3)
+
+        self.projects[0].advisor = self.other
+        self.projects[0].save()
+        self.assertEqual(self._counters(self.advisor, '2024-2025')['supervised_projects'], 1)
+        self.assertEqual(self._counters(self.other, '2024-2025')['supervised_projects'], 1)
+
+        self.projects[1].delete()
+        self.assertEqual(self._counters(self.advisor, '2024-2025')['supervised_projects'], 0)
+
+    def test_pending_reviews_follow_milestones_and_transfers(self):
+        milestone = self._milestone(self.projects[0])
+        self.assertEqual(self._counters(self.advisor, '2024-2025')['pending_reviews'], 0)
+        milestone.status = 'Submitted'
+        milestone.save()
+        self._milestone(self.projects[0], status='Submitted')
+        self.assertEqual(self._counters(self.advisor, '2024-2025')['pending_reviews'], 2)
+
+        milestone.status = 'Approved'
+        milestone.save()
+        self.assertEqual(self._counters(self.advisor, '2024-2025')['pending_reviews'], 1)
+
+        self.projects[0].advisor = self.other
+        self.projects[0].save()
+        self.assertEqual(self._counters(self.advisor, '2024-2025')['pending_reviews'], 0)
+        self.assertEqual(self._counters(self.other, '2024-2025')['pending_reviews'], 1)
+
+        ProjectGroup.objects.get(project_id=self.projects[0].project_id).delete()
+        self.assertEqual(self._counters(self.other, '2024-2025')['pending_reviews'], 0)
+
+    def test_committee_seats_and_quota(self):
+        group = ProjectGroup.objects.get(project_id=self.projects[0].project_id)
+        group.main_committee_id = 'ADV-W01'
+        group.third_committee_id = 'ADV-W02'
+        group.save()
+        self.assertEqual(self._counters(self.advisor, '2024-2025')['main_committee_seats'], 1)
+        self.assertEqual(self._counters(self.other, '2024-2025')['third_committee_seats'], 1)
+        self.assertFalse(self.advisor.can_join_committee('main'))
+        self.assertTrue(self.advisor.can_join_committee('second'))
+
+        group.main_committee_id = None
+        group.save()
+        self.assertEqual(self._counters(self.advisor, '2024-2025')['main_committee_seats'], 0)
+        group.delete()
+        self.assertEqual(self._counters(self.other, '2024-2025')['third_committee_seats'], 0)
+
+    def test_bulk_transfer_moves_counters(self):
+        self._milestone(self.projects[0], status='Submitted')
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post('/api/projects/projects/bulk_operations/', {
+            'operation': 'transfer', 'project_ids': [p.project_id for p in self.projects[:2]],
+            'new_advisor_id': self.other.pk, 'comment': 'Rebalancing',
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self._counters(self.other, '2024-2025')['supervised_projects'], 2)
+        self.assertEqual(self._counters(self.other, '2024-2025')['pending_reviews'], 1)
+        self.assertEqual(self._counters(self.advisor, '2024-2025')['supervised_projects'], 0)
+        self.assertEqual(self._counters(self.advisor, '2024-2025')['pending_reviews'], 0)
+
+    def test_bulk_quota_is_checked_per_academic_year(self):
+        # Three projects over all years against a quota of 2, but at most 2 in any one year
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        project_id = '2025-2026-W003'
+        ProjectGroup.objects.create(project_id=project_id, topic_lao='', topic_eng='Workload 3')
+        Project.objects.create(project_id=project_id, title='Workload 3', advisor=self.other)
+        url = '/api/projects/projects/bulk_operations/'
+        response = client.post(url, {
+            'operation': 'transfer', 'project_ids': [project_id],
+            'new_advisor_id': self.advisor.pk, 'comment': 'Rebalancing',
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self._counters(self.advisor, '2025-2026')['supervised_projects'], 2)
+
+        project_id = '2025-2026-W004'
+        ProjectGroup.objects.create(project_id=project_id, topic_lao='', topic_eng='Workload 4')
+        Project.objects.create(project_id=project_id, title='Workload 4', advisor=self.other)
+        response = client.post(url, {
+            'operation': 'transfer', 'project_ids': [project_id],
+            'new_advisor_id': self.advisor.pk, 'comment': 'Rebalancing',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rebuild_matches_incremental_counters(self):
+        self._milestone(self.projects[2], status='Submitted')
+        group = ProjectGroup.objects.get(project_id=self.projects[1].project_id)
+        group.second_committee_id = 'ADV-W02'
+        group.save()
+        incremental = set(AdvisorWorkloadCounter.objects.exclude(
+            **dict.fromkeys(COUNTER_FIELDS, 0)
+        ).values_list('advisor_id', 'academic_year', *COUNTER_FIELDS))
+
+        AdvisorWorkloadCounter.objects.all().delete()
+        rebuild_workload_counters()
+        self.assertEqual(
+            set(AdvisorWorkloadCounter.objects.values_list('advisor_id', 'academic_year', *COUNTER_FIELDS)),
+            incremental,
+        )
+
+    def test_workload_summary_is_one_query_plus_specializations(self):
+        AdvisorSpecialization.objects.create(advisor=self.advisor, major='Computer Science')
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with self.assertNumQueries(2):
+            response = client.get('/api/advisors/workload-summary/')
+        self.assertEqual(response.status_code, 200)
+        summaries = {s['advisor_id']: s for s in response.data['workload_summaries']}
+        self.assertEqual(response.data['academic_year'], '2024-2025')
+        self.assertEqual(summaries['ADV-W01']['current_load'], 2)
+        self.assertFalse(summaries['ADV-W01']['is_overloaded'])
+        self.assertEqual(summaries['ADV-W01']['specializations'], ['Computer Science'])
+        self.assertEqual(response.data['overloaded_count'], 0)
+
+        response = client.get('/api/advisors/workload-summary/', {'academic_year': '2025-2026'})
+        summaries = {s['advisor_id']: s for s in response.data['workload_summaries']}
+        self.assertEqual(summaries['ADV-W01']['current_load'], 1)
+
+        response = client.get('/api/advisors/workload-summary/', {'academic_year': 'all'})
+        summaries = {s['advisor_id']: s for s in response.data['workload_summaries']}
+        self.assertEqual(summaries['ADV-W01']['current_load'], 3)
+        self.assertTrue(summaries['ADV-W01']['is_overloaded'])
+
+        response = client.get('/api/advisors/workload-summary/', {'academic_year': 'soon'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_statistics_count_overloaded_advisors(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/advisors/statistics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['overloaded_advisors'], 0)
+
+        project_id = '2024-2025-W010'
+        ProjectGroup.objects.create(project_id=project_id, topic_lao='', topic_eng='Workload 10')
+        Project.objects.create(project_id=project_id, title='Workload 10', advisor=self.advisor)
+        response = client.get('/api/advisors/statistics/')
+        self.assertEqual(response.data['overloaded_advisors'], 1)
@@ -0,0 +1,111 @@
+"""
+Tests for the queued JSONL audit log
+"""
+import json
+import logging
+import os
+import tempfile
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from core import audit
+from core.audit import AuditLog, get_audit_settings
+from core.middleware import AuditLogMiddleware
+
+
+class AuditLogTestCase(TestCase):
+    """Records should be written off-thread, sampled per path and never block"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.filename = os.path.join(self.directory.name, 'audit.jsonl')
+
+    def make_audit_log(self, **overrides):
+        config = {**get_audit_settings(), 'ENABLED': True, 'FILENAME': self.filename, **overrides}
+        audit_log = AuditLog(config)
+        self.addCleanup(audit_log.stop)
+        return audit_log
+
+    def read_records(self):
+        with open(self.filename, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_records_are_written_as_json_lines(self):
+        audit_log = self.make_audit_log()
+        audit_log.log({'path': '/api/projects/', 'status': 200})
+        audit_log.log({'path': '/api/students/', 'status': 404})
+        audit_log.stop()
+
+        self.assertEqual(self.read_records(), [
+            {'path': '/api/projects/', 'status': 200},
+            {'path': '/api/students/', 'status': 404},
+        ])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        audit_log = self.make_audit_log(QUEUE_SIZE=1)
+        # No listener is draining the queue here
+        for _ in range(3):
+            audit_log.handler.handle(logging.makeLogRecord({'audit': {}}))
+        self.assertEqual(audit_log.dropped, 2)
+
+    def test_per_path_sampling(self):
+        audit_log = self.make_audit_log(
+            SAMPLE_RATE=1.0,
+            PATH_SAMPLE_RATES={'/api/monitoring/': 1.0, '/api/monitoring/health/': 0.0},
+        )
+        self.assertFalse(audit_log.should_log('/api/monitoring/health/', 200))
+        self.assertTrue(audit_log.should_log('/api/monitoring/health/', 503))
+        self.assertTrue(audit_log.should_log('/api/monitoring/metrics/', 200))
+        self.assertFalse(self.make_audit_log(ENABLED=False).should_log('/api/projects/', 500))
+
+
+class AuditLogMiddlewareTestCase(TestCase):
+    """The middleware must not read response bodies"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.filename = os.path.join(self.directory.name, 'audit.jsonl')
+        self.factory = RequestFactory()
+        self.middleware = AuditLogMiddleware(lambda request: None)
+        audit.reset_audit_log()
+        self.addCleanup(audit.reset_audit_log)
+
+    def run_request(self, response, path='/api/projects/export/?format=csv'):
+        config = {'ENABLED': True, 'FILENAME': self.filename, 'PATH_SAMPLE_RATES': {}}
+        with override_settings(AUDIT_LOG=config):
+            audit.reset_audit_log()
+            request = self.factory.get(path, HTTP_USER_AGENT='pytest')
+            self.middleware.process_request(request)
+            self.middleware.process_response(request, response)
+            audit.reset_audit_log()
+        with open(self.filename, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_streaming_response_is_not_consumed(self):
+        consumed = []
+
+        def rows():
+            consumed.append(True)
+            yield b'a,b\n'
+
+        response = StreamingHttpResponse(rows())
+        [record] = self.run_request(response)
+
+        self.assertEqual(consumed, [])
+        self.assertIsNone(record['size'])
+        self.assertEqual(record['path'], '/api/projects/export/')
+        self.assertEqual(record['query'], 'format=csv')
+        self.assertEqual(record['ua'], 'pytest')
+        self.assertIn('ms', record)
+
+    def test_size_comes_from_content_length(self):
+        response = HttpResponse(b'hello')
+        response['Content-Length'] = '5'
+        [record] = self.run_request(response, path='/api/projects/')
+
+        self.assertEqual(record['size'], 5)
+        self.assertEqual(record['status'], 200)
+        self.assertNotIn('query', record)
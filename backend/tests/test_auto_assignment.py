@@ -0,0 +1,199 @@
+"""
+Tests for automatic advisor assignment
+"""
+import random
+import time
+from itertools import product
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from advisors.models import Advisor, AdvisorSpecialization, AdvisorWorkloadCounter
+from projects.auto_assignment import (
+    AdvisorProfile, AutoAssignment, ProjectProfile, fit_score, solve_assignment,
+)
+from projects.models import Project, ProjectGroup, ProjectStatus, ProjectStudent
+from students.models import Student
+
+User = get_user_model()
+
+
+class SolveAssignmentTestCase(TestCase):
+    """The solver should place as many projects as possible with the best total fit"""
+
+    def _instance(self, rng):
+        words = ['vision', 'learning', 'network', 'finance', 'robot', 'energy']
+        projects = [
+            ProjectProfile(f'P{i}', students=1, majors={rng.choice(['cs', 'it'])}, words=set(rng.sample(words, 2)))
+            for i in range(6)
+        ]
+        advisors = [
+            AdvisorProfile(
+                i + 1, capacity=rng.randint(0, 3), student_capacity=10,
+                majors={rng.choice(['cs', 'it']): rng.randint(1, 5)}, words=set(rng.sample(words, 2)),
+            )
+            for i in range(3)
+        ]
+        return projects, advisors
+
+    def _best(self, projects, advisors):
+        best = (0, 0)
+        for choice in product([None, *advisors], repeat=len(projects)):
+            used = [a.pk for a in choice if a is not None]
+            if any(used.count(a.pk) > a.capacity for a in advisors):
+                continue
+            fit = sum(fit_score(p, a) for p, a in zip(projects, choice) if a is not None)
+            best = max(best, (len(used), fit))
+        return best
+
+    def test_matches_exhaustive_search(self):
+        rng = random.Random(7)
+        for _ in range(25):
+            projects, advisors = self._instance(rng)
+            solved = solve_assignment(projects, advisors, candidate_limit=10)
+            loads = [pk for pk, _ in solved.values()]
+            for advisor in advisors:
+                self.assertLessEqual(loads.count(advisor.pk), advisor.capacity)
+            self.assertEqual((len(solved), sum(fit for _, fit in solved.values())), self._best(projects, advisors))
+
+    def test_student_limits_are_respected(self):
+        projects = [ProjectProfile(f'P{i}', students=2, majors={'cs'}) for i in range(4)]
+        advisors = [
+            AdvisorProfile(1, capacity=4, student_capacity=3, majors={'cs': 5}),
+            AdvisorProfile(2, capacity=4, student_capacity=8),
+        ]
+        solved = solve_assignment(projects, advisors)
+        self.assertEqual(len(solved), 4)
+        self.assertEqual([pk for pk, _ in solved.values()].count(1), 1)
+
+    def test_large_cohort_solves_in_seconds(self):
+        rng = random.Random(1)
+        vocabulary = [f'topic{i}' for i in range(300)]
+        majors = [f'major{i}' for i in range(10)]
+        projects = [
+            ProjectProfile(f'P{i}', students=rng.randint(1, 3), majors={rng.choice(majors)},
+                           words=set(rng.sample(vocabulary, 4)))
+            for i in range(2000)
+        ]
+        advisors = [
+            AdvisorProfile(i + 1, capacity=rng.randint(5, 15), student_capacity=rng.randint(10, 35),
+                           majors={m: rng.randint(1, 5) for m in rng.sample(majors, 2)},
+                           words=set(rng.sample(vocabulary, 20)))
+            for i in range(200)
+        ]
+        started = time.monotonic()
+        solved = solve_assignment(projects, advisors)
+        self.assertLess(time.monotonic() - started, 15)
+        capacity = {a.pk: a for a in advisors}
+        students = {p.project_id: p.students for p in projects}
+        for advisor in advisors:
+            taken = [pid for pid, (pk, _) in solved.items() if pk == advisor.pk]
+            self.assertLessEqual(len(taken), capacity[advisor.pk].capacity)
+            self.assertLessEqual(sum(students[pid] for pid in taken), advisor.student_capacity)
+
+
+class AutoAssignmentTestCase(TestCase):
+    """Preview and apply should plan the unassigned groups of one academic year"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='assign_admin', email='assign_admin@example.com', password='testpass123', role='Admin'
+        )
+        self.vision = self._advisor('assign_vision', 'ADV-A01', 'Machine learning, computer vision', quota=2)
+        self.business = self._advisor('assign_business', 'ADV-A02', 'Marketing and finance', max_students=2)
+        self.general = self._advisor('assign_general', 'ADV-A03', 'Computer networks')
+        AdvisorSpecialization.objects.create(advisor=self.vision, major='Computer Science', expertise_level=5)
+        AdvisorSpecialization.objects.create(advisor=self.business, major='Business', expertise_level=3)
+
+        # ADV-A01 already supervises one project, leaving room for one more
+        self._group('2025-2026-A000', 'Existing vision project', ['Computer Science'])
+        Project.objects.create(project_id='2025-2026-A000', title='Existing', advisor=self.vision)
+        self._group('2025-2026-A001', 'Machine learning for crop vision', ['Computer Science'])
+        self._group('2025-2026-A002', 'Deep learning vision for sensor networks', ['Computer Science'])
+        self._group('2025-2026-A003', 'Marketing analytics', ['Business'])
+        self._group('2025-2026-A004', 'Finance dashboard', ['Business', 'Business'])
+        self._group('2025-2026-A005', 'Rejected vision idea', ['Computer Science'], status=ProjectStatus.REJECTED)
+        self._group('2024-2025-A006', 'Older vision project', ['Computer Science'])
+        Project.objects.create(project_id='2025-2026-A003', title='Marketing analytics')
+
+    def _advisor(self, username, advisor_id, interests, **limits):
+        user = User.objects.create_user(
+            username=username, email=f'{username}@example.com', password='testpass123',
+            role='Advisor', first_name='Assign', last_name=username
+        )
+        return Advisor.objects.create(user=user, advisor_id=advisor_id, research_interests=interests, **limits)
+
+    def _group(self, project_id, topic, majors, status=ProjectStatus.PENDING):
+        group = ProjectGroup.objects.create(project_id=project_id, topic_lao='', topic_eng=topic, status=status)
+        for i, major in enumerate(majors):
+            user = User.objects.create_user(
+                username=f'{project_id}-{i}', email=f'{project_id}-{i}@example.com', password='testpass123',
+                role='Student'
+            )
+            Student.objects.create(user=user, student_id=f'S{project_id}-{i}', major=major, classroom='A')
+            ProjectStudent.objects.create(project_group=group, student=user)
+        return group
+
+    def _supervised(self, advisor):
+        return sum(AdvisorWorkloadCounter.objects.filter(advisor=advisor).values_list('supervised_projects', flat=True))
+
+    def test_preview_plans_without_writing(self):
+        report = AutoAssignment('2025-2026').preview()
+        plan = {a['project_id']: a['advisor_id'] for a in report['assignments']}
+        self.assertEqual(plan, {
+            '2025-2026-A001': 'ADV-A01',
+            '2025-2026-A002': 'ADV-A03',
+            '2025-2026-A003': 'ADV-A02',
+            '2025-2026-A004': 'ADV-A03',
+        })
+        self.assertEqual(report['unassigned_project_ids'], [])
+        self.assertEqual(Project.objects.filter(advisor__isnull=False).count(), 1)
+        self.assertEqual(self._supervised(self.vision), 1)
+
+    def test_prior_year_load_does_not_use_capacity(self):
+        # Earlier cohorts fill ADV-A01's quota and ADV-A02's student limit, but only in 2023-2024
+        for i in range(2):
+            self._group(f'2023-2024-A10{i}', 'Old vision project', ['Computer Science'])
+            Project.objects.create(project_id=f'2023-2024-A10{i}', title='Old', advisor=self.vision)
+        self._group('2023-2024-A102', 'Old finance project', ['Business', 'Business'])
+        Project.objects.create(project_id='2023-2024-A102', title='Old', advisor=self.business)
+
+        report = AutoAssignment('2025-2026').preview()
+        plan = {a['project_id']: a['advisor_id'] for a in report['assignments']}
+        self.assertEqual(plan['2025-2026-A001'], 'ADV-A01')
+        self.assertEqual(plan['2025-2026-A003'], 'ADV-A02')
+        self.assertEqual(report['unassigned_project_ids'], [])
+
+    def test_apply_writes_assignments_and_counters(self):
+        report = AutoAssignment('2025-2026').apply(self.admin)
+        self.assertEqual(report['applied']['updated'], 4)
+        self.assertEqual(Project.objects.get(project_id='2025-2026-A001').advisor, self.vision)
+        self.assertEqual(Project.objects.get(project_id='2025-2026-A004').advisor, self.general)
+        self.assertEqual(ProjectGroup.objects.get(project_id='2025-2026-A003').advisor_name, 'Assign assign_business')
+        self.assertFalse(Project.objects.filter(project_id__in=['2025-2026-A005', '2024-2025-A006']).exists())
+        self.assertEqual(self._supervised(self.vision), 2)
+        self.assertEqual(self._supervised(self.general), 2)
+
+        report = AutoAssignment('2025-2026').preview()
+        self.assertEqual(report['assignments'], [])
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = '/api/projects/projects/auto_assign/'
+        response = client.post(url, {'academic_year': '2025-2026'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(len(response.data['assignments']), 4)
+        self.assertFalse(Project.objects.filter(project_id='2025-2026-A001').exists())
+
+        response = client.post(url, {'academic_year': '2025-2026', 'apply': True}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Project.objects.get(project_id='2025-2026-A001').advisor, self.vision)
+
+        response = client.post(url, {'academic_year': 'next year'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        client.force_authenticate(self.general.user)
+        response = client.post(url, {'academic_year': '2025-2026'}, format='json')
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,171 @@
+"""
+Tests for set-based bulk project operations
+"""
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from advisors.models import Advisor
+from milestones.models import Milestone, MilestoneTask, MilestoneTemplate
+from notifications.models import Notification
+from projects.models import LogEntry, Project, ProjectGroup, ProjectStudent, StatusHistory
+
+User = get_user_model()
+
+URL = '/api/projects/projects/bulk_operations/'
+
+
+class BulkProjectOperationsTestCase(TestCase):
+    """Many projects should change in a fixed number of queries with batched side effects"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='bulk_admin', email='bulk_admin@example.com', password='testpass123', role='Admin'
+        )
+        self.advisor = self._advisor('bulk_advisor', 'ADV-B01', quota=10)
+        self.students = [
+            User.objects.create_user(
+                username=f'bulk_student{i}', email=f'bulk_student{i}@example.com',
+                password='testpass123', role='Student'
+            )
+            for i in range(3)
+        ]
+        self.projects = []
+        # Materialise the project summaries so every bulk call updates existing rows
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                project_id = f'2024-2025-B{i:03d}'
+                project = Project.objects.create(project_id=project_id, title=f'Bulk {i}', advisor=self.advisor)
+                group = ProjectGroup.objects.create(
+                    project_id=project_id, topic_lao='', topic_eng=f'Bulk {i}', advisor_name='Bulk Advisor'
+                )
+                ProjectStudent.objects.create(project_group=group, student=self.students[i])
+                self.projects.append(project)
+        self.project_ids = [p.project_id for p in self.projects]
+        Notification.objects.all().delete()
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _advisor(self, username, advisor_id, **quotas):
+        user = User.objects.create_user(
+            username=username, email=f'{username}@example.com', password='testpass123',
+            role='Advisor', first_name='Bulk', last_name=username
+        )
+        return Advisor.objects.create(user=user, advisor_id=advisor_id, **quotas)
+
+    def _post(self, **data):
+        return self.client.post(URL, data, format='json')
+
+    def test_status_change_writes_history_logs_and_one_notification_per_recipient(self):
+        history_before = StatusHistory.objects.count()
+        response = self._post(operation='update_status', project_ids=self.project_ids,
+                              status='Approved', comment='Committee decision')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['updated'], 3)
+
+        self.assertEqual(set(Project.objects.values_list('status', flat=True)), {'Approved'})
+        self.assertEqual(set(ProjectGroup.objects.values_list('status', flat=True)), {'Approved'})
+        self.assertEqual(StatusHistory.objects.count() - history_before, 3)
+        self.assertEqual(LogEntry.objects.filter(type='status_change').count(), 3)
+
+        # Advisor gets one notification covering all three projects; each student one
+        advisor_notes = Notification.objects.filter(recipient_id=str(self.advisor.user_id))
+        self.assertEqual(advisor_notes.count(), 1)
+        self.assertEqual(len(advisor_notes.get().message.splitlines()), 3)
+        for student in self.students:
+            self.assertEqual(Notification.objects.filter(recipient_id=str(student.id)).count(), 1)
+        self.assertEqual(response.data['notifications_sent'], 4)
+
+        # Repeating the change is a no-op
+        response = self._post(operation='update_status', project_ids=self.project_ids, status='Approved')
+        self.assertEqual(response.data['updated'], 0)
+        self.assertEqual(sorted(response.data['unchanged_project_ids']), self.project_ids)
+
+    def test_query_count_does_not_grow_with_projects(self):
+        def queries(status, project_ids):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self._post(operation='update_status', project_ids=project_ids, status=status)
+            self.assertEqual(response.status_code, 200, response.data)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(queries('Rejected', self.project_ids[:1]), queries('Approved', self.project_ids))
+
+    def test_approval_applies_milestone_template(self):
+        template = MilestoneTemplate.objects.create(name='Standard', description='Standard plan')
+        MilestoneTask.objects.create(template=template, name='Proposal', duration_days=7, order=1)
+        MilestoneTask.objects.create(template=template, name='Report', duration_days=14, order=2)
+
+        response = self._post(operation='update_status', project_ids=self.project_ids,
+                              status='Approved', template_id=str(template.id))
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Milestone.objects.filter(template=template).count(), 6)
+
+    def test_transfer_respects_quota(self):
+        small = self._advisor('bulk_small', 'ADV-B02', quota=2)
+        response = self._post(operation='transfer', project_ids=self.project_ids,
+                              new_advisor_id=small.pk, comment='Rebalancing')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Project.objects.filter(advisor=small).count(), 0)
+
+        response = self._post(operation='transfer', project_ids=self.project_ids[:2],
+                              new_advisor_id=small.pk, comment='Rebalancing')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Project.objects.filter(advisor=small).count(), 2)
+        self.assertEqual(
+            ProjectGroup.objects.filter(advisor_name='Bulk bulk_small').count(), 2
+        )
+        self.assertEqual(Notification.objects.filter(recipient_id=str(small.user_id)).count(), 1)
+        self.assertEqual(Notification.objects.filter(recipient_id=str(self.advisor.user_id)).count(), 1)
+
+    def test_committee_assignment(self):
+        member = self._advisor('bulk_member', 'ADV-B03', second_committee_quota=2)
+        response = self._post(operation='assign_committee', project_ids=self.project_ids,
+                              committee_type='second', advisor_id=member.pk)
+        self.assertEqual(response.status_code, 400)
+
+        response = self._post(operation='assign_committee', project_ids=self.project_ids[:2],
+                              committee_type='second', advisor_id=member.pk)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(ProjectGroup.objects.filter(second_committee_id='ADV-B03').count(), 2)
+        self.assertEqual(Notification.objects.filter(recipient_id=str(member.user_id)).count(), 1)
+
+    def test_defense_schedule_rejects_room_clashes(self):
+        ProjectGroup.objects.create(
+            project_id='2024-2025-X999', topic_lao='', topic_eng='Other',
+            defense_date=date(2025, 6, 1), defense_time=time(9, 0), defense_room='R1'
+        )
+        slot = {'defense_date': '2025-06-01', 'defense_time': '09:00', 'defense_room': 'R1'}
+        response = self._post(operation='schedule_defense', schedules=[
+            {'project_id': self.project_ids[0], **slot},
+        ])
+        self.assertEqual(response.status_code, 400)
+
+        slot['defense_room'] = 'R2'
+        response = self._post(operation='schedule_defense', schedules=[
+            {'project_id': self.project_ids[0], **slot},
+            {'project_id': self.project_ids[1], **slot},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ProjectGroup.objects.filter(defense_room='R2').exists())
+
+        response = self._post(operation='schedule_defense', schedules=[
+            {'project_id': self.project_ids[0], **slot},
+            {'project_id': self.project_ids[1], **slot, 'defense_time': '10:00'},
+        ])
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(ProjectGroup.objects.filter(defense_room='R2').count(), 2)
+        self.assertEqual(LogEntry.objects.filter(type='defense_scheduled').count(), 2)
+
+    def test_requires_admin_and_known_projects(self):
+        self.client.force_authenticate(self.students[0])
+        response = self._post(operation='update_status', project_ids=self.project_ids, status='Approved')
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(self.admin)
+        response = self._post(operation='update_status', project_ids=['missing'], status='Approved')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,131 @@
+"""
+Tests for committee membership rows and their lookups
+"""
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from advisors.models import Advisor
+from committees.membership import (
+    committee_count, committee_counts, committee_groups, committee_members_for, sync_committee_members,
+)
+from committees.models import ProjectCommitteeMember
+from projects.models import Project, ProjectGroup
+from projects.visibility import ProjectVisibility
+
+User = get_user_model()
+
+
+class CommitteeMembersTestCase(TestCase):
+    """Committee slots should be mirrored as rows that answer lookups in one query"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='committee_admin', email='committee_admin@example.com', password='testpass123', role='Admin'
+        )
+        self.first = self._advisor('committee_one', 'ADV-C01', second_committee_quota=2)
+        self.second = self._advisor('committee_two', 'ADV-C02')
+        self.groups = [
+            ProjectGroup.objects.create(
+                project_id=f'2024-2025-C{i:03d}', topic_lao='', topic_eng=f'Committee {i}',
+                main_committee_id='ADV-C01', second_committee_id='ADV-C02' if i else None,
+            )
+            for i in range(3)
+        ]
+
+    def _advisor(self, username, advisor_id, **quotas):
+        user = User.objects.create_user(
+            username=username, email=f'{username}@example.com', password='testpass123',
+            role='Advisor', first_name='Committee', last_name=username
+        )
+        return Advisor.objects.create(user=user, advisor_id=advisor_id, **quotas)
+
+    def _roles(self, group):
+        return dict(
+            ProjectCommitteeMember.objects.filter(project_group=group).values_list('role', 'advisor__advisor_id')
+        )
+
+    def test_saving_a_group_syncs_its_rows(self):
+        group = self.groups[1]
+        self.assertEqual(self._roles(group), {'main': 'ADV-C01', 'second': 'ADV-C02'})
+
+        group.main_committee_id = 'ADV-C02'
+        group.second_committee_id = None
+        group.third_committee_id = 'UNKNOWN'
+        group.save()
+        self.assertEqual(self._roles(group), {'main': 'ADV-C02'})
+
+    def test_sync_is_set_based(self):
+        ProjectCommitteeMember.objects.all().delete()
+        # Rows, advisors, insert; then the workload counters: insert and one update per distinct change
+        with self.assertNumQueries(6):
+            sync_committee_members(self.groups)
+        self.assertEqual(ProjectCommitteeMember.objects.count(), 5)
+        with self.assertNumQueries(1):
+            sync_committee_members(self.groups)
+
+    def test_backfill_migration(self):
+        ProjectCommitteeMember.objects.all().delete()
+        migration = import_module('committees.migrations.0002_project_committee_members')
+        migration.backfill_committee_members(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(self._roles(self.groups[2]), {'main': 'ADV-C01', 'second': 'ADV-C02'})
+        self.assertEqual(ProjectCommitteeMember.objects.count(), 5)
+
+    def test_lookups_are_single_queries(self):
+        with self.assertNumQueries(1):
+            members = committee_members_for(self.groups)
+        self.assertEqual(members[self.groups[0].pk], {'main': self.first})
+        self.assertEqual(members[self.groups[1].pk]['second'].user.username, 'committee_two')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(len(committee_groups(self.second)), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(committee_count(self.first, 'main'), 3)
+        with self.assertNumQueries(1):
+            counts = committee_counts([self.first, self.second])
+        self.assertEqual(counts[self.first.pk], {'main': 3, 'second': 0, 'third': 0})
+        self.assertEqual(counts[self.second.pk], {'main': 0, 'second': 2, 'third': 0})
+
+        project = Project.objects.create(project_id=self.groups[1].project_id, title='Committee 1')
+        with self.assertNumQueries(2):
+            self.assertEqual(set(project.get_committee_members()), {'main', 'second'})
+
+    def test_committee_members_see_their_projects(self):
+        visible = ProjectVisibility(self.second.user).filter_groups(ProjectGroup.objects.all())
+        self.assertEqual(
+            set(visible.values_list('project_id', flat=True)), {g.project_id for g in self.groups[1:]}
+        )
+
+    def test_update_committee_action_writes_slot_and_row(self):
+        project = Project.objects.create(project_id=self.groups[0].project_id, title='Committee 0')
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = f'/api/projects/projects/{project.pk}/update_committee/'
+
+        response = client.post(url, {'committee_type': 'third', 'advisor_id': self.second.pk}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.groups[0].refresh_from_db()
+        self.assertEqual(self.groups[0].third_committee_id, 'ADV-C02')
+        self.assertEqual(self._roles(self.groups[0]), {'main': 'ADV-C01', 'third': 'ADV-C02'})
+
+        response = client.post(url, {'committee_type': 'third', 'advisor_id': None}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self._roles(self.groups[0]), {'main': 'ADV-C01'})
+
+    def test_quota_is_checked_against_rows(self):
+        self.assertTrue(self.first.can_join_committee('second'))
+        self.groups[0].second_committee_id = 'ADV-C01'
+        self.groups[0].third_committee_id = 'ADV-C01'
+        self.groups[0].save()
+        self.assertEqual(self.first.get_committee_count('second'), 1)
+
+        ProjectGroup.objects.create(
+            project_id='2024-2025-C100', topic_lao='', topic_eng='Extra', second_committee_id='ADV-C01'
+        )
+        self.assertFalse(self.first.can_join_committee('second'))
+        self.assertFalse(self.first.can_join_committee('unknown'))
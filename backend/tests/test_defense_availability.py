@@ -0,0 +1,175 @@
+"""
+Tests for room and panel availability
+"""
+import random
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from advisors.models import Advisor
+from committees.models import ProjectCommitteeMember
+from defense_management.availability import (
+    PERSON, ROOM, Availability, Booking, IntervalIndex, even_slots, load_bookings, slot_grid,
+)
+from defense_management.models import DefenseRoom, DefenseSchedule
+from projects.models import Project, ProjectGroup, ProjectStatus
+
+User = get_user_model()
+
+MONDAY = date(2026, 3, 2)
+TUESDAY = date(2026, 3, 3)
+
+
+class IntervalIndexTestCase(TestCase):
+    """Index lookups should agree with scanning every booking"""
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(5)
+        bookings = []
+        for i in range(400):
+            start = rng.randrange(480, 1080, 15)
+            bookings.append(Booking(
+                rng.choice([MONDAY, TUESDAY]), start, start + rng.choice([30, 60, 90, 240]),
+                rng.choice(['R1', 'R2', None]), frozenset(rng.sample(range(10), 2)), f'P{i}',
+            ))
+        index = IntervalIndex(bookings)
+        for _ in range(300):
+            day, start = rng.choice([MONDAY, TUESDAY]), rng.randrange(420, 1140, 5)
+            end = start + rng.randrange(5, 180, 5)
+            room, person = rng.choice(['R1', 'R2']), rng.randrange(10)
+            expected = [b for b in bookings if b.day == day and b.room == room and b.overlaps(start, end)]
+            self.assertEqual(set(index.overlapping(ROOM, room, day, start, end)), set(expected))
+            expected = [b for b in bookings if b.day == day and person in b.people and b.overlaps(start, end)]
+            self.assertEqual(set(index.overlapping(PERSON, person, day, start, end)), set(expected))
+
+    def test_busy_and_free_intervals(self):
+        index = IntervalIndex([
+            Booking(MONDAY, 540, 600, 'R1'), Booking(MONDAY, 570, 660, 'R1'), Booking(MONDAY, 780, 840, 'R1'),
+        ])
+        self.assertEqual(index.busy(ROOM, 'R1', MONDAY), [(540, 660), (780, 840)])
+        self.assertEqual(index.free(ROOM, 'R1', MONDAY, 480, 900), [(480, 540), (660, 780), (840, 900)])
+        self.assertEqual(index.free(ROOM, 'R1', TUESDAY, 480, 900), [(480, 900)])
+        self.assertTrue(index.is_free(ROOM, 'R1', MONDAY, 660, 780))
+
+
+class AvailabilityTestCase(TestCase):
+    """Bookings from both sources should load in one query and answer grid queries"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='availability_admin', email='availability_admin@example.com', password='testpass123', role='Admin'
+        )
+        self.advisors = [self._advisor(i) for i in range(1, 5)]
+        self.room_a = DefenseRoom.objects.create(name='Room A', room_type='classroom', capacity=30, location='B1')
+        DefenseRoom.objects.create(name='Room B', room_type='classroom', capacity=30, location='B1')
+
+        # ADV-V1 supervises and ADV-V2 sits on the committee of a Monday 09:00 defense in Room A
+        group = self._group('2025-2026-V001', defense_date=MONDAY, defense_time=time(9, 0), defense_room='Room A')
+        Project.objects.create(project_id=group.project_id, title='V001', advisor=self.advisors[0], project_group=group)
+        ProjectCommitteeMember.objects.create(project_group=group, advisor=self.advisors[1], role='main')
+        # ADV-V3 and ADV-V4 sit in a 90-minute DefenseSchedule at 13:30 in Room B
+        self._schedule(self._group('2025-2026-V002'), time(13, 30), 'Room B', duration=90)
+        # Cancelled defenses hold nothing
+        self._schedule(self._group('2025-2026-V003'), time(10, 0), 'Room A', status='cancelled')
+        self._group('2025-2026-V004', defense_date=TUESDAY, defense_time=time(10, 0), defense_room='Room B')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _advisor(self, n):
+        user = User.objects.create_user(
+            username=f'availability_{n}', email=f'availability_{n}@example.com', password='testpass123', role='Advisor'
+        )
+        return Advisor.objects.create(user=user, advisor_id=f'ADV-V{n}')
+
+    def _group(self, project_id, **defense):
+        return ProjectGroup.objects.create(
+            project_id=project_id, topic_lao='', topic_eng=project_id, status=ProjectStatus.APPROVED, **defense
+        )
+
+    def _schedule(self, group, start, room, duration=60, status='scheduled'):
+        return DefenseSchedule.objects.create(
+            project=group, defense_date=timezone.make_aware(datetime.combine(MONDAY, start)), defense_time=start,
+            defense_room=room, defense_duration=duration, status=status, created_by=self.admin,
+            main_committee=self.advisors[2].user, second_committee=self.advisors[3].user, third_committee=self.admin,
+        )
+
+    def test_bookings_load_in_one_query(self):
+        with self.assertNumQueries(1):
+            bookings = load_bookings(MONDAY, TUESDAY)
+        pks = [advisor.pk for advisor in self.advisors]
+        self.assertEqual(
+            sorted((b.project_id, b.day, b.start, b.end, b.room, b.people) for b in bookings),
+            [
+                ('2025-2026-V001', MONDAY, 540, 600, 'Room A', frozenset(pks[:2])),
+                ('2025-2026-V002', MONDAY, 810, 900, 'Room B', frozenset(pks[2:])),
+                ('2025-2026-V004', TUESDAY, 600, 660, 'Room B', frozenset()),
+            ],
+        )
+        self.assertEqual([b.project_id for b in load_bookings(MONDAY, MONDAY, exclude=['2025-2026-V001'])],
+                         ['2025-2026-V002'])
+
+    def test_slot_grid_for_any_slot_length(self):
+        availability = Availability(MONDAY, TUESDAY)
+        slots = even_slots(540, 900, 45)
+        self.assertEqual(slots[:2], [(540, 585), (585, 630)])
+        self.assertEqual(len(slots), 8)
+        pks = [advisor.pk for advisor in self.advisors]
+        grid = dict(slot_grid(availability, slots, ['Room A', 'Room B'], [pks[1], pks[2]]))
+        monday = {row['start']: row for row in grid[MONDAY]}
+        self.assertEqual(monday[540]['free_rooms'], ['Room B'])
+        self.assertEqual(monday[540]['busy_people'], [pks[1]])
+        self.assertFalse(monday[540]['available'])
+        self.assertEqual(monday[585]['busy_people'], [pks[1]])   # 09:45-10:30 still overlaps 09:00-10:00
+        self.assertTrue(monday[630]['available'])
+        self.assertEqual(monday[810]['busy_people'], [pks[2]])
+        self.assertEqual(monday[855]['free_rooms'], ['Room A'])
+        self.assertEqual([row['free_rooms'] for row in grid[TUESDAY] if row['start'] == 585], [['Room A']])
+
+    def test_availability_endpoint(self):
+        url = '/api/defense/availability/'
+        with self.assertNumQueries(3):      # rooms, advisors, bookings, whatever the range
+            response = self.client.get(url, {
+                'start_date': MONDAY.isoformat(), 'end_date': TUESDAY.isoformat(),
+                'advisors': 'ADV-V3,ADV-V2', 'slot_minutes': 30, 'day_start': '09:00', 'day_end': '15:00',
+            })
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['rooms'], ['Room A', 'Room B'])
+        self.assertEqual(response.data['advisors'], ['ADV-V3', 'ADV-V2'])
+        self.assertEqual(len(response.data['time_slots']), 12)
+        monday = response.data['days'][0]
+        self.assertEqual(monday['date'], MONDAY.isoformat())
+        slots = {slot['start']: slot for slot in monday['slots']}
+        self.assertEqual(slots['09:30']['busy_advisors'], ['ADV-V2'])
+        self.assertEqual(slots['09:30']['free_rooms'], ['Room B'])
+        self.assertEqual(slots['14:30']['busy_advisors'], ['ADV-V3'])
+        self.assertTrue(slots['10:00']['available'])
+        self.assertEqual(monday['rooms']['Room B']['busy'],
+                         [{'start': '13:30', 'end': '15:00', 'project_id': '2025-2026-V002'}])
+        self.assertEqual(monday['advisors']['ADV-V2']['free'], [{'start': '10:00', 'end': '15:00'}])
+
+        response = self.client.get(url, {
+            'start_date': MONDAY.isoformat(), 'rooms': 'Room A', 'time_slots': '09:00-10:00,10:15-11:15',
+        })
+        self.assertEqual(response.data['time_slots'], ['09:00-10:00', '10:15-11:15'])
+        self.assertEqual([slot['available'] for slot in response.data['days'][0]['slots']], [False, True])
+
+        for params in [
+            {'start_date': TUESDAY.isoformat(), 'end_date': MONDAY.isoformat()},
+            {'start_date': MONDAY.isoformat(), 'end_date': (MONDAY + timedelta(days=90)).isoformat()},
+            {'start_date': MONDAY.isoformat(), 'time_slots': '9-10'},
+            {'start_date': MONDAY.isoformat(), 'advisors': 'ADV-NONE'},
+        ]:
+            self.assertEqual(self.client.get(url, params).status_code, 400, params)
+
+    def test_room_availability_view(self):
+        response = self.client.get(f'/api/defense/rooms/{self.room_a.id}/availability/{MONDAY.isoformat()}/')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['booked_slots'], [{'start': '09:00', 'end': '10:00', 'defense': '2025-2026-V001'}])
+        self.assertEqual(len(response.data['available_slots']), 7)
+        self.assertEqual([c['reason'] for c in response.data['conflicts']], ['Status: cancelled'])
+
+        response = self.client.get(f'/api/defense/rooms/{self.room_a.id}/availability/not-a-date/')
+        self.assertEqual(response.status_code, 400)
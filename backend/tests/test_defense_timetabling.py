@@ -0,0 +1,197 @@
+"""
+Tests for automatic defense timetabling
+"""
+import json
+import random
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from advisors.models import Advisor, AdvisorAvailability
+from defense_management.timetabling import Booking, Defense, DefenseTimetabler, Timetable
+from projects.models import LogEntry, Project, ProjectGroup, ProjectStatus
+from settings.models import SystemSettings
+
+User = get_user_model()
+
+MONDAY = date(2026, 3, 2)
+TUESDAY = date(2026, 3, 3)
+
+
+class TimetableTestCase(TestCase):
+    """The solver should never double-book and should use as few days as it can"""
+
+    def _assert_valid(self, timetable):
+        rooms, people = set(), set()
+        for project_id, (d, s, room) in timetable.placed.items():
+            self.assertNotIn((d, s, room), rooms)
+            self.assertNotIn((d, s, room), timetable.blocked_rooms)
+            rooms.add((d, s, room))
+            for person in timetable.defenses[project_id].people:
+                self.assertNotIn((person, d, s), people)
+                self.assertNotIn((person, d, s), timetable.blocked_people)
+                self.assertNotIn(timetable.days[d], timetable.unavailable.get(person, ()))
+                people.add((person, d, s))
+
+    def test_cohort_is_packed_into_the_fewest_days(self):
+        rng = random.Random(3)
+        days = [MONDAY + timedelta(days=i) for i in range(8)]
+        slots = [(540, 600), (615, 675), (780, 840), (855, 915)]
+        defenses = [Defense(f'P{i:03d}', tuple(sorted(set(rng.sample(range(80), 4))))) for i in range(100)]
+        unavailable = {person: {rng.choice(days)} for person in range(0, 80, 4)}
+        bookings = [Booking(days[0], 540, 600, 'R1', frozenset({7}))]
+        timetable = Timetable(days, slots, ['R1', 'R2', 'R3', 'R4', 'R5'], bookings, unavailable)
+
+        self.assertEqual(timetable.schedule(defenses), [])
+        self._assert_valid(timetable)
+        self.assertEqual(timetable.summary()['days_used'], 6)    # 100 defenses + 1 booking, 20 positions a day
+
+    def test_committees_keep_their_room(self):
+        defenses = [Defense(f'A{i}', (1, 2)) for i in range(2)] + [Defense(f'B{i}', (3, 4)) for i in range(2)]
+        timetable = Timetable([MONDAY], [(540, 600), (615, 675)], ['R1', 'R2'])
+        self.assertEqual(timetable.schedule(defenses), [])
+        self.assertEqual(timetable.summary(), {'days_used': 1, 'room_changes': 0})
+
+    def test_stationed_room_and_infeasible_defense(self):
+        timetable = Timetable([MONDAY], [(540, 600)], ['R1', 'R2'])
+        unplaced = timetable.schedule([Defense('A', (1,), room='R2'), Defense('B', (1,)), Defense('C', (2,))])
+        self.assertEqual(timetable.placed['A'][2], 'R2')
+        self.assertEqual(unplaced, ['B'])
+
+    def test_move_only_displaces_colliding_defenses(self):
+        days = [MONDAY, TUESDAY]
+        timetable = Timetable(days, [(540, 600), (615, 675)], ['R1', 'R2'])
+        timetable.schedule([Defense(f'P{i}', (i, i + 10)) for i in range(6)])
+        before = dict(timetable.placed)
+        target = before['P0']
+
+        self.assertEqual(timetable.move('P5', target), [])
+        self._assert_valid(timetable)
+        self.assertEqual(timetable.placed['P5'], target)
+        moved = {pid for pid in before if before[pid] != timetable.placed[pid]}
+        self.assertEqual(moved, {'P0', 'P5'})
+
+        timetable.block(Booking(MONDAY, 540, 600, None, frozenset({1})))
+        with self.assertRaises(ValueError):
+            timetable.move('P1', (0, 0, 'R2'))
+
+
+class DefenseTimetablerTestCase(TestCase):
+    """Timetables should respect existing bookings, absences and be written in bulk"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='timetable_admin', email='timetable_admin@example.com', password='testpass123', role='Admin'
+        )
+        self.advisors = [self._advisor(i) for i in range(1, 5)]
+        SystemSettings.objects.create(setting_name='defense_settings_2025-2026', setting_value=json.dumps({
+            'startDefenseDate': MONDAY.isoformat(),
+            'timeSlots': '09:00-10:00,10:15-11:15',
+            'rooms': [{'id': 'r1', 'name': 'Room A', 'majorIds': []}, {'id': 'r2', 'name': 'Room B', 'majorIds': []}],
+            'stationaryAdvisors': {},
+            'timezone': 'Asia/Bangkok',
+        }))
+        # Supervisor, committee member
+        for i, (supervisor, member) in enumerate([(1, 2), (2, 3), (3, 1), (4, 2)], start=1):
+            self._project(f'2025-2026-D{i:03d}', supervisor, member)
+        # Booked last year's way: ADV-T1 and Room A are taken on Monday at 09:00
+        self._project('2024-2025-D900', 1, None, status=ProjectStatus.APPROVED,
+                      defense_date=MONDAY, defense_time=time(9, 0), defense_room='Room A')
+        AdvisorAvailability.objects.create(advisor=self.advisors[3], date=MONDAY, is_available=False)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _advisor(self, n):
+        user = User.objects.create_user(
+            username=f'timetable_{n}', email=f'timetable_{n}@example.com', password='testpass123', role='Advisor'
+        )
+        return Advisor.objects.create(user=user, advisor_id=f'ADV-T{n}')
+
+    def _project(self, project_id, supervisor, member, status=ProjectStatus.APPROVED, **defense):
+        group = ProjectGroup.objects.create(
+            project_id=project_id, topic_lao='', topic_eng=project_id, status=status,
+            main_committee_id=f'ADV-T{member}' if member else None, **defense
+        )
+        Project.objects.create(
+            project_id=project_id, title=project_id, status=status,
+            advisor=self.advisors[supervisor - 1], project_group=group,
+        )
+
+    def _booked(self):
+        groups = ProjectGroup.objects.filter(project_id__startswith='2025-2026-')
+        return {
+            g.project_id: (g.defense_date, g.defense_time, g.defense_room)
+            for g in groups if g.defense_date
+        }
+
+    def test_preview_respects_bookings_and_absences(self):
+        report = DefenseTimetabler('2025-2026').preview()
+        schedule = {entry['project_id']: entry for entry in report['schedule']}
+        self.assertEqual(sorted(schedule), ['2025-2026-D001', '2025-2026-D002', '2025-2026-D003', '2025-2026-D004'])
+        self.assertEqual(report['unscheduled'], [])
+        self.assertEqual(report['days_used'], 2)
+        self.assertNotEqual(schedule['2025-2026-D004']['defense_date'], MONDAY.isoformat())
+        for entry in schedule.values():
+            if 'ADV-T1' in entry['advisors'] or entry['defense_room'] == 'Room A':
+                self.assertNotEqual((entry['defense_date'], entry['defense_time']), (MONDAY.isoformat(), '09:00'))
+        seats = [(a, e['defense_date'], e['defense_time']) for e in schedule.values() for a in e['advisors']]
+        self.assertEqual(len(seats), len(set(seats)))
+        self.assertEqual(self._booked(), {})
+
+    def test_apply_and_reschedule(self):
+        report = DefenseTimetabler('2025-2026').apply(self.admin)
+        self.assertEqual(report['applied']['updated'], 4)
+        booked = self._booked()
+        self.assertEqual(len(booked), 4)
+        self.assertEqual(LogEntry.objects.filter(type='defense_scheduled').count(), 4)
+        self.assertEqual(DefenseTimetabler('2025-2026').preview()['existing'], 4)
+
+        # Move D002 (ADV-T2, ADV-T3) onto D004's slot (ADV-T4, ADV-T2): D004 has to make way
+        day, start, room = booked['2025-2026-D004']
+        report = DefenseTimetabler('2025-2026').reschedule('2025-2026-D002', day, start, room, user=self.admin)
+        changed = {entry['project_id'] for entry in report['changes']}
+        self.assertIn('2025-2026-D002', changed)
+        self.assertEqual(report['unscheduled'], [])
+        after = self._booked()
+        self.assertEqual(after['2025-2026-D002'], (day, start, room))
+        self.assertNotEqual(after['2025-2026-D004'], (day, start, room))
+        for project_id in set(booked) - changed:
+            self.assertEqual(after[project_id], booked[project_id])
+        self.assertEqual(len(set(after.values())), 4)
+
+    def test_endpoints(self):
+        response = self.client.post('/api/defense/timetable/', {'academic_year': '2025-2026'}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['time_slots'], ['09:00-10:00', '10:15-11:15'])
+        self.assertEqual(self._booked(), {})
+
+        response = self.client.post('/api/defense/timetable/', {
+            'academic_year': '2025-2026', 'time_slots': '9-10', 'apply': True,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/defense/timetable/reschedule/', {
+            'academic_year': '2025-2026', 'project_id': '2025-2026-D001',
+            'defense_date': MONDAY.isoformat(), 'defense_time': '09:00', 'defense_room': 'Room A',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_authenticate(self.advisors[0].user)
+        response = self.client.post('/api/defense/timetable/', {'academic_year': '2025-2026'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_single_booking_rejects_conflicts(self):
+        project = Project.objects.get(project_id='2025-2026-D003')
+        url = f'/api/projects/projects/{project.pk}/schedule_defense/'
+        response = self.client.post(url, {
+            'defense_date': MONDAY.isoformat(), 'defense_time': '09:30', 'defense_room': 'Room B',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data['conflicts']), 1)
+
+        response = self.client.post(url, {
+            'defense_date': MONDAY.isoformat(), 'defense_time': '10:15', 'defense_room': 'Room A',
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
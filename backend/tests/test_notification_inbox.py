@@ -0,0 +1,134 @@
+"""
+Tests for the cached unread-notification inboxes
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from accounts.middleware import UserNotificationMiddleware
+from notifications.inbox import INBOX_SIZE, get_inbox, invalidate_inbox, unread_count, user_audiences
+from notifications.models import Notification
+
+User = get_user_model()
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'notification-inbox-tests',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class NotificationInboxTestCase(TestCase):
+    """Cached counts and inboxes should track the database without querying it"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(
+            username='inbox_student',
+            email='inbox_student@example.com',
+            password='testpass123',
+            role='Student',
+        )
+        self.other = User.objects.create_user(
+            username='inbox_other',
+            email='inbox_other@example.com',
+            password='testpass123',
+            role='Advisor',
+        )
+        # Drop anything signals created for the new users
+        Notification.objects.all().delete()
+        invalidate_inbox(*user_audiences(self.user), *user_audiences(self.other))
+
+    def notify(self, recipient_id, recipient_type='user', **kwargs):
+        return Notification.objects.create(
+            title=kwargs.pop('title', 'Update'),
+            message='Something happened',
+            recipient_id=recipient_id,
+            recipient_type=recipient_type,
+            **kwargs,
+        )
+
+    def expected_unread(self, user):
+        return sum(
+            Notification.objects.filter(is_read=False, is_archived=False).filter(
+                **({'recipient_type': 'all'} if audience == 'all' else {'recipient_id': audience})
+            ).exclude(**({} if audience == 'all' else {'recipient_type': 'all'})).count()
+            for audience in user_audiences(user)
+        )
+
+    def test_counts_follow_create_read_archive_and_delete(self):
+        self.assertEqual(unread_count(self.user), 0)
+        self.assertEqual(unread_count(self.other), 0)
+
+        personal = self.notify(str(self.user.id))
+        role_wide = self.notify('Student', recipient_type='role')
+        everyone = self.notify('all', recipient_type='all')
+        self.notify(str(self.other.id))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user), 3)
+
+        personal.mark_as_read()
+        role_wide.mark_as_archived()
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user), 1)
+            self.assertEqual(unread_count(self.other), 2)
+
+        everyone.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user), 0)
+        self.assertEqual(unread_count(self.user), self.expected_unread(self.user))
+
+    def test_inbox_merges_audiences_newest_first(self):
+        first = self.notify(str(self.user.id), title='first')
+        second = self.notify('all', recipient_type='all', title='second')
+        third = self.notify('Student', recipient_type='role', title='third')
+        self.notify('Advisor', recipient_type='role', title='not mine')
+
+        inbox = get_inbox(self.user)
+        self.assertEqual(inbox['unread_count'], 3)
+        self.assertEqual(
+            [item['id'] for item in inbox['notifications']],
+            [str(third.id), str(second.id), str(first.id)],
+        )
+
+        second.mark_as_read()
+        with self.assertNumQueries(0):
+            inbox = get_inbox(self.user)
+        self.assertEqual([item['title'] for item in inbox['notifications']], ['third', 'first'])
+
+    def test_reading_from_a_full_inbox_refills_it(self):
+        notifications = [self.notify(str(self.user.id), title=f'n{i}') for i in range(INBOX_SIZE + 2)]
+        self.assertEqual(len(get_inbox(self.user)['notifications']), INBOX_SIZE)
+
+        notifications[-1].mark_as_read()
+        inbox = get_inbox(self.user)
+        self.assertEqual(inbox['unread_count'], INBOX_SIZE + 1)
+        self.assertEqual(len(inbox['notifications']), INBOX_SIZE)
+        self.assertEqual(inbox['notifications'][0]['title'], f'n{INBOX_SIZE}')
+        self.assertEqual(inbox['notifications'][-1]['title'], 'n1')
+
+    def test_bulk_updates_invalidate(self):
+        self.notify(str(self.user.id))
+        self.notify(str(self.user.id))
+        self.assertEqual(unread_count(self.user), 2)
+
+        Notification.objects.filter(recipient_id=str(self.user.id)).update(is_read=True)
+        invalidate_inbox(str(self.user.id))
+        self.assertEqual(unread_count(self.user), 0)
+
+    def test_middleware_header_is_served_from_cache(self):
+        self.notify(str(self.user.id))
+        self.notify('all', recipient_type='all')
+        request = RequestFactory().get('/api/projects/')
+        request.user = self.user
+        middleware = UserNotificationMiddleware(lambda request: HttpResponse())
+
+        unread_count(self.user)
+        with self.assertNumQueries(0):
+            response = middleware.process_response(request, HttpResponse())
+        self.assertEqual(response['X-Unread-Notifications'], '2')
@@ -0,0 +1,116 @@
+"""
+Tests for keyset cursor pagination
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.pagination import KeysetCursorPagination
+from notifications.models import Notification
+from projects.models import Project
+
+User = get_user_model()
+
+
+class KeysetCursorPaginationTestCase(TestCase):
+    """Pages should be stable and complete even with duplicate timestamps"""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        for i in range(25):
+            Notification.objects.create(
+                title=f'Notice {i}', message='Hello', recipient_id='all', recipient_type='all'
+            )
+        # Force ties on created_at so the id tie-breaker is exercised
+        Notification.objects.update(created_at=timezone.now())
+
+    def _page(self, url, **attrs):
+        paginator = KeysetCursorPagination()
+        for name, value in attrs.items():
+            setattr(paginator, name, value)
+        request = Request(self.factory.get(url))
+        rows = paginator.paginate_queryset(Notification.objects.all(), request)
+        return paginator, rows
+
+    def test_walks_forward_and_back_without_gaps(self):
+        seen = []
+        url = '/api/notifications/?page_size=10'
+        pages = []
+        while url:
+            paginator, rows = self._page(url)
+            pages.append([row.pk for row in rows])
+            seen.extend(row.pk for row in rows)
+            url = paginator.get_next_link()
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(seen, list(Notification.objects.order_by('-created_at', '-id').values_list('pk', flat=True)))
+
+        previous_url = paginator.get_previous_link()
+        _, rows = self._page(previous_url)
+        self.assertEqual([row.pk for row in rows], pages[1])
+
+    def test_count_modes(self):
+        paginator, _ = self._page('/api/notifications/?count=none')
+        self.assertNotIn('count', paginator.get_paginated_response([]).data)
+
+        paginator, _ = self._page('/api/notifications/?count=exact')
+        self.assertEqual(paginator.get_paginated_response([]).data['count'], 25)
+
+        # SQLite has no planner estimate, so the exact count is used
+        paginator, _ = self._page('/api/notifications/')
+        data = paginator.get_paginated_response([]).data
+        self.assertEqual(data['count'], 25)
+        self.assertFalse(data['count_is_estimate'])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(NotFound):
+            self._page('/api/notifications/?cursor=not-a-cursor')
+
+    def test_notification_list_endpoint_cursor_is_opt_in(self):
+        user = User.objects.create_user(
+            username='reader1', email='reader1@example.com', password='testpass123', role='Student'
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        # Without ?cursor= the page-number response is unchanged
+        response = client.get('/api/notifications/', {'page': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+        self.assertNotIn('cursor=', response.data['previous'])
+
+        response = client.get('/api/notifications/', {'cursor': '', 'page_size': 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIn('cursor=', response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+        response = client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+
+
+class ProjectSearchCursorTestCase(TestCase):
+    """ProjectViewSet.search should switch to keyset pagination on ?cursor="""
+
+    def test_search_cursor_pages(self):
+        admin = User.objects.create_user(
+            username='admin1', email='admin1@example.com', password='testpass123', role='Admin'
+        )
+        for i in range(5):
+            Project.objects.create(project_id=f'2024-2025-P{i:03d}', title=f'Project {i}')
+        client = APIClient()
+        client.force_authenticate(user=admin)
+
+        response = client.get('/api/projects/projects/search/', {'cursor': '', 'page_size': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertNotIn('total_pages', response.data)
+
+        response = client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['next'])
@@ -0,0 +1,175 @@
+"""
+Tests for the JWT principal cache (HTTP and WebSocket authentication)
+"""
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from core.jwt_auth import CachedJWTAuthentication, revoke_token
+from core.middleware.websocket_auth import get_user_from_token
+from core.principal import PrincipalCache, get_principal_cache, reset_principal_cache
+
+User = get_user_model()
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'principal-cache-tests',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PrincipalCacheTestCase(TestCase):
+    """Authenticated users should come from memory after the first request"""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        reset_principal_cache()
+        self.addCleanup(reset_principal_cache)
+        self.user = User.objects.create_user(
+            username='principal_student',
+            email='principal_student@example.com',
+            password='testpass123',
+            role='Student',
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.factory = RequestFactory()
+
+    def authenticate(self, token=None):
+        request = self.factory.get('/api/projects/', HTTP_AUTHORIZATION=f'Bearer {token or self.token}')
+        return CachedJWTAuthentication().authenticate(request)
+
+    def test_user_is_loaded_once(self):
+        user, validated_token = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.principal.role, 'Student')
+
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+        self.assertEqual(user.username, 'principal_student')
+
+    def test_shared_cache_serves_other_processes(self):
+        self.authenticate()
+        # A fresh process has an empty local tier but shares the cache
+        get_principal_cache().clear()
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_shared_cache_holds_no_password(self):
+        from django.core.cache import cache
+
+        self.authenticate()
+        shared_user = cache.get(f'principal_user_{self.user.pk}')[0]
+        self.assertNotIn('password', shared_user.__dict__)
+
+        get_principal_cache().clear()
+        user, _ = self.authenticate()
+        # Loaded from the database only when something needs it
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password('testpass123'))
+
+    def test_returned_users_are_copies(self):
+        first, _ = self.authenticate()
+        first.first_name = 'Changed'
+        second, _ = self.authenticate()
+        self.assertNotEqual(second.first_name, 'Changed')
+
+    def test_role_and_profile_changes_invalidate(self):
+        from students.models import Student
+
+        self.authenticate()
+        self.user.role = 'Advisor'
+        self.user.save()
+        user, _ = self.authenticate()
+        self.assertEqual(user.role, 'Advisor')
+        self.assertEqual(user.principal.role, 'Advisor')
+        self.assertIsNone(user.principal.student_id)
+
+        student = Student.objects.create(
+            user=self.user, student_id='PC-001', major='Computer Science', classroom='CS-1',
+        )
+        user, _ = self.authenticate()
+        self.assertEqual(user.principal.student_id, student.pk)
+        self.assertTrue(user.principal.can_access_academic_year(self.user.current_academic_year))
+        self.assertFalse(user.principal.can_access_academic_year('1999-2000'))
+
+    def test_inactive_and_deleted_users_are_rejected(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_other_process_invalidation_applies_immediately(self):
+        self.authenticate()
+        # Another process deactivates the user; this process still holds the entry in memory
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        PrincipalCache().invalidate(self.user.pk)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_bulk_deactivation_invalidates(self):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {self.token}'}
+        self.assertEqual(self.client.get('/api/users/me/', **headers).status_code, 200)
+
+        response = self.client.post(
+            '/api/users/users/bulk_update/',
+            {'user_ids': [self.user.pk], 'updates': {'is_active': False}},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/users/me/', **headers).status_code, 401)
+
+    def test_revoked_token_is_rejected(self):
+        other_token = AccessToken.for_user(self.user)
+        self.authenticate()
+        revoke_token(self.token)
+        with self.assertRaises(InvalidToken):
+            self.authenticate()
+        # Other tokens of the same user still work, also after the local tier expires
+        get_principal_cache().clear()
+        with self.assertRaises(InvalidToken):
+            self.authenticate()
+        user, _ = self.authenticate(other_token)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_other_process_revocation_applies_immediately(self):
+        self.authenticate()
+        PrincipalCache().revoke(self.user.pk, self.token['jti'], self.token['exp'])
+        with self.assertRaises(InvalidToken):
+            self.authenticate()
+
+    def test_logout_revokes_access_token(self):
+        refresh = RefreshToken.for_user(self.user)
+        for path in ('/api/users/logout/', '/api/auth/logout/'):
+            access = str(refresh.access_token)
+            self.client.post(
+                path, {'refresh': str(refresh)},
+                HTTP_AUTHORIZATION=f'Bearer {access}', content_type='application/json',
+            )
+            with self.assertRaises(InvalidToken):
+                self.authenticate(access)
+
+    def test_websocket_token_uses_the_cache(self):
+        user = async_to_sync(get_user_from_token)(str(self.token))
+        self.assertTrue(user.is_authenticated)
+        self.assertEqual(user.pk, self.user.pk)
+
+        with self.assertNumQueries(0):
+            user = async_to_sync(get_user_from_token)(str(self.token))
+        self.assertEqual(user.pk, self.user.pk)
+
+        self.assertFalse(async_to_sync(get_user_from_token)('not-a-token').is_authenticated)
+        refresh = str(RefreshToken.for_user(self.user))
+        self.assertFalse(async_to_sync(get_user_from_token)(refresh).is_authenticated)
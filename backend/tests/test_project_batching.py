@@ -0,0 +1,95 @@
+"""
+Tests for batched ProjectGroup resolution in ProjectSerializer
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from advisors.models import Advisor
+from milestones.models import Milestone, MilestoneTemplate
+from projects.batching import ProjectBatch
+from projects.models import LogEntry, Project, ProjectGroup, ProjectStudent
+from projects.serializers import ProjectSerializer
+
+User = get_user_model()
+
+
+class ProjectBatchTestCase(TestCase):
+    """ProjectSerializer list mode should use a constant number of queries"""
+
+    def setUp(self):
+        advisor_user = User.objects.create_user(
+            username='committee1', email='committee1@example.com',
+            password='testpass123', role='Advisor', first_name='Ada', last_name='Lovelace'
+        )
+        self.advisor = Advisor.objects.create(user=advisor_user, advisor_id='ADV-001')
+        self.template = MilestoneTemplate.objects.create(name='Default', description='Default')
+        self.student_user = User.objects.create_user(
+            username='student1', email='student1@example.com',
+            password='testpass123', role='Student', first_name='Sam', last_name='Student'
+        )
+
+    def _create_projects(self, count, offset=0):
+        for i in range(offset, offset + count):
+            project_id = f'2024-2025-P{i:03d}'
+            Project.objects.create(project_id=project_id, title=f'Project {i}')
+            group = ProjectGroup.objects.create(
+                project_id=project_id,
+                topic_lao=f'Lao {i}',
+                topic_eng=f'English {i}',
+                advisor_name='Dr. Advisor',
+                main_committee_id=self.advisor.advisor_id,
+            )
+            ProjectStudent.objects.create(project_group=group, student=self.student_user)
+            Milestone.objects.create(
+                project_group=group, template=self.template, name='Proposal',
+                due_date=date.today() + timedelta(days=7), status='Pending'
+            )
+            LogEntry.objects.create(project=group, type='comment', author_id=1, content='hello')
+
+    def _count_queries(self):
+        projects = Project.objects.order_by('project_id')
+        with CaptureQueriesContext(connection) as ctx:
+            data = ProjectSerializer(projects, many=True).data
+        return len(ctx.captured_queries), data
+
+    def test_query_count_independent_of_page_size(self):
+        self._create_projects(2)
+        small_count, _ = self._count_queries()
+
+        self._create_projects(8, offset=2)
+        large_count, data = self._count_queries()
+
+        self.assertEqual(len(data), 10)
+        self.assertEqual(small_count, large_count)
+
+    def test_batched_values_match_related_rows(self):
+        self._create_projects(1)
+        row = ProjectSerializer(Project.objects.all(), many=True).data[0]
+
+        self.assertEqual(row['topic_eng'], 'English 0')
+        self.assertEqual(row['main_committee'], self.advisor.id)
+        self.assertEqual(row['committee_member_names'], {'main': 'Ada Lovelace'})
+        self.assertEqual(row['student_names'], ['Sam Student'])
+        self.assertEqual(row['student_count'], 1)
+        self.assertEqual(row['milestone_count'], 1)
+        self.assertEqual(row['pending_milestone_count'], 1)
+        self.assertEqual(len(row['recent_activity']), 1)
+
+    def test_single_instance_uses_one_batch(self):
+        self._create_projects(1)
+        project = Project.objects.get()
+        with CaptureQueriesContext(connection) as ctx:
+            data = ProjectSerializer(project).data
+        self.assertEqual(data['student_count'], 1)
+        self.assertLessEqual(len(ctx.captured_queries), 5)
+
+    def test_batch_without_project_group(self):
+        project = Project.objects.create(project_id='2024-2025-P999', title='Orphan')
+        batch = ProjectBatch.for_projects([project])
+        self.assertIsNone(batch.group_for(project))
+        self.assertEqual(batch.milestone_counts_for(project), (0, 0))
+        self.assertEqual(ProjectSerializer(project).data['topic_eng'], 'Orphan')
@@ -0,0 +1,97 @@
+"""
+Tests for the project full-text search index
+"""
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from projects.models import Project, ProjectGroup, ProjectStudent
+from projects.read_model import refresh_project_summaries
+from projects.search import search_project_ids, search_projects, tokenize_query
+from students.models import Student
+
+User = get_user_model()
+
+
+class ProjectSearchIndexTestCase(TestCase):
+    """Search index should stay in sync with summaries and rank matches"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin1', email='admin1@example.com', password='testpass123', role='Admin'
+        )
+        self._create_project('2024-2025-P001', 'ລະບົບຄຸ້ມຄອງ ກະສິກຳ', 'Smart Farm Monitoring', 'Dr. Vientiane')
+        self._create_project('2024-2025-P002', 'ລະບົບ ຫ້ອງສະໝຸດ', 'Library System', 'Dr. Farmer')
+
+        student_user = User.objects.create_user(
+            username='student1', email='student1@example.com', password='testpass123',
+            role='Student', first_name='Khamla', last_name='Phommavong'
+        )
+        Student.objects.create(user=student_user, student_id='STU042', major='CS', classroom='A')
+        ProjectStudent.objects.create(
+            project_group=ProjectGroup.objects.get(project_id='2024-2025-P002'), student=student_user
+        )
+        refresh_project_summaries(['2024-2025-P001', '2024-2025-P002'])
+
+    def _create_project(self, project_id, topic_lao, topic_eng, advisor_name):
+        Project.objects.create(project_id=project_id, title=topic_eng)
+        ProjectGroup.objects.create(
+            project_id=project_id, topic_lao=topic_lao, topic_eng=topic_eng, advisor_name=advisor_name
+        )
+
+    def test_prefix_match_on_topics_and_students(self):
+        self.assertEqual(search_project_ids('monit'), ['2024-2025-P001'])
+        self.assertEqual(search_project_ids('ຫ້ອງ'), ['2024-2025-P002'])
+        self.assertEqual(search_project_ids('stu042'), ['2024-2025-P002'])
+        self.assertEqual(search_project_ids('khamla phomma'), ['2024-2025-P002'])
+
+    def test_fuzzy_match_corrects_typos(self):
+        self.assertEqual(search_project_ids('librery'), ['2024-2025-P002'])
+
+    def test_topic_match_ranks_above_advisor_match(self):
+        self.assertEqual(search_project_ids('farm'), ['2024-2025-P001', '2024-2025-P002'])
+
+    def test_search_stays_in_sql(self):
+        for n in range(3, 40):
+            self._create_project(f'2024-2025-P{n:03d}', '', f'Farm robot {n}', 'Dr. Robot')
+        refresh_project_summaries(Project.objects.values_list('project_id', flat=True))
+
+        queryset = search_projects(Project.objects.all(), 'farm').order_by('search_rank', 'project_id')
+        _, params = queryset.query.sql_with_params()
+        self.assertEqual(len(params), 1)    # the match expression, however many projects match
+        with self.assertNumQueries(2):      # vocabulary prefix check, then the joined query
+            project_ids = list(search_projects(Project.objects.all(), 'farm').values_list('project_id', flat=True))
+        self.assertEqual(len(project_ids), 39)
+        self.assertEqual([project.project_id for project in queryset], search_project_ids('farm'))
+        self.assertEqual(search_projects(Project.objects.all(), 'robt').count(), 37)
+
+    def test_index_follows_updates_and_deletes(self):
+        group = ProjectGroup.objects.get(project_id='2024-2025-P001')
+        group.topic_eng = 'Drone Mapping'
+        group.save()
+        refresh_project_summaries(['2024-2025-P001'])
+        self.assertEqual(search_project_ids('drone'), ['2024-2025-P001'])
+        self.assertEqual(search_project_ids('monit'), [])
+
+        group.delete()
+        Project.objects.filter(project_id='2024-2025-P001').delete()
+        refresh_project_summaries(['2024-2025-P001'])
+        self.assertEqual(search_project_ids('drone'), [])
+
+    def test_rebuild_command_recreates_index(self):
+        call_command('rebuild_project_summaries', '--search-index', stdout=open('/dev/null', 'w'))
+        self.assertEqual(search_project_ids('library'), ['2024-2025-P002'])
+
+    def test_search_endpoint_orders_by_relevance(self):
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        response = client.get('/api/projects/projects/search/', {'query': 'farm'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row['project_id'] for row in response.data['results']],
+            ['2024-2025-P001', '2024-2025-P002']
+        )
+
+    def test_tokenize_strips_query_syntax(self):
+        self.assertEqual(tokenize_query('"smart" OR farm*'), ['smart', 'or', 'farm'])
@@ -0,0 +1,115 @@
+"""
+Tests for the cached single-query project statistics
+"""
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from milestones.models import Milestone, MilestoneTemplate
+from projects.models import Project, ProjectGroup, ProjectStudent
+from projects.read_model import refresh_project_summaries
+from projects.statistics import ProjectStatistics
+from students.models import Student
+
+User = get_user_model()
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'project-statistics-tests',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProjectStatisticsTestCase(TestCase):
+    """Statistics should come from one query and be served from cache until a write"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.admin = User.objects.create_user(
+            username='stats_admin', email='stats_admin@example.com', password='testpass123', role='Admin'
+        )
+        self.student = User.objects.create_user(
+            username='stats_student', email='stats_student@example.com', password='testpass123', role='Student'
+        )
+        Student.objects.create(user=self.student, student_id='ST-001', major='Computer Science', classroom='A')
+        self.template = MilestoneTemplate.objects.create(name='Plan', description='Plan')
+
+        self.g1 = self._group('2024-2025-S001', status='Approved', advisor_name='Dr. A',
+                              defense_date=date(2025, 6, 1), defense_time=time(9, 0), defense_room='R1')
+        ProjectStudent.objects.create(project_group=self.g1, student=self.student)
+        self._milestone(self.g1, 'Approved', 10)
+        self._milestone(self.g1, 'Pending', -3)
+        self.g2 = self._group('2024-2025-S002', status='Pending', advisor_name='Dr. A')
+        self.g3 = self._group('2023-2024-S003', status='Rejected', advisor_name='Dr. B')
+
+    def _group(self, project_id, **fields):
+        Project.objects.create(project_id=project_id, title=project_id)
+        return ProjectGroup.objects.create(project_id=project_id, topic_lao='', topic_eng=project_id, **fields)
+
+    def _milestone(self, group, status, days):
+        return Milestone.objects.create(
+            project_group=group, template=self.template, name=f'{status} {days}', status=status,
+            due_date=date.today() + timedelta(days=days),
+        )
+
+    def test_figures_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            stats = ProjectStatistics(self.admin).compute()
+        self.assertEqual(stats['total_projects'], 3)
+        self.assertEqual(
+            (stats['pending_projects'], stats['approved_projects'], stats['rejected_projects']), (1, 1, 1)
+        )
+        self.assertEqual((stats['scheduled_defenses'], stats['unscheduled_defenses']), (1, 2))
+        self.assertEqual(stats['projects_by_advisor'], {'Dr. A': 2, 'Dr. B': 1})
+        self.assertEqual(stats['projects_by_major'], {'Computer Science': 1})
+        self.assertEqual(stats['projects_needing_attention'], 1)
+        self.assertEqual(stats['average_milestone_completion'], 50.0)
+
+    def test_academic_year_and_role_scope(self):
+        stats = ProjectStatistics(self.admin, '2024-2025').get()
+        self.assertEqual(stats['total_projects'], 2)
+        self.assertEqual(stats['projects_by_status'], {'Approved': 1, 'Pending': 1})
+
+        stats = ProjectStatistics(self.student).get()
+        self.assertEqual(stats['total_projects'], 1)
+        self.assertEqual(stats['projects_by_advisor'], {'Dr. A': 1})
+
+    def test_cached_until_a_write(self):
+        ProjectStatistics(self.admin, '2024-2025').get()
+        with self.assertNumQueries(0):
+            stats = ProjectStatistics(self.admin, '2024-2025').get()
+        self.assertEqual(stats['projects_needing_attention'], 1)
+
+        self._milestone(self.g2, 'Pending', -1)
+        self.assertEqual(ProjectStatistics(self.admin, '2024-2025').get()['projects_needing_attention'], 2)
+
+        self.g2.status = 'Approved'
+        self.g2.save()
+        self.assertEqual(ProjectStatistics(self.admin).get()['approved_projects'], 2)
+
+        # Writes that bypass signals invalidate through the read-model refresh
+        ProjectGroup.objects.filter(pk=self.g2.pk).update(status='Rejected')
+        refresh_project_summaries([self.g2.project_id])
+        self.assertEqual(ProjectStatistics(self.admin, '2024-2025').get()['rejected_projects'], 1)
+
+    def test_other_years_stay_cached(self):
+        ProjectStatistics(self.admin, '2023-2024').get()
+        self._milestone(self.g1, 'Approved', 5)
+        with self.assertNumQueries(0):
+            ProjectStatistics(self.admin, '2023-2024').get()
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get('/api/projects/projects/statistics/', {'academic_year': '2024-2025'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_projects'], 2)
+
+        response = client.get('/api/projects/projects/statistics/', {'academic_year': 'bad year'})
+        self.assertEqual(response.status_code, 400)
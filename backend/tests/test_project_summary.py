@@ -0,0 +1,157 @@
+"""
+Tests for the denormalized ProjectSummary read model
+"""
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from milestones.models import Milestone, MilestoneTemplate
+from projects.models import Project, ProjectGroup, ProjectStudent, ProjectSummary
+from projects.read_model import (
+    academic_year_from_project_id, refresh_project_summaries, safe_refresh_project_summaries,
+)
+from students.models import Student
+
+User = get_user_model()
+
+
+class ProjectSummaryTestCase(TestCase):
+    """Summary rows should mirror Project/ProjectGroup writes"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin1', email='admin1@example.com', password='testpass123', role='Admin'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project = Project.objects.create(project_id='2024-2025-P001', title='Smart Farm')
+            self.group = ProjectGroup.objects.create(
+                project_id='2024-2025-P001', topic_lao='ກະສິກຳ', topic_eng='Smart Farm',
+                advisor_name='Dr. Advisor', main_advisor_score=80, main_committee_score=90
+            )
+
+    def test_refresh_flattens_related_rows(self):
+        student_user = User.objects.create_user(
+            username='student1', email='student1@example.com', password='testpass123',
+            role='Student', first_name='Sam', last_name='Student'
+        )
+        Student.objects.create(user=student_user, student_id='STU001', major='CS', classroom='A')
+        ProjectStudent.objects.create(project_group=self.group, student=student_user)
+        template = MilestoneTemplate.objects.create(name='Default', description='Default')
+        Milestone.objects.create(
+            project_group=self.group, template=template, name='Proposal',
+            due_date=date.today() - timedelta(days=1), status='Pending'
+        )
+
+        refresh_project_summaries(['2024-2025-P001'])
+        summary = ProjectSummary.objects.get(project_id='2024-2025-P001')
+
+        self.assertEqual(summary.academic_year, '2024-2025')
+        self.assertEqual(summary.topic_eng, 'Smart Farm')
+        self.assertEqual(summary.student_ids, 'STU001')
+        self.assertEqual(summary.student_names, 'Sam Student')
+        self.assertEqual(summary.student_count, 1)
+        self.assertEqual(summary.milestone_count, 1)
+        self.assertEqual(summary.overdue_milestone_count, 1)
+        self.assertEqual(summary.final_score, 85)
+        self.assertEqual(summary.legacy_project, self.project)
+
+    def test_schedule_defense_updates_summary(self):
+        with patch('projects.read_model.safe_refresh_project_summaries', wraps=safe_refresh_project_summaries) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    f'/api/projects/projects/{self.project.pk}/schedule_defense/',
+                    {'defense_date': '2025-06-01', 'defense_time': '09:00', 'defense_room': 'A101'},
+                    format='json'
+                )
+        self.assertEqual(response.status_code, 200)
+        # Project, group and log entry writes share one refresh on commit
+        refresh.assert_called_once_with({'2024-2025-P001'})
+        summary = ProjectSummary.objects.get(project_id='2024-2025-P001')
+        self.assertEqual(summary.defense_room, 'A101')
+        self.assertTrue(summary.is_scheduled)
+
+    def test_update_status_updates_summary(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/projects/projects/{self.project.pk}/update_status/',
+                {'status': 'Approved'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ProjectSummary.objects.get(project_id='2024-2025-P001').status, 'Approved')
+
+    def test_deleted_project_removes_summary(self):
+        refresh_project_summaries(['2024-2025-P001'])
+        self.group.delete()
+        self.project.delete()
+        refresh_project_summaries(['2024-2025-P001'])
+        self.assertFalse(ProjectSummary.objects.filter(project_id='2024-2025-P001').exists())
+
+    def test_summaries_endpoint_and_rebuild_command(self):
+        call_command('rebuild_project_summaries', stdout=open('/dev/null', 'w'))
+        response = self.client.get('/api/projects/projects/summaries/?academic_year=2024-2025')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['advisor_name'], 'Dr. Advisor')
+
+    def test_academic_year_from_project_id(self):
+        self.assertEqual(academic_year_from_project_id('2024-2025-P001'), '2024-2025')
+        self.assertEqual(academic_year_from_project_id('IMPORT-001'), '')
+
+    def test_direct_writes_refresh_summary_on_commit(self):
+        ProjectSummary.objects.all().delete()
+        with patch('projects.read_model.safe_refresh_project_summaries', wraps=safe_refresh_project_summaries) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    self.group.topic_eng = 'Smarter Farm'
+                    self.group.save()
+                    self.project.title = 'Smarter Farm'
+                    self.project.save()
+        refresh.assert_called_once_with({'2024-2025-P001'})
+        self.assertEqual(ProjectSummary.objects.get(project_id='2024-2025-P001').topic_eng, 'Smarter Farm')
+
+        # IDs queued in a rolled-back savepoint are dropped with it
+        with patch('projects.read_model.safe_refresh_project_summaries', wraps=safe_refresh_project_summaries) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    try:
+                        with transaction.atomic():
+                            Project.objects.create(project_id='2024-2025-P009', title='Rolled back')
+                            raise RuntimeError
+                    except RuntimeError:
+                        pass
+                    self.project.title = 'Smartest Farm'
+                    self.project.save()
+        refresh.assert_called_once_with({'2024-2025-P001'})
+        self.assertEqual(ProjectSummary.objects.get(project_id='2024-2025-P001').title, 'Smartest Farm')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.delete()
+            self.project.delete()
+        self.assertFalse(ProjectSummary.objects.filter(project_id='2024-2025-P001').exists())
+
+    def test_bulk_update_refreshes_summary(self):
+        Project.objects.create(project_id='2024-2025-P002', title='Ungrouped')
+        refresh_project_summaries(['2024-2025-P002'])
+        response = self.client.post(
+            '/api/projects/projects/bulk_update/',
+            {'project_ids': ['2024-2025-P002'], 'updates': {'status': 'Approved'}}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(ProjectSummary.objects.get(project_id='2024-2025-P002').status, 'Approved')
+
+    def test_log_entries_update_last_activity(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/projects/projects/{self.project.pk}/add_log_entry/',
+                {'type': 'comment', 'content': 'Draft submitted'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        summary = ProjectSummary.objects.get(project_id='2024-2025-P001')
+        self.assertEqual(summary.last_activity_at, self.group.log_entries.get().created_at)
@@ -0,0 +1,76 @@
+"""
+Tests for join-based project visibility
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from advisors.models import Advisor
+from projects.models import Project, ProjectGroup, ProjectStudent
+from projects.visibility import ProjectVisibility, visible_projects
+from students.models import Student
+
+User = get_user_model()
+
+
+class ProjectVisibilityTestCase(TestCase):
+    """Each role's rule should resolve in SQL, not Python id lists"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin1', email='admin1@example.com', password='testpass123', role='Admin'
+        )
+        self.student_user = User.objects.create_user(
+            username='student1', email='student1@example.com', password='testpass123', role='Student'
+        )
+        Student.objects.create(user=self.student_user, student_id='STU001', major='CS', classroom='A')
+        self.advisor_user = User.objects.create_user(
+            username='advisor1', email='advisor1@example.com', password='testpass123',
+            role='Advisor', first_name='Grace', last_name='Hopper'
+        )
+        self.advisor = Advisor.objects.create(user=self.advisor_user, advisor_id='ADV-001')
+
+        self.own = self._project('P-OWN', advisor_name='Someone Else')
+        ProjectStudent.objects.create(project_group=self.own[1], student=self.student_user)
+        self.supervised = self._project('P-SUP', advisor_name='Grace Hopper')
+        self.committee = self._project('P-COM', advisor_name='Someone Else', third_committee_id='ADV-001')
+        self.other = self._project('P-OTH', advisor_name='Someone Else')
+
+    def _project(self, project_id, **group_fields):
+        project = Project.objects.create(project_id=project_id, title=project_id)
+        group = ProjectGroup.objects.create(
+            project_id=project_id, topic_lao='', topic_eng=project_id, **group_fields
+        )
+        return project, group
+
+    def _visible_ids(self, user):
+        return set(visible_projects(user).values_list('project_id', flat=True))
+
+    def test_admin_sees_everything(self):
+        self.assertEqual(self._visible_ids(self.admin), {'P-OWN', 'P-SUP', 'P-COM', 'P-OTH'})
+
+    def test_student_sees_own_projects(self):
+        self.assertEqual(self._visible_ids(self.student_user), {'P-OWN'})
+
+    def test_advisor_sees_supervised_and_committee_projects(self):
+        self.assertEqual(self._visible_ids(self.advisor_user), {'P-SUP', 'P-COM'})
+
+    def test_student_without_profile_sees_nothing(self):
+        orphan = User.objects.create_user(
+            username='student2', email='student2@example.com', password='testpass123', role='Student'
+        )
+        self.assertEqual(self._visible_ids(orphan), set())
+
+    def test_filter_groups_applies_same_rule(self):
+        groups = ProjectVisibility(self.advisor_user).filter_groups(ProjectGroup.objects.all())
+        self.assertEqual(set(groups.values_list('project_id', flat=True)), {'P-SUP', 'P-COM'})
+
+    def test_visibility_is_a_single_query(self):
+        for i in range(20):
+            self._project(f'P-EXTRA-{i}', advisor_name='Grace Hopper')
+        queryset = visible_projects(self.advisor_user)
+        with CaptureQueriesContext(connection) as ctx:
+            list(queryset)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('SELECT', ctx.captured_queries[0]['sql'].split('IN', 1)[1])
@@ -0,0 +1,123 @@
+"""
+Tests for the Project -> ProjectGroup link and the indexes behind hot query shapes
+"""
+import importlib
+from datetime import date
+
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from milestones.models import Milestone
+from notifications.models import Notification
+from projects.models import Project, ProjectGroup
+from projects.read_model import refresh_project_summaries
+from system_monitoring.models import RequestLog
+
+link_migration = importlib.import_module('projects.migrations.0006_project_group_link_and_indexes')
+
+
+def index_name(model, fields):
+    for index in model._meta.indexes:
+        if list(index.fields) == fields:
+            return index.name
+    raise AssertionError(f'No index on {fields} for {model.__name__}')
+
+
+class QueryPlanTestCase(TestCase):
+    """The planner should pick the composite indexes for the measured query shapes"""
+
+    def assertUsesIndex(self, queryset, name):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would otherwise always be scanned sequentially
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        elif connection.vendor != 'sqlite':
+            self.skipTest(f'No plan expectations for {connection.vendor}')
+        plan = queryset.explain()
+        self.assertIn(name, plan, plan)
+
+    def test_unread_notifications_by_recipient(self):
+        self.assertUsesIndex(
+            Notification.objects.filter(recipient_id='7', is_read=False).order_by('-created_at'),
+            index_name(Notification, ['recipient_id', 'is_read', '-created_at']),
+        )
+
+    def test_overdue_milestones(self):
+        self.assertUsesIndex(
+            Milestone.objects.filter(status='Pending', due_date__lt=date.today()),
+            index_name(Milestone, ['status', 'due_date']),
+        )
+
+    def test_project_groups_by_status(self):
+        self.assertUsesIndex(
+            ProjectGroup.objects.filter(status='Pending').order_by('-created_at'),
+            index_name(ProjectGroup, ['status', '-created_at']),
+        )
+
+    def test_project_groups_by_committee_member(self):
+        for field in ('main_committee_id', 'second_committee_id', 'third_committee_id'):
+            with self.subTest(field=field):
+                self.assertUsesIndex(
+                    ProjectGroup.objects.filter(**{field: 'ADV-001'}), index_name(ProjectGroup, [field]),
+                )
+
+    def test_request_log_keyset_page(self):
+        self.assertUsesIndex(
+            RequestLog.objects.filter(timestamp__lt=timezone.now()).order_by('-timestamp', '-id'),
+            index_name(RequestLog, ['-timestamp', '-id']),
+        )
+
+    def test_advisor_name_search_uses_trigram_index_on_postgres(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('Trigram index is PostgreSQL only')
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1 FROM pg_indexes WHERE indexname = %s', [link_migration.ADVISOR_NAME_TRGM_INDEX])
+            if cursor.fetchone() is None:
+                self.skipTest('pg_trgm is not available')
+        self.assertUsesIndex(
+            ProjectGroup.objects.filter(advisor_name__icontains='hopper'), link_migration.ADVISOR_NAME_TRGM_INDEX,
+        )
+
+
+class ProjectGroupLinkTestCase(TestCase):
+    """Project.project_group should follow the project_id match"""
+
+    def _group(self, project_id):
+        return ProjectGroup.objects.create(project_id=project_id, topic_lao='', topic_eng=project_id)
+
+    def test_linked_whichever_is_created_first(self):
+        project = Project.objects.create(project_id='2024-2025-L001', title='Project first')
+        group = self._group('2024-2025-L001')
+        project.refresh_from_db()
+        self.assertEqual(project.project_group, group)
+
+        group = self._group('2024-2025-L002')
+        project = Project.objects.create(project_id='2024-2025-L002', title='Group first')
+        self.assertEqual(project.project_group_id, group.pk)
+        self.assertEqual(group.legacy_project, project)
+
+    def test_bulk_created_groups_are_linked_on_refresh(self):
+        project = Project.objects.create(project_id='2024-2025-L003', title='Bulk')
+        ProjectGroup.objects.bulk_create([ProjectGroup(project_id='2024-2025-L003', topic_lao='', topic_eng='Bulk')])
+        refresh_project_summaries(['2024-2025-L003'])
+        project.refresh_from_db()
+        self.assertEqual(project.project_group.project_id, '2024-2025-L003')
+
+    def test_backfill_links_existing_rows(self):
+        projects = [Project.objects.create(project_id=f'2024-2025-L1{i}', title='Old') for i in range(3)]
+        for project in projects[:2]:
+            self._group(project.project_id)
+        Project.objects.update(project_group=None)
+
+        class SchemaEditor:
+            pass
+        schema_editor = SchemaEditor()
+        schema_editor.connection = connection
+        link_migration.link_project_groups(apps, schema_editor)
+
+        linked = dict(Project.objects.values_list('project_id', 'project_group__project_id'))
+        self.assertEqual(linked, {
+            '2024-2025-L10': '2024-2025-L10', '2024-2025-L11': '2024-2025-L11', '2024-2025-L12': None,
+        })
@@ -0,0 +1,126 @@
+"""
+Tests for the shared rate limiter
+"""
+import threading
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import RequestFactory, TestCase, override_settings
+
+from core import rate_limit
+from core.middleware import RateLimitMiddleware
+from core.middleware.websocket_rate_limit import WebSocketRateLimitMiddleware
+from core.rate_limit import CacheRateLimiter, LocalRateLimiter, Rate, evaluate
+
+
+class RateLimiterTestCase(TestCase):
+    """Limits should be enforced atomically and only count allowed hits"""
+
+    def assert_limits(self, limiter):
+        rates = [Rate(3, 60)]
+        results = [limiter.hit('client', rates) for _ in range(4)]
+        self.assertEqual([r.allowed for r in results], [True, True, True, False])
+        self.assertEqual([r.remaining for r in results[:3]], [2, 1, 0])
+        self.assertGreater(results[3].retry_after, 0)
+        # Other keys have their own counters
+        self.assertTrue(limiter.hit('other', rates).allowed)
+
+    def test_local_limiter(self):
+        self.assert_limits(LocalRateLimiter())
+
+    def test_cache_limiter(self):
+        self.assert_limits(CacheRateLimiter(LocMemCache('rate-limit-test', {})))
+
+    def test_blocked_hits_are_not_counted(self):
+        for limiter in [LocalRateLimiter(), CacheRateLimiter(LocMemCache('rate-limit-blocked', {}))]:
+            with mock.patch('core.rate_limit.time.time', return_value=120.0):
+                for _ in range(5):
+                    limiter.hit('client', [Rate(2, 60)])
+            # The next window only sees the two allowed hits, weighted by overlap
+            with mock.patch('core.rate_limit.time.time', return_value=210.0):
+                self.assertTrue(limiter.hit('client', [Rate(2, 60)]).allowed)
+
+    def test_cache_limiter_is_not_undercounted_by_concurrent_hits(self):
+        class SlowCache(LocMemCache):
+            def get_many(self, keys, version=None):
+                values = super().get_many(keys, version)
+                time.sleep(0.05)    # every worker reads before any of them is judged
+                return values
+
+        limiter = CacheRateLimiter(SlowCache('rate-limit-race', {}))
+        start = threading.Barrier(8)
+        results = []
+
+        def hit():
+            start.wait()
+            results.append(limiter.hit('client', [Rate(3, 3600)]).allowed)
+
+        threads = [threading.Thread(target=hit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 3)
+
+    def test_sliding_window_weights_previous_window(self):
+        rate = Rate(10, 60)
+        # A quarter into the window, 75% of the previous window still counts
+        self.assertFalse(evaluate([rate], [(2, 10)], now=15.0).allowed)
+        self.assertTrue(evaluate([rate], [(2, 8)], now=15.0).allowed)
+        # Every rate must have room
+        self.assertFalse(evaluate([Rate(100, 60), Rate(5, 3600)], [(0, 0), (5, 0)], now=0.0).allowed)
+
+    def test_slots(self):
+        limiter = LocalRateLimiter()
+        self.assertTrue(limiter.acquire('ip', 2, 60))
+        self.assertTrue(limiter.acquire('ip', 2, 60))
+        self.assertFalse(limiter.acquire('ip', 2, 60))
+        limiter.release('ip')
+        self.assertTrue(limiter.acquire('ip', 2, 60))
+
+
+class RateLimitMiddlewareTestCase(TestCase):
+    """Both middlewares should share the process-wide limiter"""
+
+    def setUp(self):
+        rate_limit.reset_rate_limiter()
+        self.addCleanup(rate_limit.reset_rate_limiter)
+
+    def test_http_returns_429_with_retry_after(self):
+        api_security = {
+            **settings.API_SECURITY,
+            'MAX_REQUESTS_PER_MINUTE': 2,
+            'RATE_LIMIT_LOCAL_FALLBACK': True,
+        }
+        middleware = RateLimitMiddleware(lambda request: None)
+        factory = RequestFactory()
+        with override_settings(API_SECURITY=api_security):
+            responses = [middleware.process_request(factory.get('/api/projects/')) for _ in range(3)]
+
+        self.assertIsNone(responses[0])
+        self.assertIsNone(responses[1])
+        self.assertEqual(responses[2].status_code, 429)
+        self.assertIn('Retry-After', responses[2])
+
+    def test_websocket_releases_connection_slot(self):
+        limiter = LocalRateLimiter()
+        sent = []
+
+        async def inner(scope, receive, send):
+            pass
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = WebSocketRateLimitMiddleware(inner)
+        scope = {'type': 'websocket', 'client': ('10.0.0.1', 1234), 'headers': []}
+        with mock.patch('core.middleware.websocket_rate_limit.get_rate_limiter', return_value=limiter):
+            for _ in range(middleware.MAX_CONNECTIONS_PER_IP + 1):
+                async_to_sync(middleware)(scope, None, send)
+
+        # Finished connections give their slot back, so none were refused
+        self.assertEqual(sent, [])
+        self.assertTrue(limiter.acquire('ws_concurrent:10.0.0.1', 1, 60))
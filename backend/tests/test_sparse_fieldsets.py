@@ -0,0 +1,131 @@
+"""
+Tests for sparse fieldsets (?fields= / ?omit=) on project, student and advisor serializers
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from advisors.models import Advisor, AdvisorNote, AdvisorSpecialization
+from advisors.serializers import AdvisorSerializer
+from milestones.models import Milestone, MilestoneTemplate
+from projects.models import LogEntry, Project, ProjectGroup, ProjectStudent
+from projects.serializers import ProjectSerializer
+from students.models import Student, StudentAttendance, StudentSkill
+from students.serializers import StudentSerializer
+
+User = get_user_model()
+
+
+class SparseFieldsetTestCase(TestCase):
+    """Unrequested fields should be neither computed nor prefetched"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='sparse_admin', email='sparse_admin@example.com', password='testpass123', role='Admin'
+        )
+        self.student_user = User.objects.create_user(
+            username='sparse_student', email='sparse_student@example.com', password='testpass123',
+            role='Student', first_name='Sam', last_name='Student'
+        )
+        self.template = MilestoneTemplate.objects.create(name='Default', description='Default')
+        for i in range(3):
+            project_id = f'2024-2025-F{i:03d}'
+            Project.objects.create(project_id=project_id, title=f'Project {i}')
+            group = ProjectGroup.objects.create(
+                project_id=project_id, topic_lao='', topic_eng=f'Topic {i}', advisor_name='Dr. Advisor'
+            )
+            ProjectStudent.objects.create(project_group=group, student=self.student_user)
+            Milestone.objects.create(
+                project_group=group, template=self.template, name='Proposal',
+                due_date=date.today() + timedelta(days=7),
+            )
+            LogEntry.objects.create(project=group, type='comment', author_id=1, content='hello')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def _request(self, query=''):
+        return Request(RequestFactory().get(f'/api/?{query}'))
+
+    def _serialize(self, serializer_class, queryset, query=''):
+        request = self._request(query)
+        queryset = serializer_class.optimize_queryset(queryset.all(), request)
+        with CaptureQueriesContext(connection) as ctx:
+            data = serializer_class(queryset, many=True, context={'request': request}).data
+        return len(ctx.captured_queries), data
+
+    def test_project_fields_skip_batch_parts(self):
+        projects = Project.objects.order_by('project_id')
+        full_queries, full = self._serialize(ProjectSerializer, projects)
+        self.assertIn('recent_activity', full[0])
+
+        queries, data = self._serialize(ProjectSerializer, projects, 'fields=id,project_id,status')
+        self.assertEqual(set(data[0]), {'id', 'project_id', 'status'})
+        # Only the projects themselves
+        self.assertEqual(queries, 1)
+
+        queries, data = self._serialize(ProjectSerializer, projects, 'fields=id,topic_eng,status')
+        self.assertEqual(data[0]['topic_eng'], 'Topic 0')
+        self.assertEqual(queries, 2)
+
+        queries, data = self._serialize(
+            ProjectSerializer, projects,
+            'omit=recent_activity,committee_member_names,milestone_count,pending_milestone_count,student_names'
+        )
+        self.assertNotIn('recent_activity', data[0])
+        self.assertEqual(data[0]['student_count'], 1)
+        self.assertLess(queries, full_queries)
+
+    def test_project_endpoint(self):
+        response = self.client.get('/api/projects/projects/', {'fields': 'project_id,topic_eng'})
+        self.assertEqual(response.status_code, 200)
+        rows = response.data.get('results', response.data) if isinstance(response.data, dict) else response.data
+        self.assertTrue(rows)
+        self.assertEqual(set(rows[0]), {'project_id', 'topic_eng'})
+
+        project = Project.objects.first()
+        response = self.client.get(f'/api/projects/projects/{project.pk}/', {'omit': 'recent_activity'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('recent_activity', response.data)
+        self.assertIn('student_names', response.data)
+
+    def test_student_fields_and_prefetches(self):
+        student = Student.objects.create(
+            user=self.student_user, student_id='SP-001', major='Computer Science', classroom='A'
+        )
+        StudentSkill.objects.create(student=student, skill_name='Python', category='technical')
+        StudentAttendance.objects.create(student=student, date=date.today(), status='present')
+
+        queries, data = self._serialize(StudentSerializer, Student.objects.all(), 'fields=id,student_id')
+        self.assertEqual(data, [{'id': student.pk, 'student_id': 'SP-001'}])
+        self.assertEqual(queries, 1)
+
+        queries, data = self._serialize(StudentSerializer, Student.objects.all(), 'fields=user,skills,attendance_summary')
+        self.assertEqual(data[0]['skills'][0]['skill_name'], 'Python')
+        self.assertEqual(data[0]['attendance_summary']['present_days'], 1)
+        # Students with their user, then one query per prefetched relation
+        self.assertEqual(queries, 3)
+
+    def test_advisor_queries_do_not_grow_with_rows(self):
+        def add_advisor(i):
+            user = User.objects.create_user(
+                username=f'sparse_adv{i}', email=f'sparse_adv{i}@example.com', password='testpass123', role='Advisor'
+            )
+            advisor = Advisor.objects.create(user=user, advisor_id=f'SP-ADV-{i}')
+            AdvisorSpecialization.objects.create(advisor=advisor, major='Computer Science')
+            AdvisorNote.objects.create(advisor=advisor, title='Note', content='Hi', created_by=self.admin)
+
+        add_advisor(0)
+        one, _ = self._serialize(AdvisorSerializer, Advisor.objects.all())
+        add_advisor(1)
+        add_advisor(2)
+        three, data = self._serialize(AdvisorSerializer, Advisor.objects.all())
+        self.assertEqual(one, three)
+        self.assertEqual(data[0]['recent_notes'][0]['created_by'], self.admin.get_full_name())
+
+        serializer = AdvisorSerializer(Advisor.objects.first(), fields=['advisor_id', 'quota'])
+        self.assertEqual(set(serializer.data), {'advisor_id', 'quota'})
@@ -0,0 +1,97 @@
+"""
+Tests for the compiled threat matcher used by the security middlewares
+"""
+from django.conf import settings
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.middleware import BlockSuspiciousRequestsMiddleware, EnvironmentProtectionMiddleware, SecurityMiddleware
+from core.threat_matcher import IPSet, PatternSet, TokenSet, get_threat_matcher
+
+
+class ThreatMatcherTestCase(TestCase):
+    """The combined matchers should agree with matching pattern by pattern"""
+
+    def test_pattern_set_reports_matching_pattern(self):
+        patterns = PatternSet([r'union\s+select', r'<script.*?>.*?</script>', r'\.env'])
+        self.assertEqual(patterns.search('1 UNION  SELECT password'), r'union\s+select')
+        self.assertEqual(patterns.search('<Script>alert(1)</script>'), r'<script.*?>.*?</script>')
+        self.assertIsNone(patterns.search('/api/projects/'))
+
+    def test_pattern_set_agrees_with_settings_patterns(self):
+        import re
+        patterns = settings.API_SECURITY['SUSPICIOUS_PATTERNS']
+        matcher = PatternSet(patterns)
+        samples = ['/wp-login.php', '/api/projects/?q=drop table x', 'javascript:alert(1)',
+                   '/api/students/', 'hello world', '/static/../etc/passwd', 'name=onload =x']
+        for sample in samples:
+            expected = any(re.search(p, sample, re.IGNORECASE) for p in patterns)
+            self.assertEqual(matcher.search(sample) is not None, expected, sample)
+
+    def test_pattern_set_handles_backreferences_and_invalid_patterns(self):
+        patterns = PatternSet([r'(a)\1', r'[unclosed', r'drop\s+table'])
+        self.assertEqual(patterns.patterns, [r'(a)\1', r'drop\s+table'])
+        self.assertEqual(patterns.search('xaax'), r'(a)\1')
+        self.assertIsNone(patterns.search('xabx'))
+        self.assertEqual(patterns.search('DROP TABLE'), r'drop\s+table')
+
+    def test_token_set(self):
+        tokens = TokenSet(['sqlmap', 'bot', '.env'])
+        self.assertEqual(tokens.search('Mozilla/5.0 SQLMap/1.7'), 'sqlmap')
+        self.assertEqual(tokens.search('/.ENV'), '.env')
+        self.assertIsNone(tokens.search('Mozilla/5.0 Firefox'))
+
+    def test_ip_set_addresses_and_networks(self):
+        blocked = IPSet(['203.0.113.7', '10.0.0.0/8', '2001:db8::/32', 'unknown'])
+        self.assertIn('203.0.113.7', blocked)
+        self.assertIn('10.200.3.4', blocked)
+        self.assertIn('2001:db8::1', blocked)
+        self.assertIn('unknown', blocked)
+        self.assertNotIn('203.0.113.8', blocked)
+        self.assertNotIn('11.0.0.1', blocked)
+        self.assertNotIn('2001:db9::1', blocked)
+        self.assertNotIn(None, blocked)
+
+
+class SecurityMiddlewareMatcherTestCase(TestCase):
+    """All three middlewares should read the shared, settings-driven matcher"""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_blocked_cidr_is_denied(self):
+        api_security = {**settings.API_SECURITY, 'BLOCKED_IPS': ['192.0.2.0/24']}
+        middleware = SecurityMiddleware(lambda request: None)
+        with override_settings(API_SECURITY=api_security):
+            request = self.factory.get('/api/projects/', REMOTE_ADDR='192.0.2.55')
+            self.assertEqual(middleware.process_request(request).status_code, 403)
+            request = self.factory.get('/api/projects/', REMOTE_ADDR='198.51.100.1')
+            self.assertIsNone(middleware.process_request(request))
+        # The matcher is rebuilt once the override ends
+        self.assertFalse(get_threat_matcher().is_blocked_ip('192.0.2.55'))
+
+    def test_suspicious_query_and_post_values(self):
+        middleware = SecurityMiddleware(lambda request: None)
+        request = self.factory.get('/api/projects/', {'q': "1' union select 1"})
+        self.assertEqual(middleware.process_request(request).status_code, 400)
+        request = self.factory.post('/api/projects/', {'title': '<script>alert(1)</script>'})
+        self.assertEqual(middleware.process_request(request).status_code, 400)
+        request = self.factory.get('/api/projects/', {'q': 'machine learning'})
+        self.assertIsNone(middleware.process_request(request))
+
+    def test_block_suspicious_user_agent_and_query(self):
+        middleware = BlockSuspiciousRequestsMiddleware(lambda request: None)
+        response = middleware.process_request(
+            self.factory.get('/api/projects/', HTTP_USER_AGENT='sqlmap/1.7')
+        )
+        self.assertEqual(response.status_code, 403)
+        response = middleware.process_request(self.factory.get('/api/projects/?file=php://input'))
+        self.assertEqual(response.status_code, 403)
+        self.assertIsNone(middleware.process_request(
+            self.factory.get('/api/projects/', HTTP_USER_AGENT='Mozilla/5.0 Firefox/128.0')
+        ))
+
+    def test_environment_protection(self):
+        middleware = EnvironmentProtectionMiddleware(lambda request: None)
+        self.assertEqual(middleware.process_request(self.factory.get('/.git/config')).status_code, 403)
+        self.assertEqual(middleware.process_request(self.factory.get('/api/..%2fsettings.py')).status_code, 403)
+        self.assertIsNone(middleware.process_request(self.factory.get('/api/monitoring/error-logs/')))